@@ -0,0 +1,257 @@
+"""Negotiated HTTP response compression (zstd, brotli, gzip)
+
+Pure ASGI middleware so streaming responses stay streaming:
+- complete bodies below minimum_size are sent as-is
+- complete bodies above it are compressed in one shot (Content-Length set)
+- streamed bodies (exports, NDJSON) use a streaming compressor that is
+  flushed after every chunk, so the client still receives data as it is
+  produced
+- SSE (text/event-stream) and responses that already carry a
+  Content-Encoding are never touched; WebSocket traffic is not HTTP
+
+brotli and zstandard are optional; gzip is always available.
+"""
+
+import zlib
+from collections.abc import Callable, Iterable
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# SSE must stay unbuffered; archives are already compressed
+EXCLUDED_MEDIA_TYPES = (
+    "text/event-stream",
+    "application/gzip",
+    "application/zip",
+    "application/zstd",
+)
+
+
+class _Stream:
+    """Incremental compressor: chunk() output is flushed, finish() ends it"""
+
+    def __init__(self, chunk: Callable[[bytes], bytes], finish: Callable[[], bytes]):
+        self.chunk = chunk
+        self.finish = finish
+
+
+class Encoder:
+    """One content coding with one-shot and streaming compression"""
+
+    def __init__(
+        self,
+        name: str,
+        compress: Callable[[bytes], bytes],
+        stream: Callable[[], _Stream],
+    ):
+        self.name = name
+        self.compress = compress
+        self.stream = stream
+
+
+def gzip_encoder(level: int = 6) -> Encoder:
+    def compress(data: bytes) -> bytes:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+
+    def stream() -> _Stream:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        return _Stream(
+            lambda data: compressor.compress(data)
+            + compressor.flush(zlib.Z_SYNC_FLUSH),
+            compressor.flush,
+        )
+
+    return Encoder("gzip", compress, stream)
+
+
+def brotli_encoder(quality: int = 4) -> Optional[Encoder]:
+    if brotli is None:
+        return None
+
+    def stream() -> _Stream:
+        compressor = brotli.Compressor(quality=quality)
+        return _Stream(
+            lambda data: compressor.process(data) + compressor.flush(),
+            compressor.finish,
+        )
+
+    return Encoder("br", lambda data: brotli.compress(data, quality=quality), stream)
+
+
+def zstd_encoder(level: int = 3) -> Optional[Encoder]:
+    if zstandard is None:
+        return None
+    one_shot = zstandard.ZstdCompressor(level=level)
+
+    def stream() -> _Stream:
+        compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        return _Stream(
+            lambda data: compressor.compress(data)
+            + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+            compressor.flush,
+        )
+
+    return Encoder("zstd", one_shot.compress, stream)
+
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    """Map of coding -> q-value from an Accept-Encoding header"""
+    accepted: dict[str, float] = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def negotiate(header: str, encoders: Iterable[Encoder]) -> Optional[Encoder]:
+    """Best encoder for Accept-Encoding; ties go to the server's order"""
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoder in encoders:
+        quality = accepted.get(encoder.name, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoder, quality
+    return best
+
+
+class CompressionMiddleware:
+    """Compress HTTP responses with the best coding the client accepts"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+        excluded_media_types: tuple[str, ...] = EXCLUDED_MEDIA_TYPES,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.excluded_media_types = excluded_media_types
+        # Server preference order (best ratio/speed trade-off first)
+        self.encoders = [
+            encoder
+            for encoder in (
+                zstd_encoder(zstd_level),
+                brotli_encoder(brotli_quality),
+                gzip_encoder(gzip_level),
+            )
+            if encoder is not None
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoder = negotiate(
+            Headers(scope=scope).get("accept-encoding", ""), self.encoders
+        )
+        if encoder is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(self, encoder, send)
+        await self.app(scope, receive, responder)
+
+
+class _CompressingResponder:
+    """Wraps `send` for one response"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoder: Encoder, send: Send):
+        self.middleware = middleware
+        self.encoder = encoder
+        self.send = send
+        self.start: Optional[Message] = None
+        self.passthrough = False
+        self.stream: Optional[_Stream] = None
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            headers = MutableHeaders(raw=message["headers"])
+            self.passthrough = not self._compressible(message["status"], headers)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send_start()
+            await self.send(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+
+        if self.stream is None and not more_body:
+            # Complete body in one message
+            if len(body) >= self.middleware.minimum_size:
+                body = self.encoder.compress(body)
+                self._set_encoding(len(body))
+            await self._send_start()
+            await self.send({"type": "http.response.body", "body": body})
+            return
+
+        if self.stream is None:
+            # Streaming body: length unknown up front
+            self.stream = self.encoder.stream()
+            self._set_encoding(None)
+            await self._send_start()
+
+        data = self.stream.chunk(body) if body else b""
+        if not more_body:
+            data += self.stream.finish()
+        if data or not more_body:
+            await self.send(
+                {"type": "http.response.body", "body": data, "more_body": more_body}
+            )
+
+    def _compressible(self, status: int, headers: MutableHeaders) -> bool:
+        if "content-encoding" in headers:
+            return False
+        if status < 200 or status in (204, 304):
+            return False
+        media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        if media_type in self.middleware.excluded_media_types:
+            return False
+        headers.add_vary_header("Accept-Encoding")
+        return True
+
+    def _set_encoding(self, length: Optional[int]) -> None:
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["Content-Encoding"] = self.encoder.name
+        if length is not None:
+            headers["Content-Length"] = str(length)
+        elif "content-length" in headers:
+            del headers["Content-Length"]
+        # A different representation: strong validators become weak
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = "W/" + etag
+
+    async def _send_start(self) -> None:
+        if self.start is not None:
+            start, self.start = self.start, None
+            await self.send(start)
@@ -0,0 +1,87 @@
+"""Conditional GET support (ETag / Last-Modified) for session endpoints
+
+Validators are derived from SessionVersion (revision + updated_at), which
+repositories can load without messages, so a matching request is answered
+with 304 before the session itself is read.
+"""
+
+import hashlib
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.domain.session.entities import SessionVersion
+
+# Cached copies must always be revalidated; the 304 path makes that cheap
+CACHE_CONTROL = "private, no-cache"
+
+
+def _utc(value: datetime) -> datetime:
+    """Stored timestamps are naive UTC; make them aware"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def session_etag(version: SessionVersion) -> str:
+    """Strong ETag of a single session"""
+    updated = int(_utc(version.updated_at).timestamp() * 1_000_000)
+    return f'"{version.revision}-{updated:x}"'
+
+
+def list_etag(versions: Sequence[SessionVersion]) -> str:
+    """Strong ETag of a session list (membership, order and versions)"""
+    digest = hashlib.blake2b(digest_size=12)
+    for version in versions:
+        digest.update(version.session_id.encode())
+        digest.update(session_etag(version).encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def last_modified(versions: Sequence[SessionVersion]) -> Optional[datetime]:
+    """Latest updated_at among versions, None for an empty list"""
+    return max((_utc(v.updated_at) for v in versions), default=None)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison (RFC 9110 13.1.2) for If-None-Match
+    candidates = (tag.strip().removeprefix("W/") for tag in header.split(","))
+    return etag.removeprefix("W/") in candidates
+
+
+def is_not_modified(request: Request, etag: str, modified: Optional[datetime]) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when it is absent"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return modified.replace(microsecond=0) <= since
+    return False
+
+
+def validator_headers(etag: str, modified: Optional[datetime]) -> dict[str, str]:
+    """ETag, Last-Modified and Cache-Control headers for a response"""
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if modified is not None:
+        headers["Last-Modified"] = format_datetime(modified, usegmt=True)
+    return headers
+
+
+def not_modified(etag: str, modified: Optional[datetime]) -> Response:
+    """Empty 304 response carrying the current validators"""
+    return Response(status_code=304, headers=validator_headers(etag, modified))
@@ -2,15 +2,25 @@
 
 from typing import Optional
 
+from app.config import Settings
 from app.domain.chat.ports import ChatService
 from app.domain.session.ports import SessionRepository
 from app.harness.container import Container
+from app.infrastructure.admission import AdmissionController
+from app.application.chat.batch import BatchChatUseCase
 from app.application.chat.send_message import SendMessageUseCase
 from app.application.session.create_session import CreateSessionUseCase
 from app.application.session.list_sessions import ListSessionsUseCase
 from app.application.session.get_session import GetSessionUseCase
 from app.application.session.update_session import UpdateSessionUseCase
 from app.application.session.delete_session import DeleteSessionUseCase
+from app.application.session.select_branch import SelectBranchUseCase
+from app.application.session.list_messages import ListMessagesUseCase
+from app.application.session.export_sessions import ExportSessionsUseCase
+from app.application.session.import_sessions import ImportSessionsUseCase
+from app.application.session.bulk_action import BulkSessionActionUseCase
+from app.application.session.batch_get_sessions import BatchGetSessionsUseCase
+from app.application.search.search_messages import SearchMessagesUseCase
 
 # Singleton container
 _container: Optional[Container] = None
@@ -30,6 +40,10 @@ def set_container(container: Container) -> None:
     _container = container
 
 
+def get_config() -> Settings:
+    return get_container().config
+
+
 # Port dependencies
 def get_session_repository() -> SessionRepository:
     return get_container().session_repository()
@@ -39,11 +53,19 @@ def get_chat_service() -> ChatService:
     return get_container().chat_service()
 
 
+def get_admission_controller() -> AdmissionController:
+    return get_container().admission_controller()
+
+
 # Use case dependencies
 def get_send_message_use_case() -> SendMessageUseCase:
     return get_container().send_message_use_case()
 
 
+def get_batch_chat_use_case() -> BatchChatUseCase:
+    return get_container().batch_chat_use_case()
+
+
 def get_create_session_use_case() -> CreateSessionUseCase:
     return get_container().create_session_use_case()
 
@@ -62,3 +84,31 @@ def get_update_session_use_case() -> UpdateSessionUseCase:
 
 def get_delete_session_use_case() -> DeleteSessionUseCase:
     return get_container().delete_session_use_case()
+
+
+def get_select_branch_use_case() -> SelectBranchUseCase:
+    return get_container().select_branch_use_case()
+
+
+def get_list_messages_use_case() -> ListMessagesUseCase:
+    return get_container().list_messages_use_case()
+
+
+def get_search_messages_use_case() -> SearchMessagesUseCase:
+    return get_container().search_messages_use_case()
+
+
+def get_export_sessions_use_case() -> ExportSessionsUseCase:
+    return get_container().export_sessions_use_case()
+
+
+def get_import_sessions_use_case() -> ImportSessionsUseCase:
+    return get_container().import_sessions_use_case()
+
+
+def get_bulk_session_action_use_case() -> BulkSessionActionUseCase:
+    return get_container().bulk_session_action_use_case()
+
+
+def get_batch_get_sessions_use_case() -> BatchGetSessionsUseCase:
+    return get_container().batch_get_sessions_use_case()
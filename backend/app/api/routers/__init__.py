@@ -2,6 +2,14 @@
 
 from .chat import router as chat_router
 from .health import router as health_router
+from .search import router as search_router
 from .sessions import router as sessions_router
+from .websocket import router as websocket_router
 
-__all__ = ["chat_router", "sessions_router", "health_router"]
\ No newline at end of file
+__all__ = [
+    "chat_router",
+    "sessions_router",
+    "health_router",
+    "websocket_router",
+    "search_router",
+]
\ No newline at end of file
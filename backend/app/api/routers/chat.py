@@ -1,14 +1,23 @@
 """Chat streaming endpoint with SSE"""
 
-import json
-
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
 
-from app.application.chat.dto import ChatRequest
+from app.application.chat.batch import BatchChatUseCase
+from app.application.chat.dto import BatchChatRequest, ChatRequest
 from app.application.chat.send_message import SendMessageUseCase
+from app.infrastructure.admission import (
+    AdmissionController,
+    AdmissionTimeoutError,
+    Priority,
+)
 
-from ..dependencies import get_send_message_use_case
+from ..dependencies import (
+    get_admission_controller,
+    get_batch_chat_use_case,
+    get_send_message_use_case,
+)
+from ..serialization import SSE_DONE, dumps, encode_sse_data, encode_sse_token
 
 router = APIRouter(prefix="/api", tags=["chat"])
 
@@ -17,6 +26,7 @@ router = APIRouter(prefix="/api", tags=["chat"])
 async def stream_chat(
     request: ChatRequest,
     use_case: SendMessageUseCase = Depends(get_send_message_use_case),
+    admission: AdmissionController = Depends(get_admission_controller),
 ):
     """
     Stream chat response using Server-Sent Events (SSE)
@@ -32,19 +42,22 @@ async def stream_chat(
         async def generate_sse():
             """Generate SSE stream"""
             try:
-                # Stream tokens from use case
-                async for token in use_case.execute(request):
-                    # Send token as SSE
-                    data = json.dumps({"content": token}, ensure_ascii=False)
-                    yield f"data: {data}\n\n"
+                # Hold an interactive slot for the whole generation
+                async with admission.slot(Priority.INTERACTIVE):
+                    # Stream tokens from use case
+                    async for token in use_case.execute(request):
+                        # Send token as SSE (pre-encoded bytes)
+                        yield encode_sse_token(token)
 
                 # Send completion signal
-                yield "data: [DONE]\n\n"
+                yield SSE_DONE
+
+            except AdmissionTimeoutError as e:
+                yield encode_sse_data({"error": str(e), "retryable": True})
 
             except Exception as e:
                 # Send error in SSE format
-                error_data = json.dumps({"error": str(e)}, ensure_ascii=False)
-                yield f"data: {error_data}\n\n"
+                yield encode_sse_data({"error": str(e)})
 
         return StreamingResponse(
             generate_sse(),
@@ -57,4 +70,37 @@ async def stream_chat(
         )
 
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/chat/batch")
+async def batch_chat(
+    request: BatchChatRequest,
+    use_case: BatchChatUseCase = Depends(get_batch_chat_use_case),
+):
+    """
+    Run many prompts concurrently (non-streaming per prompt)
+
+    Returns NDJSON, one line per item in completion order:
+    {"index": 0, "status": "ok", "content": "...", "model": "..."}\n
+
+    Batch generations share the interactive admission budget at a lower
+    priority.
+    """
+    try:
+        use_case.validate(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def generate_ndjson():
+        """Generate NDJSON lines"""
+        try:
+            async for result in use_case.execute(request):
+                yield result.model_dump_json(exclude_none=True) + "\n"
+        except Exception as e:
+            yield dumps({"error": str(e)}) + b"\n"
+
+    return StreamingResponse(
+        generate_ndjson(),
+        media_type="application/x-ndjson",
+        headers={"X-Accel-Buffering": "no"},
+    )
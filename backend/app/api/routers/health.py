@@ -1,6 +1,11 @@
 """Health check endpoint"""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from app.harness.container import Container
+from app.infrastructure.metrics import metrics
+
+from ..dependencies import get_container
 
 router = APIRouter(tags=["health"])
 
@@ -8,4 +13,19 @@ router = APIRouter(tags=["health"])
 @router.get("/health")
 async def health_check():
     """Basic health check endpoint"""
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+
+@router.get("/health/metrics")
+async def metrics_snapshot():
+    """In-process counters and gauges for this container"""
+    return metrics.snapshot()
+
+
+@router.get("/health/pool")
+async def pool_stats(container: Container = Depends(get_container)):
+    """MongoDB connection pool utilization for this container"""
+    stats = container.pool_stats()
+    if stats is None:
+        return {"status": "disconnected"}
+    return {"status": "ok", **stats}
@@ -0,0 +1,20 @@
+"""Message search endpoint"""
+
+from fastapi import APIRouter, Depends, Query
+
+from app.application.search import SearchMessagesUseCase, SearchResponseDTO
+
+from ..dependencies import get_search_messages_use_case
+
+router = APIRouter(prefix="/api/search", tags=["search"])
+
+
+@router.get("", response_model=SearchResponseDTO)
+async def search_messages(
+    browser_id: str = Query(..., description="Browser ID whose sessions to search"),
+    q: str = Query(..., min_length=1, max_length=200, description="Search text"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of hits"),
+    use_case: SearchMessagesUseCase = Depends(get_search_messages_use_case),
+):
+    """Search all messages of a browser; returns ranked snippets"""
+    return await use_case.execute(browser_id, q, limit)
@@ -1,26 +1,75 @@
 """Session CRUD endpoints"""
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 
 from app.application.session.dto import (
+    MessagePageDTO,
+    SessionBatchGetRequest,
+    SessionBatchGetResponse,
+    SessionBranchDTO,
+    SessionBulkActionDTO,
+    SessionBulkActionResponse,
+    SessionImportRequest,
+    SessionImportResponse,
     SessionCreateDTO,
     SessionResponseDTO,
     SessionUpdateDTO,
 )
+from app.config import Settings
+from app.domain.session.entities import SessionVersion
+from app.domain.session.errors import SessionConflictError
+from app.application.session.export_sessions import (
+    FILE_EXTENSIONS,
+    MEDIA_TYPES,
+    ExportFormat,
+)
 from app.application.session import (
+    BatchGetSessionsUseCase,
+    BulkSessionActionUseCase,
+    ImportSessionsUseCase,
     CreateSessionUseCase,
     DeleteSessionUseCase,
+    ExportSessionsUseCase,
     GetSessionUseCase,
+    ListMessagesUseCase,
     ListSessionsUseCase,
+    SelectBranchUseCase,
     UpdateSessionUseCase,
 )
 
+from ..compression import gzip_encoder
 from ..dependencies import (
+    get_batch_get_sessions_use_case,
+    get_bulk_session_action_use_case,
+    get_config,
+    get_export_sessions_use_case,
+    get_import_sessions_use_case,
     get_list_sessions_use_case,
     get_get_session_use_case,
     get_create_session_use_case,
     get_update_session_use_case,
     get_delete_session_use_case,
+    get_select_branch_use_case,
+    get_list_messages_use_case,
+)
+from ..conditional import (
+    is_not_modified,
+    last_modified,
+    list_etag,
+    not_modified,
+    session_etag,
+    validator_headers,
+)
+from ..serialization import (
+    JSONBytesResponse,
+    session_batch_to_json,
+    session_to_json,
+    sessions_to_json,
 )
 
 router = APIRouter(prefix="/api/sessions", tags=["sessions"])
@@ -28,6 +77,7 @@ router = APIRouter(prefix="/api/sessions", tags=["sessions"])
 
 @router.get("", response_model=list[SessionResponseDTO])
 async def get_sessions(
+    request: Request,
     browser_id: str = Query(..., description="Browser ID to filter sessions"),
     skip: int = Query(0, ge=0, description="Number of sessions to skip"),
     limit: int = Query(100, ge=1, le=500, description="Maximum number of sessions"),
@@ -36,44 +86,130 @@ async def get_sessions(
     """
     Get all sessions for a browser ID, sorted by updated_at desc.
     Returns sessions without messages for performance.
+    Supports If-None-Match (304 without loading sessions). If-Modified-Since
+    is ignored: deleting a session does not move the latest updated_at, so
+    only the ETag notices membership changes.
     """
+    versions = await use_case.versions(browser_id, skip, limit)
+    etag = list_etag(versions)
+    if is_not_modified(request, etag, None):
+        return not_modified(etag, last_modified(versions))
+
     sessions = await use_case.execute(browser_id, skip, limit)
 
-    # Convert to response DTOs without messages
-    return [
-        SessionResponseDTO(
-            session_id=s.session_id,
-            browser_id=s.browser_id,
-            title=s.title,
-            pinned=s.pinned,
-            created_at=s.created_at,
-            updated_at=s.updated_at,
-            messages=None,  # Don't include messages in list view
-        )
-        for s in sessions
-    ]
+    # Validators describe the body actually sent
+    versions = [SessionVersion.of(s) for s in sessions]
+    headers = validator_headers(list_etag(versions), last_modified(versions))
+
+    # Encode directly in the SessionResponseDTO shape (messages=None)
+    return JSONBytesResponse(sessions_to_json(sessions), headers=headers)
+
+
+async def _gzip_stream(
+    chunks: AsyncIterator[bytes], level: int
+) -> AsyncIterator[bytes]:
+    """Compress a byte stream chunk by chunk (for .gz downloads)"""
+    stream = gzip_encoder(level).stream()
+    async for chunk in chunks:
+        data = stream.chunk(chunk)
+        if data:
+            yield data
+    yield stream.finish()
+
+
+# Must be declared before /{session_id} so "export" is not taken as an ID
+@router.get("/export")
+async def export_sessions(
+    browser_id: str = Query(..., description="Browser ID whose sessions to export"),
+    format: ExportFormat = Query("ndjson", description="ndjson, markdown or json"),
+    compress: bool = Query(False, description="Download as a .gz file"),
+    use_case: ExportSessionsUseCase = Depends(get_export_sessions_use_case),
+    config: Settings = Depends(get_config),
+):
+    """
+    Export all sessions of a browser as a streamed download.
+    Sessions are read from a repository cursor and sent one at a time
+    (chunked transfer), so neither side holds the whole export in memory.
+    """
+    chunks = use_case.execute(browser_id, format)
+    filename = f"conversations-{datetime.utcnow():%Y%m%d}.{FILE_EXTENSIONS[format]}"
+    media_type = MEDIA_TYPES[format]
+    if compress:
+        chunks = _gzip_stream(chunks, config.compression_gzip_level)
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.get("/{session_id}", response_model=SessionResponseDTO)
 async def get_session(
+    request: Request,
     session_id: str,
+    tree: bool = Query(
+        False, description="Return every branch instead of the active path"
+    ),
     use_case: GetSessionUseCase = Depends(get_get_session_use_case),
 ):
-    """Get a specific session with all messages"""
+    """
+    Get a specific session with the messages of its active branch.
+    With tree=1, messages holds every branch in creation order.
+    Supports If-None-Match / If-Modified-Since (304 without loading messages).
+    """
+    version = await use_case.version(session_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    etag = session_etag(version)
+    modified = last_modified([version])
+    if is_not_modified(request, etag, modified):
+        return not_modified(etag, modified)
+
     session = await use_case.execute(session_id)
 
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    return SessionResponseDTO(
-        session_id=session.session_id,
-        browser_id=session.browser_id,
-        title=session.title,
-        pinned=session.pinned,
-        created_at=session.created_at,
-        updated_at=session.updated_at,
-        messages=session.messages,  # Include messages
-    )
+    version = SessionVersion.of(session)
+    headers = validator_headers(session_etag(version), last_modified([version]))
+    if not tree:
+        session = session.model_copy(update={"messages": session.active_path()})
+
+    # Encode entity + messages straight to JSON bytes (no DTO re-validation)
+    return JSONBytesResponse(session_to_json(session), headers=headers)
+
+
+@router.get("/{session_id}/messages", response_model=MessagePageDTO)
+async def get_messages(
+    session_id: str,
+    after: Optional[str] = Query(
+        None, description="Message id or ISO timestamp; return newer messages"
+    ),
+    before: Optional[str] = Query(
+        None, description="Message id or ISO timestamp; return older messages"
+    ),
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of messages"),
+    use_case: ListMessagesUseCase = Depends(get_list_messages_use_case),
+):
+    """
+    Get one page of messages in creation order.
+    Without a cursor the latest page is returned (one screen, not the whole
+    history); `after` fetches what is new since the last seen message and
+    `before` scrolls back.
+    """
+    try:
+        page = await use_case.execute(session_id, after, before, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if page is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    return JSONBytesResponse(page.__pydantic_serializer__.to_json(page))
 
 
 @router.post("", response_model=SessionResponseDTO)
@@ -98,6 +234,48 @@ async def create_session(
     )
 
 
+@router.post("/bulk", response_model=SessionImportResponse)
+async def import_sessions(
+    request: SessionImportRequest,
+    use_case: ImportSessionsUseCase = Depends(get_import_sessions_use_case),
+):
+    """
+    Import many sessions with their messages in one write (e.g. migrating
+    localStorage). Existing sessions are reported as "exists", not replaced.
+    """
+    try:
+        return await use_case.execute(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/bulk/actions", response_model=SessionBulkActionResponse)
+async def bulk_session_action(
+    action: SessionBulkActionDTO,
+    use_case: BulkSessionActionUseCase = Depends(get_bulk_session_action_use_case),
+):
+    """Pin, unpin or delete the listed sessions, or all sessions of a browser"""
+    return await use_case.execute(action)
+
+
+@router.post("/batch-get", response_model=SessionBatchGetResponse)
+async def batch_get_sessions(
+    request: SessionBatchGetRequest,
+    use_case: BatchGetSessionsUseCase = Depends(get_batch_get_sessions_use_case),
+):
+    """
+    Load several sessions of a browser in one request (one database query).
+    Unknown IDs, and IDs of other browsers, are returned in `missing`.
+    """
+    try:
+        sessions, missing = await use_case.execute(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSONBytesResponse(
+        session_batch_to_json(sessions, missing, request.include_messages)
+    )
+
+
 @router.patch("/{session_id}", response_model=SessionResponseDTO)
 async def update_session(
     session_id: str,
@@ -118,6 +296,42 @@ async def update_session(
         created_at=session.created_at,
         updated_at=session.updated_at,
         messages=None,  # Don't include messages in update response
+        active_leaf_id=session.active_leaf_id,
+        message_count=session.message_count,
+        total_tokens=session.total_tokens,
+        last_message_preview=session.last_message_preview,
+    )
+
+
+@router.put("/{session_id}/branch", response_model=SessionResponseDTO)
+async def select_branch(
+    session_id: str,
+    branch: SessionBranchDTO,
+    use_case: SelectBranchUseCase = Depends(get_select_branch_use_case),
+):
+    """Switch the active branch to the one through the given message"""
+    try:
+        session = await use_case.execute(session_id, branch.message_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except SessionConflictError:
+        raise HTTPException(status_code=409, detail="Session was modified; retry")
+
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    return SessionResponseDTO(
+        session_id=session.session_id,
+        browser_id=session.browser_id,
+        title=session.title,
+        pinned=session.pinned,
+        created_at=session.created_at,
+        updated_at=session.updated_at,
+        messages=session.active_path(),  # Only the selected branch
+        active_leaf_id=session.active_leaf_id,
+        message_count=session.message_count,
+        total_tokens=session.total_tokens,
+        last_message_preview=session.last_message_preview,
     )
 
 
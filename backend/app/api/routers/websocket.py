@@ -0,0 +1,223 @@
+"""Chat over WebSocket with multiplexed streams
+
+One connection carries several concurrent generations. Every frame is a JSON
+object tagged with the client-chosen stream_id and the session_id.
+
+Client -> server:
+    {"type": "start", "stream_id": "s1", <ChatRequest fields>}
+    {"type": "cancel", "stream_id": "s1"}
+    {"type": "ping"}
+
+Server -> client:
+    {"type": "token", "stream_id": "s1", "session_id": "...", "content": "..."}
+    {"type": "done", "stream_id": "s1", "session_id": "..."}
+    {"type": "cancelled", "stream_id": "s1", "session_id": "..."}
+    {"type": "error", "stream_id": "s1", "error": "...", "retryable": false}
+    {"type": "pong"}
+"""
+
+import asyncio
+import json
+from collections import deque
+from typing import Any
+
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+
+from app.application.chat.dto import ChatRequest
+from app.application.chat.send_message import SendMessageUseCase
+from app.config import Settings
+from app.infrastructure.admission import (
+    AdmissionController,
+    AdmissionTimeoutError,
+    Priority,
+)
+
+from ..dependencies import (
+    get_admission_controller,
+    get_config,
+    get_send_message_use_case,
+)
+
+router = APIRouter(tags=["chat"])
+
+
+class ChatConnection:
+    """Multiplexes chat streams over a single WebSocket
+
+    Outgoing frames go through one buffer drained by a single sender task.
+    Token frames are bounded: when the client reads slowly the buffer fills
+    and generations pause until it drains (backpressure). Control frames
+    (done/error/cancelled/pong) are never blocked. Consecutive tokens of the
+    same stream that are still buffered are merged into one frame.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        use_case: SendMessageUseCase,
+        admission: AdmissionController,
+        max_streams: int = 8,
+        buffer_frames: int = 256,
+    ):
+        self._ws = websocket
+        self._use_case = use_case
+        self._admission = admission
+        self._max_streams = max_streams
+        self._buffer_frames = max(1, buffer_frames)
+
+        self._streams: dict[str, asyncio.Task] = {}
+        self._frames: deque[dict[str, Any]] = deque()
+        self._buffered_tokens = 0
+        self._has_frames = asyncio.Event()
+        self._has_room = asyncio.Event()
+        self._has_room.set()
+
+    async def run(self) -> None:
+        """Serve the connection until the client disconnects"""
+        sender = asyncio.create_task(self._send_loop())
+        try:
+            while True:
+                raw = await self._ws.receive_text()
+                try:
+                    frame = json.loads(raw)
+                except json.JSONDecodeError:
+                    self._emit({"type": "error", "error": "Invalid JSON frame"})
+                    continue
+                self._handle(frame)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            for task in list(self._streams.values()):
+                task.cancel()
+            await asyncio.gather(*self._streams.values(), return_exceptions=True)
+            sender.cancel()
+            await asyncio.gather(sender, return_exceptions=True)
+
+    def _handle(self, frame: Any) -> None:
+        if not isinstance(frame, dict):
+            self._emit({"type": "error", "error": "Frame must be a JSON object"})
+            return
+
+        frame_type = frame.get("type")
+        stream_id = frame.get("stream_id")
+
+        if frame_type == "ping":
+            self._emit({"type": "pong"})
+        elif frame_type == "cancel":
+            task = self._streams.get(stream_id)
+            if task:
+                task.cancel()
+        elif frame_type == "start":
+            self._start(stream_id, frame)
+        else:
+            self._emit(
+                {
+                    "type": "error",
+                    "stream_id": stream_id,
+                    "error": f"Unknown frame type: {frame_type}",
+                }
+            )
+
+    def _start(self, stream_id: Any, frame: dict[str, Any]) -> None:
+        error = None
+        if not isinstance(stream_id, str) or not stream_id:
+            error = "stream_id is required"
+        elif stream_id in self._streams:
+            error = "stream_id is already active"
+        elif len(self._streams) >= self._max_streams:
+            error = f"At most {self._max_streams} concurrent streams per connection"
+
+        request = None
+        if error is None:
+            payload = {k: v for k, v in frame.items() if k not in ("type", "stream_id")}
+            try:
+                request = ChatRequest(**payload)
+            except ValidationError as e:
+                error = str(e)
+
+        if error is not None:
+            self._emit({"type": "error", "stream_id": stream_id, "error": error})
+            return
+
+        self._streams[stream_id] = asyncio.create_task(
+            self._run_stream(stream_id, request)
+        )
+
+    async def _run_stream(self, stream_id: str, request: ChatRequest) -> None:
+        tag = {"stream_id": stream_id, "session_id": request.session_id}
+        try:
+            async with self._admission.slot(Priority.INTERACTIVE):
+                async for token in self._use_case.execute(request):
+                    await self._emit_token({"type": "token", **tag, "content": token})
+            self._emit({"type": "done", **tag})
+        except asyncio.CancelledError:
+            self._emit({"type": "cancelled", **tag})
+            raise
+        except AdmissionTimeoutError as e:
+            self._emit({"type": "error", **tag, "error": str(e), "retryable": True})
+        except Exception as e:
+            self._emit({"type": "error", **tag, "error": str(e), "retryable": False})
+        finally:
+            self._streams.pop(stream_id, None)
+
+    def _emit(self, frame: dict[str, Any]) -> None:
+        """Queue a control frame (never blocks)"""
+        self._frames.append(frame)
+        self._has_frames.set()
+
+    async def _emit_token(self, frame: dict[str, Any]) -> None:
+        """Queue a token frame, waiting while the send buffer is full"""
+        while self._buffered_tokens >= self._buffer_frames:
+            self._has_room.clear()
+            await self._has_room.wait()
+        self._buffered_tokens += 1
+        self._emit(frame)
+
+    def _drain(self) -> list[dict[str, Any]]:
+        """Take all buffered frames, merging consecutive tokens per stream"""
+        out: list[dict[str, Any]] = []
+        open_token: dict[str, dict[str, Any]] = {}
+        while self._frames:
+            frame = self._frames.popleft()
+            stream_id = frame.get("stream_id")
+            if frame["type"] == "token":
+                self._buffered_tokens -= 1
+                pending = open_token.get(stream_id)
+                if pending is not None:
+                    pending["content"] += frame["content"]
+                    continue
+                frame = dict(frame)
+                open_token[stream_id] = frame
+            else:
+                open_token.pop(stream_id, None)
+            out.append(frame)
+
+        self._has_frames.clear()
+        self._has_room.set()
+        return out
+
+    async def _send_loop(self) -> None:
+        while True:
+            await self._has_frames.wait()
+            for frame in self._drain():
+                await self._ws.send_json(frame)
+
+
+@router.websocket("/ws/chat")
+async def chat_websocket(
+    websocket: WebSocket,
+    use_case: SendMessageUseCase = Depends(get_send_message_use_case),
+    admission: AdmissionController = Depends(get_admission_controller),
+    config: Settings = Depends(get_config),
+):
+    """Multiplexed chat streams over one WebSocket connection"""
+    await websocket.accept()
+    connection = ChatConnection(
+        websocket,
+        use_case,
+        admission,
+        max_streams=config.ws_max_streams_per_connection,
+        buffer_frames=config.ws_send_buffer_frames,
+    )
+    await connection.run()
@@ -0,0 +1,117 @@
+"""Fast JSON encoding for SSE frames and session payloads
+
+Encodes straight to bytes and bypasses FastAPI's response_model round trip
+(dump -> validate -> dump -> json.dumps), which walks every message of a
+session several times. Uses orjson when installed and falls back to the
+standard library otherwise; both produce the same JSON.
+"""
+
+import json
+from datetime import datetime
+from typing import Any
+
+from fastapi.responses import Response
+
+from app.domain.session.entities import Session
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# Fields of SessionResponseDTO, in response order
+SESSION_FIELDS = (
+    "session_id",
+    "browser_id",
+    "title",
+    "pinned",
+    "created_at",
+    "updated_at",
+    "messages",
+    "active_leaf_id",
+    "message_count",
+    "total_tokens",
+    "last_message_preview",
+)
+_SESSION_INCLUDE = set(SESSION_FIELDS)
+
+_SSE_TOKEN_PREFIX = b'data: {"content": '
+_SSE_TOKEN_SUFFIX = b"}\n\n"
+SSE_DONE = b"data: [DONE]\n\n"
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> bytes:
+    """Serialize plain Python data to UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default)
+    return json.dumps(
+        value, ensure_ascii=False, separators=(",", ":"), default=_default
+    ).encode()
+
+
+def encode_sse_token(token: str) -> bytes:
+    """Encode one token as an SSE frame: data: {"content": "..."}"""
+    return _SSE_TOKEN_PREFIX + dumps(token) + _SSE_TOKEN_SUFFIX
+
+
+def encode_sse_data(payload: dict[str, Any]) -> bytes:
+    """Encode an arbitrary JSON object as an SSE frame"""
+    return b"data: " + dumps(payload) + b"\n\n"
+
+
+def session_to_json(session: Session, include_messages: bool = True) -> bytes:
+    """Encode a session in the SessionResponseDTO shape
+
+    With messages, pydantic-core serializes the entity (and all messages)
+    directly to JSON in one pass. Without them, only scalar fields are read.
+    """
+    if include_messages:
+        return session.__pydantic_serializer__.to_json(
+            session, include=_SESSION_INCLUDE
+        )
+    return dumps(session_summary(session))
+
+
+def session_summary(session: Session) -> dict[str, Any]:
+    """Scalar SessionResponseDTO fields with messages set to None"""
+    return {
+        "session_id": session.session_id,
+        "browser_id": session.browser_id,
+        "title": session.title,
+        "pinned": session.pinned,
+        "created_at": session.created_at,
+        "updated_at": session.updated_at,
+        "messages": None,
+        "active_leaf_id": session.active_leaf_id,
+        "message_count": session.message_count,
+        "total_tokens": session.total_tokens,
+        "last_message_preview": session.last_message_preview,
+    }
+
+
+def sessions_to_json(sessions: list[Session]) -> bytes:
+    """Encode a session list (without messages) as a JSON array"""
+    return dumps([session_summary(s) for s in sessions])
+
+
+def session_batch_to_json(
+    sessions: list[Session], missing: list[str], include_messages: bool = True
+) -> bytes:
+    """Encode a SessionBatchGetResponse: {"sessions": [...], "missing": [...]}"""
+    encoded = b",".join(session_to_json(s, include_messages) for s in sessions)
+    return b'{"sessions":[' + encoded + b'],"missing":' + dumps(missing) + b"}"
+
+
+class JSONBytesResponse(Response):
+    """Response for bodies that are already encoded JSON bytes"""
+
+    media_type = "application/json"
+
+    def __init__(self, content: bytes, status_code: int = 200, **kwargs: Any):
+        super().__init__(content=content, status_code=status_code, **kwargs)
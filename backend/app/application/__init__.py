@@ -10,6 +10,11 @@ from .session import (
     GetSessionUseCase,
     UpdateSessionUseCase,
     DeleteSessionUseCase,
+    SelectBranchUseCase,
+    ListMessagesUseCase,
+    ExportSessionsUseCase,
+    ImportSessionsUseCase,
+    BulkSessionActionUseCase,
 )
 
 __all__ = [
@@ -24,4 +29,9 @@ __all__ = [
     "GetSessionUseCase",
     "UpdateSessionUseCase",
     "DeleteSessionUseCase",
+    "SelectBranchUseCase",
+    "ListMessagesUseCase",
+    "ExportSessionsUseCase",
+    "ImportSessionsUseCase",
+    "BulkSessionActionUseCase",
 ]
\ No newline at end of file
@@ -1,6 +1,21 @@
 """Chat application layer"""
 
-from .dto import ChatRequest, ChatResponse
+from .batch import BatchChatUseCase
+from .dto import (
+    BatchChatItem,
+    BatchChatRequest,
+    BatchChatResult,
+    ChatRequest,
+    ChatResponse,
+)
 from .send_message import SendMessageUseCase
 
-__all__ = ["ChatRequest", "ChatResponse", "SendMessageUseCase"]
+__all__ = [
+    "ChatRequest",
+    "ChatResponse",
+    "BatchChatItem",
+    "BatchChatRequest",
+    "BatchChatResult",
+    "SendMessageUseCase",
+    "BatchChatUseCase",
+]
@@ -0,0 +1,350 @@
+"""Batch chat use case"""
+
+import asyncio
+from collections.abc import AsyncGenerator
+from typing import Optional
+
+from app.domain.chat.entities import MessageEmbed
+from app.domain.chat.ports import ChatService
+from app.domain.search.ports import SearchIndex
+from app.domain.session.entities import Session
+from app.domain.session.errors import SessionConflictError
+from app.domain.session.locks import KeyedLock
+from app.domain.session.ports import SessionRepository
+from app.infrastructure.admission import AdmissionController, Priority
+
+from .dto import BatchChatItem, BatchChatRequest, BatchChatResult
+
+
+class _GroupWrite:
+    """A session group's new messages, waiting for the next write_batch"""
+
+    def __init__(
+        self,
+        session: Session,
+        messages: list[MessageEmbed],
+        revision: int,
+        is_new: bool,
+    ):
+        self.session = session
+        self.messages = messages
+        self.revision = revision
+        self.is_new = is_new
+        # Resolves to the session written to, or to the write's error
+        self.done: asyncio.Future[Session] = asyncio.get_running_loop().create_future()
+
+
+class BatchChatUseCase:
+    """Use case for answering many prompts concurrently without streaming
+
+    Items that target the same session run in order within one worker,
+    holding the session's lock (shared with interactive turns via
+    `session_locks`), so turns never interleave; different sessions (and
+    stateless items) run concurrently up to the concurrency limit. Every
+    generation holds a BATCH-priority admission slot, so batch work shares
+    the interactive budget but always queues behind it.
+
+    A session group's new messages are queued once it is done generating,
+    and queued groups are written together: new sessions with one
+    insert_many, the others with one write_batch whose appends are each
+    guarded by the revision their session was loaded at. Only sessions that
+    conflicted are reloaded and retried, like interactive turns. A batch is
+    written once `write_batch_size` groups are queued or no group is still
+    generating. A group keeps its session lock (but frees its concurrency
+    slot) until its write lands, and its results are only reported then;
+    answers that could not be saved are reported as errors.
+    """
+
+    def __init__(
+        self,
+        session_repository: SessionRepository,
+        chat_service: ChatService,
+        admission: Optional[AdmissionController] = None,
+        concurrency: int = 8,
+        max_items: int = 1000,
+        admission_timeout: Optional[float] = None,
+        search_index: Optional[SearchIndex] = None,
+        session_locks: Optional[KeyedLock] = None,
+        append_attempts: int = 5,
+        write_batch_size: int = 100,
+    ):
+        self.session_repository = session_repository
+        self.chat_service = chat_service
+        self.admission = admission
+        self.concurrency = max(1, concurrency)
+        self.max_items = max_items
+        self.admission_timeout = admission_timeout
+        self.search_index = search_index
+        self.session_locks = KeyedLock() if session_locks is None else session_locks
+        self.append_attempts = max(1, append_attempts)
+        self.write_batch_size = max(1, write_batch_size)
+
+    def validate(self, request: BatchChatRequest) -> None:
+        """
+        Check request limits before streaming starts
+
+        Raises:
+            ValueError: If the batch has too many items
+        """
+        if len(request.items) > self.max_items:
+            raise ValueError(
+                f"Batch has {len(request.items)} items; the limit is {self.max_items}"
+            )
+
+    async def execute(
+        self, request: BatchChatRequest
+    ) -> AsyncGenerator[BatchChatResult, None]:
+        """
+        Execute the batch
+
+        Args:
+            request: Batch of prompts
+
+        Yields:
+            One result per item, in completion order
+        """
+        self.validate(request)
+
+        # Group items by session; stateless items each get their own group
+        groups: list[tuple[Optional[str], list[tuple[int, BatchChatItem]]]] = []
+        by_session: dict[str, list[tuple[int, BatchChatItem]]] = {}
+        for index, item in enumerate(request.items):
+            if item.session_id is None:
+                groups.append((None, [(index, item)]))
+            elif item.session_id in by_session:
+                by_session[item.session_id].append((index, item))
+            else:
+                by_session[item.session_id] = [(index, item)]
+                groups.append((item.session_id, by_session[item.session_id]))
+
+        limit = min(request.concurrency or self.concurrency, self.concurrency)
+        semaphore = asyncio.Semaphore(limit)
+        results: asyncio.Queue[BatchChatResult] = asyncio.Queue()
+        pending: list[_GroupWrite] = []
+        # Session groups holding their lock that may still queue a write;
+        # groups waiting for a lock do not count, so two batches never
+        # wait for each other's writes
+        generating = 0
+
+        async def flush_if_due() -> None:
+            if pending and (len(pending) >= self.write_batch_size or generating == 0):
+                batch = list(pending)
+                pending.clear()
+                await self._persist(batch)
+
+        async def generate(
+            session_id: str, entries: list[tuple[int, BatchChatItem]]
+        ) -> tuple[list[BatchChatResult], Optional[_GroupWrite]]:
+            try:
+                session = await self.session_repository.find_by_session_id(session_id)
+            except Exception as e:
+                return [self._error(index, item, e) for index, item in entries], None
+            is_new = session is None
+            if session is None:
+                session = Session(session_id=session_id, browser_id=request.browser_id)
+
+            revision, known = session.revision, len(session.messages)
+            group_results = [
+                await self._run_item(index, item, session) for index, item in entries
+            ]
+            new_messages = session.messages[known:]
+            if not new_messages:
+                return group_results, None
+            return group_results, _GroupWrite(session, new_messages, revision, is_new)
+
+        async def run_session(
+            session_id: str, entries: list[tuple[int, BatchChatItem]]
+        ) -> None:
+            nonlocal generating
+            await semaphore.acquire()
+            slot_held = True
+            try:
+                async with self.session_locks.hold(session_id):
+                    generating += 1
+                    try:
+                        group_results, write = await generate(session_id, entries)
+                    finally:
+                        generating -= 1
+                    # Let other groups generate while this write is queued
+                    semaphore.release()
+                    slot_held = False
+                    if write is not None:
+                        pending.append(write)
+                    await flush_if_due()
+                    if write is not None:
+                        try:
+                            session = await write.done
+                        except Exception as e:
+                            group_results = [self._unsaved(r, e) for r in group_results]
+                        else:
+                            await self._index(session, write.messages)
+            finally:
+                if slot_held:
+                    semaphore.release()
+            for result in group_results:
+                await results.put(result)
+
+        async def run_group(
+            session_id: Optional[str], entries: list[tuple[int, BatchChatItem]]
+        ) -> None:
+            if session_id is not None:
+                await run_session(session_id, entries)
+                return
+            async with semaphore:
+                for index, item in entries:
+                    await results.put(await self._run_item(index, item, None))
+
+        tasks = [
+            asyncio.create_task(run_group(key, entries)) for key, entries in groups
+        ]
+        try:
+            for _ in range(len(request.items)):
+                yield await results.get()
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _persist(self, writes: list[_GroupWrite]) -> None:
+        """
+        Write queued groups together, retrying only the conflicting ones
+
+        New sessions go through one insert_many and the others through one
+        write_batch guarded by each session's loaded revision. A session
+        that already existed or conflicted is reloaded, gets its messages
+        added again in order and is retried, up to `append_attempts` times.
+        Every write's `done` future is resolved (or failed with
+        SessionConflictError or the repository's error).
+        """
+        repository = self.session_repository
+        for attempt in range(1, self.append_attempts + 1):
+            creates = [w for w in writes if w.is_new]
+            appends = [w for w in writes if not w.is_new]
+            try:
+                inserted = (
+                    await repository.insert_many([w.session for w in creates])
+                    if creates
+                    else []
+                )
+                conflicts = (
+                    await repository.write_batch(
+                        [],
+                        [(w.session, w.messages) for w in appends],
+                        {w.session.session_id: w.revision for w in appends},
+                    )
+                    if appends
+                    else set()
+                )
+            except Exception as e:
+                for write in writes:
+                    write.done.set_exception(e)
+                return
+
+            retry = [w for w, ok in zip(creates, inserted) if not ok]
+            retry += [w for w in appends if w.session.session_id in conflicts]
+            for write in writes:
+                if write not in retry:
+                    write.done.set_result(write.session)
+            if attempt == self.append_attempts:
+                for write in retry:
+                    write.done.set_exception(
+                        SessionConflictError(write.session.session_id, write.revision)
+                    )
+                return
+
+            writes = []
+            for write in retry:
+                try:
+                    fresh = await repository.find_by_session_id(
+                        write.session.session_id
+                    )
+                except Exception as e:
+                    write.done.set_exception(e)
+                    continue
+                if fresh is None:
+                    # Deleted during the batch; do not bring it back
+                    write.done.set_result(write.session)
+                    continue
+                write.session, write.revision, write.is_new = (
+                    fresh,
+                    fresh.revision,
+                    False,
+                )
+                for message in write.messages:
+                    fresh.add_message(message)
+                writes.append(write)
+            if not writes:
+                return
+
+    async def _index(self, session: Session, messages: list[MessageEmbed]) -> None:
+        """Add appended messages to the search index (best effort)"""
+        if self.search_index is None:
+            return
+        try:
+            await self.search_index.index_messages(session, messages)
+        except Exception as e:
+            print(f"Error indexing messages: {e}")
+
+    async def _run_item(
+        self, index: int, item: BatchChatItem, session: Optional[Session]
+    ) -> BatchChatResult:
+        """Generate one answer; appends the turn to the session on success"""
+        user_msg = MessageEmbed(role="user", content=item.message)
+        history = [*(session.active_path() if session else []), user_msg]
+
+        try:
+            if self.admission is not None:
+                await self.admission.acquire(Priority.BATCH, self.admission_timeout)
+            try:
+                model = self.chat_service.resolve_model(
+                    history, model=item.model, tags=item.tags
+                )
+                tokens = [
+                    token
+                    async for token in self.chat_service.stream_response(
+                        messages=history,
+                        model=model,
+                        system_prompt=item.system_prompt,
+                        params=item.inference_params(),
+                    )
+                ]
+            finally:
+                if self.admission is not None:
+                    self.admission.release(Priority.BATCH)
+        except Exception as e:
+            return self._error(index, item, e)
+
+        content = "".join(tokens)
+        if session is not None:
+            session.add_message(user_msg)
+            session.add_message(
+                MessageEmbed(role="assistant", content=content, model=model)
+            )
+
+        return BatchChatResult(
+            index=index,
+            id=item.id,
+            session_id=item.session_id,
+            status="ok",
+            content=content,
+            model=model,
+        )
+
+    @staticmethod
+    def _unsaved(result: BatchChatResult, error: Exception) -> BatchChatResult:
+        """An answered item whose turn could not be saved"""
+        if result.status != "ok":
+            return result
+        return result.model_copy(
+            update={"status": "error", "error": f"Answer not saved: {error}"}
+        )
+
+    @staticmethod
+    def _error(index: int, item: BatchChatItem, error: Exception) -> BatchChatResult:
+        return BatchChatResult(
+            index=index,
+            id=item.id,
+            session_id=item.session_id,
+            status="error",
+            error=str(error),
+        )
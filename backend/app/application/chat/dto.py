@@ -1,18 +1,50 @@
 """Chat DTOs"""
 
-from typing import Optional
+from typing import Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
+
+from app.domain.chat.entities import InferenceParams
 
 
 class ChatRequest(BaseModel):
-    """Chat request DTO"""
+    """Chat request DTO
+
+    Inference overrides are optional; the server clamps them to its
+    configured ceilings. Set edit_message_id to send `message` as an edit of
+    an earlier user message, or regenerate to answer the latest user message
+    again; both create a branch instead of a new session. `message` is
+    required except with regenerate, which ignores it.
+    """
 
     session_id: str
     browser_id: str
-    message: str
+    message: str = ""
+    edit_message_id: Optional[str] = None
+    regenerate: bool = False
     model: Optional[str] = None
     system_prompt: Optional[str] = None
+    tags: Optional[list[str]] = None
+    max_tokens: Optional[int] = Field(default=None, ge=1)
+    temperature: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+    top_p: Optional[float] = Field(default=None, gt=0.0, le=1.0)
+    stop_sequences: Optional[list[str]] = None
+
+    def inference_params(self) -> Optional[InferenceParams]:
+        """Per-request inference overrides, or None if none were given"""
+        params = InferenceParams(
+            max_tokens=self.max_tokens,
+            temperature=self.temperature,
+            top_p=self.top_p,
+            stop_sequences=self.stop_sequences,
+        )
+        return None if params.is_empty() else params
+
+    @model_validator(mode="after")
+    def _check_message(self) -> "ChatRequest":
+        if not self.message and not self.regenerate:
+            raise ValueError("message is required unless regenerate is set")
+        return self
 
 
 class ChatResponse(BaseModel):
@@ -20,3 +52,47 @@ class ChatResponse(BaseModel):
 
     content: str
     model: str
+
+
+class BatchChatItem(BaseModel):
+    """Single prompt within a batch request
+
+    Items with a session_id continue (or create) that session and are
+    persisted; items without one are answered statelessly.
+    """
+
+    id: Optional[str] = None
+    session_id: Optional[str] = None
+    message: str
+    model: Optional[str] = None
+    system_prompt: Optional[str] = None
+    tags: Optional[list[str]] = None
+    max_tokens: Optional[int] = Field(default=None, ge=1)
+    temperature: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+
+    def inference_params(self) -> Optional[InferenceParams]:
+        """Per-item inference overrides, or None if none were given"""
+        params = InferenceParams(
+            max_tokens=self.max_tokens, temperature=self.temperature
+        )
+        return None if params.is_empty() else params
+
+
+class BatchChatRequest(BaseModel):
+    """Batch chat request DTO"""
+
+    browser_id: str
+    items: list[BatchChatItem] = Field(min_length=1)
+    concurrency: Optional[int] = Field(default=None, ge=1)
+
+
+class BatchChatResult(BaseModel):
+    """Result line for one batch item (emitted as NDJSON)"""
+
+    index: int
+    id: Optional[str] = None
+    session_id: Optional[str] = None
+    status: Literal["ok", "error"]
+    content: Optional[str] = None
+    model: Optional[str] = None
+    error: Optional[str] = None
@@ -1,9 +1,12 @@
 """Send message use case"""
 
 from collections.abc import AsyncGenerator
+from typing import Optional
 
 from app.domain.chat.ports import ChatService
 from app.domain.chat.service import ChatOrchestrator
+from app.domain.search.ports import SearchIndex
+from app.domain.session.locks import KeyedLock
 from app.domain.session.ports import SessionRepository
 
 from .dto import ChatRequest
@@ -16,8 +19,17 @@ class SendMessageUseCase:
         self,
         session_repository: SessionRepository,
         chat_service: ChatService,
+        search_index: Optional[SearchIndex] = None,
+        session_locks: Optional[KeyedLock] = None,
+        append_attempts: int = 5,
     ):
-        self.orchestrator = ChatOrchestrator(session_repository, chat_service)
+        self.orchestrator = ChatOrchestrator(
+            session_repository,
+            chat_service,
+            search_index,
+            session_locks=session_locks,
+            append_attempts=append_attempts,
+        )
 
     async def execute(self, request: ChatRequest) -> AsyncGenerator[str, None]:
         """
@@ -35,5 +47,9 @@ class SendMessageUseCase:
             user_message=request.message,
             model=request.model,
             system_prompt=request.system_prompt,
+            tags=request.tags,
+            params=request.inference_params(),
+            edit_message_id=request.edit_message_id,
+            regenerate=request.regenerate,
         ):
             yield token
@@ -0,0 +1,6 @@
+"""Search application layer"""
+
+from .dto import SearchResponseDTO
+from .search_messages import SearchMessagesUseCase
+
+__all__ = ["SearchResponseDTO", "SearchMessagesUseCase"]
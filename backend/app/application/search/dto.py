@@ -0,0 +1,12 @@
+"""Search DTOs"""
+
+from pydantic import BaseModel
+
+from app.domain.search.entities import SearchHit
+
+
+class SearchResponseDTO(BaseModel):
+    """DTO for search results, best match first"""
+
+    query: str
+    hits: list[SearchHit]
@@ -0,0 +1,29 @@
+"""Search messages use case"""
+
+from app.domain.search.ports import SearchIndex
+
+from .dto import SearchResponseDTO
+
+
+class SearchMessagesUseCase:
+    """Use case for full-text search over a browser's messages"""
+
+    def __init__(self, search_index: SearchIndex):
+        self.search_index = search_index
+
+    async def execute(
+        self, browser_id: str, query: str, limit: int = 20
+    ) -> SearchResponseDTO:
+        """
+        Search messages
+
+        Args:
+            browser_id: Browser identifier (only its sessions are searched)
+            query: Text to find
+            limit: Maximum number of hits
+
+        Returns:
+            Ranked hits with snippets
+        """
+        hits = await self.search_index.search(browser_id, query, limit)
+        return SearchResponseDTO(query=query, hits=hits)
@@ -1,19 +1,55 @@
 """Session application layer"""
 
-from .dto import SessionCreateDTO, SessionResponseDTO, SessionUpdateDTO
+from .dto import (
+    MessagePageDTO,
+    SessionBatchGetRequest,
+    SessionBatchGetResponse,
+    SessionBranchDTO,
+    SessionBulkActionDTO,
+    SessionBulkActionResponse,
+    SessionImportDTO,
+    SessionImportRequest,
+    SessionImportResponse,
+    SessionImportResult,
+    SessionCreateDTO,
+    SessionResponseDTO,
+    SessionUpdateDTO,
+)
 from .create_session import CreateSessionUseCase
 from .list_sessions import ListSessionsUseCase
 from .get_session import GetSessionUseCase
 from .update_session import UpdateSessionUseCase
 from .delete_session import DeleteSessionUseCase
+from .select_branch import SelectBranchUseCase
+from .list_messages import ListMessagesUseCase
+from .export_sessions import ExportSessionsUseCase
+from .import_sessions import ImportSessionsUseCase
+from .bulk_action import BulkSessionActionUseCase
+from .batch_get_sessions import BatchGetSessionsUseCase
 
 __all__ = [
     "SessionCreateDTO",
     "SessionUpdateDTO",
     "SessionResponseDTO",
+    "SessionBranchDTO",
+    "MessagePageDTO",
+    "SessionImportDTO",
+    "SessionImportRequest",
+    "SessionImportResult",
+    "SessionImportResponse",
+    "SessionBulkActionDTO",
+    "SessionBulkActionResponse",
+    "SessionBatchGetRequest",
+    "SessionBatchGetResponse",
     "CreateSessionUseCase",
     "ListSessionsUseCase",
     "GetSessionUseCase",
     "UpdateSessionUseCase",
     "DeleteSessionUseCase",
+    "SelectBranchUseCase",
+    "ListMessagesUseCase",
+    "ExportSessionsUseCase",
+    "ImportSessionsUseCase",
+    "BulkSessionActionUseCase",
+    "BatchGetSessionsUseCase",
 ]
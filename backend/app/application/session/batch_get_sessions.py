@@ -0,0 +1,51 @@
+"""Batch get sessions use case"""
+
+from app.domain.session.entities import Session
+from app.domain.session.ports import SessionRepository
+
+from .dto import SessionBatchGetRequest
+
+
+class BatchGetSessionsUseCase:
+    """Use case for loading several sessions in one request
+
+    Uses the repository's find_many (one $in query; coalesced with other
+    concurrent lookups when the repository batches them).
+    """
+
+    def __init__(self, session_repository: SessionRepository, max_items: int = 100):
+        self.session_repository = session_repository
+        self.max_items = max_items
+
+    async def execute(
+        self, request: SessionBatchGetRequest
+    ) -> tuple[list[Session], list[str]]:
+        """
+        Load sessions by ID
+
+        Args:
+            request: Session IDs of one browser
+
+        Returns:
+            (sessions in request order, IDs not found for this browser)
+
+        Raises:
+            ValueError: If the request has too many session IDs
+        """
+        session_ids = list(dict.fromkeys(request.session_ids))
+        if len(session_ids) > self.max_items:
+            raise ValueError(
+                f"Request has {len(session_ids)} session IDs; "
+                f"the limit is {self.max_items}"
+            )
+
+        found = await self.session_repository.find_many(session_ids)
+        sessions: list[Session] = []
+        missing: list[str] = []
+        for session_id in session_ids:
+            session = found.get(session_id)
+            if session is None or session.browser_id != request.browser_id:
+                missing.append(session_id)
+            else:
+                sessions.append(session)
+        return sessions, missing
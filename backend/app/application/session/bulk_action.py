@@ -0,0 +1,49 @@
+"""Bulk session action use case"""
+
+from typing import Optional
+
+from app.domain.search.ports import SearchIndex
+from app.domain.session.ports import SessionRepository
+
+from .dto import SessionBulkActionDTO, SessionBulkActionResponse
+
+
+class BulkSessionActionUseCase:
+    """Use case for pinning, unpinning or deleting many sessions at once
+
+    Each action is one repository call (update_many / delete_many in Mongo),
+    always scoped to the requesting browser.
+    """
+
+    def __init__(
+        self,
+        session_repository: SessionRepository,
+        search_index: Optional[SearchIndex] = None,
+    ):
+        self.session_repository = session_repository
+        self.search_index = search_index
+
+    async def execute(self, dto: SessionBulkActionDTO) -> SessionBulkActionResponse:
+        """
+        Apply a bulk action
+
+        Args:
+            dto: Action and its targets (session_ids or all)
+
+        Returns:
+            Number of sessions matched by the action
+        """
+        session_ids = None if dto.all else dto.session_ids
+
+        if dto.action == "delete":
+            matched = await self.session_repository.delete_many(
+                dto.browser_id, session_ids
+            )
+            if self.search_index is not None:
+                await self.search_index.remove_sessions(dto.browser_id, session_ids)
+        else:
+            matched = await self.session_repository.set_pinned_many(
+                dto.browser_id, session_ids, pinned=dto.action == "pin"
+            )
+
+        return SessionBulkActionResponse(action=dto.action, matched=matched)
@@ -25,13 +25,8 @@ class CreateSessionUseCase:
             Created session
 
         Raises:
-            ValueError: If session already exists
+            SessionAlreadyExistsError: If session already exists (a ValueError)
         """
-        # Check if session already exists
-        existing = await self.session_repository.find_by_session_id(dto.session_id)
-        if existing:
-            raise ValueError("Session already exists")
-
         # Create new session
         session = Session(
             session_id=dto.session_id,
@@ -43,5 +38,5 @@ class CreateSessionUseCase:
             updated_at=datetime.utcnow(),
         )
 
-        # Save and return
-        return await self.session_repository.save(session)
+        # Insert; uniqueness is enforced by the repository
+        return await self.session_repository.create(session)
@@ -1,13 +1,21 @@
 """Delete session use case"""
 
+from typing import Optional
+
+from app.domain.search.ports import SearchIndex
 from app.domain.session.ports import SessionRepository
 
 
 class DeleteSessionUseCase:
     """Use case for deleting a session"""
 
-    def __init__(self, session_repository: SessionRepository):
+    def __init__(
+        self,
+        session_repository: SessionRepository,
+        search_index: Optional[SearchIndex] = None,
+    ):
         self.session_repository = session_repository
+        self.search_index = search_index
 
     async def execute(self, session_id: str) -> bool:
         """
@@ -19,4 +27,7 @@ class DeleteSessionUseCase:
         Returns:
             True if deleted, False if not found
         """
-        return await self.session_repository.delete(session_id)
+        deleted = await self.session_repository.delete(session_id)
+        if deleted and self.search_index is not None:
+            await self.search_index.remove_session(session_id)
+        return deleted
@@ -1,9 +1,9 @@
 """Session DTOs"""
 
 from datetime import datetime
-from typing import Optional
+from typing import Any, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, Field, model_validator
 
 from app.domain.chat.entities import MessageEmbed
 
@@ -24,8 +24,19 @@ class SessionUpdateDTO(BaseModel):
     pinned: Optional[bool] = None
 
 
+class SessionBranchDTO(BaseModel):
+    """DTO for selecting the active branch"""
+
+    message_id: str
+
+
 class SessionResponseDTO(BaseModel):
-    """DTO for session responses"""
+    """DTO for session responses
+
+    `messages` holds the active branch (root first), or every branch in
+    creation order when the full tree was requested; active_leaf_id marks
+    the branch to display (walk parent_id from it to the root).
+    """
 
     session_id: str
     browser_id: str
@@ -34,6 +45,115 @@ class SessionResponseDTO(BaseModel):
     created_at: datetime
     updated_at: datetime
     messages: Optional[list[MessageEmbed]] = None
+    active_leaf_id: Optional[str] = None
+    message_count: int = 0
+    total_tokens: int = 0
+    last_message_preview: Optional[str] = None
 
     class Config:
         from_attributes = True
+
+
+class MessagePageDTO(BaseModel):
+    """DTO for a page of messages (creation order)
+
+    has_more: more messages exist in the paging direction (newer for
+    `after`, older for `before` or the latest page).
+    """
+
+    session_id: str
+    messages: list[MessageEmbed]
+    has_more: bool
+    active_leaf_id: Optional[str] = None
+
+
+class SessionImportDTO(BaseModel):
+    """One session to import, with its messages
+
+    Also accepts the frontend's localStorage shape (id, createdAt,
+    updatedAt; timestamps in epoch milliseconds).
+    """
+
+    session_id: str = Field(validation_alias=AliasChoices("session_id", "id"))
+    title: str = "새 채팅"
+    pinned: bool = False
+    messages: list[MessageEmbed] = Field(default_factory=list)
+    active_leaf_id: Optional[str] = None
+    created_at: Optional[datetime] = Field(
+        default=None, validation_alias=AliasChoices("created_at", "createdAt")
+    )
+    updated_at: Optional[datetime] = Field(
+        default=None, validation_alias=AliasChoices("updated_at", "updatedAt")
+    )
+
+
+class SessionImportRequest(BaseModel):
+    """DTO for bulk session import; every session belongs to browser_id
+
+    Sessions are validated one by one (as SessionImportDTO) by the use case,
+    so a malformed session is reported in its result instead of failing
+    the whole request.
+    """
+
+    browser_id: str
+    sessions: list[dict[str, Any]] = Field(min_length=1)
+
+
+class SessionImportResult(BaseModel):
+    """Outcome of importing one session"""
+
+    session_id: str
+    status: Literal["created", "exists", "error"]
+    error: Optional[str] = None
+
+
+class SessionImportResponse(BaseModel):
+    """DTO for bulk import responses (results in request order)"""
+
+    created: int
+    results: list[SessionImportResult]
+
+
+class SessionBulkActionDTO(BaseModel):
+    """DTO for bulk pin/unpin/delete
+
+    Targets either the listed session_ids or, with all=True, every session
+    of the browser.
+    """
+
+    browser_id: str
+    action: Literal["pin", "unpin", "delete"]
+    session_ids: Optional[list[str]] = None
+    all: bool = False
+
+    @model_validator(mode="after")
+    def _check_targets(self) -> "SessionBulkActionDTO":
+        if self.all == (self.session_ids is not None):
+            raise ValueError("Provide either session_ids or all=true")
+        return self
+
+
+class SessionBatchGetRequest(BaseModel):
+    """DTO for loading several sessions of one browser at once"""
+
+    browser_id: str
+    session_ids: list[str] = Field(min_length=1)
+    include_messages: bool = True
+
+
+class SessionBatchGetResponse(BaseModel):
+    """DTO for batch-get responses
+
+    sessions follow request order; IDs that do not exist or belong to
+    another browser are listed in missing.
+    """
+
+    sessions: list[SessionResponseDTO]
+    missing: list[str]
+
+
+class SessionBulkActionResponse(BaseModel):
+    """DTO for bulk action responses"""
+
+    action: str
+    matched: int
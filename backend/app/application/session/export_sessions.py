@@ -0,0 +1,86 @@
+"""Export sessions use case"""
+
+from collections.abc import AsyncGenerator
+from typing import Literal
+
+from app.domain.session.entities import Session
+from app.domain.session.ports import SessionRepository
+
+ExportFormat = Literal["ndjson", "markdown", "json"]
+
+MEDIA_TYPES: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "markdown": "text/markdown; charset=utf-8",
+    "json": "application/json",
+}
+
+FILE_EXTENSIONS: dict[str, str] = {
+    "ndjson": "ndjson",
+    "markdown": "md",
+    "json": "json",
+}
+
+# Internal bookkeeping that is not part of the exported session shape
+_EXCLUDED_FIELDS = {"revision"}
+
+
+def session_to_markdown(session: Session) -> str:
+    """Markdown for one session (the active branch, like the chat view)"""
+    parts = [
+        f"# {session.title}\n\n",
+        f"*Created: {session.created_at.isoformat()}*\n\n---\n\n",
+    ]
+    for message in session.active_path():
+        role = "**You**" if message.role == "user" else "**AI**"
+        parts.append(f"{role}:\n\n{message.content}\n\n---\n\n")
+    return "".join(parts)
+
+
+class ExportSessionsUseCase:
+    """Use case for exporting every session of a browser as a stream
+
+    Sessions are pulled one at a time from the repository cursor and encoded
+    one at a time, so memory stays flat however many sessions a user has.
+    """
+
+    def __init__(self, session_repository: SessionRepository, batch_size: int = 100):
+        self.session_repository = session_repository
+        self.batch_size = max(1, batch_size)
+
+    async def execute(
+        self, browser_id: str, export_format: ExportFormat = "ndjson"
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        Export sessions
+
+        Args:
+            browser_id: Browser identifier
+            export_format: "ndjson" (one session per line), "markdown" or
+                "json" (a single array)
+
+        Yields:
+            Encoded chunks, one per session (plus array brackets for json)
+        """
+        sessions = self.session_repository.iter_by_browser_id(
+            browser_id, batch_size=self.batch_size
+        )
+
+        if export_format == "markdown":
+            first = True
+            async for session in sessions:
+                separator = "" if first else "\n"
+                first = False
+                yield (separator + session_to_markdown(session)).encode()
+        elif export_format == "json":
+            yield b"["
+            first = True
+            async for session in sessions:
+                prefix = b"" if first else b","
+                first = False
+                yield prefix + session.model_dump_json(
+                    exclude=_EXCLUDED_FIELDS
+                ).encode()
+            yield b"]"
+        else:
+            async for session in sessions:
+                yield session.model_dump_json(exclude=_EXCLUDED_FIELDS).encode() + b"\n"
@@ -2,7 +2,7 @@
 
 from typing import Optional
 
-from app.domain.session.entities import Session
+from app.domain.session.entities import Session, SessionVersion
 from app.domain.session.ports import SessionRepository
 
 
@@ -23,3 +23,15 @@ class GetSessionUseCase:
             Session if found, None otherwise
         """
         return await self.session_repository.find_by_session_id(session_id)
+
+    async def version(self, session_id: str) -> Optional[SessionVersion]:
+        """
+        Get a session's version without loading its messages
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            SessionVersion if found, None otherwise
+        """
+        return await self.session_repository.find_version(session_id)
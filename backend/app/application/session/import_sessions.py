@@ -0,0 +1,132 @@
+"""Import sessions use case"""
+
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from pydantic import ValidationError
+
+from app.domain.search.ports import SearchIndex
+from app.domain.session.entities import Session
+from app.domain.session.ports import SessionRepository
+
+from .dto import (
+    SessionImportDTO,
+    SessionImportRequest,
+    SessionImportResponse,
+    SessionImportResult,
+)
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Stored timestamps are naive UTC; epoch inputs parse as aware"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _raw_session_id(raw: dict[str, Any]) -> str:
+    """Best-effort ID of a session that failed validation"""
+    value = raw.get("session_id", raw.get("id"))
+    return value if isinstance(value, str) else ""
+
+
+def _to_session(item: SessionImportDTO, browser_id: str) -> Session:
+    now = datetime.utcnow()
+    for message in item.messages:
+        message.timestamp = _naive_utc(message.timestamp)
+    created_at = _naive_utc(item.created_at) or now
+    session = Session(
+        session_id=item.session_id,
+        browser_id=browser_id,
+        title=item.title,
+        pinned=item.pinned,
+        messages=item.messages,
+        active_leaf_id=item.active_leaf_id,
+        created_at=created_at,
+        updated_at=_naive_utc(item.updated_at) or created_at,
+    )
+    session.refresh_stats()
+    return session
+
+
+class ImportSessionsUseCase:
+    """Use case for creating many sessions (with messages) in one request
+
+    Sessions are written with a single repository insert_many instead of a
+    check-then-create per session. Existing sessions are never overwritten,
+    so re-running a migration is harmless. Each session is validated on its
+    own; invalid ones are reported as errors and the rest are imported.
+    """
+
+    def __init__(
+        self,
+        session_repository: SessionRepository,
+        search_index: Optional[SearchIndex] = None,
+        max_items: int = 1000,
+    ):
+        self.session_repository = session_repository
+        self.search_index = search_index
+        self.max_items = max_items
+
+    async def execute(self, request: SessionImportRequest) -> SessionImportResponse:
+        """
+        Import sessions
+
+        Args:
+            request: Sessions to import for one browser
+
+        Returns:
+            Per-session results in request order
+
+        Raises:
+            ValueError: If the request has too many sessions
+        """
+        if len(request.sessions) > self.max_items:
+            raise ValueError(
+                f"Import has {len(request.sessions)} sessions; "
+                f"the limit is {self.max_items}"
+            )
+
+        results: list[Optional[SessionImportResult]] = []
+        to_insert: list[tuple[int, Session]] = []
+        seen: set[str] = set()
+        for raw in request.sessions:
+            try:
+                item = SessionImportDTO.model_validate(raw)
+                session = _to_session(item, request.browser_id)
+            except (ValidationError, ValueError) as e:
+                results.append(
+                    SessionImportResult(
+                        session_id=_raw_session_id(raw), status="error", error=str(e)
+                    )
+                )
+                continue
+            if session.session_id in seen:
+                results.append(
+                    SessionImportResult(
+                        session_id=session.session_id,
+                        status="error",
+                        error="Duplicate session_id in request",
+                    )
+                )
+                continue
+            seen.add(session.session_id)
+            to_insert.append((len(results), session))
+            results.append(None)
+
+        inserted = await self.session_repository.insert_many(
+            [session for _, session in to_insert]
+        )
+
+        created = 0
+        for (position, session), ok in zip(to_insert, inserted):
+            results[position] = SessionImportResult(
+                session_id=session.session_id,
+                status="created" if ok else "exists",
+            )
+            if ok:
+                created += 1
+                if self.search_index is not None and session.messages:
+                    await self.search_index.index_messages(session, session.messages)
+
+        return SessionImportResponse(created=created, results=results)
@@ -0,0 +1,61 @@
+"""List messages use case (paged delta sync)"""
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.domain.session.entities import MessageCursor, MessagePage
+from app.domain.session.ports import SessionRepository
+
+
+def parse_cursor(value: Optional[str]) -> Optional[MessageCursor]:
+    """
+    Interpret a cursor query value
+
+    ISO 8601 timestamps become datetimes (naive UTC, like stored messages);
+    anything else is treated as a message id.
+    """
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return value
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+class ListMessagesUseCase:
+    """Use case for loading a page of a session's messages"""
+
+    def __init__(self, session_repository: SessionRepository):
+        self.session_repository = session_repository
+
+    async def execute(
+        self,
+        session_id: str,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        limit: int = 50,
+    ) -> Optional[MessagePage]:
+        """
+        Get messages after or before a cursor, or the latest page
+
+        Args:
+            session_id: Session identifier
+            after: Message id or ISO timestamp; returns newer messages
+            before: Message id or ISO timestamp; returns older messages
+            limit: Maximum number of messages to return
+
+        Returns:
+            MessagePage if the session exists, None otherwise
+
+        Raises:
+            ValueError: If both cursors are given or a message id is unknown
+        """
+        return await self.session_repository.find_messages(
+            session_id,
+            after=parse_cursor(after),
+            before=parse_cursor(before),
+            limit=limit,
+        )
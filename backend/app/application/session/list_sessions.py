@@ -1,6 +1,6 @@
 """List sessions use case"""
 
-from app.domain.session.entities import Session
+from app.domain.session.entities import Session, SessionVersion
 from app.domain.session.ports import SessionRepository
 
 
@@ -22,9 +22,29 @@ class ListSessionsUseCase:
             limit: Maximum number of sessions to return
 
         Returns:
-            List of sessions
+            List of sessions (messages may be omitted)
         """
-        return await self.session_repository.find_by_browser_id(
+        return await self.session_repository.list_summaries(
+            browser_id=browser_id,
+            skip=skip,
+            limit=limit,
+        )
+
+    async def versions(
+        self, browser_id: str, skip: int = 0, limit: int = 100
+    ) -> list[SessionVersion]:
+        """
+        Get versions of the sessions execute() would return, in order
+
+        Args:
+            browser_id: Browser identifier
+            skip: Number of sessions to skip
+            limit: Maximum number of sessions to return
+
+        Returns:
+            List of session versions (no messages are loaded)
+        """
+        return await self.session_repository.find_versions_by_browser_id(
             browser_id=browser_id,
             skip=skip,
             limit=limit,
@@ -0,0 +1,61 @@
+"""Select branch use case"""
+
+from typing import Optional
+
+from app.domain.session.entities import Session
+from app.domain.session.locks import KeyedLock
+from app.domain.session.ports import SessionRepository
+
+
+class SelectBranchUseCase:
+    """Use case for switching the active branch of a session
+
+    Runs under the chat turns' `session_locks`, so a switch never races a
+    turn of this process; a legacy session's full save is revision-guarded
+    against other processes.
+    """
+
+    def __init__(
+        self,
+        session_repository: SessionRepository,
+        session_locks: Optional[KeyedLock] = None,
+    ):
+        self.session_repository = session_repository
+        self.session_locks = KeyedLock() if session_locks is None else session_locks
+
+    async def execute(self, session_id: str, message_id: str) -> Optional[Session]:
+        """
+        Make the branch through a message active
+
+        Args:
+            session_id: Session identifier
+            message_id: Any message on the branch to show
+
+        Returns:
+            Updated session if found, None otherwise
+
+        Raises:
+            ValueError: If the message does not belong to the session
+            SessionConflictError: If a legacy session was written meanwhile
+        """
+        async with self.session_locks.hold(session_id):
+            return await self._execute(session_id, message_id)
+
+    async def _execute(self, session_id: str, message_id: str) -> Optional[Session]:
+        session = await self.session_repository.find_by_session_id(session_id)
+        if not session:
+            return None
+
+        if session.ensure_tree():
+            # Legacy session: persist the backfilled parent pointers once
+            expected_revision = session.revision
+            session.select_branch(message_id)
+            return await self.session_repository.save(
+                session, expected_revision=expected_revision
+            )
+
+        session.select_branch(message_id)
+        await self.session_repository.update(
+            session_id, active_leaf_id=session.active_leaf_id
+        )
+        return session
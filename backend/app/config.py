@@ -1,5 +1,8 @@
 """Application configuration using pydantic-settings"""
 
+from typing import Any, Optional
+
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
 
@@ -10,10 +13,154 @@ class Settings(BaseSettings):
     mongodb_uri: str = "mongodb://localhost:27017"
     mongodb_database_name: str = "cardnews_ai_chat"
 
+    # MongoDB connection pool (one client per process, pre-warmed to
+    # min_pool_size at startup). Wire compressors are tried in order;
+    # ones PyMongo can't load (e.g. snappy without python-snappy) are skipped.
+    mongodb_max_pool_size: int = 100
+    mongodb_min_pool_size: int = 10
+    mongodb_max_idle_time_ms: int = 300000
+    mongodb_server_selection_timeout_ms: int = 5000
+    mongodb_compressors: list[str] = ["zstd", "snappy", "zlib"]
+
     # AWS Bedrock
     aws_default_region: str = "us-east-1"
     aws_bedrock_model_id: str = "us.anthropic.claude-sonnet-4-20250514-v1:0"
 
+    # Inference defaults; bedrock_model_params overrides them per model ID,
+    # e.g. {"<model-id>": {"max_tokens": 512, "temperature": 0.3}}
+    bedrock_max_tokens: int = 1024
+    bedrock_temperature: float = 0.7
+    bedrock_top_p: Optional[float] = None
+    bedrock_stop_sequences: list[str] = []
+    bedrock_model_params: dict[str, dict[str, Any]] = {}
+
+    # Server-enforced ceilings for per-request overrides
+    bedrock_max_tokens_ceiling: int = 2048
+    bedrock_temperature_ceiling: float = 1.0
+    bedrock_max_stop_sequences: int = 4
+
+    # Max cached ChatBedrockConverse clients (keyed by model + parameters)
+    bedrock_client_pool_size: int = 16
+
+    # Admission control shared by interactive chat and batch jobs
+    chat_max_concurrent_streams: int = 64
+    chat_rate_limit_per_second: float = 20.0
+    chat_rate_limit_burst: int = 40
+    chat_admission_timeout_seconds: float = 10.0
+    chat_batch_max_share: float = 0.5
+
+    # Batch chat endpoint
+    chat_batch_concurrency: int = 8
+    chat_batch_max_items: int = 1000
+    # Sessions whose new messages are written together (one write_batch)
+    chat_batch_write_size: int = 100
+
+    # WebSocket chat transport
+    ws_max_streams_per_connection: int = 8
+    ws_send_buffer_frames: int = 256
+
+    # Retry policy for transient Bedrock failures (before the first token only)
+    chat_retry_max_attempts: int = 3
+    chat_retry_base_delay_seconds: float = 0.25
+    chat_retry_max_delay_seconds: float = 2.0
+    chat_retry_deadline_seconds: float = 8.0
+
+    # Chat turns on one session are serialized per process; appends that lose
+    # a revision race with another container are retried (the model is not)
+    chat_append_max_attempts: int = 5
+
+    # Model routing: cheap turns go to a fast model unless the client pins one
+    model_routing_enabled: bool = False
+    model_router_fast_model_id: str = "us.anthropic.claude-3-5-haiku-20241022-v1:0"
+    model_router_max_prompt_chars: int = 200
+    model_router_max_history_messages: int = 6
+    model_router_escalation_keywords: list[str] = [
+        "```",
+        "code",
+        "코드",
+        "debug",
+        "디버그",
+        "analyze",
+        "분석",
+        "explain in detail",
+        "자세히",
+    ]
+    model_router_escalation_tags: list[str] = ["code", "analysis", "long-form"]
+    model_router_max_ttft_ms: float = 2500.0
+    model_router_max_error_rate: float = 0.2
+    model_router_stats_window: int = 50
+    model_router_stats_max_age_seconds: float = 300.0
+
+    # Streaming export: sessions fetched per database round trip
+    session_export_batch_size: int = 100
+
+    # Bulk import: max sessions per POST /api/sessions/bulk
+    session_import_max_items: int = 1000
+
+    # Message content at rest: zstd (zlib without zstandard) above min_bytes.
+    # Dictionaries are zstd dictionary files; the first compresses new
+    # content, all of them decode. Content beyond the per-session inline
+    # budget spills to the message_blobs collection.
+    message_compression_enabled: bool = True
+    message_compression_min_bytes: int = 1024
+    message_compression_zstd_level: int = 3
+    message_compression_zlib_level: int = 6
+    message_compression_dictionaries: list[str] = []
+    session_inline_content_budget_bytes: int = 8 * 1024 * 1024
+
+    # Batch get: max session IDs per POST /api/sessions/batch-get
+    session_batch_get_max_items: int = 100
+
+    # Session lookups issued within the window are coalesced into one query
+    session_loader_enabled: bool = True
+    session_loader_window_ms: float = 2.0
+    session_loader_max_batch: int = 100
+
+    # Write-behind session writes (off by default). Writes are acknowledged
+    # once buffered and flushed every interval_ms or after max_ops writes,
+    # coalesced per session into one bulk_write. A crash loses whatever was
+    # not flushed yet; at most max_pending sessions are buffered, beyond that
+    # writers wait for a flush. The buffer is drained on shutdown.
+    session_write_behind_enabled: bool = False
+    session_write_behind_interval_ms: float = 5.0
+    session_write_behind_max_ops: int = 100
+    session_write_behind_max_pending: int = 1000
+
+    # Session storage: "mongo", "sqlite" for single-node installs (one
+    # database file in WAL mode; reader threads share it with one writer
+    # thread) or "memory" (indexed, not persisted). Cold-session tiering
+    # applies to mongo only.
+    session_backend: str = "mongo"
+    session_sqlite_path: str = "sessions.db"
+    session_sqlite_readers: int = 4
+    session_sqlite_synchronous: str = "NORMAL"
+
+    # Cold-session tiering (off by default): sessions idle for idle_days are
+    # moved to the sessions_archive collection every interval_seconds,
+    # batch_size at a time, and restored on first access by ID. Archived
+    # sessions stay in session lists; pinned ones are never archived. With
+    # retention_days set, a TTL index hard-deletes them that long after
+    # archiving.
+    session_archive_enabled: bool = False
+    session_archive_idle_days: float = 7.0
+    session_archive_interval_seconds: float = 3600.0
+    session_archive_batch_size: int = 200
+    session_archive_retention_days: Optional[float] = None
+
+    # Message search: "mongo" (text index) or "memory" (in-process n-grams,
+    # rebuilt from the session store at startup). Defaults to "mongo" with
+    # the mongo session backend and to "memory" otherwise.
+    search_backend: Optional[str] = None
+    search_ngram_size: int = 2
+
+    # HTTP response compression (gzip always; br/zstd when installed).
+    # SSE is never compressed; responses below the threshold are sent raw.
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    compression_zstd_level: int = 3
+
     # AWS credentials are automatically read by boto3 from environment:
     # AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY
 
@@ -22,6 +169,14 @@ class Settings(BaseSettings):
     app_version: str = "0.1.0"
     debug: bool = False
 
+    @model_validator(mode="after")
+    def _default_search_backend(self) -> "Settings":
+        if self.search_backend is None:
+            self.search_backend = (
+                "mongo" if self.session_backend == "mongo" else "memory"
+            )
+        return self
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
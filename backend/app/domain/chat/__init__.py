@@ -1,7 +1,15 @@
 """Chat domain - business concept grouping"""
 
-from .entities import MessageEmbed
+from .entities import InferenceParams, MessageEmbed
+from .errors import ChatServiceError, TransientChatServiceError
 from .ports import ChatService
 from .service import ChatOrchestrator
 
-__all__ = ["MessageEmbed", "ChatService", "ChatOrchestrator"]
+__all__ = [
+    "MessageEmbed",
+    "InferenceParams",
+    "ChatService",
+    "ChatOrchestrator",
+    "ChatServiceError",
+    "TransientChatServiceError",
+]
@@ -15,3 +15,22 @@ class MessageEmbed(BaseModel):
     content: str
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     model: Optional[str] = None
+    # Message this one replies to; None for a conversation root
+    parent_id: Optional[str] = None
+
+
+class InferenceParams(BaseModel):
+    """Per-request inference parameter overrides
+
+    Unset fields fall back to the server's per-model defaults. Adapters clamp
+    every value to the server-enforced ceilings.
+    """
+
+    max_tokens: Optional[int] = Field(default=None, ge=1)
+    temperature: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+    top_p: Optional[float] = Field(default=None, gt=0.0, le=1.0)
+    stop_sequences: Optional[list[str]] = None
+
+    def is_empty(self) -> bool:
+        """True when no override is set"""
+        return not self.model_dump(exclude_none=True)
@@ -0,0 +1,9 @@
+"""Chat domain errors"""
+
+
+class ChatServiceError(Exception):
+    """Raised when the LLM provider fails to produce a response"""
+
+
+class TransientChatServiceError(ChatServiceError):
+    """Provider failure that is safe to retry (throttling, 5xx, timeouts)"""
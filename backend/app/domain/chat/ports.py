@@ -4,7 +4,7 @@ from abc import ABC, abstractmethod
 from collections.abc import AsyncGenerator
 from typing import Optional
 
-from .entities import MessageEmbed
+from .entities import InferenceParams, MessageEmbed
 
 
 class ChatService(ABC):
@@ -16,6 +16,7 @@ class ChatService(ABC):
         messages: list[MessageEmbed],
         model: Optional[str] = None,
         system_prompt: Optional[str] = None,
+        params: Optional[InferenceParams] = None,
     ) -> AsyncGenerator[str, None]:
         """
         Stream chat response from LLM
@@ -24,6 +25,7 @@ class ChatService(ABC):
             messages: Conversation history
             model: Optional model ID to use
             system_prompt: Optional system prompt
+            params: Optional inference parameter overrides
 
         Yields:
             Token strings from the LLM response
@@ -34,3 +36,22 @@ class ChatService(ABC):
     def get_model_id(self) -> str:
         """Get the current model ID"""
         pass
+
+    def resolve_model(
+        self,
+        messages: list[MessageEmbed],
+        model: Optional[str] = None,
+        tags: Optional[list[str]] = None,
+    ) -> str:
+        """
+        Decide which model will answer this request
+
+        Args:
+            messages: Conversation history including the new user message
+            model: Model explicitly requested by the client, if any
+            tags: Optional request tags used by routing implementations
+
+        Returns:
+            Model ID that should be passed to stream_response
+        """
+        return model or self.get_model_id()
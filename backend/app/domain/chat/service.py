@@ -1,24 +1,101 @@
 """Domain service for orchestrating chat flow"""
 
+from collections.abc import Callable
 from datetime import datetime
+from functools import partial
 from typing import Optional
 
-from .entities import MessageEmbed
+from .entities import InferenceParams, MessageEmbed
 from .ports import ChatService
+from ..search.ports import SearchIndex
 from ..session.entities import Session
+from ..session.errors import SessionAlreadyExistsError, SessionConflictError
+from ..session.locks import KeyedLock
 from ..session.ports import SessionRepository
 
 
 class ChatOrchestrator:
-    """Orchestrates the chat flow between session and LLM"""
+    """Orchestrates the chat flow between session and LLM
+
+    Turns on the same session are serialized in-process by `session_locks`
+    (share one KeyedLock per process); turns on different sessions run in
+    parallel. Across processes, messages are appended with a revision guard:
+    on a conflict the session is reloaded and the message is placed on the
+    fresh copy and appended again, up to `append_attempts` times. The model
+    is never called again.
+    """
 
     def __init__(
         self,
         session_repository: SessionRepository,
         chat_service: ChatService,
+        search_index: Optional[SearchIndex] = None,
+        session_locks: Optional[KeyedLock] = None,
+        append_attempts: int = 5,
     ):
         self.session_repository = session_repository
         self.chat_service = chat_service
+        self.search_index = search_index
+        self.session_locks = KeyedLock() if session_locks is None else session_locks
+        self.append_attempts = max(1, append_attempts)
+
+    async def _index(self, session: Session, messages: list[MessageEmbed]) -> None:
+        """Add appended messages to the search index (best effort)"""
+        if self.search_index is None:
+            return
+        try:
+            await self.search_index.index_messages(session, messages)
+        except Exception as e:
+            # Search lagging behind must never fail a chat turn
+            print(f"Error indexing messages: {e}")
+
+    async def _add_and_write(
+        self,
+        session: Session,
+        message: MessageEmbed,
+        place: Callable[[Session], None],
+        is_new: bool = False,
+        full_write: bool = False,
+    ) -> Session:
+        """
+        Place a message on the session and persist it, retrying conflicts
+
+        Args:
+            place: Adds `message` to a session; applied again to a reloaded
+                copy after a conflict
+            is_new: Insert the session (create) instead of appending
+            full_write: Save the whole session instead of appending
+
+        Returns:
+            The session the message was written to
+
+        Raises:
+            SessionConflictError: If every attempt conflicted
+        """
+        repository = self.session_repository
+        for attempt in range(1, self.append_attempts + 1):
+            expected_revision = session.revision
+            place(session)
+            try:
+                if is_new:
+                    return await repository.create(session)
+                if full_write:
+                    return await repository.save(
+                        session, expected_revision=expected_revision
+                    )
+                await repository.append_messages(
+                    session, [message], expected_revision=expected_revision
+                )
+                return session
+            except (SessionConflictError, SessionAlreadyExistsError):
+                if attempt == self.append_attempts:
+                    raise
+            fresh = await repository.find_by_session_id(session.session_id)
+            if fresh is None:
+                # Deleted during the turn; do not bring it back
+                return session
+            session, is_new, full_write = fresh, False, False
+        return session
 
     async def process_message(
         self,
@@ -27,16 +104,58 @@ class ChatOrchestrator:
         user_message: str,
         model: Optional[str] = None,
         system_prompt: Optional[str] = None,
+        tags: Optional[list[str]] = None,
+        params: Optional[InferenceParams] = None,
+        edit_message_id: Optional[str] = None,
+        regenerate: bool = False,
     ):
         """
         Process a user message and stream the response
 
+        Args:
+            edit_message_id: Send user_message as an edited version of this
+                user message (a sibling branch sharing its prefix)
+            regenerate: Ignore user_message and answer the latest user
+                message on the active branch again (a sibling reply)
+
         Yields:
             Tokens from the assistant response
+
+        Raises:
+            ValueError: If the message to edit or regenerate does not exist
+            SessionConflictError: If concurrent writers kept winning
         """
+        # One turn per session at a time; waiters see the previous reply
+        async with self.session_locks.hold(session_id):
+            async for token in self._process_message(
+                session_id,
+                browser_id,
+                user_message,
+                model,
+                system_prompt,
+                tags,
+                params,
+                edit_message_id,
+                regenerate,
+            ):
+                yield token
+
+    async def _process_message(
+        self,
+        session_id: str,
+        browser_id: str,
+        user_message: str,
+        model: Optional[str],
+        system_prompt: Optional[str],
+        tags: Optional[list[str]],
+        params: Optional[InferenceParams],
+        edit_message_id: Optional[str],
+        regenerate: bool,
+    ):
         # Get or create session
         session = await self.session_repository.find_by_session_id(session_id)
-        if not session:
+        is_new = session is None
+        if is_new:
             session = Session(
                 session_id=session_id,
                 browser_id=browser_id,
@@ -47,35 +166,85 @@ class ChatOrchestrator:
                 updated_at=datetime.utcnow(),
             )
 
-        # Add user message
-        user_msg = MessageEmbed(
-            role="user",
-            content=user_message,
-            timestamp=datetime.utcnow(),
-        )
-        session.add_message(user_msg)
+        # Legacy linear sessions get parent pointers and counters once
+        # (full write)
+        needs_full_write = session.ensure_tree() or is_new
+        if needs_full_write:
+            session.refresh_stats()
 
-        # Save session with user message
-        session = await self.session_repository.save(session)
+        if regenerate:
+            if needs_full_write:
+                try:
+                    session = await self.session_repository.save(
+                        session, expected_revision=session.revision
+                    )
+                except SessionConflictError:
+                    # Written meanwhile (tree included); answer the fresh copy
+                    fresh = await self.session_repository.find_by_session_id(session_id)
+                    session = fresh or session
+            # Reply again to the latest user message on the active branch
+            path = session.active_path()
+            while path and path[-1].role != "user":
+                path.pop()
+            if not path:
+                raise ValueError("No user message to regenerate a reply for")
+            reply_parent_id = path[-1].id
+        else:
+            # Add user message
+            user_msg = MessageEmbed(
+                role="user",
+                content=user_message,
+                timestamp=datetime.utcnow(),
+            )
+            if edit_message_id is not None:
+                edited = session.find_message(edit_message_id)
+                if edited is None or edited.role != "user":
+                    raise ValueError(f"User message {edit_message_id} not found")
+                place_user = partial(
+                    Session.add_branch, parent_id=edited.parent_id, message=user_msg
+                )
+            else:
+                place_user = partial(Session.add_message, message=user_msg)
 
-        # Stream response from LLM
+            # Save session with user message (only the new message unless
+            # the whole session must be written)
+            session = await self._add_and_write(
+                session,
+                user_msg,
+                place_user,
+                is_new=is_new,
+                full_write=needs_full_write,
+            )
+            await self._index(session, [user_msg])
+            path = session.active_path()
+            reply_parent_id = user_msg.id
+
+        # Pick the model up front so the decision is recorded on the reply
+        model = self.chat_service.resolve_model(path, model=model, tags=tags)
+
+        # Stream response from LLM (active branch only)
         full_response = ""
         async for token in self.chat_service.stream_response(
-            messages=session.messages,
+            messages=path,
             model=model,
             system_prompt=system_prompt,
+            params=params,
         ):
             full_response += token
             yield token
 
-        # Add assistant message
+        # Add assistant message; conflicts only redo the append
         assistant_msg = MessageEmbed(
             role="assistant",
             content=full_response,
             timestamp=datetime.utcnow(),
-            model=model or self.chat_service.get_model_id(),
+            model=model,
         )
-        session.add_message(assistant_msg)
-
-        # Save session with assistant message
-        await self.session_repository.save(session)
+        session = await self._add_and_write(
+            session,
+            assistant_msg,
+            partial(
+                Session.add_branch, parent_id=reply_parent_id, message=assistant_msg
+            ),
+        )
+        await self._index(session, [assistant_msg])
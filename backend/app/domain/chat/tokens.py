@@ -0,0 +1,17 @@
+"""Token estimation without a tokenizer"""
+
+import math
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count of a text
+
+    ASCII (English, code) averages about four characters per token; Hangul
+    and other non-ASCII characters are closer to one token each. Good enough
+    for usage displays, not for billing.
+    """
+    if not text:
+        return 0
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
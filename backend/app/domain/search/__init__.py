@@ -0,0 +1,7 @@
+"""Search domain - business concept grouping"""
+
+from .entities import SearchHit
+from .ports import SearchIndex
+from .snippet import make_snippet
+
+__all__ = ["SearchHit", "SearchIndex", "make_snippet"]
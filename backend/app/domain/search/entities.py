@@ -0,0 +1,17 @@
+"""Search entities"""
+
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class SearchHit(BaseModel):
+    """One matching message, ranked by score (higher is better)"""
+
+    session_id: str
+    message_id: str
+    role: str
+    snippet: str
+    score: float
+    timestamp: Optional[datetime] = None
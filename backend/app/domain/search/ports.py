@@ -0,0 +1,41 @@
+"""Search index port (interface)"""
+
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from ..chat.entities import MessageEmbed
+from ..session.entities import Session
+from .entities import SearchHit
+
+
+class SearchIndex(ABC):
+    """Full-text index over chat messages, maintained incrementally"""
+
+    @abstractmethod
+    async def index_messages(
+        self, session: Session, messages: list[MessageEmbed]
+    ) -> None:
+        """Add messages just appended to `session`"""
+        pass
+
+    @abstractmethod
+    async def remove_session(self, session_id: str) -> None:
+        """Drop every indexed message of a session"""
+        pass
+
+    @abstractmethod
+    async def remove_sessions(
+        self, browser_id: str, session_ids: Optional[list[str]] = None
+    ) -> None:
+        """Drop a browser's listed sessions (all of them if session_ids is None)
+
+        IDs that belong to another browser are ignored.
+        """
+        pass
+
+    @abstractmethod
+    async def search(
+        self, browser_id: str, query: str, limit: int = 20
+    ) -> list[SearchHit]:
+        """Ranked hits among one browser's sessions, best first"""
+        pass
@@ -0,0 +1,28 @@
+"""Snippet extraction for search results"""
+
+
+def make_snippet(content: str, query: str, context: int = 50) -> str:
+    """
+    Text around the first match of query, with ellipses where cut
+
+    Args:
+        content: Message text
+        query: Search query
+        context: Characters to keep on each side of the match
+
+    Returns:
+        Snippet; the first 2 * context characters if the query is not found
+    """
+    needle = query.strip().lower()
+    index = content.lower().find(needle) if needle else -1
+    if index == -1:
+        return content[: context * 2]
+
+    start = max(0, index - context)
+    end = min(len(content), index + len(needle) + context)
+    snippet = content[start:end]
+    if start > 0:
+        snippet = "..." + snippet
+    if end < len(content):
+        snippet = snippet + "..."
+    return snippet
@@ -1,7 +1,19 @@
 """Session domain - business concept grouping"""
 
-from .entities import Session
+from .entities import MessageCursor, MessagePage, Session, SessionVersion
+from .errors import SessionAlreadyExistsError, SessionConflictError
+from .locks import KeyedLock
 from .ports import SessionRepository
 from .service import SessionService
 
-__all__ = ["Session", "SessionRepository", "SessionService"]
+__all__ = [
+    "Session",
+    "SessionVersion",
+    "MessagePage",
+    "MessageCursor",
+    "SessionRepository",
+    "SessionAlreadyExistsError",
+    "SessionConflictError",
+    "KeyedLock",
+    "SessionService",
+]
@@ -1,34 +1,249 @@
 """Session entity - pure domain model"""
 
 from datetime import datetime
+from typing import Optional, Union
 
 from pydantic import BaseModel, Field
 
 from ..chat.entities import MessageEmbed
+from ..chat.tokens import estimate_tokens
+
+# A message page cursor: a message id or a timestamp (naive UTC)
+MessageCursor = Union[str, datetime]
+
+PREVIEW_LENGTH = 100
+
+
+def message_preview(content: str) -> str:
+    """First PREVIEW_LENGTH characters of a message, whitespace collapsed"""
+    return " ".join(content[: PREVIEW_LENGTH * 2].split())[:PREVIEW_LENGTH]
+
+
+def message_stats(contents: list[str]) -> dict:
+    """Denormalized counters for messages with these contents, in order"""
+    return {
+        "message_count": len(contents),
+        "total_tokens": sum(estimate_tokens(c) for c in contents),
+        "last_message_preview": message_preview(contents[-1]) if contents else None,
+    }
 
 
 class Session(BaseModel):
-    """Session entity with pure domain logic"""
+    """Session entity with pure domain logic
+
+    Messages form a tree through MessageEmbed.parent_id and are stored
+    append-only in creation order. active_leaf_id marks the end of the branch
+    the user is looking at; regenerating or editing appends a sibling branch
+    that shares the prefix instead of copying it. Sessions stored before
+    branching existed have no parent pointers and no active leaf - they are
+    read as a single linear branch until ensure_tree() upgrades them.
+
+    revision counts changes; together with updated_at it identifies a
+    version of the session (used for ETags).
+
+    message_count, total_tokens (estimated) and last_message_preview are
+    denormalized so session lists need not load messages. add_branch keeps
+    them current; refresh_stats() recomputes them from messages.
+    """
 
     session_id: str
     browser_id: str
     title: str = "새 채팅"
     messages: list[MessageEmbed] = Field(default_factory=list)
+    active_leaf_id: Optional[str] = None
     pinned: bool = False
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    revision: int = 0
+    message_count: int = 0
+    total_tokens: int = 0
+    last_message_preview: Optional[str] = None
+
+    def touch(self) -> None:
+        """Record a change: bump updated_at and revision"""
+        self.updated_at = datetime.utcnow()
+        self.revision += 1
+
+    def ensure_tree(self) -> bool:
+        """
+        Backfill parent pointers for a legacy linear session
+
+        Returns:
+            True if messages were changed and the whole session must be
+            persisted once; False if it already was a tree
+        """
+        if self.active_leaf_id is not None or not self.messages:
+            return False
+        for previous, message in zip(self.messages, self.messages[1:]):
+            message.parent_id = previous.id
+        self.active_leaf_id = self.messages[-1].id
+        return True
+
+    def refresh_stats(self) -> None:
+        """Recompute the denormalized counters from messages"""
+        for field, value in message_stats([m.content for m in self.messages]).items():
+            setattr(self, field, value)
+
+    def find_message(self, message_id: str) -> Optional[MessageEmbed]:
+        """Find a message anywhere in the tree"""
+        return next((m for m in self.messages if m.id == message_id), None)
+
+    def active_path(self) -> list[MessageEmbed]:
+        """Messages on the active branch, root first (the prompt history)"""
+        if self.active_leaf_id is None:
+            return list(self.messages)
+
+        by_id = {m.id: m for m in self.messages}
+        path = []
+        current = by_id.get(self.active_leaf_id)
+        while current is not None:
+            path.append(current)
+            current = by_id.get(current.parent_id) if current.parent_id else None
+        path.reverse()
+        return path
 
     def add_message(self, message: MessageEmbed) -> None:
-        """Add a message to the session"""
+        """Add a message as a reply to the active leaf"""
+        self.ensure_tree()
+        self.add_branch(self.active_leaf_id, message)
+
+    def add_branch(self, parent_id: Optional[str], message: MessageEmbed) -> None:
+        """
+        Add a message under an arbitrary parent and make it the active leaf
+
+        Args:
+            parent_id: Message to reply to; None starts a new root
+            message: New message
+
+        Raises:
+            ValueError: If parent_id does not exist in this session
+        """
+        self.ensure_tree()
+        if parent_id is not None and self.find_message(parent_id) is None:
+            raise ValueError(f"Message {parent_id} not found in session")
+        message.parent_id = parent_id
         self.messages.append(message)
-        self.updated_at = datetime.utcnow()
+        self.active_leaf_id = message.id
+        self.message_count += 1
+        self.total_tokens += estimate_tokens(message.content)
+        self.last_message_preview = message_preview(message.content)
+        self.touch()
+
+    def select_branch(self, message_id: str) -> None:
+        """
+        Make the branch through message_id active
+
+        Follows the most recent child down from message_id so selecting a
+        sibling shows the latest continuation of that branch.
+
+        Raises:
+            ValueError: If message_id does not exist in this session
+        """
+        self.ensure_tree()
+        if self.find_message(message_id) is None:
+            raise ValueError(f"Message {message_id} not found in session")
+
+        latest_child: dict[str, str] = {}
+        for message in self.messages:
+            if message.parent_id is not None:
+                latest_child[message.parent_id] = message.id
+
+        leaf = message_id
+        while leaf in latest_child:
+            leaf = latest_child[leaf]
+        self.active_leaf_id = leaf
+        self.touch()
+
+    def message_page(
+        self,
+        after: Optional[MessageCursor] = None,
+        before: Optional[MessageCursor] = None,
+        limit: int = 50,
+    ) -> "MessagePage":
+        """
+        One page of messages in creation order
+
+        Args:
+            after: Return the first `limit` messages after this cursor
+            before: Return the last `limit` messages before this cursor
+            limit: Page size; without a cursor the latest page is returned
+
+        Raises:
+            ValueError: If both cursors are given or a message id is unknown
+        """
+        if after is not None and before is not None:
+            raise ValueError("Use either after or before, not both")
+
+        cursor = after if after is not None else before
+        if cursor is None:
+            candidates = self.messages
+        elif isinstance(cursor, datetime):
+            if after is not None:
+                candidates = [m for m in self.messages if m.timestamp > cursor]
+            else:
+                candidates = [m for m in self.messages if m.timestamp < cursor]
+        else:
+            index = next(
+                (i for i, m in enumerate(self.messages) if m.id == cursor), None
+            )
+            if index is None:
+                raise ValueError(f"Message {cursor} not found in session")
+            if after is not None:
+                candidates = self.messages[index + 1 :]
+            else:
+                candidates = self.messages[:index]
+
+        if after is not None:
+            window = candidates[: limit + 1]
+            has_more = len(window) > limit
+            window = window[:limit]
+        else:
+            window = candidates[-(limit + 1) :]
+            has_more = len(window) > limit
+            window = window[-limit:]
+        return MessagePage(
+            session_id=self.session_id,
+            messages=window,
+            has_more=has_more,
+            active_leaf_id=self.active_leaf_id,
+        )
 
     def update_title(self, title: str) -> None:
         """Update session title"""
         self.title = title
-        self.updated_at = datetime.utcnow()
+        self.touch()
 
     def toggle_pin(self) -> None:
         """Toggle pinned status"""
         self.pinned = not self.pinned
-        self.updated_at = datetime.utcnow()
+        self.touch()
+
+
+class SessionVersion(BaseModel):
+    """Version marker of a session, loadable without its messages"""
+
+    session_id: str
+    revision: int = 0
+    updated_at: datetime
+
+    @classmethod
+    def of(cls, session: Session) -> "SessionVersion":
+        """Version of a loaded session"""
+        return cls(
+            session_id=session.session_id,
+            revision=session.revision,
+            updated_at=session.updated_at,
+        )
+
+
+class MessagePage(BaseModel):
+    """A window of a session's messages in creation order
+
+    has_more tells whether more messages exist in the paging direction
+    (newer for `after`, older for `before` or the latest page).
+    """
+
+    session_id: str
+    messages: list[MessageEmbed]
+    has_more: bool
+    active_leaf_id: Optional[str] = None
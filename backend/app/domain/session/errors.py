@@ -0,0 +1,22 @@
+"""Session domain errors"""
+
+
+class SessionAlreadyExistsError(ValueError):
+    """Raised when creating a session whose ID is already taken"""
+
+    def __init__(self, session_id: str):
+        super().__init__("Session already exists")
+        self.session_id = session_id
+
+
+class SessionConflictError(Exception):
+    """Raised when a guarded write finds the session at another revision
+
+    Another writer (a concurrent turn, another container) changed the
+    session since it was read; reload it and redo the write.
+    """
+
+    def __init__(self, session_id: str, expected_revision: int):
+        super().__init__("Session was modified concurrently")
+        self.session_id = session_id
+        self.expected_revision = expected_revision
@@ -0,0 +1,54 @@
+"""Per-session serialization of concurrent writers within one process"""
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+
+class _Entry:
+    __slots__ = ("lock", "holders")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        # Tasks holding or waiting for the lock
+        self.holders = 0
+
+
+class KeyedLock:
+    """One asyncio.Lock per key, created on demand
+
+    Tasks using the same key run one at a time, in arrival order; different
+    keys never wait for each other. A key's lock is dropped as soon as
+    nobody holds or waits for it, so memory is bounded by the number of
+    keys in use.
+
+    Usage:
+        async with locks.hold(session_id):
+            ...
+    """
+
+    def __init__(self):
+        self._entries: dict[str, _Entry] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def locked(self, key: str) -> bool:
+        """Whether a task currently holds the key"""
+        entry = self._entries.get(key)
+        return entry is not None and entry.lock.locked()
+
+    @asynccontextmanager
+    async def hold(self, key: str) -> AsyncIterator[None]:
+        """Hold the key's lock for the duration of the block"""
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry()
+        entry.holders += 1
+        try:
+            async with entry.lock:
+                yield
+        finally:
+            entry.holders -= 1
+            if entry.holders == 0:
+                del self._entries[key]
@@ -1,9 +1,12 @@
 """Session repository port (interface)"""
 
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
 from typing import Optional
 
-from .entities import Session
+from ..chat.entities import MessageEmbed
+from .entities import MessageCursor, MessagePage, Session, SessionVersion
+from .errors import SessionAlreadyExistsError, SessionConflictError
 
 
 class SessionRepository(ABC):
@@ -14,6 +17,22 @@ class SessionRepository(ABC):
         """Find a session by its ID"""
         pass
 
+    async def find_many(self, session_ids: list[str]) -> dict[str, Session]:
+        """Find several sessions by ID, ideally in one round trip
+
+        Unknown IDs are left out of the result. The default implementation
+        looks them up one by one; adapters should use a single query.
+
+        Returns:
+            Sessions keyed by session_id
+        """
+        found = {}
+        for session_id in dict.fromkeys(session_ids):
+            session = await self.find_by_session_id(session_id)
+            if session is not None:
+                found[session_id] = session
+        return found
+
     @abstractmethod
     async def find_by_browser_id(
         self, browser_id: str, skip: int = 0, limit: int = 100
@@ -21,14 +40,245 @@ class SessionRepository(ABC):
         """Find all sessions for a browser ID"""
         pass
 
+    async def list_summaries(
+        self, browser_id: str, skip: int = 0, limit: int = 100
+    ) -> list[Session]:
+        """Like find_by_browser_id, but messages may be left out
+
+        For list views, which only need the scalar fields (including the
+        denormalized counters). The default returns full sessions.
+        """
+        return await self.find_by_browser_id(browser_id, skip, limit)
+
+    async def iter_by_browser_id(
+        self, browser_id: str, batch_size: int = 100
+    ) -> AsyncIterator[Session]:
+        """Stream every session of a browser (updated_at desc, with messages)
+
+        Holds at most one batch in memory. The default implementation pages
+        through find_by_browser_id; adapters should use a database cursor.
+        """
+        skip = 0
+        while True:
+            page = await self.find_by_browser_id(browser_id, skip, batch_size)
+            for session in page:
+                yield session
+            if len(page) < batch_size:
+                return
+            skip += batch_size
+
     @abstractmethod
-    async def save(self, session: Session) -> Session:
-        """Save a session (create or update)"""
+    def iter_all(self, batch_size: int = 100) -> AsyncIterator[Session]:
+        """Stream every session that lists can show, in no particular order
+
+        For rebuilding derived data such as the search index; holds at most
+        one batch in memory. Archived sessions are left out.
+        """
         pass
 
+    async def find_version(self, session_id: str) -> Optional[SessionVersion]:
+        """Find a session's version without loading its messages
+
+        The default implementation loads the whole session; adapters should
+        override it with a projection.
+        """
+        session = await self.find_by_session_id(session_id)
+        return SessionVersion.of(session) if session else None
+
+    async def find_versions_by_browser_id(
+        self, browser_id: str, skip: int = 0, limit: int = 100
+    ) -> list[SessionVersion]:
+        """Versions of list_summaries' result, in the same order"""
+        sessions = await self.find_by_browser_id(browser_id, skip, limit)
+        return [SessionVersion.of(s) for s in sessions]
+
+    async def find_messages(
+        self,
+        session_id: str,
+        after: Optional[MessageCursor] = None,
+        before: Optional[MessageCursor] = None,
+        limit: int = 50,
+    ) -> Optional[MessagePage]:
+        """Load one page of a session's messages (see Session.message_page)
+
+        The default implementation loads the whole session; adapters should
+        select the window in the database.
+
+        Returns:
+            MessagePage, or None if the session does not exist
+
+        Raises:
+            ValueError: If both cursors are given or a message id is unknown
+        """
+        session = await self.find_by_session_id(session_id)
+        if session is None:
+            return None
+        return session.message_page(after=after, before=before, limit=limit)
+
+    @abstractmethod
+    async def save(
+        self, session: Session, expected_revision: Optional[int] = None
+    ) -> Session:
+        """Save a session (create or update)
+
+        Args:
+            expected_revision: Only overwrite the stored session if it is
+                still at this revision (the one `session` was read at);
+                a missing session is created. Adapters check it in the
+                write itself, like append_messages.
+
+        Raises:
+            SessionConflictError: If the stored revision differs
+        """
+        pass
+
+    async def create(self, session: Session) -> Session:
+        """Insert a new session
+
+        Adapters should rely on a unique index instead of checking first;
+        the default implementation checks, then saves.
+
+        Raises:
+            SessionAlreadyExistsError: If the session ID is taken
+        """
+        if await self.find_by_session_id(session.session_id) is not None:
+            raise SessionAlreadyExistsError(session.session_id)
+        return await self.save(session)
+
+    async def save_many(self, sessions: list[Session]) -> None:
+        """Save several sessions (create or update), ideally in one round trip
+
+        The default implementation saves them one by one; adapters with a
+        bulk write API should override it.
+        """
+        for session in sessions:
+            await self.save(session)
+
+    async def append_messages(
+        self,
+        session: Session,
+        messages: list[MessageEmbed],
+        expected_revision: Optional[int] = None,
+    ) -> None:
+        """Persist messages just added to an already stored session
+
+        `session` already contains `messages`; adapters should write only the
+        new messages plus the session's scalar fields (active_leaf_id,
+        updated_at) so write cost does not grow with history length. The
+        default implementation falls back to a full save.
+
+        Args:
+            expected_revision: Only write if the stored session is still at
+                this revision (the one `session` was read at). Adapters
+                should check it in the write itself (optimistic concurrency);
+                the default implementation checks, then saves.
+
+        Raises:
+            SessionConflictError: If the stored revision differs
+        """
+        if expected_revision is not None:
+            version = await self.find_version(session.session_id)
+            if version is not None and version.revision != expected_revision:
+                raise SessionConflictError(session.session_id, expected_revision)
+        await self.save(session)
+
+    async def write_batch(
+        self,
+        saves: list[Session],
+        appends: list[tuple[Session, list[MessageEmbed]]],
+        expected_revisions: Optional[dict[str, int]] = None,
+    ) -> set[str]:
+        """Apply full saves and message appends of different sessions together
+
+        Each session appears at most once. Adapters should send everything
+        in one round trip; the default implementation uses save_many, then
+        append_messages per session. A failed batch may be retried whole;
+        adapters whose batches can apply part-way must make appends skip
+        messages already stored.
+
+        Args:
+            expected_revisions: Session ID -> revision its append is guarded
+                by (as in append_messages); a conflict only skips that
+                session's append
+
+        Returns:
+            IDs of the sessions whose append was skipped for a conflict
+        """
+        if saves:
+            await self.save_many(saves)
+        expected_revisions = expected_revisions or {}
+        conflicts: set[str] = set()
+        for session, messages in appends:
+            try:
+                await self.append_messages(
+                    session, messages, expected_revisions.get(session.session_id)
+                )
+            except SessionConflictError:
+                conflicts.add(session.session_id)
+        return conflicts
+
+    async def insert_many(self, sessions: list[Session]) -> list[bool]:
+        """Insert new sessions, ideally in one round trip
+
+        Existing sessions are left untouched. The default implementation
+        checks and saves one by one.
+
+        Returns:
+            Per input session: True if inserted, False if it already existed
+        """
+        inserted = []
+        for session in sessions:
+            if await self.find_by_session_id(session.session_id) is not None:
+                inserted.append(False)
+                continue
+            await self.save(session)
+            inserted.append(True)
+        return inserted
+
+    async def set_pinned_many(
+        self, browser_id: str, session_ids: Optional[list[str]], pinned: bool
+    ) -> int:
+        """Pin or unpin a browser's sessions (all of them if session_ids is None)
+
+        Returns:
+            Number of sessions matched
+        """
+        targets = await self._bulk_targets(browser_id, session_ids)
+        for session_id in targets:
+            await self.update(session_id, pinned=pinned)
+        return len(targets)
+
+    async def delete_many(
+        self, browser_id: str, session_ids: Optional[list[str]] = None
+    ) -> int:
+        """Delete a browser's sessions (all of them if session_ids is None)
+
+        Returns:
+            Number of sessions deleted
+        """
+        deleted = 0
+        for session_id in await self._bulk_targets(browser_id, session_ids):
+            deleted += await self.delete(session_id)
+        return deleted
+
+    async def _bulk_targets(
+        self, browser_id: str, session_ids: Optional[list[str]]
+    ) -> list[str]:
+        """IDs of the browser's sessions selected by a bulk operation"""
+        wanted = set(session_ids) if session_ids is not None else None
+        return [
+            session.session_id
+            async for session in self.iter_by_browser_id(browser_id)
+            if wanted is None or session.session_id in wanted
+        ]
+
     @abstractmethod
     async def update(self, session_id: str, **kwargs) -> Optional[Session]:
-        """Update specific fields of a session"""
+        """Update specific fields of a session
+
+        Bumps updated_at and revision. Adapters may return the session
+        without its messages (metadata only).
+        """
         pass
 
     @abstractmethod
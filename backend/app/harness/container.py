@@ -1,18 +1,50 @@
 """Dependency injection container - wires ports to adapters"""
 
-from typing import Optional
+import asyncio
+from typing import Any, Optional
 
 from app.config import Settings, settings
 from app.domain.chat.ports import ChatService
+from app.domain.search.ports import SearchIndex
+from app.domain.session.locks import KeyedLock
 from app.domain.session.ports import SessionRepository
+from app.infrastructure.admission import AdmissionController
+from app.infrastructure.database import (
+    PoolStatsListener,
+    close_client,
+    create_mongo_client,
+    resolve_mongodb_uri,
+)
 from app.infrastructure.chat.bedrock_adapter import BedrockChatService
+from app.infrastructure.chat.retry import RetryingChatService
+from app.infrastructure.chat.router import RoutingChatService, RoutingRules
+from app.infrastructure.search import MongoSearchIndex, NGramSearchIndex
+from app.infrastructure.search.rebuild import rebuild_search_index
+from app.infrastructure.session.archive import (
+    SessionArchive,
+    TieringSessionRepository,
+    load_session_archive,
+)
+from app.infrastructure.session.content_codec import load_content_codec
+from app.infrastructure.session.loader import BatchingSessionRepository
+from app.infrastructure.session.memory_adapter import InMemorySessionRepository
 from app.infrastructure.session.mongo_adapter import MongoSessionRepository
+from app.infrastructure.session.sqlite_adapter import SqliteSessionRepository
+from app.infrastructure.session.write_behind import WriteBehindSessionRepository
+from app.application.chat.batch import BatchChatUseCase
 from app.application.chat.send_message import SendMessageUseCase
 from app.application.session.create_session import CreateSessionUseCase
 from app.application.session.list_sessions import ListSessionsUseCase
 from app.application.session.get_session import GetSessionUseCase
 from app.application.session.update_session import UpdateSessionUseCase
 from app.application.session.delete_session import DeleteSessionUseCase
+from app.application.session.select_branch import SelectBranchUseCase
+from app.application.session.list_messages import ListMessagesUseCase
+from app.application.session.export_sessions import ExportSessionsUseCase
+from app.application.session.import_sessions import ImportSessionsUseCase
+from app.application.session.bulk_action import BulkSessionActionUseCase
+from app.application.session.batch_get_sessions import BatchGetSessionsUseCase
+from app.application.search.search_messages import SearchMessagesUseCase
 
 
 class Container:
@@ -26,6 +58,15 @@ class Container:
         self._config = config or settings
         self._session_repo: Optional[SessionRepository] = None
         self._chat_service: Optional[ChatService] = None
+        self._admission: Optional[AdmissionController] = None
+        self._search_index: Optional[SearchIndex] = None
+        self._session_locks = KeyedLock()
+        self._write_behind: Optional[WriteBehindSessionRepository] = None
+        self._archive: Optional[SessionArchive] = None
+        self._archive_task: Optional[asyncio.Task] = None
+        self._sqlite: Optional[SqliteSessionRepository] = None
+        self._mongo_client = None
+        self._pool_stats: Optional[PoolStatsListener] = None
 
     @property
     def config(self) -> Settings:
@@ -33,20 +74,169 @@ class Container:
 
     def session_repository(self) -> SessionRepository:
         if self._session_repo is None:
-            self._session_repo = MongoSessionRepository()
+            config = self._config
+            if config.session_backend == "sqlite":
+                self._sqlite = SqliteSessionRepository(
+                    config.session_sqlite_path,
+                    readers=config.session_sqlite_readers,
+                    synchronous=config.session_sqlite_synchronous,
+                )
+                self._session_repo = self._sqlite
+            elif config.session_backend == "memory":
+                self._session_repo = InMemorySessionRepository()
+            else:
+                mongo = MongoSessionRepository(load_content_codec(config))
+                self._session_repo = mongo
+                if config.session_archive_enabled:
+                    self._archive = load_session_archive(
+                        mongo, config, search_index=self.search_index()
+                    )
+                    self._session_repo = TieringSessionRepository(mongo, self._archive)
+            if config.session_write_behind_enabled:
+                self._write_behind = WriteBehindSessionRepository(
+                    self._session_repo,
+                    interval=config.session_write_behind_interval_ms / 1000,
+                    max_ops=config.session_write_behind_max_ops,
+                    max_pending=config.session_write_behind_max_pending,
+                )
+                self._session_repo = self._write_behind
+            if config.session_loader_enabled:
+                self._session_repo = BatchingSessionRepository(
+                    self._session_repo,
+                    window=config.session_loader_window_ms / 1000,
+                    max_batch=config.session_loader_max_batch,
+                )
         return self._session_repo
 
+    def session_archive(self) -> Optional[SessionArchive]:
+        """The cold-session archive, or None if tiering is disabled"""
+        self.session_repository()
+        return self._archive
+
+    async def start(self) -> None:
+        """Load in-process state and start background jobs
+
+        Runs after the database is initialized. The in-memory search index
+        is rebuilt from the session store before requests are served.
+        """
+        if self._config.search_backend == "memory":
+            await rebuild_search_index(self.search_index(), self.session_repository())
+        archive = self.session_archive()
+        if archive is not None and self._archive_task is None:
+            await archive.ensure_indexes()
+            self._archive_task = asyncio.create_task(
+                archive.run(self._config.session_archive_interval_seconds)
+            )
+
+    def mongo_client(self):
+        """The process-wide MongoDB client, or None if no URI is configured"""
+        if self._mongo_client is None:
+            mongodb_uri = resolve_mongodb_uri(self._config)
+            if mongodb_uri is None:
+                return None
+            self._pool_stats = PoolStatsListener(self._config.mongodb_max_pool_size)
+            self._mongo_client = create_mongo_client(
+                mongodb_uri, self._config, pool_listener=self._pool_stats
+            )
+        return self._mongo_client
+
+    def pool_stats(self) -> Optional[dict[str, Any]]:
+        """Connection pool utilization, or None before a client exists"""
+        return self._pool_stats.snapshot() if self._pool_stats else None
+
+    async def close(self) -> None:
+        """Release resources on shutdown
+
+        Stops background jobs and drains buffered session writes first,
+        then closes the session store and the MongoDB pool.
+        """
+        if self._archive_task is not None:
+            self._archive_task.cancel()
+            await asyncio.gather(self._archive_task, return_exceptions=True)
+            self._archive_task = None
+        if self._write_behind is not None:
+            await self._write_behind.drain()
+        if self._sqlite is not None:
+            await self._sqlite.close()
+        await close_client(self._mongo_client)
+        self._mongo_client = None
+
     def chat_service(self) -> ChatService:
         if self._chat_service is None:
-            self._chat_service = BedrockChatService()
+            self._chat_service = RetryingChatService(
+                BedrockChatService(),
+                max_attempts=self._config.chat_retry_max_attempts,
+                base_delay=self._config.chat_retry_base_delay_seconds,
+                max_delay=self._config.chat_retry_max_delay_seconds,
+                deadline=self._config.chat_retry_deadline_seconds,
+            )
+            if self._config.model_routing_enabled:
+                self._chat_service = RoutingChatService(
+                    self._chat_service, self._routing_rules()
+                )
         return self._chat_service
 
+    def search_index(self) -> SearchIndex:
+        if self._search_index is None:
+            if self._config.search_backend == "memory":
+                self._search_index = NGramSearchIndex(n=self._config.search_ngram_size)
+            else:
+                self._search_index = MongoSearchIndex()
+        return self._search_index
+
+    def admission_controller(self) -> AdmissionController:
+        if self._admission is None:
+            config = self._config
+            self._admission = AdmissionController(
+                max_concurrent=config.chat_max_concurrent_streams,
+                rate_per_second=config.chat_rate_limit_per_second,
+                burst=config.chat_rate_limit_burst,
+                batch_max_share=config.chat_batch_max_share,
+                default_timeout=config.chat_admission_timeout_seconds,
+            )
+        return self._admission
+
+    def _routing_rules(self) -> RoutingRules:
+        config = self._config
+        return RoutingRules(
+            default_model_id=config.aws_bedrock_model_id,
+            fast_model_id=config.model_router_fast_model_id,
+            max_prompt_chars=config.model_router_max_prompt_chars,
+            max_history_messages=config.model_router_max_history_messages,
+            escalation_keywords=config.model_router_escalation_keywords,
+            escalation_tags=config.model_router_escalation_tags,
+            max_ttft_ms=config.model_router_max_ttft_ms,
+            max_error_rate=config.model_router_max_error_rate,
+            stats_window=config.model_router_stats_window,
+            stats_max_age_seconds=config.model_router_stats_max_age_seconds,
+        )
+
+    def session_locks(self) -> KeyedLock:
+        """Per-session locks shared by every chat turn of this process"""
+        return self._session_locks
+
     # --- Use Cases ---
 
     def send_message_use_case(self) -> SendMessageUseCase:
         return SendMessageUseCase(
             session_repository=self.session_repository(),
             chat_service=self.chat_service(),
+            search_index=self.search_index(),
+            session_locks=self.session_locks(),
+            append_attempts=self._config.chat_append_max_attempts,
+        )
+
+    def batch_chat_use_case(self) -> BatchChatUseCase:
+        return BatchChatUseCase(
+            session_repository=self.session_repository(),
+            chat_service=self.chat_service(),
+            admission=self.admission_controller(),
+            concurrency=self._config.chat_batch_concurrency,
+            max_items=self._config.chat_batch_max_items,
+            search_index=self.search_index(),
+            session_locks=self.session_locks(),
+            append_attempts=self._config.chat_append_max_attempts,
+            write_batch_size=self._config.chat_batch_write_size,
         )
 
     def create_session_use_case(self) -> CreateSessionUseCase:
@@ -72,4 +262,46 @@ class Container:
     def delete_session_use_case(self) -> DeleteSessionUseCase:
         return DeleteSessionUseCase(
             session_repository=self.session_repository(),
+            search_index=self.search_index(),
+        )
+
+    def select_branch_use_case(self) -> SelectBranchUseCase:
+        return SelectBranchUseCase(
+            session_repository=self.session_repository(),
+            session_locks=self.session_locks(),
+        )
+
+    def list_messages_use_case(self) -> ListMessagesUseCase:
+        return ListMessagesUseCase(
+            session_repository=self.session_repository(),
+        )
+
+    def search_messages_use_case(self) -> SearchMessagesUseCase:
+        return SearchMessagesUseCase(
+            search_index=self.search_index(),
+        )
+
+    def export_sessions_use_case(self) -> ExportSessionsUseCase:
+        return ExportSessionsUseCase(
+            session_repository=self.session_repository(),
+            batch_size=self._config.session_export_batch_size,
+        )
+
+    def import_sessions_use_case(self) -> ImportSessionsUseCase:
+        return ImportSessionsUseCase(
+            session_repository=self.session_repository(),
+            search_index=self.search_index(),
+            max_items=self._config.session_import_max_items,
+        )
+
+    def bulk_session_action_use_case(self) -> BulkSessionActionUseCase:
+        return BulkSessionActionUseCase(
+            session_repository=self.session_repository(),
+            search_index=self.search_index(),
+        )
+
+    def batch_get_sessions_use_case(self) -> BatchGetSessionsUseCase:
+        return BatchGetSessionsUseCase(
+            session_repository=self.session_repository(),
+            max_items=self._config.session_batch_get_max_items,
         )
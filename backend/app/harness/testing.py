@@ -9,60 +9,20 @@ Provides:
 """
 
 from collections.abc import AsyncGenerator
-from datetime import datetime, timezone
 from typing import Any, Callable, Optional
 
 from app.config import Settings
-from app.domain.chat.entities import MessageEmbed
-from app.domain.session.entities import Session
+from app.domain.chat.entities import InferenceParams, MessageEmbed
 from app.domain.chat.ports import ChatService
+from app.domain.search.ports import SearchIndex
 from app.domain.session.ports import SessionRepository
 from app.harness.container import Container
+from app.infrastructure.session.memory_adapter import InMemorySessionRepository
+from app.infrastructure.search.ngram_index import NGramSearchIndex
 from app.harness.evaluation.metrics import EvaluationMetric, LLMJudgeMetric
 from app.harness.evaluation.runner import EvaluationRunner
 
 
-class InMemorySessionRepository(SessionRepository):
-    """In-memory implementation of SessionRepository for testing"""
-
-    def __init__(self):
-        self._sessions: dict[str, Session] = {}
-
-    async def find_by_session_id(self, session_id: str) -> Optional[Session]:
-        return self._sessions.get(session_id)
-
-    async def find_by_browser_id(
-        self, browser_id: str, skip: int = 0, limit: int = 100
-    ) -> list[Session]:
-        results = [
-            s for s in self._sessions.values() if s.browser_id == browser_id
-        ]
-        results.sort(key=lambda s: s.updated_at, reverse=True)
-        return results[skip : skip + limit]
-
-    async def save(self, session: Session) -> Session:
-        self._sessions[session.session_id] = session
-        return session
-
-    async def update(self, session_id: str, **kwargs) -> Optional[Session]:
-        session = self._sessions.get(session_id)
-        if not session:
-            return None
-
-        data = session.model_dump()
-        data.update(kwargs)
-        data["updated_at"] = datetime.now(timezone.utc)
-        updated = Session(**data)
-        self._sessions[session_id] = updated
-        return updated
-
-    async def delete(self, session_id: str) -> bool:
-        if session_id in self._sessions:
-            del self._sessions[session_id]
-            return True
-        return False
-
-
 class FakeChatService(ChatService):
     """Fake chat service that returns a single predetermined response"""
 
@@ -75,6 +35,7 @@ class FakeChatService(ChatService):
         messages: list[MessageEmbed],
         model: Optional[str] = None,
         system_prompt: Optional[str] = None,
+        params: Optional[InferenceParams] = None,
     ) -> AsyncGenerator[str, None]:
         for word in self._response.split():
             yield word + " "
@@ -113,6 +74,7 @@ class ScriptedChatService(ChatService):
         messages: list[MessageEmbed],
         model: Optional[str] = None,
         system_prompt: Optional[str] = None,
+        params: Optional[InferenceParams] = None,
     ) -> AsyncGenerator[str, None]:
         # Extract last user message
         last_user_msg = ""
@@ -125,6 +87,7 @@ class ScriptedChatService(ChatService):
             "input": last_user_msg,
             "model": model,
             "system_prompt": system_prompt,
+            "params": params,
         })
 
         # Resolve response
@@ -161,10 +124,14 @@ class TestContainer(Container):
         super().__init__(config or Settings(mongodb_uri="mongodb://localhost:27017"))
         self._in_memory_repo = InMemorySessionRepository()
         self._fake_chat = FakeChatService(response=fake_response)
+        self._ngram_index = NGramSearchIndex()
 
     def session_repository(self) -> SessionRepository:
         return self._in_memory_repo
 
+    def search_index(self) -> SearchIndex:
+        return self._ngram_index
+
     def chat_service(self) -> ChatService:
         return self._fake_chat
 
@@ -200,10 +167,14 @@ class EvalContainer(Container):
         )
         self._pass_threshold = pass_threshold
         self._custom_metrics = custom_metrics or {}
+        self._ngram_index = NGramSearchIndex()
 
     def session_repository(self) -> SessionRepository:
         return self._in_memory_repo
 
+    def search_index(self) -> SearchIndex:
+        return self._ngram_index
+
     def chat_service(self) -> ChatService:
         return self._scripted_chat
 
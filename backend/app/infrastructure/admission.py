@@ -0,0 +1,188 @@
+"""Admission control for chat generations
+
+A single budget of concurrent stream slots and a token-bucket request rate is
+shared by interactive chat and batch jobs. Interactive requests always queue
+ahead of batch work, and batch work may hold at most a configured share of
+the slots and rate so interactive traffic keeps headroom.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Optional
+
+from app.infrastructure.metrics import MetricsRegistry, metrics
+
+
+class Priority(IntEnum):
+    """Admission priority; lower values are served first"""
+
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+class AdmissionTimeoutError(Exception):
+    """Raised when a slot could not be obtained before the timeout"""
+
+
+class AdmissionController:
+    """Priority-aware concurrency limiter with a shared rate limit
+
+    Usage:
+        async with controller.slot(Priority.INTERACTIVE):
+            async for token in use_case.execute(request):
+                ...
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 64,
+        rate_per_second: float = 0.0,
+        burst: int = 1,
+        batch_max_share: float = 0.5,
+        default_timeout: Optional[float] = None,
+        registry: Optional[MetricsRegistry] = None,
+    ):
+        self._capacity = max(1, max_concurrent)
+        self._batch_capacity = max(1, int(self._capacity * batch_max_share))
+        self._rate = rate_per_second
+        self._burst = max(1, burst)
+        # Capped so a batch request always fits in a full bucket
+        self._batch_token_reserve = min(
+            self._burst * (1.0 - batch_max_share), self._burst - 1.0
+        )
+        self._tokens = float(self._burst)
+        self._refilled_at = time.monotonic()
+        self._default_timeout = default_timeout
+        self._metrics = registry or metrics
+
+        self._active: dict[Priority, int] = {p: 0 for p in Priority}
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    @property
+    def active(self) -> int:
+        """Number of slots currently held"""
+        return sum(self._active.values())
+
+    def _can_admit(self, priority: Priority) -> bool:
+        if self.active >= self._capacity:
+            return False
+        if priority == Priority.BATCH:
+            return self._active[Priority.BATCH] < self._batch_capacity
+        return True
+
+    def _prune(self) -> None:
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+
+    def _has_waiters_ahead(self, priority: Priority) -> bool:
+        self._prune()
+        return bool(self._waiters) and self._waiters[0][0] <= priority
+
+    def _admit(self, priority: Priority) -> None:
+        self._active[priority] += 1
+        self._metrics.set_gauge(
+            "admission.active", self._active[priority], priority=priority.name.lower()
+        )
+
+    def _release(self, priority: Priority) -> None:
+        self._active[priority] -= 1
+        self._metrics.set_gauge(
+            "admission.active", self._active[priority], priority=priority.name.lower()
+        )
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._can_admit(Priority(priority)):
+                break
+            heapq.heappop(self._waiters)
+            self._admit(Priority(priority))
+            future.set_result(None)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        self._tokens = min(self._burst, self._tokens + elapsed * self._rate)
+
+    async def _take_token(self, priority: Priority, deadline: Optional[float]) -> None:
+        """Consume one rate-limit token, waiting for a refill if needed"""
+        if self._rate <= 0:
+            return
+        # Batch work leaves a reserve of tokens for interactive bursts
+        needed = 1.0
+        if priority == Priority.BATCH:
+            needed += self._batch_token_reserve
+
+        while True:
+            self._refill()
+            if self._tokens >= needed:
+                self._tokens -= 1.0
+                return
+            wait = (needed - self._tokens) / self._rate
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise AdmissionTimeoutError("Rate limit exceeded")
+            await asyncio.sleep(wait)
+
+    async def acquire(
+        self, priority: Priority, timeout: Optional[float] = None
+    ) -> None:
+        """Wait for a slot; raises AdmissionTimeoutError after timeout"""
+        timeout = self._default_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        try:
+            await self._take_token(priority, deadline)
+        except AdmissionTimeoutError:
+            self._metrics.increment(
+                "admission.rejected", priority=priority.name.lower(), reason="rate"
+            )
+            raise
+
+        if self._can_admit(priority) and not self._has_waiters_ahead(priority):
+            self._admit(priority)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._seq), future))
+        try:
+            if deadline is None:
+                await future
+            else:
+                await asyncio.wait_for(future, max(0.0, deadline - time.monotonic()))
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # Slot was granted just as we gave up - hand it back
+                self._release(priority)
+            else:
+                future.cancel()
+            if isinstance(e, asyncio.TimeoutError):
+                self._metrics.increment(
+                    "admission.rejected",
+                    priority=priority.name.lower(),
+                    reason="concurrency",
+                )
+                raise AdmissionTimeoutError("No generation slot available") from e
+            raise
+
+    def release(self, priority: Priority) -> None:
+        """Return a slot obtained with acquire()"""
+        self._release(priority)
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority, timeout: Optional[float] = None):
+        """Hold a slot for the duration of the block"""
+        await self.acquire(priority, timeout)
+        try:
+            yield
+        finally:
+            self._release(priority)
@@ -1,5 +1,12 @@
 """Chat infrastructure adapters"""
 
 from .bedrock_adapter import BedrockChatService
+from .retry import RetryingChatService
+from .router import RoutingChatService, RoutingRules
 
-__all__ = ["BedrockChatService"]
+__all__ = [
+    "BedrockChatService",
+    "RetryingChatService",
+    "RoutingChatService",
+    "RoutingRules",
+]
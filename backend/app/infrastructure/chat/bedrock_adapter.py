@@ -1,43 +1,137 @@
 """AWS Bedrock implementation of ChatService"""
 
+from collections import OrderedDict
 from collections.abc import AsyncGenerator
 from typing import Optional
 
+from botocore.exceptions import (
+    ClientError,
+    ConnectTimeoutError,
+    EndpointConnectionError,
+    ReadTimeoutError,
+)
 from langchain_aws import ChatBedrockConverse
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 
-from app.config import settings
-from app.domain.chat.entities import MessageEmbed
+from app.config import Settings, settings
+from app.domain.chat.entities import InferenceParams, MessageEmbed
+from app.domain.chat.errors import ChatServiceError, TransientChatServiceError
 from app.domain.chat.ports import ChatService
 
+# Bedrock error codes that indicate a retryable condition. Stream errors are
+# reported with camelCase codes (e.g. "throttlingException"), so compare
+# lower-cased.
+TRANSIENT_ERROR_CODES = frozenset(
+    code.lower()
+    for code in (
+        "ThrottlingException",
+        "TooManyRequestsException",
+        "ServiceUnavailableException",
+        "InternalServerException",
+        "ModelNotReadyException",
+        "ModelTimeoutException",
+    )
+)
+
+
+def classify_bedrock_error(error: Exception) -> ChatServiceError:
+    """Map a boto/Bedrock exception to a domain ChatServiceError"""
+    network_errors = (EndpointConnectionError, ConnectTimeoutError, ReadTimeoutError)
+    if isinstance(error, network_errors):
+        return TransientChatServiceError(str(error))
+
+    if isinstance(error, ClientError):
+        code = str(error.response.get("Error", {}).get("Code", "")).lower()
+        status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        if code in TRANSIENT_ERROR_CODES or (status and status >= 500):
+            return TransientChatServiceError(str(error))
+
+    return ChatServiceError(str(error))
+
+
+def resolve_inference_params(
+    model_id: str,
+    overrides: Optional[InferenceParams] = None,
+    config: Settings = settings,
+) -> InferenceParams:
+    """Merge global defaults, per-model defaults and request overrides
+
+    The result is clamped to the configured ceilings so that the worst-case
+    stream length is bounded regardless of what the client asks for. A None
+    in the per-model defaults means "not set" and keeps the global default.
+    """
+    values = {
+        "max_tokens": config.bedrock_max_tokens,
+        "temperature": config.bedrock_temperature,
+        "top_p": config.bedrock_top_p,
+        "stop_sequences": list(config.bedrock_stop_sequences),
+    }
+    model_values = config.bedrock_model_params.get(model_id, {})
+    values.update({k: v for k, v in model_values.items() if v is not None})
+    if overrides:
+        values.update(overrides.model_dump(exclude_none=True))
+
+    values["max_tokens"] = min(values["max_tokens"], config.bedrock_max_tokens_ceiling)
+    values["temperature"] = min(
+        values["temperature"], config.bedrock_temperature_ceiling
+    )
+    values["stop_sequences"] = (values["stop_sequences"] or [])[
+        : config.bedrock_max_stop_sequences
+    ]
+    return InferenceParams(**values)
+
 
 class BedrockChatService(ChatService):
     """AWS Bedrock implementation of the ChatService port using LangChain"""
 
     def __init__(self):
         """Initialize the Bedrock chat service"""
-        self.llm = None
         self.current_model_id = settings.aws_bedrock_model_id
+        # LRU pool of clients keyed by model ID and effective parameters
+        self._clients: OrderedDict[tuple, ChatBedrockConverse] = OrderedDict()
 
-    def _get_llm(self, model_id: Optional[str] = None) -> ChatBedrockConverse:
+    def _get_llm(
+        self,
+        model_id: Optional[str] = None,
+        params: Optional[InferenceParams] = None,
+    ) -> ChatBedrockConverse:
         """Get or create LangChain ChatBedrockConverse instance"""
         model_to_use = model_id or settings.aws_bedrock_model_id
-
-        if not self.llm or model_to_use != self.current_model_id:
-            self.llm = ChatBedrockConverse(
+        resolved = resolve_inference_params(model_to_use, params)
+        key = (
+            model_to_use,
+            resolved.max_tokens,
+            resolved.temperature,
+            resolved.top_p,
+            tuple(resolved.stop_sequences or ()),
+        )
+
+        llm = self._clients.get(key)
+        if llm is None:
+            llm = ChatBedrockConverse(
                 model=model_to_use,
-                region=settings.aws_default_region,
+                region_name=settings.aws_default_region,
+                max_tokens=resolved.max_tokens,
+                temperature=resolved.temperature,
+                top_p=resolved.top_p,
+                stop_sequences=resolved.stop_sequences or None,
                 # AWS credentials are automatically loaded from environment by boto3
             )
-            self.current_model_id = model_to_use
+            self._clients[key] = llm
+            while len(self._clients) > settings.bedrock_client_pool_size:
+                self._clients.popitem(last=False)
+        else:
+            self._clients.move_to_end(key)
 
-        return self.llm
+        self.current_model_id = model_to_use
+        return llm
 
     async def stream_response(
         self,
         messages: list[MessageEmbed],
         model: Optional[str] = None,
         system_prompt: Optional[str] = None,
+        params: Optional[InferenceParams] = None,
     ) -> AsyncGenerator[str, None]:
         """
         Stream chat response from AWS Bedrock
@@ -46,9 +140,14 @@ class BedrockChatService(ChatService):
             messages: Conversation history
             model: Optional model ID to use
             system_prompt: Optional system prompt
+            params: Optional inference overrides, clamped to server ceilings
 
         Yields:
             Token strings from the LLM response
+
+        Raises:
+            TransientChatServiceError: On throttling or transient 5xx errors
+            ChatServiceError: On any other provider failure
         """
         # Build LangChain messages
         langchain_messages = []
@@ -76,7 +175,7 @@ class BedrockChatService(ChatService):
                 langchain_messages.append(AIMessage(content=msg.content))
 
         # Get LLM instance
-        llm = self._get_llm(model)
+        llm = self._get_llm(model, params)
 
         # Stream tokens from LangChain
         try:
@@ -85,9 +184,9 @@ class BedrockChatService(ChatService):
                 if hasattr(chunk, "content") and chunk.content:
                     yield chunk.content
         except Exception as e:
-            # Log error and yield error message
+            # Surface as a domain error so callers can decide whether to retry
             print(f"Error in chat streaming: {e}")
-            yield f"Error: {str(e)}"
+            raise classify_bedrock_error(e) from e
 
     def get_model_id(self) -> str:
         """Get the current model ID"""
@@ -0,0 +1,129 @@
+"""Retrying decorator for ChatService
+
+Retries transient provider failures (throttling, 5xx) only while nothing
+has been streamed to the caller yet. Once a token has been yielded the
+failure is re-raised as-is: a retry would replay the answer from the start
+and duplicate output on the client.
+"""
+
+import asyncio
+import random
+import time
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from typing import Optional
+
+from app.domain.chat.entities import InferenceParams, MessageEmbed
+from app.domain.chat.errors import TransientChatServiceError
+from app.domain.chat.ports import ChatService
+from app.infrastructure.metrics import MetricsRegistry, metrics
+
+
+class RetryingChatService(ChatService):
+    """ChatService decorator with jittered exponential backoff
+
+    Backoff uses "full jitter": the n-th retry sleeps a uniform random time
+    in [0, min(max_delay, base_delay * 2**(n-1))]. The total deadline covers
+    all attempts and sleeps; a retry that could not start before the deadline
+    is not attempted. Waiting for an attempt's first token is bounded by
+    what is left of the deadline, so a provider call that hangs without
+    answering or failing ends as a transient error.
+    """
+
+    def __init__(
+        self,
+        inner: ChatService,
+        max_attempts: int = 3,
+        base_delay: float = 0.25,
+        max_delay: float = 2.0,
+        deadline: float = 8.0,
+        registry: Optional[MetricsRegistry] = None,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        rng: Optional[random.Random] = None,
+    ):
+        self._inner = inner
+        self._max_attempts = max(1, max_attempts)
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._deadline = deadline
+        self._metrics = registry or metrics
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+
+    def _backoff(self, retry_number: int) -> float:
+        cap = min(self._max_delay, self._base_delay * (2 ** (retry_number - 1)))
+        return self._rng.uniform(0, cap)
+
+    async def stream_response(
+        self,
+        messages: list[MessageEmbed],
+        model: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        params: Optional[InferenceParams] = None,
+    ) -> AsyncGenerator[str, None]:
+        """Stream from the inner service, retrying before the first token"""
+        model_label = model or self._inner.get_model_id()
+        started = time.monotonic()
+        attempt = 0
+
+        while True:
+            attempt += 1
+            yielded = False
+            stream = self._inner.stream_response(
+                messages=messages,
+                model=model,
+                system_prompt=system_prompt,
+                params=params,
+            )
+            try:
+                remaining = self._deadline - (time.monotonic() - started)
+                try:
+                    async with asyncio.timeout(max(0.0, remaining)):
+                        first = await anext(stream, None)
+                except TimeoutError as e:
+                    self._metrics.increment("chat.retry.stalled", model=model_label)
+                    raise TransientChatServiceError(
+                        "No response before the retry deadline"
+                    ) from e
+                if first is not None:
+                    yielded = True
+                    yield first
+                    async for token in stream:
+                        yield token
+                if attempt > 1:
+                    self._metrics.increment("chat.retry.recovered", model=model_label)
+                return
+            except TransientChatServiceError:
+                if yielded:
+                    # Partial output already reached the client - never replay
+                    self._metrics.increment(
+                        "chat.retry.skipped_after_output", model=model_label
+                    )
+                    raise
+                if attempt >= self._max_attempts:
+                    self._metrics.increment("chat.retry.exhausted", model=model_label)
+                    raise
+
+                delay = self._backoff(attempt)
+                if time.monotonic() - started + delay > self._deadline:
+                    self._metrics.increment(
+                        "chat.retry.deadline_exceeded", model=model_label
+                    )
+                    raise
+
+                self._metrics.increment("chat.retry.attempts", model=model_label)
+                await self._sleep(delay)
+            finally:
+                await stream.aclose()
+
+    def resolve_model(
+        self,
+        messages: list[MessageEmbed],
+        model: Optional[str] = None,
+        tags: Optional[list[str]] = None,
+    ) -> str:
+        """Delegate model resolution to the wrapped service"""
+        return self._inner.resolve_model(messages, model=model, tags=tags)
+
+    def get_model_id(self) -> str:
+        """Get the current model ID of the wrapped service"""
+        return self._inner.get_model_id()
@@ -0,0 +1,200 @@
+"""Latency- and cost-aware model routing for ChatService
+
+Cheap turns (short prompt, short history, no escalation keyword or tag) go
+to a fast model; everything else goes to the default model. The fast model
+is only chosen while its rolling TTFT and error rate stay within bounds.
+Samples expire after stats_max_age_seconds, so a demoted fast model is
+tried again once its bad samples have aged out. An explicit model from the
+client always wins, except the sentinel "auto".
+"""
+
+import time
+from collections import deque
+from collections.abc import AsyncGenerator, Callable
+from threading import Lock
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from app.domain.chat.entities import InferenceParams, MessageEmbed
+from app.domain.chat.ports import ChatService
+from app.infrastructure.metrics import MetricsRegistry, metrics
+
+AUTO_MODEL = "auto"
+
+
+class RoutingRules(BaseModel):
+    """Configurable rules for picking a model per request"""
+
+    default_model_id: str
+    fast_model_id: str
+    max_prompt_chars: int = 200
+    max_history_messages: int = 6
+    escalation_keywords: list[str] = Field(default_factory=list)
+    escalation_tags: list[str] = Field(default_factory=list)
+    max_ttft_ms: float = 2500.0
+    max_error_rate: float = 0.2
+    stats_window: int = 50
+    stats_max_age_seconds: float = 300.0
+    min_samples: int = 5
+
+
+class ModelStats:
+    """Rolling TTFT and error samples for a single model
+
+    Keeps at most `window` samples, none older than `max_age` seconds.
+    """
+
+    def __init__(
+        self,
+        window: int,
+        max_age: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        # (recorded_at, ttft_ms or None, error)
+        self._samples: deque[tuple[float, Optional[float], bool]] = deque(maxlen=window)
+        self._max_age = max_age
+        self._clock = clock
+        self._lock = Lock()
+
+    def _expire(self) -> None:
+        cutoff = self._clock() - self._max_age
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+
+    def record(self, ttft_ms: Optional[float], error: bool) -> None:
+        with self._lock:
+            self._samples.append((self._clock(), ttft_ms, error))
+
+    @property
+    def samples(self) -> int:
+        with self._lock:
+            self._expire()
+            return len(self._samples)
+
+    @property
+    def mean_ttft_ms(self) -> float:
+        with self._lock:
+            self._expire()
+            ttfts = [t for _, t, _ in self._samples if t is not None]
+            return sum(ttfts) / len(ttfts) if ttfts else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            self._expire()
+            if not self._samples:
+                return 0.0
+            return sum(e for _, _, e in self._samples) / len(self._samples)
+
+
+class RoutingChatService(ChatService):
+    """ChatService decorator that routes each request to a model
+
+    Usage:
+        service = RoutingChatService(inner, RoutingRules(
+            default_model_id="...sonnet...",
+            fast_model_id="...haiku...",
+        ))
+        model = service.resolve_model(session.messages)
+    """
+
+    def __init__(
+        self,
+        inner: ChatService,
+        rules: RoutingRules,
+        registry: Optional[MetricsRegistry] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._inner = inner
+        self._rules = rules
+        self._metrics = registry or metrics
+        self._clock = clock
+        self._stats: dict[str, ModelStats] = {}
+        self._keywords = [k.lower() for k in rules.escalation_keywords]
+        self._tags = {t.lower() for t in rules.escalation_tags}
+
+    def stats_for(self, model_id: str) -> ModelStats:
+        """Rolling stats for a model (created on first use)"""
+        if model_id not in self._stats:
+            self._stats[model_id] = ModelStats(
+                self._rules.stats_window,
+                self._rules.stats_max_age_seconds,
+                self._clock,
+            )
+        return self._stats[model_id]
+
+    def _is_healthy(self, model_id: str) -> bool:
+        stats = self.stats_for(model_id)
+        if stats.samples < self._rules.min_samples:
+            return True
+        return (
+            stats.error_rate <= self._rules.max_error_rate
+            and stats.mean_ttft_ms <= self._rules.max_ttft_ms
+        )
+
+    def _route(
+        self, messages: list[MessageEmbed], tags: Optional[list[str]]
+    ) -> tuple[str, str]:
+        """Pick (model_id, reason) for a request without an explicit model"""
+        rules = self._rules
+        prompt = next((m.content for m in reversed(messages) if m.role == "user"), "")
+        lowered = prompt.lower()
+
+        if tags and self._tags.intersection(t.lower() for t in tags):
+            return rules.default_model_id, "tag"
+        if any(keyword in lowered for keyword in self._keywords):
+            return rules.default_model_id, "keyword"
+        if len(prompt) > rules.max_prompt_chars:
+            return rules.default_model_id, "prompt_length"
+        if len(messages) > rules.max_history_messages:
+            return rules.default_model_id, "history_size"
+        if not self._is_healthy(rules.fast_model_id):
+            return rules.default_model_id, "fast_model_degraded"
+        return rules.fast_model_id, "cheap_turn"
+
+    def resolve_model(
+        self,
+        messages: list[MessageEmbed],
+        model: Optional[str] = None,
+        tags: Optional[list[str]] = None,
+    ) -> str:
+        """Pick the model for this request; an explicit model always wins"""
+        if model and model != AUTO_MODEL:
+            model_id, reason = model, "explicit"
+        else:
+            model_id, reason = self._route(messages, tags)
+        self._metrics.increment("chat.router.decisions", model=model_id, reason=reason)
+        return model_id
+
+    async def stream_response(
+        self,
+        messages: list[MessageEmbed],
+        model: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        params: Optional[InferenceParams] = None,
+    ) -> AsyncGenerator[str, None]:
+        """Stream from the routed model and record its TTFT/error stats"""
+        if not model or model == AUTO_MODEL:
+            model = self.resolve_model(messages)
+
+        started = time.monotonic()
+        ttft_ms: Optional[float] = None
+        try:
+            async for token in self._inner.stream_response(
+                messages=messages,
+                model=model,
+                system_prompt=system_prompt,
+                params=params,
+            ):
+                if ttft_ms is None:
+                    ttft_ms = (time.monotonic() - started) * 1000
+                yield token
+        except Exception:
+            self.stats_for(model).record(ttft_ms, error=True)
+            raise
+        self.stats_for(model).record(ttft_ms, error=False)
+
+    def get_model_id(self) -> str:
+        """Get the default (non-routed) model ID"""
+        return self._rules.default_model_id
@@ -1,28 +1,192 @@
-"""MongoDB connection using Motor and Beanie"""
+"""MongoDB connection using Motor and Beanie
 
+The client (and its connection pool) is created once per process, owned by
+the Container, pre-warmed at startup and closed on shutdown. Pool sizing,
+timeouts and wire compression come from Settings.
+"""
+
+import asyncio
+import inspect
 import os
+from threading import Lock
+from typing import Any, Optional
+
+from pymongo import monitoring
 
-from app.config import settings
+from app.config import Settings, settings
+from app.infrastructure.metrics import MetricsRegistry, metrics
 
 
-async def init_db():
-    """Initialize MongoDB connection and Beanie ODM
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Tracks connection pool utilization from PyMongo's pool events
 
-    Skips initialization if MONGODB_URI is not set (e.g. during initial deploy).
+    Events arrive on PyMongo's threads, so counts are guarded by a lock.
+    Totals cover every server the client is connected to.
     """
-    mongodb_uri = os.environ.get("MONGODB_URI", settings.mongodb_uri)
 
+    def __init__(self, max_pool_size: int, registry: Optional[MetricsRegistry] = None):
+        self._max_pool_size = max_pool_size
+        self._metrics = registry or metrics
+        self._lock = Lock()
+        self._pools: set[Any] = set()
+        self._open = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._checkout_failures = 0
+        self._clears = 0
+
+    def snapshot(self) -> dict[str, Any]:
+        """Current pool utilization"""
+        with self._lock:
+            capacity = self._max_pool_size * max(1, len(self._pools))
+            return {
+                "pools": len(self._pools),
+                "max_pool_size": self._max_pool_size,
+                "open": self._open,
+                "in_use": self._in_use,
+                "available": max(0, self._open - self._in_use),
+                "waiting": self._waiting,
+                "utilization": round(self._in_use / capacity, 4) if capacity else 0.0,
+                "checkout_failures": self._checkout_failures,
+                "clears": self._clears,
+            }
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        with self._lock:
+            self._pools.add(event.address)
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        with self._lock:
+            self._clears += 1
+        self._metrics.increment("mongo.pool.cleared")
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        with self._lock:
+            self._pools.discard(event.address)
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        with self._lock:
+            self._open += 1
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        with self._lock:
+            self._open -= 1
+
+    def connection_check_out_started(
+        self, event: monitoring.ConnectionCheckOutStartedEvent
+    ) -> None:
+        with self._lock:
+            self._waiting += 1
+
+    def connection_check_out_failed(
+        self, event: monitoring.ConnectionCheckOutFailedEvent
+    ) -> None:
+        with self._lock:
+            self._waiting -= 1
+            self._checkout_failures += 1
+        self._metrics.increment("mongo.pool.checkout_failed", reason=event.reason)
+
+    def connection_checked_out(
+        self, event: monitoring.ConnectionCheckedOutEvent
+    ) -> None:
+        with self._lock:
+            self._waiting -= 1
+            self._in_use += 1
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        with self._lock:
+            self._in_use -= 1
+
+
+def resolve_mongodb_uri(config: Settings = settings) -> Optional[str]:
+    """MongoDB URI to connect to, or None if none is configured
+
+    MONGODB_URI is unset e.g. during an initial deploy; the default
+    localhost URI then means "no database" rather than a local server.
+    """
+    mongodb_uri = os.environ.get("MONGODB_URI", config.mongodb_uri)
     if mongodb_uri == "mongodb://localhost:27017" and not os.environ.get("MONGODB_URI"):
-        print("WARNING: MONGODB_URI not set, skipping database initialization")
+        return None
+    return mongodb_uri
+
+
+def create_mongo_client(
+    mongodb_uri: str,
+    config: Settings = settings,
+    pool_listener: Optional[PoolStatsListener] = None,
+):
+    """Create a Motor client with the pool and compression settings
+
+    Compressors PyMongo can't load are skipped with a warning; the server
+    picks the first one of the list it also supports.
+    """
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    options: dict[str, Any] = {
+        "maxPoolSize": config.mongodb_max_pool_size,
+        "minPoolSize": config.mongodb_min_pool_size,
+        "maxIdleTimeMS": config.mongodb_max_idle_time_ms,
+        "serverSelectionTimeoutMS": config.mongodb_server_selection_timeout_ms,
+    }
+    if config.mongodb_compressors:
+        options["compressors"] = ",".join(config.mongodb_compressors)
+    if pool_listener is not None:
+        options["event_listeners"] = [pool_listener]
+    return AsyncIOMotorClient(mongodb_uri, **options)
+
+
+async def prewarm_pool(client, connections: int) -> None:
+    """Open `connections` pooled connections now instead of on first use
+
+    Concurrent pings each check out their own connection.
+    """
+    if connections <= 0:
         return
+    await asyncio.gather(*(client.admin.command("ping") for _ in range(connections)))
+
+
+async def close_client(client) -> None:
+    """Close a client and its pool (Motor closes synchronously)"""
+    if client is None:
+        return
+    result = client.close()
+    if inspect.isawaitable(result):
+        await result
+
+
+async def init_db(client=None):
+    """Initialize Beanie on a MongoDB client
+
+    Creates a client from settings when none is given (one-off scripts).
+    Skips initialization if MONGODB_URI is not set (e.g. during initial
+    deploy).
+
+    Returns:
+        The client, or None if initialization was skipped
+    """
+    if client is None:
+        mongodb_uri = resolve_mongodb_uri()
+        if mongodb_uri is None:
+            print("WARNING: MONGODB_URI not set, skipping database initialization")
+            return None
+        client = create_mongo_client(mongodb_uri)
 
     from beanie import init_beanie
-    from motor.motor_asyncio import AsyncIOMotorClient
 
-    from app.infrastructure.session.document import SessionDocument
+    from app.infrastructure.search.document import MessageSearchDocument
+    from app.infrastructure.session.document import (
+        MessageBlobDocument,
+        SessionDocument,
+    )
 
-    client = AsyncIOMotorClient(mongodb_uri)
     await init_beanie(
         database=client[settings.mongodb_database_name],
-        document_models=[SessionDocument],
+        document_models=[SessionDocument, MessageBlobDocument, MessageSearchDocument],
     )
+    return client
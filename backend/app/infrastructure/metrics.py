@@ -0,0 +1,65 @@
+"""In-process metrics registry
+
+Lightweight counters and gauges for operational visibility. Values are
+per-container (not aggregated across replicas) and exposed through the
+health router.
+"""
+
+from collections import defaultdict
+from threading import Lock
+
+
+class MetricsRegistry:
+    """Thread-safe registry of named counters and gauges
+
+    Usage:
+        metrics.increment("chat.retry.attempts", model="sonnet")
+        metrics.snapshot()
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._counters: dict[str, float] = defaultdict(float)
+        self._gauges: dict[str, float] = {}
+
+    @staticmethod
+    def _key(name: str, labels: dict[str, str]) -> str:
+        if not labels:
+            return name
+        rendered = ",".join(f"{k}={v}" for k, v in sorted(labels.items()))
+        return f"{name}{{{rendered}}}"
+
+    def increment(self, name: str, value: float = 1.0, **labels: str) -> None:
+        """Add value to a counter"""
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] += value
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        """Set a gauge to an absolute value"""
+        key = self._key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def get(self, name: str, **labels: str) -> float:
+        """Read a counter or gauge (0.0 if never recorded)"""
+        key = self._key(name, labels)
+        with self._lock:
+            if key in self._gauges:
+                return self._gauges[key]
+            return self._counters.get(key, 0.0)
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        """Copy of all current values"""
+        with self._lock:
+            return {"counters": dict(self._counters), "gauges": dict(self._gauges)}
+
+    def reset(self) -> None:
+        """Clear all values (for tests)"""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+
+
+# Process-wide registry
+metrics = MetricsRegistry()
@@ -0,0 +1,7 @@
+"""Search infrastructure - full-text index adapters"""
+
+from .document import MessageSearchDocument
+from .mongo_adapter import MongoSearchIndex
+from .ngram_index import NGramSearchIndex
+
+__all__ = ["MessageSearchDocument", "MongoSearchIndex", "NGramSearchIndex"]
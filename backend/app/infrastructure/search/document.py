@@ -0,0 +1,37 @@
+"""Beanie Document for the message search collection"""
+
+from datetime import datetime
+from typing import Optional
+
+from beanie import Document
+from pymongo import ASCENDING, TEXT, IndexModel
+
+
+class MessageSearchDocument(Document):
+    """One searchable message (denormalized copy of MessageEmbed)
+
+    The compound index puts browser_id before the text key, so every search
+    is an equality-prefixed text query confined to one browser's messages.
+    default_language "none" disables stemming and stop words, which would
+    otherwise mangle Korean and code.
+    """
+
+    browser_id: str
+    session_id: str
+    message_id: str
+    role: str
+    content: str
+    timestamp: Optional[datetime] = None
+
+    class Settings:
+        """Beanie settings"""
+
+        name = "message_search"
+        indexes = [
+            IndexModel(
+                [("browser_id", ASCENDING), ("content", TEXT)],
+                name="browser_content_text",
+                default_language="none",
+            ),
+            IndexModel([("session_id", ASCENDING)], name="session_id"),
+        ]
@@ -0,0 +1,97 @@
+"""MongoDB text-index implementation of SearchIndex"""
+
+from typing import Optional
+
+from app.domain.chat.entities import MessageEmbed
+from app.domain.search.entities import SearchHit
+from app.domain.search.ports import SearchIndex
+from app.domain.search.snippet import make_snippet
+from app.domain.session.entities import Session
+
+from .document import MessageSearchDocument
+
+
+def search_collection():
+    """Raw collection behind MessageSearchDocument"""
+    # Beanie 1.x exposes the Motor collection, 2.x the async PyMongo one
+    getter = getattr(MessageSearchDocument, "get_motor_collection", None)
+    if getter is None:
+        getter = MessageSearchDocument.get_pymongo_collection
+    return getter()
+
+
+def text_query(query: str) -> str:
+    """$text search string matching the whole query as a phrase"""
+    return '"' + query.strip().replace("\\", " ").replace('"', " ") + '"'
+
+
+class MongoSearchIndex(SearchIndex):
+    """Search over a separate message collection with a text index
+
+    Messages are copied on append (one insert_many per turn) because a text
+    index on the embedded session messages can only rank whole sessions,
+    not tell which message matched. The text index tokenizes on word
+    boundaries, so unlike the n-gram index it does not match fragments
+    inside a Korean word.
+    """
+
+    async def index_messages(
+        self, session: Session, messages: list[MessageEmbed]
+    ) -> None:
+        """Insert the new messages in one unordered write"""
+        if not messages:
+            return
+        await search_collection().insert_many(
+            [
+                {
+                    "browser_id": session.browser_id,
+                    "session_id": session.session_id,
+                    "message_id": message.id,
+                    "role": message.role,
+                    "content": message.content,
+                    "timestamp": message.timestamp,
+                }
+                for message in messages
+            ],
+            ordered=False,
+        )
+
+    async def remove_session(self, session_id: str) -> None:
+        """Delete a session's indexed messages"""
+        await search_collection().delete_many({"session_id": session_id})
+
+    async def remove_sessions(
+        self, browser_id: str, session_ids: Optional[list[str]] = None
+    ) -> None:
+        """One delete_many scoped to the browser"""
+        query: dict = {"browser_id": browser_id}
+        if session_ids is not None:
+            query["session_id"] = {"$in": session_ids}
+        await search_collection().delete_many(query)
+
+    async def search(
+        self, browser_id: str, query: str, limit: int = 20
+    ) -> list[SearchHit]:
+        """Text search within one browser, ranked by textScore"""
+        if not query.strip():
+            return []
+        cursor = (
+            search_collection()
+            .find(
+                {"browser_id": browser_id, "$text": {"$search": text_query(query)}},
+                {"_id": 0, "score": {"$meta": "textScore"}},
+            )
+            .sort([("score", {"$meta": "textScore"}), ("timestamp", -1)])
+            .limit(limit)
+        )
+        return [
+            SearchHit(
+                session_id=raw["session_id"],
+                message_id=raw["message_id"],
+                role=raw["role"],
+                snippet=make_snippet(raw["content"], query),
+                score=raw["score"],
+                timestamp=raw.get("timestamp"),
+            )
+            async for raw in cursor
+        ]
@@ -0,0 +1,222 @@
+"""In-process inverted index over character n-grams
+
+Korean has no spaces inside compounds and is agglutinative ("세션을",
+"세션에서"), so word-level indexes miss most partial matches. Indexing every
+character 1..n-gram of each word makes any substring of at least one
+character findable; a query is answered by intersecting the postings of its
+n-grams and then verifying the phrase in the candidate text, so results
+match the previous client-side `includes` semantics. Ranking is BM25 over
+the query n-grams, newer messages first on ties.
+
+Postings are kept per browser, so a search only touches one user's data.
+Intended for the in-memory/local mode; state is not persisted.
+"""
+
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+from app.domain.chat.entities import MessageEmbed
+from app.domain.search.entities import SearchHit
+from app.domain.search.ports import SearchIndex
+from app.domain.search.snippet import make_snippet
+from app.domain.session.entities import Session
+
+_WORD = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    """Words of text, width/case-folded and joined by single spaces"""
+    return " ".join(_WORD.findall(unicodedata.normalize("NFKC", text).casefold()))
+
+
+def document_grams(text: str, n: int) -> Counter:
+    """All 1..n-character substrings of every word, with counts"""
+    counts: Counter = Counter()
+    for word in normalize(text).split():
+        for size in range(1, min(n, len(word)) + 1):
+            counts.update(word[i : i + size] for i in range(len(word) - size + 1))
+    return counts
+
+
+def query_grams(text: str, n: int) -> set[str]:
+    """Longest available n-grams of every query word"""
+    grams: set[str] = set()
+    for word in normalize(text).split():
+        size = min(n, len(word))
+        grams.update(word[i : i + size] for i in range(len(word) - size + 1))
+    return grams
+
+
+class _Entry:
+    __slots__ = ("session_id", "message_id", "role", "content", "timestamp", "length")
+
+    def __init__(
+        self,
+        session_id: str,
+        message_id: str,
+        role: str,
+        content: str,
+        timestamp: Optional[datetime],
+        length: int,
+    ):
+        self.session_id = session_id
+        self.message_id = message_id
+        self.role = role
+        self.content = content
+        self.timestamp = timestamp
+        self.length = length
+
+
+class _Shard:
+    """Index of one browser's messages"""
+
+    def __init__(self):
+        self.entries: dict[int, _Entry] = {}
+        self.postings: dict[str, dict[int, int]] = {}
+        self.by_session: dict[str, list[int]] = {}
+        self.total_length = 0
+
+
+class NGramSearchIndex(SearchIndex):
+    """Inverted n-gram index kept in process memory"""
+
+    def __init__(self, n: int = 2, k1: float = 1.2, b: float = 0.75):
+        self.n = max(1, n)
+        self.k1 = k1
+        self.b = b
+        self._shards: dict[str, _Shard] = {}
+        self._session_browser: dict[str, str] = {}
+        self._next_id = 0
+
+    async def index_messages(
+        self, session: Session, messages: list[MessageEmbed]
+    ) -> None:
+        """Add new messages to the browser's shard"""
+        shard = self._shards.setdefault(session.browser_id, _Shard())
+        self._session_browser[session.session_id] = session.browser_id
+        doc_ids = shard.by_session.setdefault(session.session_id, [])
+
+        for message in messages:
+            grams = document_grams(message.content, self.n)
+            doc_id = self._next_id
+            self._next_id += 1
+            length = sum(grams.values())
+            shard.entries[doc_id] = _Entry(
+                session.session_id,
+                message.id,
+                message.role,
+                message.content,
+                message.timestamp,
+                length,
+            )
+            shard.total_length += length
+            doc_ids.append(doc_id)
+            for gram, count in grams.items():
+                shard.postings.setdefault(gram, {})[doc_id] = count
+
+    async def remove_session(self, session_id: str) -> None:
+        """Remove a session's messages and their postings"""
+        browser_id = self._session_browser.pop(session_id, None)
+        shard = self._shards.get(browser_id) if browser_id else None
+        if shard is None:
+            return
+
+        for doc_id in shard.by_session.pop(session_id, []):
+            entry = shard.entries.pop(doc_id)
+            shard.total_length -= entry.length
+            for gram in document_grams(entry.content, self.n):
+                postings = shard.postings.get(gram)
+                if postings is None:
+                    continue
+                postings.pop(doc_id, None)
+                if not postings:
+                    del shard.postings[gram]
+        if not shard.entries:
+            del self._shards[browser_id]
+
+    async def remove_sessions(
+        self, browser_id: str, session_ids: Optional[list[str]] = None
+    ) -> None:
+        """Remove sessions of one browser (its whole shard if session_ids is None)"""
+        shard = self._shards.get(browser_id)
+        if shard is None:
+            return
+        if session_ids is None:
+            del self._shards[browser_id]
+            for session_id in shard.by_session:
+                self._session_browser.pop(session_id, None)
+            return
+        for session_id in session_ids:
+            if session_id in shard.by_session:
+                await self.remove_session(session_id)
+
+    async def search(
+        self, browser_id: str, query: str, limit: int = 20
+    ) -> list[SearchHit]:
+        """Messages containing the query phrase, ranked by BM25"""
+        shard = self._shards.get(browser_id)
+        grams = query_grams(query, self.n)
+        phrase = normalize(query)
+        if shard is None or not grams:
+            return []
+
+        postings = [shard.postings.get(gram) for gram in grams]
+        if any(p is None for p in postings):
+            return []
+        postings.sort(key=len)
+
+        # Intersect, starting from the rarest gram
+        candidates = [
+            doc_id
+            for doc_id in postings[0]
+            if all(doc_id in other for other in postings[1:])
+        ]
+
+        total = len(shard.entries)
+        average = shard.total_length / total
+        weights = [
+            (p, math.log(1 + (total - len(p) + 0.5) / (len(p) + 0.5))) for p in postings
+        ]
+
+        scored = []
+        for doc_id in candidates:
+            entry = shard.entries[doc_id]
+            # Grams can co-occur without forming the phrase
+            if phrase not in normalize(entry.content):
+                continue
+            norm = self.k1 * (1 - self.b + self.b * entry.length / average)
+            score = sum(
+                idf * p[doc_id] * (self.k1 + 1) / (p[doc_id] + norm)
+                for p, idf in weights
+            )
+            stamp = entry.timestamp.timestamp() if entry.timestamp else 0.0
+            scored.append((score, stamp, entry))
+
+        best = heapq.nlargest(limit, scored, key=lambda row: (row[0], row[1]))
+        return [
+            SearchHit(
+                session_id=entry.session_id,
+                message_id=entry.message_id,
+                role=entry.role,
+                snippet=make_snippet(entry.content, query),
+                score=round(score, 4),
+                timestamp=entry.timestamp,
+            )
+            for score, _, entry in best
+        ]
+
+    def stats(self) -> dict[str, int]:
+        """Index size (for health/metrics endpoints)"""
+        return {
+            "browsers": len(self._shards),
+            "messages": sum(len(s.entries) for s in self._shards.values()),
+            "grams": sum(len(s.postings) for s in self._shards.values()),
+            "postings": sum(
+                len(p) for s in self._shards.values() for p in s.postings.values()
+            ),
+        }
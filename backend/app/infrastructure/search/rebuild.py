@@ -0,0 +1,75 @@
+"""Rebuild the message search index from the session store
+
+The index is maintained on append, so it only needs rebuilding when it
+missed writes: sessions stored before search existed, a fresh or dropped
+message_search collection, or the in-memory n-gram index after a restart
+(the container does that one at startup). Each session's entries are
+replaced (removed, then re-added from its messages), so re-running is
+safe and the other sessions stay searchable meanwhile. A message appended
+while its session is being replaced can be dropped; re-run to pick it up.
+
+Usage:
+    python -m app.infrastructure.search.rebuild [--batch-size N]
+"""
+
+import argparse
+import asyncio
+
+from app.domain.search.ports import SearchIndex
+from app.domain.session.ports import SessionRepository
+
+
+async def rebuild_search_index(
+    index: SearchIndex,
+    repository: SessionRepository,
+    batch_size: int = 100,
+) -> dict[str, int]:
+    """
+    Re-index every session the repository lists
+
+    Args:
+        index: Search index to fill
+        repository: Source of sessions (archived ones are not searchable)
+        batch_size: Sessions read per batch
+
+    Returns:
+        Counts of scanned sessions and indexed messages
+    """
+    totals = {"sessions": 0, "messages": 0}
+    async for session in repository.iter_all(batch_size):
+        totals["sessions"] += 1
+        await index.remove_session(session.session_id)
+        if session.messages:
+            await index.index_messages(session, session.messages)
+            totals["messages"] += len(session.messages)
+    return totals
+
+
+async def _main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    from app.config import settings
+    from app.infrastructure.database import close_client, init_db
+    from app.infrastructure.session.content_codec import load_content_codec
+    from app.infrastructure.session.mongo_adapter import MongoSessionRepository
+
+    from .mongo_adapter import MongoSearchIndex
+
+    client = await init_db()
+    if client is None:
+        return
+    try:
+        totals = await rebuild_search_index(
+            MongoSearchIndex(),
+            MongoSessionRepository(load_content_codec(settings)),
+            batch_size=args.batch_size,
+        )
+    finally:
+        await close_client(client)
+    print(f"Indexed {totals['messages']} messages of {totals['sessions']} sessions")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
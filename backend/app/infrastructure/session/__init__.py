@@ -1,6 +1,24 @@
 """Session infrastructure adapters"""
 
-from .document import SessionDocument
+from .archive import SessionArchive, TieringSessionRepository
+from .content_codec import ContentCodec
+from .document import MessageBlobDocument, SessionDocument
+from .loader import BatchingSessionRepository, SessionLoader
+from .memory_adapter import InMemorySessionRepository
 from .mongo_adapter import MongoSessionRepository
+from .sqlite_adapter import SqliteSessionRepository
+from .write_behind import WriteBehindSessionRepository
 
-__all__ = ["SessionDocument", "MongoSessionRepository"]
+__all__ = [
+    "SessionDocument",
+    "MessageBlobDocument",
+    "ContentCodec",
+    "MongoSessionRepository",
+    "SqliteSessionRepository",
+    "InMemorySessionRepository",
+    "BatchingSessionRepository",
+    "SessionLoader",
+    "WriteBehindSessionRepository",
+    "SessionArchive",
+    "TieringSessionRepository",
+]
@@ -0,0 +1,573 @@
+"""Cold-session tiering into an archive collection
+
+Most sessions are never opened again after a while, yet they would stay in
+the hot `sessions` collection and its indexes forever. A background job
+moves sessions idle for longer than `idle_after` into `sessions_archive`,
+one compact document per session. Pinned sessions are never archived, so
+the retention TTL cannot delete them.
+
+- _id: the session ID
+- browser_id, revision, updated_at, archived_at: plain fields for version
+  checks, session lists, bulk deletes and the retention TTL
+- summary: the session without its messages, for session lists
+- codec, data: the whole session as BSON (spilled content included),
+  compressed as one frame with the message content codec
+
+Lookups by ID that miss the hot collection restore the session there
+(TieringSessionRepository), so reads stay transparent. Session lists merge
+the archived summaries in by updated_at (one browser_id/updated_at index),
+so archived sessions stay in the sidebar without being restored; opening
+one restores it. Export and bulk deletes cover both tiers. With `retention`
+set, a TTL index on archived_at hard-deletes sessions that long after they
+were archived.
+
+Archived sessions are not searchable either: their search index entries
+are dropped when they are archived and re-added when they are restored, so
+nothing is left behind when the TTL deletes them.
+
+Run one tiering pass with:
+    python -m app.infrastructure.session.archive [--idle-days N]
+"""
+
+import argparse
+import asyncio
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+import bson
+from pymongo import DeleteOne, ReplaceOne
+from pymongo.errors import OperationFailure
+
+from app.domain.chat.entities import MessageEmbed
+from app.domain.search.ports import SearchIndex
+from app.domain.session.entities import (
+    MessageCursor,
+    MessagePage,
+    Session,
+    SessionVersion,
+)
+from app.domain.session.errors import SessionAlreadyExistsError
+from app.domain.session.ports import SessionRepository
+from app.infrastructure.metrics import MetricsRegistry, metrics
+
+from . import mongo_adapter
+from .mongo_adapter import MongoSessionRepository
+
+ARCHIVE_COLLECTION = "sessions_archive"
+_TTL_INDEX = "archived_at_ttl"
+_LIST_INDEX = "browser_id_updated_at"
+# IndexOptionsConflict / IndexKeySpecsConflict: the TTL changed
+_INDEX_CONFLICTS = (85, 86)
+
+
+def archive_collection():
+    """Raw archive collection (same database as the sessions collection)"""
+    return mongo_adapter.sessions_collection().database[ARCHIVE_COLLECTION]
+
+
+class SessionArchive:
+    """Moves idle sessions out of the hot collection and back on access
+
+    Args:
+        repository: Hot repository; encodes restored sessions and decodes
+            the ones being archived
+        idle_after: Sessions not updated for this long are archived
+        batch_size: Sessions moved per round trip
+        retention: Hard-delete archived sessions this long after archiving
+            (None: keep them)
+        collection: Archive collection (defaults to sessions_archive)
+        search_index: Index to drop archived sessions from and re-add
+            restored ones to (None: no search)
+    """
+
+    def __init__(
+        self,
+        repository: MongoSessionRepository,
+        idle_after: timedelta = timedelta(days=7),
+        batch_size: int = 200,
+        retention: Optional[timedelta] = None,
+        collection: Optional[Any] = None,
+        registry: Optional[MetricsRegistry] = None,
+        search_index: Optional[SearchIndex] = None,
+    ):
+        self._repository = repository
+        self._idle_after = idle_after
+        self._batch_size = max(1, batch_size)
+        self._retention = retention
+        self._collection = collection
+        self._metrics = registry or metrics
+        self._search_index = search_index
+
+    def _archive(self):
+        if self._collection is not None:
+            return self._collection
+        return archive_collection()
+
+    # --- Encoding ---
+
+    def _encode(self, session: Session, archived_at: datetime) -> dict:
+        codec = self._repository.codec
+        return {
+            "_id": session.session_id,
+            "browser_id": session.browser_id,
+            "revision": session.revision,
+            "updated_at": session.updated_at,
+            "archived_at": archived_at,
+            "summary": session.model_dump(exclude={"messages"}),
+            "codec": codec.codec,
+            "data": codec.compress(bson.encode(session.model_dump())),
+        }
+
+    def _decode(self, raw: dict) -> Session:
+        data = self._repository.codec.unpack(raw["codec"], raw["data"])
+        return Session.model_validate(bson.decode(data))
+
+    # --- Tiering ---
+
+    async def ensure_indexes(self) -> None:
+        """Create the list index; create, change or drop the retention TTL"""
+        collection = self._archive()
+        await collection.create_index(
+            [("browser_id", 1), ("updated_at", -1)], name=_LIST_INDEX
+        )
+        if self._retention is None:
+            if _TTL_INDEX in await collection.index_information():
+                await collection.drop_index(_TTL_INDEX)
+            return
+
+        seconds = int(self._retention.total_seconds())
+        try:
+            await collection.create_index(
+                "archived_at", name=_TTL_INDEX, expireAfterSeconds=seconds
+            )
+        except OperationFailure as e:
+            if e.code not in _INDEX_CONFLICTS:
+                raise
+            await collection.database.command(
+                "collMod",
+                collection.name,
+                index={"name": _TTL_INDEX, "expireAfterSeconds": seconds},
+            )
+
+    async def archive_idle(self, now: Optional[datetime] = None) -> int:
+        """
+        Move sessions not updated since `now - idle_after` to the archive
+
+        Returns:
+            Number of sessions archived
+        """
+        now = now or datetime.utcnow()
+        cutoff = now - self._idle_after
+        # Sessions restored since the cutoff were read again; keep them hot.
+        # Pinned sessions stay hot for good (the retention TTL would delete
+        # them otherwise).
+        query = {
+            "updated_at": {"$lt": cutoff},
+            "restored_at": {"$not": {"$gte": cutoff}},
+            "pinned": {"$ne": True},
+        }
+        archived = 0
+        while True:
+            cursor = (
+                mongo_adapter.sessions_collection()
+                .find(query, {"_id": 0})
+                .limit(self._batch_size)
+            )
+            raws = [raw async for raw in cursor]
+            if not raws:
+                break
+            moved = await self._move(await self._repository.to_sessions(raws), now)
+            archived += moved
+            # Nothing moved: every session of the batch is being written to
+            if moved == 0 or len(raws) < self._batch_size:
+                break
+        return archived
+
+    async def _move(self, sessions: list[Session], now: datetime) -> int:
+        """Archive sessions, then drop their hot copies if still unchanged
+
+        A session written to after it was read keeps its hot copy, and its
+        archive copy is discarded. A crash in between leaves both copies;
+        the hot one wins and the next pass moves it again.
+        """
+        hot = mongo_adapter.sessions_collection()
+        await self._archive().bulk_write(
+            [
+                ReplaceOne({"_id": s.session_id}, self._encode(s, now), upsert=True)
+                for s in sessions
+            ],
+            ordered=False,
+        )
+        await hot.bulk_write(
+            [
+                DeleteOne({"session_id": s.session_id, "updated_at": s.updated_at})
+                for s in sessions
+            ],
+            ordered=False,
+        )
+
+        session_ids = [s.session_id for s in sessions]
+        cursor = hot.find(
+            {"session_id": {"$in": session_ids}}, {"_id": 0, "session_id": 1}
+        )
+        kept = {raw["session_id"] async for raw in cursor}
+        if kept:
+            await self._archive().delete_many({"_id": {"$in": list(kept)}})
+        moved = [i for i in session_ids if i not in kept]
+        if moved:
+            # Spilled content now lives in the archive document
+            await mongo_adapter.blobs_collection().delete_many(
+                {"session_id": {"$in": moved}}
+            )
+            await self._unindex([s for s in sessions if s.session_id in moved])
+        self._metrics.increment("session.archive.archived", len(moved))
+        return len(moved)
+
+    async def _unindex(self, sessions: list[Session]) -> None:
+        """Drop archived sessions from search (one call per browser)"""
+        if self._search_index is None:
+            return
+        by_browser: dict[str, list[str]] = {}
+        for session in sessions:
+            by_browser.setdefault(session.browser_id, []).append(session.session_id)
+        for browser_id, session_ids in by_browser.items():
+            await self._search_index.remove_sessions(browser_id, session_ids)
+
+    async def run(self, interval: float) -> None:
+        """Archive idle sessions every `interval` seconds until cancelled"""
+        while True:
+            try:
+                archived = await self.archive_idle()
+                if archived:
+                    print(f"Archived {archived} idle sessions")
+            except Exception as e:
+                print(f"Error archiving idle sessions: {e}")
+            await asyncio.sleep(interval)
+
+    # --- Access ---
+
+    async def restore_many(self, session_ids: list[str]) -> dict[str, Session]:
+        """Move archived sessions back to the hot collection
+
+        Returns:
+            The restored sessions by ID; IDs that are not archived are left
+            out. A session restored concurrently is returned as stored hot.
+            Restored sessions are marked with restored_at so the next
+            tiering pass leaves them hot.
+        """
+        if not session_ids:
+            return {}
+        cursor = self._archive().find(
+            {"_id": {"$in": list(dict.fromkeys(session_ids))}}
+        )
+        sessions = [self._decode(raw) async for raw in cursor]
+        if not sessions:
+            return {}
+
+        inserted = await self._repository.insert_many(sessions)
+        await self._archive().delete_many(
+            {"_id": {"$in": [s.session_id for s in sessions]}}
+        )
+        restored = {s.session_id: s for s, ok in zip(sessions, inserted) if ok}
+        if restored:
+            # Not idle any more, although updated_at is unchanged
+            await mongo_adapter.sessions_collection().update_many(
+                {"session_id": {"$in": list(restored)}},
+                {"$set": {"restored_at": datetime.utcnow()}},
+            )
+            if self._search_index is not None:
+                for session in restored.values():
+                    await self._search_index.index_messages(session, session.messages)
+        conflicts = [s.session_id for s, ok in zip(sessions, inserted) if not ok]
+        if conflicts:
+            restored.update(await self._repository.find_many(conflicts))
+        self._metrics.increment("session.archive.restored", len(restored))
+        return restored
+
+    async def restore(self, session_id: str) -> Optional[Session]:
+        """restore_many() for one session; None if it is not archived"""
+        return (await self.restore_many([session_id])).get(session_id)
+
+    async def find_version(self, session_id: str) -> Optional[SessionVersion]:
+        """Version of an archived session, without restoring it"""
+        raw = await self._archive().find_one(
+            {"_id": session_id}, {"revision": 1, "updated_at": 1}
+        )
+        if raw is None:
+            return None
+        return SessionVersion(
+            session_id=raw["_id"],
+            revision=raw["revision"],
+            updated_at=raw["updated_at"],
+        )
+
+    async def list_summaries(self, browser_id: str, limit: int) -> list[Session]:
+        """A browser's newest archived sessions without messages
+
+        Documents archived before summaries were stored are decoded whole.
+        """
+        cursor = (
+            self._archive()
+            .find({"browser_id": browser_id}, {"data": 0})
+            .sort("updated_at", -1)
+            .limit(limit)
+        )
+        summaries = []
+        async for raw in cursor:
+            if "summary" not in raw:
+                full = await self._archive().find_one({"_id": raw["_id"]})
+                summaries.append(self._decode(full).model_copy(update={"messages": []}))
+            else:
+                summaries.append(Session.model_validate(raw["summary"]))
+        return summaries
+
+    async def find_versions_by_browser_id(
+        self, browser_id: str, limit: int
+    ) -> list[SessionVersion]:
+        """Versions of a browser's newest archived sessions"""
+        cursor = (
+            self._archive()
+            .find({"browser_id": browser_id}, {"revision": 1, "updated_at": 1})
+            .sort("updated_at", -1)
+            .limit(limit)
+        )
+        return [
+            SessionVersion(
+                session_id=raw["_id"],
+                revision=raw["revision"],
+                updated_at=raw["updated_at"],
+            )
+            async for raw in cursor
+        ]
+
+    async def archived_ids(self, session_ids: list[str]) -> set[str]:
+        """Which of these sessions are archived"""
+        cursor = self._archive().find({"_id": {"$in": session_ids}}, {"_id": 1})
+        return {raw["_id"] async for raw in cursor}
+
+    async def iter_by_browser_id(
+        self, browser_id: str, batch_size: int = 100
+    ) -> AsyncIterator[Session]:
+        """Stream a browser's archived sessions (unindexed scan)"""
+        cursor = self._archive().find({"browser_id": browser_id}).batch_size(batch_size)
+        async for raw in cursor:
+            yield self._decode(raw)
+
+    async def delete(self, session_id: str) -> bool:
+        result = await self._archive().delete_one({"_id": session_id})
+        return result.deleted_count == 1
+
+    async def delete_many(
+        self, browser_id: str, session_ids: Optional[list[str]] = None
+    ) -> int:
+        query: dict = {"browser_id": browser_id}
+        if session_ids is not None:
+            query["_id"] = {"$in": session_ids}
+        result = await self._archive().delete_many(query)
+        return result.deleted_count
+
+
+class TieringSessionRepository(SessionRepository):
+    """SessionRepository decorator that makes archived sessions transparent
+
+    Lookups by ID that find nothing hot restore the session from the
+    archive and retry. find_version and the summary/version lists answer
+    from the archive without restoring (lists merge both tiers by
+    updated_at); export and deletes cover both tiers. find_by_browser_id
+    loads whole sessions, so it only covers hot ones.
+    """
+
+    def __init__(self, inner: SessionRepository, archive: SessionArchive):
+        self._inner = inner
+        self._archive = archive
+
+    # --- Reads ---
+
+    async def find_by_session_id(self, session_id: str) -> Optional[Session]:
+        session = await self._inner.find_by_session_id(session_id)
+        if session is None:
+            session = await self._archive.restore(session_id)
+        return session
+
+    async def find_many(self, session_ids: list[str]) -> dict[str, Session]:
+        found = await self._inner.find_many(session_ids)
+        missing = [i for i in dict.fromkeys(session_ids) if i not in found]
+        if missing:
+            found.update(await self._archive.restore_many(missing))
+        return found
+
+    async def find_version(self, session_id: str) -> Optional[SessionVersion]:
+        version = await self._inner.find_version(session_id)
+        if version is None:
+            version = await self._archive.find_version(session_id)
+        return version
+
+    async def find_messages(
+        self,
+        session_id: str,
+        after: Optional[MessageCursor] = None,
+        before: Optional[MessageCursor] = None,
+        limit: int = 50,
+    ) -> Optional[MessagePage]:
+        page = await self._inner.find_messages(session_id, after, before, limit)
+        if page is None and await self._archive.restore(session_id) is not None:
+            page = await self._inner.find_messages(session_id, after, before, limit)
+        return page
+
+    async def find_by_browser_id(
+        self, browser_id: str, skip: int = 0, limit: int = 100
+    ) -> list[Session]:
+        return await self._inner.find_by_browser_id(browser_id, skip, limit)
+
+    async def list_summaries(
+        self, browser_id: str, skip: int = 0, limit: int = 100
+    ) -> list[Session]:
+        # Both tiers are sorted by updated_at; merge their first skip+limit
+        hot = await self._inner.list_summaries(browser_id, 0, skip + limit)
+        cold = await self._archive.list_summaries(browser_id, skip + limit)
+        return _merge_page(hot, cold, skip, limit)
+
+    async def find_versions_by_browser_id(
+        self, browser_id: str, skip: int = 0, limit: int = 100
+    ) -> list[SessionVersion]:
+        hot = await self._inner.find_versions_by_browser_id(browser_id, 0, skip + limit)
+        cold = await self._archive.find_versions_by_browser_id(browser_id, skip + limit)
+        return _merge_page(hot, cold, skip, limit)
+
+    async def iter_by_browser_id(
+        self, browser_id: str, batch_size: int = 100
+    ) -> AsyncIterator[Session]:
+        async for session in self._inner.iter_by_browser_id(browser_id, batch_size):
+            yield session
+        async for session in self._archive.iter_by_browser_id(browser_id, batch_size):
+            yield session
+
+    async def iter_all(self, batch_size: int = 100) -> AsyncIterator[Session]:
+        async for session in self._inner.iter_all(batch_size):
+            yield session
+
+    # --- Writes ---
+
+    async def save(
+        self, session: Session, expected_revision: Optional[int] = None
+    ) -> Session:
+        return await self._inner.save(session, expected_revision)
+
+    async def save_many(self, sessions: list[Session]) -> None:
+        await self._inner.save_many(sessions)
+
+    async def append_messages(
+        self,
+        session: Session,
+        messages: list[MessageEmbed],
+        expected_revision: Optional[int] = None,
+    ) -> None:
+        await self._inner.append_messages(session, messages, expected_revision)
+
+    async def write_batch(
+        self,
+        saves: list[Session],
+        appends: list[tuple[Session, list[MessageEmbed]]],
+        expected_revisions: Optional[dict[str, int]] = None,
+    ) -> set[str]:
+        return await self._inner.write_batch(saves, appends, expected_revisions)
+
+    async def create(self, session: Session) -> Session:
+        if await self._archive.archived_ids([session.session_id]):
+            raise SessionAlreadyExistsError(session.session_id)
+        return await self._inner.create(session)
+
+    async def insert_many(self, sessions: list[Session]) -> list[bool]:
+        archived = await self._archive.archived_ids([s.session_id for s in sessions])
+        fresh = [s for s in sessions if s.session_id not in archived]
+        inserted = iter(await self._inner.insert_many(fresh))
+        return [False if s.session_id in archived else next(inserted) for s in sessions]
+
+    async def update(self, session_id: str, **kwargs) -> Optional[Session]:
+        updated = await self._inner.update(session_id, **kwargs)
+        if updated is None and await self._archive.restore(session_id) is not None:
+            updated = await self._inner.update(session_id, **kwargs)
+        return updated
+
+    async def set_pinned_many(
+        self, browser_id: str, session_ids: Optional[list[str]], pinned: bool
+    ) -> int:
+        if session_ids is not None:
+            # Explicitly selected sessions come back to the hot tier
+            await self._archive.restore_many(session_ids)
+        return await self._inner.set_pinned_many(browser_id, session_ids, pinned)
+
+    async def delete(self, session_id: str) -> bool:
+        deleted = await self._inner.delete(session_id)
+        return await self._archive.delete(session_id) or deleted
+
+    async def delete_many(
+        self, browser_id: str, session_ids: Optional[list[str]] = None
+    ) -> int:
+        deleted = await self._inner.delete_many(browser_id, session_ids)
+        return deleted + await self._archive.delete_many(browser_id, session_ids)
+
+
+def _merge_page(hot: list, cold: list, skip: int, limit: int) -> list:
+    """One page of two updated_at-sorted lists; hot wins duplicate IDs
+
+    A session being restored can briefly be in both tiers.
+    """
+    hot_ids = {item.session_id for item in hot}
+    merged = hot + [item for item in cold if item.session_id not in hot_ids]
+    merged.sort(key=lambda item: item.updated_at, reverse=True)
+    return merged[skip : skip + limit]
+
+
+def load_session_archive(
+    repository: MongoSessionRepository,
+    config,
+    search_index: Optional[SearchIndex] = None,
+) -> SessionArchive:
+    """Build the archive from Settings"""
+    retention = config.session_archive_retention_days
+    return SessionArchive(
+        repository,
+        idle_after=timedelta(days=config.session_archive_idle_days),
+        batch_size=config.session_archive_batch_size,
+        retention=timedelta(days=retention) if retention is not None else None,
+        search_index=search_index,
+    )
+
+
+async def _main() -> None:
+    parser = argparse.ArgumentParser(description="Archive idle sessions")
+    parser.add_argument("--idle-days", type=float, default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+
+    from app.config import settings
+    from app.infrastructure.database import close_client, init_db
+    from app.infrastructure.search import MongoSearchIndex
+
+    from .content_codec import load_content_codec
+
+    config = settings.model_copy()
+    if args.idle_days is not None:
+        config.session_archive_idle_days = args.idle_days
+    if args.batch_size is not None:
+        config.session_archive_batch_size = args.batch_size
+
+    client = await init_db()
+    if client is None:
+        return
+    try:
+        repository = MongoSessionRepository(load_content_codec(config))
+        # An in-process index belongs to the server; it is rebuilt on start
+        search_index = MongoSearchIndex() if config.search_backend == "mongo" else None
+        archive = load_session_archive(repository, config, search_index=search_index)
+        await archive.ensure_indexes()
+        archived = await archive.archive_idle()
+    finally:
+        await close_client(client)
+    print(f"Archived {archived} idle sessions")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
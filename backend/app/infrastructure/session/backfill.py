@@ -0,0 +1,106 @@
+"""One-shot backfill of denormalized session counters
+
+Populates message_count, total_tokens and last_message_preview on documents
+written before those fields existed. Reads only message contents (decoding
+compressed or spilled ones), and writes with unordered bulk_write batches.
+Each update is conditional on the message array size it was computed from,
+so a session that receives a message meanwhile is skipped (its append
+already maintains the counters from then on; re-run to pick up any
+stragglers).
+
+Usage:
+    python -m app.infrastructure.session.backfill [--only-missing] [--batch-size N]
+"""
+
+import argparse
+import asyncio
+from typing import Any, Optional
+
+from pymongo import UpdateOne
+
+from app.domain.session.entities import message_stats
+
+from .mongo_adapter import MongoSessionRepository, sessions_collection
+
+
+async def backfill_session_stats(
+    collection: Optional[Any] = None,
+    batch_size: int = 500,
+    only_missing: bool = False,
+    repository: Optional[MongoSessionRepository] = None,
+) -> dict[str, int]:
+    """
+    Recompute counters for every session (or only those missing them)
+
+    Args:
+        collection: Sessions collection (defaults to the Beanie one)
+        batch_size: Documents per cursor batch and per bulk_write
+        only_missing: Only touch documents without message_count
+        repository: Decodes compressed or spilled content (defaults to one
+            without compression settings, which can still decode)
+
+    Returns:
+        Counts of scanned, updated and skipped documents
+    """
+    collection = collection if collection is not None else sessions_collection()
+    repository = repository or MongoSessionRepository()
+    query = {"message_count": {"$exists": False}} if only_missing else {}
+    projection = {
+        "_id": 1,
+        "messages.content": 1,
+        "messages.codec": 1,
+        "messages.content_z": 1,
+        "messages.blob_id": 1,
+    }
+    cursor = collection.find(query, projection).batch_size(batch_size)
+
+    totals = {"scanned": 0, "updated": 0, "skipped": 0}
+    operations: list[UpdateOne] = []
+
+    async def flush() -> None:
+        if not operations:
+            return
+        result = await collection.bulk_write(list(operations), ordered=False)
+        totals["updated"] += result.matched_count
+        totals["skipped"] += len(operations) - result.matched_count
+        operations.clear()
+
+    async for raw in cursor:
+        totals["scanned"] += 1
+        messages = await repository.decode(raw.get("messages", []))
+        contents = [m.get("content", "") for m in messages]
+        operations.append(
+            UpdateOne(
+                {"_id": raw["_id"], "messages": {"$size": len(contents)}},
+                {"$set": message_stats(contents)},
+            )
+        )
+        if len(operations) >= batch_size:
+            await flush()
+    await flush()
+    return totals
+
+
+async def _main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only-missing", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    from app.infrastructure.database import close_client, init_db
+
+    client = await init_db()
+    try:
+        totals = await backfill_session_stats(
+            batch_size=args.batch_size, only_missing=args.only_missing
+        )
+    finally:
+        await close_client(client)
+    print(
+        f"Scanned {totals['scanned']}, updated {totals['updated']}, "
+        f"skipped {totals['skipped']}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
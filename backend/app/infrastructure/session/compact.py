@@ -0,0 +1,129 @@
+"""Compact in-memory message representation
+
+MessageEmbed is a pydantic model: every instance carries a __dict__, a
+fields-set, a UUID string and a datetime. For histories that stay in memory
+(the in-memory repository holds every session of the process) that overhead
+dominates. CompactMessage keeps the same data in a slotted object:
+
+- id / parent_id: canonical UUID strings are stored as 128-bit ints
+- role / model: interned, so each distinct value exists once per process
+- timestamp: integer microseconds since the Unix epoch (naive UTC)
+
+Convert at the repository boundary with from_embed() / to_embed();
+to_embed() skips validation (the data came from a MessageEmbed), which
+makes it about twice as fast as model_construct.
+"""
+
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Union
+from uuid import UUID
+
+from app.domain.chat.entities import MessageEmbed
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_FIELDS = frozenset(MessageEmbed.model_fields)
+
+PackedId = Union[int, str]
+
+
+def pack_id(value: Optional[str]) -> Optional[PackedId]:
+    """Store canonical UUID strings as ints; keep anything else as-is"""
+    if value is None or len(value) != 36:
+        return value
+    try:
+        packed = UUID(value)
+    except ValueError:
+        return value
+    return packed.int if str(packed) == value else value
+
+
+def unpack_id(value: Optional[PackedId]) -> Optional[str]:
+    """Inverse of pack_id"""
+    if isinstance(value, int):
+        return str(UUID(int=value))
+    return value
+
+
+def pack_timestamp(value: datetime) -> int:
+    """Microseconds since the epoch; aware datetimes are converted to UTC"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def unpack_timestamp(value: int) -> datetime:
+    """Inverse of pack_timestamp (returns a naive UTC datetime)"""
+    return _EPOCH + timedelta(microseconds=value)
+
+
+class CompactMessage:
+    """Slotted, low-overhead counterpart of MessageEmbed"""
+
+    __slots__ = (
+        "packed_id",
+        "role",
+        "content",
+        "timestamp_us",
+        "model",
+        "packed_parent_id",
+    )
+
+    def __init__(
+        self,
+        packed_id: PackedId,
+        role: str,
+        content: str,
+        timestamp_us: int,
+        model: Optional[str] = None,
+        packed_parent_id: Optional[PackedId] = None,
+    ):
+        self.packed_id = packed_id
+        self.role = sys.intern(role)
+        self.content = content
+        self.timestamp_us = timestamp_us
+        self.model = sys.intern(model) if model is not None else None
+        self.packed_parent_id = packed_parent_id
+
+    @classmethod
+    def from_embed(cls, message: MessageEmbed) -> "CompactMessage":
+        """Build from a MessageEmbed (the content string is shared)"""
+        return cls(
+            pack_id(message.id),
+            message.role,
+            message.content,
+            pack_timestamp(message.timestamp),
+            message.model,
+            pack_id(message.parent_id),
+        )
+
+    def to_embed(self) -> MessageEmbed:
+        """Convert back to a MessageEmbed (no validation; data is trusted)"""
+        message = MessageEmbed.__new__(MessageEmbed)
+        object.__setattr__(
+            message,
+            "__dict__",
+            {
+                "id": unpack_id(self.packed_id),
+                "role": self.role,
+                "content": self.content,
+                "timestamp": unpack_timestamp(self.timestamp_us),
+                "model": self.model,
+                "parent_id": unpack_id(self.packed_parent_id),
+            },
+        )
+        object.__setattr__(message, "__pydantic_fields_set__", set(_FIELDS))
+        object.__setattr__(message, "__pydantic_extra__", None)
+        object.__setattr__(message, "__pydantic_private__", None)
+        return message
+
+
+def compact_messages(messages: list[MessageEmbed]) -> list[CompactMessage]:
+    """Convert a history to compact form"""
+    return [CompactMessage.from_embed(m) for m in messages]
+
+
+def expand_messages(messages: list[CompactMessage]) -> list[MessageEmbed]:
+    """Convert a compact history back to MessageEmbed objects"""
+    return [m.to_embed() for m in messages]
@@ -0,0 +1,270 @@
+"""Compression of message content at rest
+
+Message text above a size threshold is stored compressed: zstd (with a
+trained dictionary when one is configured) or zlib when zstandard is not
+installed. A compressed message keeps `content` empty and carries:
+
+- codec: "zlib", "zstd" or "zstd:<dictionary id>"
+- content_z: compressed bytes (inline), or
+- blob_id: key into the message_blobs collection (spilled)
+
+Only the first `inline_budget` bytes of a session's content are stored in
+the session document; messages beyond it spill to the blob collection, so
+long histories stay far from MongoDB's 16 MB document limit. Content is
+decoded when messages are loaded; queries that project messages out (lists,
+summaries, versions) never decompress anything.
+
+Train a dictionary from stored messages with:
+    python -m app.infrastructure.session.content_codec --out dict.zstd
+"""
+
+import argparse
+import asyncio
+import zlib
+from collections.abc import Awaitable, Callable
+from typing import Any, Optional
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+CODEC_ZLIB = "zlib"
+CODEC_ZSTD = "zstd"
+# Blobs of content that did not shrink are stored as UTF-8
+CODEC_IDENTITY = "identity"
+
+# Compressed size must be at most this share of the original to be kept
+_MIN_SAVING = 0.9
+
+LoadBlobs = Callable[[list[str]], Awaitable[dict[str, dict]]]
+
+
+def blob_id(session_id: str, message_id: str) -> str:
+    """Blob key of a spilled message"""
+    return f"{session_id}:{message_id}"
+
+
+class ContentCodec:
+    """Compresses and decompresses message content
+
+    Args:
+        min_bytes: Compress content of at least this many UTF-8 bytes
+            (None: never compress; decoding still works)
+        zstd_level: zstd compression level
+        zlib_level: zlib compression level (fallback codec)
+        dictionaries: Trained zstd dictionaries; the first one compresses
+            new content, all of them can decode (keep old ones after
+            retraining)
+        inline_budget: Content bytes per session document before messages
+            spill to the blob collection
+    """
+
+    def __init__(
+        self,
+        min_bytes: Optional[int] = 1024,
+        zstd_level: int = 3,
+        zlib_level: int = 6,
+        dictionaries: Optional[list[bytes]] = None,
+        inline_budget: int = 8 * 1024 * 1024,
+    ):
+        self.min_bytes = min_bytes
+        self.inline_budget = inline_budget
+        self._zlib_level = zlib_level
+        self._decompressors: dict[str, Any] = {}
+        self._compressor = None
+        self._codec = CODEC_ZLIB
+
+        if zstandard is not None:
+            self._codec = CODEC_ZSTD
+            self._compressor = zstandard.ZstdCompressor(level=zstd_level)
+            self._decompressors[CODEC_ZSTD] = zstandard.ZstdDecompressor()
+            for i, data in enumerate(dictionaries or []):
+                dictionary = zstandard.ZstdCompressionDict(data)
+                codec = f"{CODEC_ZSTD}:{dictionary.dict_id()}"
+                self._decompressors[codec] = zstandard.ZstdDecompressor(
+                    dict_data=dictionary
+                )
+                if i == 0:
+                    self._codec = codec
+                    self._compressor = zstandard.ZstdCompressor(
+                        level=zstd_level, dict_data=dictionary
+                    )
+        elif dictionaries:
+            raise ValueError("zstd dictionaries require the zstandard package")
+
+    @property
+    def codec(self) -> str:
+        """Codec used for new content"""
+        return self._codec
+
+    def compress(self, data: bytes) -> bytes:
+        if self._compressor is not None:
+            return self._compressor.compress(data)
+        return zlib.compress(data, self._zlib_level)
+
+    def unpack(self, codec: str, data: bytes) -> bytes:
+        """Decompress bytes written with `codec`"""
+        if codec == CODEC_IDENTITY:
+            return bytes(data)
+        if codec == CODEC_ZLIB:
+            return zlib.decompress(data)
+        decompressor = self._decompressors.get(codec)
+        if decompressor is None:
+            raise ValueError(f"Cannot decode message content with codec {codec!r}")
+        return decompressor.decompress(data)
+
+    def decompress(self, codec: str, data: bytes) -> str:
+        return self.unpack(codec, data).decode()
+
+    def _pack(self, content: str) -> tuple[Optional[str], bytes]:
+        """(codec, bytes) to store; codec is None when not worth compressing"""
+        data = content.encode()
+        if self.min_bytes is None or len(data) < self.min_bytes:
+            return None, data
+        packed = self.compress(data)
+        if len(packed) > len(data) * _MIN_SAVING:
+            return None, data
+        return self._codec, packed
+
+    def encode_messages(
+        self,
+        session_id: str,
+        browser_id: str,
+        messages: list[dict],
+        inline_bytes: int = 0,
+    ) -> tuple[list[dict], list[dict], int]:
+        """
+        Encode raw messages for storage
+
+        Args:
+            messages: Dumped MessageEmbed dicts (not modified)
+            inline_bytes: Content bytes already stored inline in the
+                document; counts against inline_budget
+
+        Returns:
+            (stored messages, blob documents to write, inline bytes added)
+        """
+        stored: list[dict] = []
+        blobs: list[dict] = []
+        added = 0
+        for message in messages:
+            codec, data = self._pack(message["content"])
+            if inline_bytes + added + len(data) <= self.inline_budget:
+                added += len(data)
+                if codec is None:
+                    stored.append(message)
+                else:
+                    stored.append(
+                        {**message, "content": "", "codec": codec, "content_z": data}
+                    )
+                continue
+
+            key = blob_id(session_id, message["id"])
+            blobs.append(
+                {
+                    "_id": key,
+                    "session_id": session_id,
+                    "browser_id": browser_id,
+                    "codec": codec or CODEC_IDENTITY,
+                    "data": data,
+                }
+            )
+            stored.append(
+                {
+                    **message,
+                    "content": "",
+                    "codec": codec or CODEC_IDENTITY,
+                    "blob_id": key,
+                }
+            )
+        return stored, blobs, added
+
+    async def decode_messages(
+        self, messages: list[dict], load_blobs: LoadBlobs
+    ) -> list[dict]:
+        """Decode stored messages in place; spilled content is loaded in one call"""
+        blob_ids = [m["blob_id"] for m in messages if "blob_id" in m]
+        blobs = await load_blobs(blob_ids) if blob_ids else {}
+        for message in messages:
+            codec = message.pop("codec", None)
+            if codec is None:
+                continue
+            key = message.pop("blob_id", None)
+            if key is None:
+                message["content"] = self.decompress(codec, message.pop("content_z"))
+                continue
+            blob = blobs.get(key)
+            if blob is None:
+                raise LookupError(f"Message content blob {key} is missing")
+            message["content"] = self.decompress(blob["codec"], blob["data"])
+        return messages
+
+
+def load_content_codec(config) -> ContentCodec:
+    """Build the codec from Settings (reads the dictionary files)"""
+    dictionaries = []
+    for path in config.message_compression_dictionaries:
+        with open(path, "rb") as f:
+            dictionaries.append(f.read())
+    return ContentCodec(
+        min_bytes=(
+            config.message_compression_min_bytes
+            if config.message_compression_enabled
+            else None
+        ),
+        zstd_level=config.message_compression_zstd_level,
+        zlib_level=config.message_compression_zlib_level,
+        dictionaries=dictionaries,
+        inline_budget=config.session_inline_content_budget_bytes,
+    )
+
+
+def is_encoded(messages: list[dict]) -> bool:
+    """Whether any stored message needs decoding"""
+    return any("codec" in m for m in messages)
+
+
+def train_dictionary(samples: list[str], size: int = 112_640) -> bytes:
+    """Train a zstd dictionary from sample message contents"""
+    if zstandard is None:
+        raise RuntimeError("Training a dictionary requires the zstandard package")
+    encoded = [s.encode() for s in samples if s]
+    return zstandard.train_dictionary(size, encoded).as_bytes()
+
+
+async def _main() -> None:
+    parser = argparse.ArgumentParser(description="Train a zstd message dictionary")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--samples", type=int, default=5000)
+    parser.add_argument("--size", type=int, default=112_640)
+    args = parser.parse_args()
+
+    from app.config import settings
+    from app.infrastructure.database import close_client, init_db
+
+    from .mongo_adapter import MongoSessionRepository, sessions_collection
+
+    client = await init_db()
+    try:
+        pipeline = [
+            {"$unwind": "$messages"},
+            {"$sample": {"size": args.samples}},
+            {"$replaceRoot": {"newRoot": "$messages"}},
+        ]
+        cursor = sessions_collection().aggregate(pipeline)
+        if hasattr(cursor, "__await__"):
+            cursor = await cursor
+        messages = [raw async for raw in cursor]
+        await MongoSessionRepository(load_content_codec(settings)).decode(messages)
+    finally:
+        await close_client(client)
+
+    dictionary = train_dictionary([m["content"] for m in messages], args.size)
+    with open(args.out, "wb") as f:
+        f.write(dictionary)
+    print(f"Wrote {len(dictionary)} byte dictionary from {len(messages)} messages")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
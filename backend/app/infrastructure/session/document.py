@@ -1,9 +1,11 @@
 """Beanie Document models for MongoDB"""
 
 from datetime import datetime
+from typing import Optional
 
 from beanie import Document, Indexed
 from pydantic import Field
+from pymongo import ASCENDING, IndexModel
 
 from app.domain.chat.entities import MessageEmbed
 
@@ -15,11 +17,44 @@ class SessionDocument(Document):
     browser_id: Indexed(str)
     title: str = "새 채팅"
     messages: list[MessageEmbed] = []
+    active_leaf_id: Optional[str] = None
     pinned: bool = False
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    revision: int = 0
+    message_count: int = 0
+    total_tokens: int = 0
+    last_message_preview: Optional[str] = None
 
     class Settings:
         """Beanie settings"""
 
         name = "sessions"
+        # Used by the tiering job to find idle sessions
+        indexes = [IndexModel([("updated_at", ASCENDING)], name="updated_at")]
+
+
+class MessageBlobDocument(Document):
+    """Message content spilled out of a session document
+
+    The id is "<session_id>:<message_id>"; data holds the content encoded
+    with codec (see content_codec).
+    """
+
+    id: str
+    session_id: str
+    browser_id: str
+    codec: str
+    data: bytes
+
+    class Settings:
+        """Beanie settings"""
+
+        name = "message_blobs"
+        indexes = [
+            IndexModel(
+                [("browser_id", ASCENDING), ("session_id", ASCENDING)],
+                name="browser_session",
+            ),
+            IndexModel([("session_id", ASCENDING)], name="session_id"),
+        ]
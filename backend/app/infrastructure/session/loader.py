@@ -0,0 +1,260 @@
+"""Request-coalescing session loader (DataLoader pattern)
+
+Concurrent find_by_session_id calls for different IDs are collected for a
+short window (or until the batch is full) and answered by a single
+find_many query. Identical IDs that are already queued or in flight share
+one lookup. Every caller still gets its own Session copy, so mutating a
+loaded entity never leaks into another request.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Optional
+
+from app.domain.chat.entities import MessageEmbed
+from app.domain.session.entities import (
+    MessageCursor,
+    MessagePage,
+    Session,
+    SessionVersion,
+)
+from app.domain.session.ports import SessionRepository
+from app.infrastructure.metrics import MetricsRegistry, metrics
+
+FetchMany = Callable[[list[str]], Awaitable[dict[str, Session]]]
+
+
+def _copy(session: Session) -> Session:
+    return session.model_copy(update={"messages": list(session.messages)})
+
+
+class SessionLoader:
+    """Batches single-session lookups into find_many calls
+
+    A batch is dispatched `window` seconds after its first key arrives, or
+    immediately once it holds `max_batch` keys. Waiters that are cancelled
+    do not cancel the shared lookup.
+    """
+
+    def __init__(
+        self,
+        fetch_many: FetchMany,
+        window: float = 0.002,
+        max_batch: int = 100,
+        registry: Optional[MetricsRegistry] = None,
+    ):
+        self._fetch_many = fetch_many
+        self._window = max(0.0, window)
+        self._max_batch = max(1, max_batch)
+        self._metrics = registry or metrics
+
+        # Keys waiting for the next dispatch, and keys whose query is running
+        self._queued: dict[str, asyncio.Future] = {}
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, session_id: str) -> Optional[Session]:
+        """Load one session (a private copy), or None if it does not exist"""
+        future = self._queued.get(session_id) or self._in_flight.get(session_id)
+        if future is not None:
+            self._metrics.increment("session.loader.deduplicated")
+        else:
+            future = self._enqueue(session_id)
+        session = await asyncio.shield(future)
+        return _copy(session) if session is not None else None
+
+    async def load_many(self, session_ids: list[str]) -> dict[str, Session]:
+        """Load several sessions; unknown IDs are left out"""
+        ids = list(dict.fromkeys(session_ids))
+        sessions = await asyncio.gather(*(self.load(i) for i in ids))
+        return {i: s for i, s in zip(ids, sessions) if s is not None}
+
+    def forget(self, session_id: str) -> None:
+        """Stop sharing a running lookup after the session was written
+
+        Callers arriving later start a fresh lookup instead of joining a
+        query that may have read the old state. Queued keys are kept: their
+        query has not been sent yet.
+        """
+        self._in_flight.pop(session_id, None)
+
+    def forget_all(self) -> None:
+        """forget() for every running lookup"""
+        self._in_flight.clear()
+
+    def _enqueue(self, session_id: str) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queued[session_id] = future
+        if len(self._queued) >= self._max_batch:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window, self._dispatch)
+        return future
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._queued:
+            return
+        batch, self._queued = self._queued, {}
+        self._in_flight.update(batch)
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: dict[str, asyncio.Future]) -> None:
+        self._metrics.increment("session.loader.batches")
+        self._metrics.increment("session.loader.keys", len(batch))
+        try:
+            found = await self._fetch_many(list(batch))
+        except asyncio.CancelledError:
+            for future in batch.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+                    # Waiters may all have gone; don't log it as unretrieved
+                    future.exception()
+        else:
+            for session_id, future in batch.items():
+                if not future.done():
+                    future.set_result(found.get(session_id))
+        finally:
+            for session_id, future in batch.items():
+                if self._in_flight.get(session_id) is future:
+                    del self._in_flight[session_id]
+
+
+class BatchingSessionRepository(SessionRepository):
+    """SessionRepository decorator that coalesces session lookups
+
+    find_by_session_id and find_many go through a SessionLoader; everything
+    else is delegated to the wrapped repository. Completed writes drop the
+    session's running lookup so later reads observe them.
+    """
+
+    def __init__(
+        self,
+        inner: SessionRepository,
+        window: float = 0.002,
+        max_batch: int = 100,
+        registry: Optional[MetricsRegistry] = None,
+    ):
+        self._inner = inner
+        self._loader = SessionLoader(
+            inner.find_many, window=window, max_batch=max_batch, registry=registry
+        )
+
+    async def find_by_session_id(self, session_id: str) -> Optional[Session]:
+        return await self._loader.load(session_id)
+
+    async def find_many(self, session_ids: list[str]) -> dict[str, Session]:
+        return await self._loader.load_many(session_ids)
+
+    async def find_by_browser_id(
+        self, browser_id: str, skip: int = 0, limit: int = 100
+    ) -> list[Session]:
+        return await self._inner.find_by_browser_id(browser_id, skip, limit)
+
+    async def list_summaries(
+        self, browser_id: str, skip: int = 0, limit: int = 100
+    ) -> list[Session]:
+        return await self._inner.list_summaries(browser_id, skip, limit)
+
+    async def iter_by_browser_id(
+        self, browser_id: str, batch_size: int = 100
+    ) -> AsyncIterator[Session]:
+        async for session in self._inner.iter_by_browser_id(browser_id, batch_size):
+            yield session
+
+    async def iter_all(self, batch_size: int = 100) -> AsyncIterator[Session]:
+        async for session in self._inner.iter_all(batch_size):
+            yield session
+
+    async def find_version(self, session_id: str) -> Optional[SessionVersion]:
+        return await self._inner.find_version(session_id)
+
+    async def find_versions_by_browser_id(
+        self, browser_id: str, skip: int = 0, limit: int = 100
+    ) -> list[SessionVersion]:
+        return await self._inner.find_versions_by_browser_id(browser_id, skip, limit)
+
+    async def find_messages(
+        self,
+        session_id: str,
+        after: Optional[MessageCursor] = None,
+        before: Optional[MessageCursor] = None,
+        limit: int = 50,
+    ) -> Optional[MessagePage]:
+        return await self._inner.find_messages(session_id, after, before, limit)
+
+    async def save(
+        self, session: Session, expected_revision: Optional[int] = None
+    ) -> Session:
+        try:
+            return await self._inner.save(session, expected_revision)
+        finally:
+            # Also after a conflict: the caller reloads the session next
+            self._loader.forget(session.session_id)
+
+    async def create(self, session: Session) -> Session:
+        created = await self._inner.create(session)
+        self._loader.forget(session.session_id)
+        return created
+
+    async def save_many(self, sessions: list[Session]) -> None:
+        await self._inner.save_many(sessions)
+        self._forget_all([s.session_id for s in sessions])
+
+    async def append_messages(
+        self,
+        session: Session,
+        messages: list[MessageEmbed],
+        expected_revision: Optional[int] = None,
+    ) -> None:
+        try:
+            await self._inner.append_messages(session, messages, expected_revision)
+        finally:
+            # Also after a conflict: the caller reloads the session next
+            self._loader.forget(session.session_id)
+
+    async def insert_many(self, sessions: list[Session]) -> list[bool]:
+        inserted = await self._inner.insert_many(sessions)
+        self._forget_all([s.session_id for s in sessions])
+        return inserted
+
+    async def set_pinned_many(
+        self, browser_id: str, session_ids: Optional[list[str]], pinned: bool
+    ) -> int:
+        matched = await self._inner.set_pinned_many(browser_id, session_ids, pinned)
+        self._forget_all(session_ids)
+        return matched
+
+    async def delete_many(
+        self, browser_id: str, session_ids: Optional[list[str]] = None
+    ) -> int:
+        deleted = await self._inner.delete_many(browser_id, session_ids)
+        self._forget_all(session_ids)
+        return deleted
+
+    async def update(self, session_id: str, **kwargs) -> Optional[Session]:
+        updated = await self._inner.update(session_id, **kwargs)
+        self._loader.forget(session_id)
+        return updated
+
+    async def delete(self, session_id: str) -> bool:
+        deleted = await self._inner.delete(session_id)
+        self._loader.forget(session_id)
+        return deleted
+
+    def _forget_all(self, session_ids: Optional[list[str]]) -> None:
+        if session_ids is None:
+            self._loader.forget_all()
+            return
+        for session_id in session_ids:
+            self._loader.forget(session_id)
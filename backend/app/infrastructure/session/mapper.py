@@ -1,22 +1,28 @@
-"""Mappers between domain entities and persistence models"""
+"""Mappers between domain entities and raw MongoDB documents
+
+The Mongo adapter reads and writes plain dicts (no Beanie round trip):
+entities are dumped once on write, and documents are turned back into
+entities once on read, after their message content was decoded.
+"""
 
 from app.domain.session.entities import Session
-from .document import SessionDocument
 
 
-def session_entity_to_document(session: Session) -> SessionDocument:
-    """Convert domain Session entity to MongoDB SessionDocument"""
-    return SessionDocument(**session.model_dump())
+def session_entity_to_raw(session: Session) -> dict:
+    """Convert domain Session entity to a raw MongoDB document (without _id)"""
+    return session.model_dump()
+
+
+def session_raw_to_entity(raw: dict) -> Session:
+    """Convert a raw MongoDB document to domain Session entity
 
+    For the adapter's read path, after message content was decoded. Fields
+    missing from older documents get their defaults; keys that are not
+    entity fields (_id, content_bytes) are dropped.
 
-def session_document_to_entity(document: SessionDocument) -> Session:
-    """Convert MongoDB SessionDocument to domain Session entity"""
-    return Session(
-        session_id=document.session_id,
-        browser_id=document.browser_id,
-        title=document.title,
-        messages=document.messages,
-        pinned=document.pinned,
-        created_at=document.created_at,
-        updated_at=document.updated_at,
-    )
+    Raw messages are plain dicts, so they have to be turned into MessageEmbed
+    objects one by one either way. pydantic-core's validator does that in
+    Rust, which beats model_construct's per-field Python loop (see
+    benchmarks/bench_mapper.py).
+    """
+    return Session.model_validate(raw)
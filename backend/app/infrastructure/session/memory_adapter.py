@@ -0,0 +1,224 @@
+"""In-memory implementation of SessionRepository
+
+Used by the test harness, as a benchmark baseline and for single-process
+installs that need no persistence (session_backend="memory").
+
+Each browser has a secondary index: a list of (updated_at, session_id) keys
+kept sorted with bisect. List queries slice it from the newest end, so they
+cost O(log n + limit) regardless of how many sessions are stored; a write
+that changes updated_at moves one key (an O(log n) search plus a memmove
+within that browser's list). Writes update the stored entity in place
+instead of rebuilding it.
+
+Messages are held as CompactMessage objects (about 6x less memory than
+MessageEmbed per message, not counting the text; see
+benchmarks/bench_message_memory.py), next to a message-less copy of each
+session. Reads that return messages expand them again, about 10 ms per
+1,000 messages; summaries, versions and appends never do.
+"""
+
+import sys
+from bisect import bisect_left, insort
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+from typing import Optional, Union
+
+from app.domain.chat.entities import MessageEmbed
+from app.domain.session.entities import Session, SessionVersion
+from app.domain.session.errors import SessionAlreadyExistsError, SessionConflictError
+from app.domain.session.ports import SessionRepository
+
+from .compact import CompactMessage, compact_messages, expand_messages
+
+IndexKey = tuple[datetime, str]
+
+# Fields update() may set; identity and bookkeeping fields are managed here
+_UPDATABLE_FIELDS = set(Session.model_fields) - {
+    "session_id",
+    "messages",
+    "created_at",
+    "updated_at",
+    "revision",
+}
+
+
+def _content_bytes(messages: Sequence[Union[MessageEmbed, CompactMessage]]) -> int:
+    return sum(sys.getsizeof(m.content) for m in messages)
+
+
+class InMemorySessionRepository(SessionRepository):
+    """In-memory implementation of SessionRepository
+
+    Stores and returns copies (sharing only the content strings) so that
+    callers mutating an entity behave as they would against a real database.
+    """
+
+    def __init__(self):
+        # Sessions without messages; their messages are in _histories
+        self._sessions: dict[str, Session] = {}
+        self._histories: dict[str, list[CompactMessage]] = {}
+        # Per browser: keys sorted ascending (newest last)
+        self._by_browser: dict[str, list[IndexKey]] = {}
+        self._messages = 0
+        self._content_bytes = 0
+
+    def _copy(self, session: Session) -> Session:
+        messages = expand_messages(self._histories[session.session_id])
+        return session.model_copy(update={"messages": messages})
+
+    # --- Indexing ---
+
+    def _index(self, session: Session) -> None:
+        keys = self._by_browser.setdefault(session.browser_id, [])
+        insort(keys, (session.updated_at, session.session_id))
+
+    def _unindex(self, session: Session) -> None:
+        keys = self._by_browser[session.browser_id]
+        key = (session.updated_at, session.session_id)
+        del keys[bisect_left(keys, key)]
+        if not keys:
+            del self._by_browser[session.browser_id]
+
+    def _store(self, session: Session) -> None:
+        """Insert or replace a session (stores a copy)"""
+        self._remove(session.session_id)
+        stored = session.model_copy(update={"messages": []})
+        self._sessions[stored.session_id] = stored
+        self._histories[stored.session_id] = compact_messages(session.messages)
+        self._index(stored)
+        self._messages += len(session.messages)
+        self._content_bytes += _content_bytes(session.messages)
+
+    def _remove(self, session_id: str) -> Optional[Session]:
+        stored = self._sessions.pop(session_id, None)
+        if stored is not None:
+            self._unindex(stored)
+            history = self._histories.pop(session_id)
+            self._messages -= len(history)
+            self._content_bytes -= _content_bytes(history)
+        return stored
+
+    def _page(self, browser_id: str, skip: int, limit: int) -> list[Session]:
+        """Stored sessions of a browser, updated_at desc"""
+        keys = self._by_browser.get(browser_id, [])
+        end = max(0, len(keys) - skip)
+        start = max(0, end - limit)
+        return [self._sessions[key[1]] for key in reversed(keys[start:end])]
+
+    def memory_stats(self) -> dict[str, int]:
+        """Sizes of what is held: entries, messages and content string bytes"""
+        return {
+            "sessions": len(self._sessions),
+            "browsers": len(self._by_browser),
+            "messages": self._messages,
+            "content_bytes": self._content_bytes,
+        }
+
+    # --- Reads ---
+
+    async def find_by_session_id(self, session_id: str) -> Optional[Session]:
+        session = self._sessions.get(session_id)
+        return self._copy(session) if session else None
+
+    async def find_by_browser_id(
+        self, browser_id: str, skip: int = 0, limit: int = 100
+    ) -> list[Session]:
+        return [self._copy(s) for s in self._page(browser_id, skip, limit)]
+
+    async def list_summaries(
+        self, browser_id: str, skip: int = 0, limit: int = 100
+    ) -> list[Session]:
+        return [
+            s.model_copy(update={"messages": []})
+            for s in self._page(browser_id, skip, limit)
+        ]
+
+    async def iter_all(self, batch_size: int = 100) -> AsyncIterator[Session]:
+        for session in list(self._sessions.values()):
+            yield self._copy(session)
+
+    async def find_version(self, session_id: str) -> Optional[SessionVersion]:
+        session = self._sessions.get(session_id)
+        return SessionVersion.of(session) if session else None
+
+    async def find_versions_by_browser_id(
+        self, browser_id: str, skip: int = 0, limit: int = 100
+    ) -> list[SessionVersion]:
+        return [SessionVersion.of(s) for s in self._page(browser_id, skip, limit)]
+
+    async def _bulk_targets(
+        self, browser_id: str, session_ids: Optional[list[str]]
+    ) -> list[str]:
+        keys = self._by_browser.get(browser_id, [])
+        wanted = set(session_ids) if session_ids is not None else None
+        return [
+            session_id
+            for _, session_id in reversed(keys)
+            if wanted is None or session_id in wanted
+        ]
+
+    # --- Writes ---
+
+    async def save(
+        self, session: Session, expected_revision: Optional[int] = None
+    ) -> Session:
+        stored = self._sessions.get(session.session_id)
+        if (
+            expected_revision is not None
+            and stored is not None
+            and stored.revision != expected_revision
+        ):
+            raise SessionConflictError(session.session_id, expected_revision)
+        self._store(session)
+        return session
+
+    async def save_many(self, sessions: list[Session]) -> None:
+        for session in sessions:
+            self._store(session)
+
+    async def create(self, session: Session) -> Session:
+        if session.session_id in self._sessions:
+            raise SessionAlreadyExistsError(session.session_id)
+        self._store(session)
+        return session
+
+    async def append_messages(
+        self,
+        session: Session,
+        messages: list[MessageEmbed],
+        expected_revision: Optional[int] = None,
+    ) -> None:
+        stored = self._sessions.get(session.session_id)
+        if stored is None:
+            await self.save(session)
+            return
+        if expected_revision is not None and stored.revision != expected_revision:
+            raise SessionConflictError(session.session_id, expected_revision)
+        self._unindex(stored)
+        self._histories[stored.session_id].extend(compact_messages(messages))
+        stored.active_leaf_id = session.active_leaf_id
+        stored.updated_at = session.updated_at
+        stored.revision = session.revision
+        stored.message_count = session.message_count
+        stored.total_tokens = session.total_tokens
+        stored.last_message_preview = session.last_message_preview
+        self._index(stored)
+        self._messages += len(messages)
+        self._content_bytes += _content_bytes(messages)
+
+    async def update(self, session_id: str, **kwargs) -> Optional[Session]:
+        stored = self._sessions.get(session_id)
+        if stored is None:
+            return None
+
+        self._unindex(stored)
+        for field, value in kwargs.items():
+            if field in _UPDATABLE_FIELDS:
+                setattr(stored, field, value)
+        stored.updated_at = datetime.utcnow()
+        stored.revision += 1
+        self._index(stored)
+        return self._copy(stored)
+
+    async def delete(self, session_id: str) -> bool:
+        return self._remove(session_id) is not None
@@ -1,85 +1,612 @@
 """MongoDB implementation of SessionRepository"""
 
-from datetime import datetime
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
 from typing import Optional
 
-from app.domain.session.entities import Session
+from pymongo import ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.domain.chat.entities import MessageEmbed
+from app.domain.chat.tokens import estimate_tokens
+from app.domain.session.entities import (
+    MessageCursor,
+    MessagePage,
+    Session,
+    SessionVersion,
+)
+from app.domain.session.errors import SessionAlreadyExistsError, SessionConflictError
 from app.domain.session.ports import SessionRepository
 
-from .mapper import session_document_to_entity, session_entity_to_document
-from .document import SessionDocument
+from .content_codec import ContentCodec, is_encoded
+from .document import MessageBlobDocument, SessionDocument
+from .mapper import session_entity_to_raw, session_raw_to_entity
+
+_DUPLICATE_KEY = 11000
+
+
+def _bulk_filter(browser_id: str, session_ids: Optional[list[str]]) -> dict:
+    """Filter for bulk operations; always scoped to one browser"""
+    query: dict = {"browser_id": browser_id}
+    if session_ids is not None:
+        query["session_id"] = {"$in": session_ids}
+    return query
+
+
+# Everything but the message list (for metadata-only reads)
+_METADATA_PROJECTION = {"_id": 0, "messages": 0}
+
+# Fields update() may set; identity and bookkeeping fields are managed here
+_UPDATABLE_FIELDS = set(Session.model_fields) - {
+    "session_id",
+    "messages",
+    "created_at",
+    "updated_at",
+    "revision",
+}
+
+# Fields needed to build a SessionVersion
+_VERSION_PROJECTION = {"_id": 0, "session_id": 1, "revision": 1, "updated_at": 1}
+
+
+def _append_update(
+    session: Session,
+    messages: list[MessageEmbed],
+    stored: list[dict],
+    inline_bytes: int,
+) -> dict:
+    """$push the new (encoded) messages and refresh scalar fields and counters
+
+    Counters are maintained in the same update ($inc), so they stay
+    consistent with the stored messages even under concurrent appends.
+    """
+    return {
+        "$push": {"messages": {"$each": stored}},
+        "$set": {
+            "active_leaf_id": session.active_leaf_id,
+            "updated_at": session.updated_at,
+            "revision": session.revision,
+            "last_message_preview": session.last_message_preview,
+        },
+        "$inc": {
+            "message_count": len(messages),
+            "total_tokens": sum(estimate_tokens(m.content) for m in messages),
+            "content_bytes": inline_bytes,
+        },
+    }
+
+
+def _revision_filter(expected_revision: int):
+    """Filter value matching one stored revision
+
+    Documents written before revisions existed lack the field; they count
+    as revision 0.
+    """
+    if expected_revision == 0:
+        return {"$in": [0, None]}
+    return expected_revision
+
+
+def sessions_collection():
+    """Raw collection behind SessionDocument for bulk/low-level operations"""
+    # Beanie 1.x exposes the Motor collection, 2.x the async PyMongo one
+    getter = getattr(SessionDocument, "get_motor_collection", None)
+    if getter is None:
+        getter = SessionDocument.get_pymongo_collection
+    return getter()
+
+
+def blobs_collection():
+    """Raw collection of message content spilled out of session documents"""
+    getter = getattr(MessageBlobDocument, "get_motor_collection", None)
+    if getter is None:
+        getter = MessageBlobDocument.get_pymongo_collection
+    return getter()
+
+
+async def _aggregate(pipeline: list[dict]):
+    """Run an aggregation on Motor (sync call) or async PyMongo (awaitable)"""
+    cursor = sessions_collection().aggregate(pipeline)
+    if hasattr(cursor, "__await__"):
+        cursor = await cursor
+    return cursor
+
+
+def _message_window_pipeline(
+    session_id: str,
+    after: Optional[MessageCursor],
+    before: Optional[MessageCursor],
+    limit: int,
+) -> list[dict]:
+    """Aggregation that slices one page (+1 to detect more) out of messages
+
+    The $match uses the unique session_id index; the window is cut on the
+    server, so only the page is transferred. `anchor` is the position of a
+    message-id cursor (-1 if unknown) so the caller can report it.
+    """
+    cursor = after if after is not None else before
+    anchor = {"$literal": -1}
+    if cursor is None:
+        candidates = "$messages"
+    elif isinstance(cursor, datetime):
+        if cursor.tzinfo is not None:
+            cursor = cursor.astimezone(timezone.utc).replace(tzinfo=None)
+        operator = "$gt" if after is not None else "$lt"
+        candidates = {
+            "$filter": {
+                "input": "$messages",
+                "as": "m",
+                "cond": {operator: ["$$m.timestamp", cursor]},
+            }
+        }
+    else:
+        anchor = {"$indexOfArray": ["$messages.id", cursor]}
+        if after is not None:
+            candidates = {
+                "$slice": [
+                    "$messages",
+                    {"$add": ["$anchor", 1]},
+                    {"$max": [{"$size": "$messages"}, 1]},
+                ]
+            }
+        else:
+            candidates = {
+                "$cond": [
+                    {"$gt": ["$anchor", 0]},
+                    {"$slice": ["$messages", "$anchor"]},
+                    [],
+                ]
+            }
+
+    size = limit + 1 if after is not None else -(limit + 1)
+    return [
+        {"$match": {"session_id": session_id}},
+        {
+            "$project": {
+                "_id": 0,
+                "messages": 1,
+                "active_leaf_id": 1,
+                "anchor": anchor,
+            }
+        },
+        {
+            "$project": {
+                "active_leaf_id": 1,
+                "anchor": 1,
+                "window": {"$slice": [candidates, size]},
+            }
+        },
+    ]
 
 
 class MongoSessionRepository(SessionRepository):
-    """MongoDB implementation of the SessionRepository port"""
+    """MongoDB implementation of the SessionRepository port
+
+    Message content is stored through `codec`: compressed above its size
+    threshold, and spilled to the blob collection beyond the per-document
+    inline budget (tracked in the document's content_bytes field). Without
+    a codec nothing is compressed, but stored content is still decoded.
+    """
+
+    def __init__(self, codec: Optional[ContentCodec] = None):
+        self._codec = codec or ContentCodec(min_bytes=None)
+
+    @property
+    def codec(self) -> ContentCodec:
+        return self._codec
+
+    # --- Content encoding ---
+
+    def _encode(self, session: Session) -> tuple[dict, list[dict]]:
+        """Raw document for a full write, plus the blobs to write first"""
+        raw = session_entity_to_raw(session)
+        raw["messages"], blobs, inline_bytes = self._codec.encode_messages(
+            session.session_id, session.browser_id, raw["messages"]
+        )
+        raw["content_bytes"] = inline_bytes
+        return raw, blobs
+
+    def _encode_append(
+        self,
+        session: Session,
+        messages: list[MessageEmbed],
+        spill: bool = False,
+        expected_revision: Optional[int] = None,
+    ) -> tuple[dict, dict, list[dict]]:
+        """(filter, update, blobs) appending messages inline, or spilled
+
+        The inline filter only matches while the document stays within the
+        inline budget; callers retry with spill=True when it matches nothing.
+        With expected_revision it also only matches that revision. It never
+        matches a document that already holds one of the messages, so a
+        retried append cannot push them twice.
+        """
+        budget = self._codec.inline_budget
+        stored, blobs, inline_bytes = self._codec.encode_messages(
+            session.session_id,
+            session.browser_id,
+            [m.model_dump() for m in messages],
+            inline_bytes=budget if spill else 0,
+        )
+        query: dict = {
+            "session_id": session.session_id,
+            "messages.id": {"$nin": [m.id for m in messages]},
+        }
+        if not spill:
+            query["content_bytes"] = {"$not": {"$gt": budget - inline_bytes}}
+        if expected_revision is not None:
+            query["revision"] = _revision_filter(expected_revision)
+        update = _append_update(session, messages, stored, inline_bytes)
+        return query, update, blobs
+
+    async def _write_blobs(self, blobs: list[dict]) -> None:
+        """Upsert spilled content (before the documents referencing it)"""
+        if not blobs:
+            return
+        await blobs_collection().bulk_write(
+            [ReplaceOne({"_id": b["_id"]}, b, upsert=True) for b in blobs],
+            ordered=False,
+        )
+
+    async def _load_blobs(self, blob_ids: list[str]) -> dict[str, dict]:
+        cursor = blobs_collection().find({"_id": {"$in": blob_ids}})
+        return {raw["_id"]: raw async for raw in cursor}
+
+    async def decode(self, messages: list[dict]) -> list[dict]:
+        """Decode stored messages in place (one blob query for all of them)"""
+        if is_encoded(messages):
+            await self._codec.decode_messages(messages, self._load_blobs)
+        return messages
+
+    async def to_sessions(self, raws: list[dict]) -> list[Session]:
+        """Build entities from raw documents, decoding their messages"""
+        await self.decode([m for raw in raws for m in raw.get("messages", ())])
+        return [session_raw_to_entity(raw) for raw in raws]
+
+    # --- Reads ---
 
     async def find_by_session_id(self, session_id: str) -> Optional[Session]:
         """Find a session by its ID"""
-        document = await SessionDocument.find_one(
-            SessionDocument.session_id == session_id
+        raw = await sessions_collection().find_one(
+            {"session_id": session_id}, {"_id": 0}
         )
-        if document:
-            return session_document_to_entity(document)
+        if raw:
+            return (await self.to_sessions([raw]))[0]
         return None
 
+    async def find_many(self, session_ids: list[str]) -> dict[str, Session]:
+        """Find several sessions with one $in query"""
+        if not session_ids:
+            return {}
+        cursor = sessions_collection().find(
+            {"session_id": {"$in": list(dict.fromkeys(session_ids))}}, {"_id": 0}
+        )
+        sessions = await self.to_sessions([raw async for raw in cursor])
+        return {session.session_id: session for session in sessions}
+
+    async def list_summaries(
+        self, browser_id: str, skip: int = 0, limit: int = 100
+    ) -> list[Session]:
+        """Browser's sessions without messages (projection)"""
+        cursor = (
+            sessions_collection()
+            .find({"browser_id": browser_id}, _METADATA_PROJECTION)
+            .sort("updated_at", -1)
+            .skip(skip)
+            .limit(limit)
+        )
+        return [session_raw_to_entity(raw) async for raw in cursor]
+
     async def find_by_browser_id(
         self, browser_id: str, skip: int = 0, limit: int = 100
     ) -> list[Session]:
         """Find all sessions for a browser ID"""
-        documents = (
-            await SessionDocument.find(SessionDocument.browser_id == browser_id)
-            .sort(-SessionDocument.updated_at)
+        cursor = (
+            sessions_collection()
+            .find({"browser_id": browser_id}, {"_id": 0})
+            .sort("updated_at", -1)
             .skip(skip)
             .limit(limit)
-            .to_list()
         )
-        return [session_document_to_entity(doc) for doc in documents]
+        return await self.to_sessions([raw async for raw in cursor])
 
-    async def save(self, session: Session) -> Session:
-        """Save a session (create or update)"""
-        # Check if session exists
-        existing = await SessionDocument.find_one(
-            SessionDocument.session_id == session.session_id
+    async def iter_by_browser_id(
+        self, browser_id: str, batch_size: int = 100
+    ) -> AsyncIterator[Session]:
+        """Stream sessions from one server cursor, batch_size documents at a time"""
+        cursor = (
+            sessions_collection()
+            .find({"browser_id": browser_id}, {"_id": 0})
+            .sort("updated_at", -1)
+            .batch_size(batch_size)
         )
+        async for raw in cursor:
+            yield (await self.to_sessions([raw]))[0]
 
-        if existing:
-            # Update existing document
-            for field, value in session.model_dump().items():
-                setattr(existing, field, value)
-            await existing.save()
-            return session_document_to_entity(existing)
-        else:
-            # Create new document
-            document = session_entity_to_document(session)
-            await document.save()
-            return session_document_to_entity(document)
+    async def iter_all(self, batch_size: int = 100) -> AsyncIterator[Session]:
+        """Stream every hot session from one server cursor"""
+        cursor = sessions_collection().find({}, {"_id": 0}).batch_size(batch_size)
+        async for raw in cursor:
+            yield (await self.to_sessions([raw]))[0]
 
-    async def update(self, session_id: str, **kwargs) -> Optional[Session]:
-        """Update specific fields of a session"""
-        document = await SessionDocument.find_one(
-            SessionDocument.session_id == session_id
+    async def find_version(self, session_id: str) -> Optional[SessionVersion]:
+        """Find a session's version with a projection (no messages)"""
+        raw = await sessions_collection().find_one(
+            {"session_id": session_id}, _VERSION_PROJECTION
         )
-        if not document:
+        return SessionVersion(**raw) if raw else None
+
+    async def find_versions_by_browser_id(
+        self, browser_id: str, skip: int = 0, limit: int = 100
+    ) -> list[SessionVersion]:
+        """Versions of a browser's sessions with a projection (no messages)"""
+        cursor = (
+            sessions_collection()
+            .find({"browser_id": browser_id}, _VERSION_PROJECTION)
+            .sort("updated_at", -1)
+            .skip(skip)
+            .limit(limit)
+        )
+        return [SessionVersion(**raw) async for raw in cursor]
+
+    async def find_messages(
+        self,
+        session_id: str,
+        after: Optional[MessageCursor] = None,
+        before: Optional[MessageCursor] = None,
+        limit: int = 50,
+    ) -> Optional[MessagePage]:
+        """Load one page of messages with a server-side $slice"""
+        if after is not None and before is not None:
+            raise ValueError("Use either after or before, not both")
+
+        pipeline = _message_window_pipeline(session_id, after, before, limit)
+        cursor = await _aggregate(pipeline)
+        rows = await cursor.to_list(length=1)
+        if not rows:
             return None
 
-        # Update fields
-        for field, value in kwargs.items():
-            if hasattr(document, field):
-                setattr(document, field, value)
+        row = rows[0]
+        message_cursor = after if after is not None else before
+        if isinstance(message_cursor, str) and row["anchor"] < 0:
+            raise ValueError(f"Message {message_cursor} not found in session")
+
+        window = row["window"]
+        has_more = len(window) > limit
+        window = window[:limit] if after is not None else window[-limit:]
+        await self.decode(window)
+        return MessagePage(
+            session_id=session_id,
+            messages=[MessageEmbed(**m) for m in window],
+            has_more=has_more,
+            active_leaf_id=row.get("active_leaf_id"),
+        )
 
-        # Always update the updated_at timestamp
-        document.updated_at = datetime.utcnow()
+    async def save(
+        self, session: Session, expected_revision: Optional[int] = None
+    ) -> Session:
+        """Save a session (create or update) with one upsert
 
-        await document.save()
-        return session_document_to_entity(document)
+        With expected_revision the replace also filters on revision; if it
+        matches nothing the session is inserted, and the unique session_id
+        index turns a concurrent writer into a conflict.
 
-    async def delete(self, session_id: str) -> bool:
-        """Delete a session"""
-        document = await SessionDocument.find_one(
-            SessionDocument.session_id == session_id
+        Raises:
+            SessionConflictError: If the stored revision differs
+        """
+        raw, blobs = self._encode(session)
+        await self._write_blobs(blobs)
+        if expected_revision is None:
+            await sessions_collection().replace_one(
+                {"session_id": session.session_id}, raw, upsert=True
+            )
+            return session
+
+        result = await sessions_collection().replace_one(
+            {
+                "session_id": session.session_id,
+                "revision": _revision_filter(expected_revision),
+            },
+            raw,
         )
-        if not document:
-            return False
+        if result.matched_count:
+            return session
+        try:
+            await sessions_collection().insert_one(raw)
+        except DuplicateKeyError:
+            raise SessionConflictError(session.session_id, expected_revision)
+        return session
+
+    async def create(self, session: Session) -> Session:
+        """Insert a session; the unique session_id index rejects duplicates"""
+        raw, blobs = self._encode(session)
+        await self._write_blobs(blobs)
+        try:
+            await sessions_collection().insert_one(raw)
+        except DuplicateKeyError:
+            raise SessionAlreadyExistsError(session.session_id)
+        return session
 
-        await document.delete()
+    async def save_many(self, sessions: list[Session]) -> None:
+        """Upsert several sessions with a single unordered bulk_write"""
+        if not sessions:
+            return
+        operations = []
+        blobs: list[dict] = []
+        for session in sessions:
+            raw, session_blobs = self._encode(session)
+            blobs += session_blobs
+            operations.append(
+                ReplaceOne({"session_id": session.session_id}, raw, upsert=True)
+            )
+        await self._write_blobs(blobs)
+        await sessions_collection().bulk_write(operations, ordered=False)
+
+    async def append_messages(
+        self,
+        session: Session,
+        messages: list[MessageEmbed],
+        expected_revision: Optional[int] = None,
+    ) -> None:
+        """Append new messages with $push; falls back to save if missing
+
+        Content goes inline while the document is within the inline budget;
+        otherwise a second update appends it spilled to the blob collection.
+        With expected_revision both updates also filter on revision, so a
+        concurrent writer makes them match nothing instead of being
+        overwritten.
+
+        Raises:
+            SessionConflictError: If the stored revision differs
+        """
+        query, update, blobs = self._encode_append(
+            session, messages, expected_revision=expected_revision
+        )
+        await self._write_blobs(blobs)
+        result = await sessions_collection().update_one(query, update)
+        if result.matched_count:
+            return
+
+        query, update, blobs = self._encode_append(
+            session, messages, spill=True, expected_revision=expected_revision
+        )
+        await self._write_blobs(blobs)
+        result = await sessions_collection().update_one(query, update)
+        if result.matched_count:
+            return
+        if expected_revision is not None and await sessions_collection().find_one(
+            {"session_id": session.session_id}, {"_id": 1}
+        ):
+            raise SessionConflictError(session.session_id, expected_revision)
+        await self.save(session)
+
+    async def write_batch(
+        self,
+        saves: list[Session],
+        appends: list[tuple[Session, list[MessageEmbed]]],
+        expected_revisions: Optional[dict[str, int]] = None,
+    ) -> set[str]:
+        """Saves and appends in one unordered bulk_write
+
+        Appends that matched nothing (over the inline budget, the session is
+        missing, a revision conflict, or a retry after a partial failure
+        finds some messages already stored) are redone through
+        append_messages with only the messages not stored yet; it spills,
+        falls back to a full save or reports the conflict. Retrying the
+        whole batch is therefore safe.
+        """
+        expected_revisions = expected_revisions or {}
+        conflicts: set[str] = set()
+        appends = [(session, messages) for session, messages in appends if messages]
+        operations: list = []
+        blobs: list[dict] = []
+        for session in saves:
+            raw, session_blobs = self._encode(session)
+            blobs += session_blobs
+            operations.append(
+                ReplaceOne({"session_id": session.session_id}, raw, upsert=True)
+            )
+        for session, messages in appends:
+            query, update, session_blobs = self._encode_append(
+                session,
+                messages,
+                expected_revision=expected_revisions.get(session.session_id),
+            )
+            blobs += session_blobs
+            operations.append(UpdateOne(query, update))
+        if not operations:
+            return conflicts
+        await self._write_blobs(blobs)
+        result = await sessions_collection().bulk_write(operations, ordered=False)
+
+        if result.matched_count + result.upserted_count < len(operations):
+            cursor = sessions_collection().find(
+                {"session_id": {"$in": [session.session_id for session, _ in appends]}},
+                {"_id": 0, "session_id": 1, "messages.id": 1},
+            )
+            stored = {
+                raw["session_id"]: {m["id"] for m in raw.get("messages", ())}
+                async for raw in cursor
+            }
+            for session, messages in appends:
+                landed = stored.get(session.session_id, set())
+                missing = [m for m in messages if m.id not in landed]
+                if not missing:
+                    continue
+                try:
+                    await self.append_messages(
+                        session, missing, expected_revisions.get(session.session_id)
+                    )
+                except SessionConflictError:
+                    conflicts.add(session.session_id)
+        return conflicts
+
+    async def insert_many(self, sessions: list[Session]) -> list[bool]:
+        """insert_many (unordered); duplicate keys are reported, not raised"""
+        if not sessions:
+            return []
+        documents = []
+        blobs: list[dict] = []
+        for session in sessions:
+            raw, session_blobs = self._encode(session)
+            documents.append(raw)
+            blobs += session_blobs
+        await self._write_blobs(blobs)
+        inserted = [True] * len(sessions)
+        try:
+            await sessions_collection().insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                if error.get("code") != _DUPLICATE_KEY:
+                    raise
+                inserted[error["index"]] = False
+        return inserted
+
+    async def set_pinned_many(
+        self, browser_id: str, session_ids: Optional[list[str]], pinned: bool
+    ) -> int:
+        """One update_many scoped to the browser"""
+        result = await sessions_collection().update_many(
+            _bulk_filter(browser_id, session_ids),
+            {
+                "$set": {"pinned": pinned, "updated_at": datetime.utcnow()},
+                "$inc": {"revision": 1},
+            },
+        )
+        return result.matched_count
+
+    async def delete_many(
+        self, browser_id: str, session_ids: Optional[list[str]] = None
+    ) -> int:
+        """One delete_many scoped to the browser"""
+        query = _bulk_filter(browser_id, session_ids)
+        result = await sessions_collection().delete_many(query)
+        # Blobs carry browser_id and session_id, so the same filter applies
+        await blobs_collection().delete_many(query)
+        return result.deleted_count
+
+    async def update(self, session_id: str, **kwargs) -> Optional[Session]:
+        """Update fields with find_one_and_update; returns metadata only"""
+        fields = {
+            field: value
+            for field, value in kwargs.items()
+            if field in _UPDATABLE_FIELDS
+        }
+        # Always update the updated_at timestamp and revision
+        fields["updated_at"] = datetime.utcnow()
+
+        raw = await sessions_collection().find_one_and_update(
+            {"session_id": session_id},
+            {"$set": fields, "$inc": {"revision": 1}},
+            projection=_METADATA_PROJECTION,
+            return_document=ReturnDocument.AFTER,
+        )
+        return session_raw_to_entity(raw) if raw else None
+
+    async def delete(self, session_id: str) -> bool:
+        """Delete a session with one delete_one"""
+        result = await sessions_collection().delete_one({"session_id": session_id})
+        if result.deleted_count != 1:
+            return False
+        await blobs_collection().delete_many({"session_id": session_id})
         return True
@@ -0,0 +1,760 @@
+"""SQLite implementation of SessionRepository
+
+An embedded store for single-node installs and development machines
+(session_backend="sqlite"). The database file runs in WAL mode, so readers
+never block the writer and vice versa:
+
+- sessions: one row per session (scalar fields and counters), with an index
+  on (browser_id, updated_at) that also covers version lists
+- messages: append-only, keyed by (session_id, seq) in creation order, so
+  appends are inserts and a page of messages is a range scan
+
+sqlite3 blocks, so statements never run on the event loop: writes go to one
+writer thread, reads to a small pool of reader threads, each with its own
+connection. Writes that arrive while a commit is running are committed
+together: each runs in its own savepoint (a failing write is rolled back
+alone) and the whole batch shares one COMMIT, i.e. one WAL sync.
+"""
+
+import asyncio
+import sqlite3
+import threading
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from app.domain.chat.entities import MessageEmbed
+from app.domain.chat.tokens import estimate_tokens
+from app.domain.session.entities import (
+    MessageCursor,
+    MessagePage,
+    Session,
+    SessionVersion,
+)
+from app.domain.session.errors import SessionAlreadyExistsError, SessionConflictError
+from app.domain.session.ports import SessionRepository
+from app.infrastructure.metrics import MetricsRegistry, metrics
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    browser_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    active_leaf_id TEXT,
+    pinned INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    revision INTEGER NOT NULL DEFAULT 0,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    total_tokens INTEGER NOT NULL DEFAULT 0,
+    last_message_preview TEXT
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS sessions_browser_updated
+    ON sessions (browser_id, updated_at DESC, session_id DESC, revision);
+CREATE TABLE IF NOT EXISTS messages (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    model TEXT,
+    parent_id TEXT,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+CREATE UNIQUE INDEX IF NOT EXISTS messages_session_message
+    ON messages (session_id, id);
+"""
+
+_SESSION_COLUMNS = (
+    "session_id",
+    "browser_id",
+    "title",
+    "active_leaf_id",
+    "pinned",
+    "created_at",
+    "updated_at",
+    "revision",
+    "message_count",
+    "total_tokens",
+    "last_message_preview",
+)
+_MESSAGE_COLUMNS = ("id", "role", "content", "timestamp", "model", "parent_id")
+
+_SELECT_SESSIONS = f"SELECT {', '.join(_SESSION_COLUMNS)} FROM sessions"
+_SELECT_MESSAGES = f"SELECT session_id, {', '.join(_MESSAGE_COLUMNS)} FROM messages"
+_ORDER = "ORDER BY updated_at DESC, session_id DESC"
+
+_SESSION_VALUES = (
+    f"INTO sessions ({', '.join(_SESSION_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(_SESSION_COLUMNS))})"
+)
+_INSERT_SESSION = f"INSERT {_SESSION_VALUES}"
+_INSERT_SESSION_IF_NEW = f"INSERT OR IGNORE {_SESSION_VALUES}"
+_UPSERT_SESSION = (
+    f"INSERT {_SESSION_VALUES} ON CONFLICT (session_id) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in _SESSION_COLUMNS[1:])
+)
+_INSERT_MESSAGE = (
+    f"INSERT INTO messages (session_id, seq, {', '.join(_MESSAGE_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * (len(_MESSAGE_COLUMNS) + 2))})"
+)
+# Rewrites only rows that changed (ensure_tree sets parent pointers)
+_UPSERT_MESSAGE = (
+    _INSERT_MESSAGE
+    + " ON CONFLICT (session_id, seq) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in _MESSAGE_COLUMNS)
+    + " WHERE messages.id IS NOT excluded.id"
+    " OR messages.parent_id IS NOT excluded.parent_id"
+)
+
+# Fields update() may set; identity and bookkeeping fields are managed here
+_UPDATABLE_FIELDS = set(Session.model_fields) - {
+    "session_id",
+    "messages",
+    "created_at",
+    "updated_at",
+    "revision",
+}
+
+Write = Callable[[sqlite3.Connection], Any]
+
+
+def _ts(value: datetime) -> str:
+    """Fixed-width naive UTC timestamp, so text order is time order"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat(timespec="microseconds")
+
+
+def _session_row(session: Session) -> tuple:
+    return (
+        session.session_id,
+        session.browser_id,
+        session.title,
+        session.active_leaf_id,
+        int(session.pinned),
+        _ts(session.created_at),
+        _ts(session.updated_at),
+        session.revision,
+        session.message_count,
+        session.total_tokens,
+        session.last_message_preview,
+    )
+
+
+def _message_rows(
+    session_id: str, messages: list[MessageEmbed], start: int = 0
+) -> list[tuple]:
+    return [
+        (
+            session_id,
+            start + i,
+            m.id,
+            m.role,
+            m.content,
+            _ts(m.timestamp),
+            m.model,
+            m.parent_id,
+        )
+        for i, m in enumerate(messages)
+    ]
+
+
+def _to_session(row: sqlite3.Row, messages: list[MessageEmbed]) -> Session:
+    return Session.model_validate({**dict(row), "messages": messages})
+
+
+def _to_message(row: sqlite3.Row) -> MessageEmbed:
+    return MessageEmbed.model_validate({c: row[c] for c in _MESSAGE_COLUMNS})
+
+
+def _placeholders(values: list) -> str:
+    return ", ".join("?" * len(values))
+
+
+class SqliteSessionRepository(SessionRepository):
+    """SQLite (WAL) implementation of the SessionRepository port
+
+    Args:
+        path: Database file (created if missing)
+        readers: Reader threads / connections
+        synchronous: PRAGMA synchronous; NORMAL is safe against process
+            crashes in WAL mode, FULL also against power loss
+    """
+
+    def __init__(
+        self,
+        path: str = "sessions.db",
+        readers: int = 4,
+        synchronous: str = "NORMAL",
+        registry: Optional[MetricsRegistry] = None,
+    ):
+        self._path = path
+        self._synchronous = synchronous
+        self._metrics = registry or metrics
+        self._writer = ThreadPoolExecutor(1, thread_name_prefix="sqlite-writer")
+        self._readers = ThreadPoolExecutor(
+            max(1, readers), thread_name_prefix="sqlite-reader"
+        )
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connect_lock = threading.Lock()
+        self._schema_ready = False
+
+        # Writes waiting for the next commit
+        self._queue: list[tuple[Write, asyncio.Future]] = []
+        self._commit_task: Optional[asyncio.Task] = None
+
+    # --- Connections (called on executor threads) ---
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        # Autocommit mode; transactions are opened explicitly
+        conn = sqlite3.connect(
+            self._path, isolation_level=None, check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA busy_timeout = 5000")
+        with self._connect_lock:
+            if not self._schema_ready:
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.executescript(_SCHEMA)
+                self._schema_ready = True
+            self._connections.append(conn)
+        conn.execute(f"PRAGMA synchronous = {self._synchronous}")
+        self._local.conn = conn
+        return conn
+
+    def _run_read(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        conn = self._connection()
+        # One snapshot for all statements of the read
+        conn.execute("BEGIN")
+        try:
+            return fn(conn)
+        finally:
+            conn.execute("COMMIT")
+
+    def _run_writes(self, writes: list[Write]) -> list[tuple[bool, Any]]:
+        conn = self._connection()
+        results: list[tuple[bool, Any]] = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for write in writes:
+                conn.execute("SAVEPOINT write")
+                try:
+                    value = write(conn)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO write")
+                    conn.execute("RELEASE write")
+                    results.append((False, e))
+                else:
+                    conn.execute("RELEASE write")
+                    results.append((True, value))
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        return results
+
+    # --- Scheduling ---
+
+    async def _read(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, self._run_read, fn)
+
+    async def _write(self, write: Write) -> Any:
+        """Queue a write for the next group commit and wait for it"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((write, future))
+        if self._commit_task is None:
+            self._commit_task = loop.create_task(self._commit_loop())
+        return await future
+
+    async def _commit_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while self._queue:
+                batch, self._queue = self._queue, []
+                try:
+                    results = await loop.run_in_executor(
+                        self._writer, self._run_writes, [w for w, _ in batch]
+                    )
+                except Exception as e:
+                    results = [(False, e)] * len(batch)
+                self._metrics.increment("session.sqlite.commits")
+                self._metrics.increment("session.sqlite.writes", len(batch))
+                for (_, future), (ok, value) in zip(batch, results):
+                    if future.done():
+                        continue
+                    if ok:
+                        future.set_result(value)
+                    else:
+                        future.set_exception(value)
+        finally:
+            self._commit_task = None
+
+    async def close(self) -> None:
+        """Wait for queued writes, then close every connection"""
+        if self._commit_task is not None:
+            await asyncio.gather(self._commit_task, return_exceptions=True)
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        with self._connect_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+    # --- Statements (run on executor threads) ---
+
+    @staticmethod
+    def _load(conn: sqlite3.Connection, rows: list[sqlite3.Row]) -> list[Session]:
+        """Sessions for session rows, with their messages (one query)"""
+        if not rows:
+            return []
+        ids = [row["session_id"] for row in rows]
+        messages: dict[str, list[MessageEmbed]] = {i: [] for i in ids}
+        for row in conn.execute(
+            f"{_SELECT_MESSAGES} WHERE session_id IN ({_placeholders(ids)}) "
+            "ORDER BY session_id, seq",
+            ids,
+        ):
+            messages[row["session_id"]].append(_to_message(row))
+        return [_to_session(row, messages[row["session_id"]]) for row in rows]
+
+    @staticmethod
+    def _insert_messages(
+        conn: sqlite3.Connection, session_id: str, messages: list[MessageEmbed]
+    ) -> None:
+        conn.executemany(_INSERT_MESSAGE, _message_rows(session_id, messages))
+
+    @classmethod
+    def _save(
+        cls,
+        conn: sqlite3.Connection,
+        session: Session,
+        expected_revision: Optional[int] = None,
+    ) -> None:
+        if expected_revision is not None:
+            # The single writer makes check-then-write atomic
+            stored = conn.execute(
+                "SELECT revision FROM sessions WHERE session_id = ?",
+                (session.session_id,),
+            ).fetchone()
+            if stored is not None and stored[0] != expected_revision:
+                raise SessionConflictError(session.session_id, expected_revision)
+        conn.execute(_UPSERT_SESSION, _session_row(session))
+        conn.execute(
+            "DELETE FROM messages WHERE session_id = ? AND seq >= ?",
+            (session.session_id, len(session.messages)),
+        )
+        try:
+            conn.executemany(
+                _UPSERT_MESSAGE, _message_rows(session.session_id, session.messages)
+            )
+        except sqlite3.IntegrityError:
+            # Messages moved to other positions; rewrite them all
+            conn.execute(
+                "DELETE FROM messages WHERE session_id = ?", (session.session_id,)
+            )
+            cls._insert_messages(conn, session.session_id, session.messages)
+
+    @classmethod
+    def _append(
+        cls,
+        conn: sqlite3.Connection,
+        session: Session,
+        messages: list[MessageEmbed],
+        expected_revision: Optional[int] = None,
+    ) -> None:
+        # Counters are incremented, so concurrent appends keep them exact
+        query = (
+            "UPDATE sessions SET active_leaf_id = ?, updated_at = ?, revision = ?, "
+            "last_message_preview = ?, message_count = message_count + ?, "
+            "total_tokens = total_tokens + ? WHERE session_id = ?"
+        )
+        params: list[Any] = [
+            session.active_leaf_id,
+            _ts(session.updated_at),
+            session.revision,
+            session.last_message_preview,
+            len(messages),
+            sum(estimate_tokens(m.content) for m in messages),
+            session.session_id,
+        ]
+        if expected_revision is not None:
+            query += " AND revision = ?"
+            params.append(expected_revision)
+        updated = conn.execute(query, params)
+        if updated.rowcount == 0:
+            exists = conn.execute(
+                "SELECT 1 FROM sessions WHERE session_id = ?", (session.session_id,)
+            ).fetchone()
+            if exists and expected_revision is not None:
+                raise SessionConflictError(session.session_id, expected_revision)
+            cls._save(conn, session)
+            return
+        (start,) = conn.execute(
+            "SELECT COALESCE(MAX(seq) + 1, 0) FROM messages WHERE session_id = ?",
+            (session.session_id,),
+        ).fetchone()
+        conn.executemany(
+            _INSERT_MESSAGE, _message_rows(session.session_id, messages, start)
+        )
+
+    # --- Reads ---
+
+    async def find_by_session_id(self, session_id: str) -> Optional[Session]:
+        """Find a session by its ID"""
+        found = await self.find_many([session_id])
+        return found.get(session_id)
+
+    async def find_many(self, session_ids: list[str]) -> dict[str, Session]:
+        """Find several sessions with two IN queries"""
+        ids = list(dict.fromkeys(session_ids))
+        if not ids:
+            return {}
+
+        def read(conn: sqlite3.Connection) -> list[Session]:
+            rows = conn.execute(
+                f"{_SELECT_SESSIONS} WHERE session_id IN ({_placeholders(ids)})", ids
+            ).fetchall()
+            return self._load(conn, rows)
+
+        return {s.session_id: s for s in await self._read(read)}
+
+    async def find_by_browser_id(
+        self, browser_id: str, skip: int = 0, limit: int = 100
+    ) -> list[Session]:
+        """Find all sessions for a browser ID"""
+
+        def read(conn: sqlite3.Connection) -> list[Session]:
+            rows = conn.execute(
+                f"{_SELECT_SESSIONS} WHERE browser_id = ? {_ORDER} LIMIT ? OFFSET ?",
+                (browser_id, limit, skip),
+            ).fetchall()
+            return self._load(conn, rows)
+
+        return await self._read(read)
+
+    async def list_summaries(
+        self, browser_id: str, skip: int = 0, limit: int = 100
+    ) -> list[Session]:
+        """Browser's sessions without messages (the messages table is skipped)"""
+
+        def read(conn: sqlite3.Connection) -> list[Session]:
+            rows = conn.execute(
+                f"{_SELECT_SESSIONS} WHERE browser_id = ? {_ORDER} LIMIT ? OFFSET ?",
+                (browser_id, limit, skip),
+            )
+            return [_to_session(row, []) for row in rows]
+
+        return await self._read(read)
+
+    async def iter_by_browser_id(
+        self, browser_id: str, batch_size: int = 100
+    ) -> AsyncIterator[Session]:
+        """Stream sessions batch_size at a time (keyset pagination)"""
+        last: Optional[tuple[str, str]] = None
+        while True:
+
+            def read(conn: sqlite3.Connection, last=last) -> list[Session]:
+                query = f"{_SELECT_SESSIONS} WHERE browser_id = ?"
+                params: list = [browser_id]
+                if last is not None:
+                    query += (
+                        " AND (updated_at < ? OR (updated_at = ? AND session_id < ?))"
+                    )
+                    params += [last[0], last[0], last[1]]
+                rows = conn.execute(
+                    f"{query} {_ORDER} LIMIT ?", params + [batch_size]
+                ).fetchall()
+                return self._load(conn, rows)
+
+            page = await self._read(read)
+            for session in page:
+                yield session
+            if len(page) < batch_size:
+                return
+            last = (_ts(page[-1].updated_at), page[-1].session_id)
+
+    async def iter_all(self, batch_size: int = 100) -> AsyncIterator[Session]:
+        """Stream every session batch_size at a time (keyset on session_id)"""
+        last: Optional[str] = None
+        while True:
+
+            def read(conn: sqlite3.Connection, last=last) -> list[Session]:
+                where, params = ("WHERE session_id > ?", [last]) if last else ("", [])
+                rows = conn.execute(
+                    f"{_SELECT_SESSIONS} {where} ORDER BY session_id LIMIT ?",
+                    params + [batch_size],
+                ).fetchall()
+                return self._load(conn, rows)
+
+            page = await self._read(read)
+            for session in page:
+                yield session
+            if len(page) < batch_size:
+                return
+            last = page[-1].session_id
+
+    async def find_version(self, session_id: str) -> Optional[SessionVersion]:
+        """Find a session's version (primary key lookup, no messages)"""
+
+        def read(conn: sqlite3.Connection) -> Optional[sqlite3.Row]:
+            return conn.execute(
+                "SELECT session_id, revision, updated_at FROM sessions "
+                "WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+
+        row = await self._read(read)
+        return SessionVersion(**dict(row)) if row else None
+
+    async def find_versions_by_browser_id(
+        self, browser_id: str, skip: int = 0, limit: int = 100
+    ) -> list[SessionVersion]:
+        """Versions of a browser's sessions (answered from the index alone)"""
+
+        def read(conn: sqlite3.Connection) -> list[sqlite3.Row]:
+            return conn.execute(
+                "SELECT session_id, revision, updated_at FROM sessions "
+                f"WHERE browser_id = ? {_ORDER} LIMIT ? OFFSET ?",
+                (browser_id, limit, skip),
+            ).fetchall()
+
+        return [SessionVersion(**dict(row)) for row in await self._read(read)]
+
+    async def find_messages(
+        self,
+        session_id: str,
+        after: Optional[MessageCursor] = None,
+        before: Optional[MessageCursor] = None,
+        limit: int = 50,
+    ) -> Optional[MessagePage]:
+        """Load one page of messages with a range scan on (session_id, seq)"""
+        if after is not None and before is not None:
+            raise ValueError("Use either after or before, not both")
+        cursor = after if after is not None else before
+        operator = ">" if after is not None else "<"
+
+        def read(conn: sqlite3.Connection) -> Optional[MessagePage]:
+            session = conn.execute(
+                "SELECT active_leaf_id FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            if session is None:
+                return None
+
+            query = f"{_SELECT_MESSAGES} WHERE session_id = ?"
+            params: list = [session_id]
+            if isinstance(cursor, datetime):
+                query += f" AND timestamp {operator} ?"
+                params.append(_ts(cursor))
+            elif cursor is not None:
+                anchor = conn.execute(
+                    "SELECT seq FROM messages WHERE session_id = ? AND id = ?",
+                    (session_id, cursor),
+                ).fetchone()
+                if anchor is None:
+                    raise ValueError(f"Message {cursor} not found in session")
+                query += f" AND seq {operator} ?"
+                params.append(anchor["seq"])
+            direction = "ASC" if after is not None else "DESC"
+            rows = conn.execute(
+                f"{query} ORDER BY seq {direction} LIMIT ?", params + [limit + 1]
+            ).fetchall()
+
+            has_more = len(rows) > limit
+            window = [_to_message(row) for row in rows[:limit]]
+            if after is None:
+                window.reverse()
+            return MessagePage(
+                session_id=session_id,
+                messages=window,
+                has_more=has_more,
+                active_leaf_id=session["active_leaf_id"],
+            )
+
+        return await self._read(read)
+
+    # --- Writes ---
+
+    async def save(
+        self, session: Session, expected_revision: Optional[int] = None
+    ) -> Session:
+        """Upsert the session row; only new or changed messages are written
+
+        Raises:
+            SessionConflictError: If the stored revision differs from
+                expected_revision (the write's savepoint is rolled back)
+        """
+        await self._write(lambda conn: self._save(conn, session, expected_revision))
+        return session
+
+    async def create(self, session: Session) -> Session:
+        """Insert a session; the primary key rejects duplicates"""
+
+        def write(conn: sqlite3.Connection) -> None:
+            try:
+                conn.execute(_INSERT_SESSION, _session_row(session))
+            except sqlite3.IntegrityError:
+                raise SessionAlreadyExistsError(session.session_id)
+            self._insert_messages(conn, session.session_id, session.messages)
+
+        await self._write(write)
+        return session
+
+    async def save_many(self, sessions: list[Session]) -> None:
+        """Save several sessions in one savepoint of a group commit"""
+        if not sessions:
+            return
+
+        def write(conn: sqlite3.Connection) -> None:
+            for session in sessions:
+                self._save(conn, session)
+
+        await self._write(write)
+
+    async def append_messages(
+        self,
+        session: Session,
+        messages: list[MessageEmbed],
+        expected_revision: Optional[int] = None,
+    ) -> None:
+        """Insert the new message rows and update the session row
+
+        With expected_revision the UPDATE also matches on revision; if it
+        matches nothing while the row exists, the write's savepoint is rolled
+        back. Falls back to a full save if the session row is missing.
+
+        Raises:
+            SessionConflictError: If the stored revision differs
+        """
+        await self._write(
+            lambda conn: self._append(conn, session, messages, expected_revision)
+        )
+
+    async def write_batch(
+        self,
+        saves: list[Session],
+        appends: list[tuple[Session, list[MessageEmbed]]],
+        expected_revisions: Optional[dict[str, int]] = None,
+    ) -> set[str]:
+        """Saves and appends as one write of a group commit
+
+        A guarded append that conflicts has written nothing yet (its
+        UPDATE matched no row), so the others go on.
+        """
+        expected_revisions = expected_revisions or {}
+
+        def write(conn: sqlite3.Connection) -> set[str]:
+            conflicts: set[str] = set()
+            for session in saves:
+                self._save(conn, session)
+            for session, messages in appends:
+                if not messages:
+                    continue
+                expected = expected_revisions.get(session.session_id)
+                try:
+                    self._append(conn, session, messages, expected)
+                except SessionConflictError:
+                    conflicts.add(session.session_id)
+            return conflicts
+
+        if not saves and not appends:
+            return set()
+        return await self._write(write)
+
+    async def insert_many(self, sessions: list[Session]) -> list[bool]:
+        """INSERT OR IGNORE each session; existing ones are reported"""
+
+        def write(conn: sqlite3.Connection) -> list[bool]:
+            inserted = []
+            for session in sessions:
+                cursor = conn.execute(_INSERT_SESSION_IF_NEW, _session_row(session))
+                inserted.append(cursor.rowcount == 1)
+                if cursor.rowcount == 1:
+                    self._insert_messages(conn, session.session_id, session.messages)
+            return inserted
+
+        if not sessions:
+            return []
+        return await self._write(write)
+
+    async def set_pinned_many(
+        self, browser_id: str, session_ids: Optional[list[str]], pinned: bool
+    ) -> int:
+        """One UPDATE scoped to the browser"""
+        query = (
+            "UPDATE sessions SET pinned = ?, updated_at = ?, revision = revision + 1 "
+            "WHERE browser_id = ?"
+        )
+        params: list = [int(pinned), _ts(datetime.utcnow()), browser_id]
+        if session_ids is not None:
+            query += f" AND session_id IN ({_placeholders(session_ids)})"
+            params += session_ids
+        return await self._write(lambda conn: conn.execute(query, params).rowcount)
+
+    async def delete_many(
+        self, browser_id: str, session_ids: Optional[list[str]] = None
+    ) -> int:
+        """Delete a browser's sessions and their messages"""
+        where = "WHERE browser_id = ?"
+        params: list = [browser_id]
+        if session_ids is not None:
+            where += f" AND session_id IN ({_placeholders(session_ids)})"
+            params += session_ids
+
+        def write(conn: sqlite3.Connection) -> int:
+            conn.execute(
+                "DELETE FROM messages WHERE session_id IN "
+                f"(SELECT session_id FROM sessions {where})",
+                params,
+            )
+            return conn.execute(f"DELETE FROM sessions {where}", params).rowcount
+
+        return await self._write(write)
+
+    async def update(self, session_id: str, **kwargs) -> Optional[Session]:
+        """Update fields; returns metadata only"""
+        fields = {
+            field: int(value) if isinstance(value, bool) else value
+            for field, value in kwargs.items()
+            if field in _UPDATABLE_FIELDS
+        }
+        # Always update the updated_at timestamp and revision
+        fields["updated_at"] = _ts(datetime.utcnow())
+        assignments = ", ".join(f"{field} = ?" for field in fields)
+
+        def write(conn: sqlite3.Connection) -> Optional[Session]:
+            cursor = conn.execute(
+                f"UPDATE sessions SET {assignments}, revision = revision + 1 "
+                "WHERE session_id = ?",
+                [*fields.values(), session_id],
+            )
+            if cursor.rowcount == 0:
+                return None
+            row = conn.execute(
+                f"{_SELECT_SESSIONS} WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            return _to_session(row, [])
+
+        return await self._write(write)
+
+    async def delete(self, session_id: str) -> bool:
+        """Delete a session and its messages"""
+
+        def write(conn: sqlite3.Connection) -> bool:
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            cursor = conn.execute(
+                "DELETE FROM sessions WHERE session_id = ?", (session_id,)
+            )
+            return cursor.rowcount == 1
+
+        return await self._write(write)
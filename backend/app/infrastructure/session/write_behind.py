@@ -0,0 +1,354 @@
+"""Write-behind session repository
+
+Session writes are acknowledged once they are buffered in memory and are
+flushed to the wrapped repository in the background: every `interval`
+seconds, or as soon as `max_ops` writes are buffered. Writes to the same
+session are coalesced (several appends become one $push $each; a full save
+supersedes everything before it), and all sessions of a flush go out in one
+write_batch call (one unordered bulk_write in Mongo).
+
+Durability trade-off: a write acknowledged here is lost if the process dies
+before the next flush, so at most `interval` seconds (or `max_ops` writes)
+of chat history is at risk. A failed flush keeps its writes and retries them
+with the next one. drain() flushes everything and must run on shutdown.
+
+A flush can fail part-way (an unordered bulk_write applies the writes it
+can), so the retry resends writes that already landed. Full saves are
+replacements and appends skip messages already stored (write_batch's
+contract), so the retry cannot push a message twice.
+
+Guarded saves and appends (expected_revision) are checked against the
+latest known version (the buffer, else the wrapped repository) before they
+are buffered; the flush itself is not guarded. Appends only add messages
+($push), so a write from another container in between cannot be lost, but
+the last flush decides active_leaf_id and revision.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Optional
+
+from app.domain.chat.entities import MessageEmbed
+from app.domain.session.entities import (
+    MessageCursor,
+    MessagePage,
+    Session,
+    SessionVersion,
+)
+from app.domain.session.errors import SessionAlreadyExistsError, SessionConflictError
+from app.domain.session.ports import SessionRepository
+from app.infrastructure.metrics import MetricsRegistry, metrics
+
+
+def _copy(session: Session) -> Session:
+    return session.model_copy(update={"messages": list(session.messages)})
+
+
+class _PendingWrite:
+    """Buffered writes of one session
+
+    `session` is the latest state. With `full` set the whole session is
+    saved; otherwise only `messages` are appended.
+    """
+
+    __slots__ = ("session", "full", "messages", "ops")
+
+    def __init__(self, session: Session, full: bool, messages: list[MessageEmbed]):
+        self.session = session
+        self.full = full
+        self.messages = messages
+        self.ops = 1
+
+    def then(self, later: "_PendingWrite") -> "_PendingWrite":
+        """Combine with writes buffered after this one"""
+        if not later.full:
+            later.full = self.full
+            later.messages = self.messages + later.messages
+        later.ops += self.ops
+        return later
+
+
+class WriteBehindSessionRepository(SessionRepository):
+    """SessionRepository decorator that buffers and batches writes
+
+    Lookups by ID (find_by_session_id, find_many, find_version,
+    find_messages) are answered from the buffer when the session has
+    unflushed writes. Browser-wide reads and metadata writes (update,
+    create, bulk actions) flush first, so they never see stale data.
+    """
+
+    def __init__(
+        self,
+        inner: SessionRepository,
+        interval: float = 0.005,
+        max_ops: int = 100,
+        max_pending: int = 1000,
+        registry: Optional[MetricsRegistry] = None,
+    ):
+        self._inner = inner
+        self._interval = max(0.0, interval)
+        self._max_ops = max(1, max_ops)
+        self._max_pending = max(1, max_pending)
+        self._metrics = registry or metrics
+
+        # Buffered writes, and the ones being flushed right now
+        self._pending: dict[str, _PendingWrite] = {}
+        self._flushing: dict[str, _PendingWrite] = {}
+        self._ops = 0
+        self._flush_lock = asyncio.Lock()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+
+    # --- Buffering ---
+
+    async def _buffer(self, write: _PendingWrite) -> None:
+        session_id = write.session.session_id
+        if len(self._pending) >= self._max_pending and session_id not in self._pending:
+            # Backpressure: bound what an outage or a crash can lose. If the
+            # flush fails, this write is rejected rather than buffered.
+            await self.flush()
+
+        earlier = self._pending.get(session_id)
+        if earlier is not None:
+            write = earlier.then(write)
+            self._metrics.increment("session.write_behind.coalesced")
+        self._pending[session_id] = write
+        self._ops += 1
+        self._metrics.set_gauge("session.write_behind.pending", len(self._pending))
+
+        if self._ops >= self._max_ops:
+            self._schedule(0)
+        elif self._timer is None:
+            self._schedule(self._interval)
+
+    def _schedule(self, delay: float) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(delay, self._start_flush)
+
+    def _start_flush(self) -> None:
+        self._timer = None
+        task = asyncio.get_running_loop().create_task(self._background_flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _background_flush(self) -> None:
+        try:
+            await self.flush()
+        except Exception as e:
+            # Writes stay buffered and are retried by the next flush
+            print(f"Error flushing session writes: {e}")
+            if self._pending and self._timer is None:
+                self._schedule(self._interval)
+
+    async def flush(self) -> None:
+        """Write everything buffered so far to the wrapped repository
+
+        Raises:
+            Exception: Whatever the wrapped repository raised; the writes
+                are buffered again (merged with newer ones) for a retry
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            batch, self._pending, self._ops = self._pending, {}, 0
+            self._flushing = batch
+            saves = [w.session for w in batch.values() if w.full]
+            appends = [
+                (w.session, w.messages)
+                for w in batch.values()
+                if not w.full and w.messages
+            ]
+            try:
+                await self._inner.write_batch(saves, appends)
+            except Exception:
+                self._metrics.increment("session.write_behind.errors")
+                self._requeue(batch)
+                raise
+            finally:
+                self._flushing = {}
+                self._metrics.set_gauge(
+                    "session.write_behind.pending", len(self._pending)
+                )
+            self._metrics.increment("session.write_behind.flushes")
+            self._metrics.increment(
+                "session.write_behind.ops", sum(w.ops for w in batch.values())
+            )
+
+    def _requeue(self, batch: dict[str, _PendingWrite]) -> None:
+        for session_id, write in batch.items():
+            later = self._pending.get(session_id)
+            self._pending[session_id] = write.then(later) if later else write
+            self._ops += write.ops
+
+    async def drain(self) -> None:
+        """Flush until nothing is buffered (call on shutdown)"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        while self._pending:
+            await self.flush()
+
+    async def _flush_sessions(self, session_ids: Optional[list[str]]) -> None:
+        """Flush before an operation that bypasses the buffer
+
+        Also waits for a running flush of these sessions (None: any session).
+        """
+        if session_ids is None or any(
+            i in self._pending or i in self._flushing for i in session_ids
+        ):
+            await self.flush()
+
+    def _buffered(self, session_id: str) -> Optional[Session]:
+        write = self._pending.get(session_id) or self._flushing.get(session_id)
+        return write.session if write else None
+
+    async def _check_revision(self, session_id: str, expected_revision: int) -> None:
+        version = await self.find_version(session_id)
+        if version is not None and version.revision != expected_revision:
+            raise SessionConflictError(session_id, expected_revision)
+
+    # --- Writes ---
+
+    async def save(
+        self, session: Session, expected_revision: Optional[int] = None
+    ) -> Session:
+        if expected_revision is not None:
+            await self._check_revision(session.session_id, expected_revision)
+        await self._buffer(_PendingWrite(_copy(session), True, []))
+        return session
+
+    async def save_many(self, sessions: list[Session]) -> None:
+        for session in sessions:
+            await self._buffer(_PendingWrite(_copy(session), True, []))
+
+    async def append_messages(
+        self,
+        session: Session,
+        messages: list[MessageEmbed],
+        expected_revision: Optional[int] = None,
+    ) -> None:
+        if expected_revision is not None:
+            await self._check_revision(session.session_id, expected_revision)
+        await self._buffer(_PendingWrite(_copy(session), False, list(messages)))
+
+    async def write_batch(
+        self,
+        saves: list[Session],
+        appends: list[tuple[Session, list[MessageEmbed]]],
+        expected_revisions: Optional[dict[str, int]] = None,
+    ) -> set[str]:
+        await self.save_many(saves)
+        expected_revisions = expected_revisions or {}
+        conflicts: set[str] = set()
+        for session, messages in appends:
+            try:
+                await self.append_messages(
+                    session, messages, expected_revisions.get(session.session_id)
+                )
+            except SessionConflictError:
+                conflicts.add(session.session_id)
+        return conflicts
+
+    async def create(self, session: Session) -> Session:
+        if self._buffered(session.session_id) is not None:
+            raise SessionAlreadyExistsError(session.session_id)
+        return await self._inner.create(session)
+
+    async def insert_many(self, sessions: list[Session]) -> list[bool]:
+        await self._flush_sessions([s.session_id for s in sessions])
+        return await self._inner.insert_many(sessions)
+
+    async def update(self, session_id: str, **kwargs) -> Optional[Session]:
+        await self._flush_sessions([session_id])
+        return await self._inner.update(session_id, **kwargs)
+
+    async def set_pinned_many(
+        self, browser_id: str, session_ids: Optional[list[str]], pinned: bool
+    ) -> int:
+        await self._flush_sessions(session_ids)
+        return await self._inner.set_pinned_many(browser_id, session_ids, pinned)
+
+    async def delete(self, session_id: str) -> bool:
+        await self._flush_sessions([session_id])
+        return await self._inner.delete(session_id)
+
+    async def delete_many(
+        self, browser_id: str, session_ids: Optional[list[str]] = None
+    ) -> int:
+        await self._flush_sessions(session_ids)
+        return await self._inner.delete_many(browser_id, session_ids)
+
+    # --- Reads ---
+
+    async def find_by_session_id(self, session_id: str) -> Optional[Session]:
+        buffered = self._buffered(session_id)
+        if buffered is not None:
+            return _copy(buffered)
+        return await self._inner.find_by_session_id(session_id)
+
+    async def find_many(self, session_ids: list[str]) -> dict[str, Session]:
+        found: dict[str, Session] = {}
+        missing: list[str] = []
+        for session_id in dict.fromkeys(session_ids):
+            buffered = self._buffered(session_id)
+            if buffered is not None:
+                found[session_id] = _copy(buffered)
+            else:
+                missing.append(session_id)
+        if missing:
+            found.update(await self._inner.find_many(missing))
+        return found
+
+    async def find_version(self, session_id: str) -> Optional[SessionVersion]:
+        buffered = self._buffered(session_id)
+        if buffered is not None:
+            return SessionVersion.of(buffered)
+        return await self._inner.find_version(session_id)
+
+    async def find_messages(
+        self,
+        session_id: str,
+        after: Optional[MessageCursor] = None,
+        before: Optional[MessageCursor] = None,
+        limit: int = 50,
+    ) -> Optional[MessagePage]:
+        buffered = self._buffered(session_id)
+        if buffered is not None:
+            return buffered.message_page(after=after, before=before, limit=limit)
+        return await self._inner.find_messages(session_id, after, before, limit)
+
+    async def find_by_browser_id(
+        self, browser_id: str, skip: int = 0, limit: int = 100
+    ) -> list[Session]:
+        await self._flush_sessions(None)
+        return await self._inner.find_by_browser_id(browser_id, skip, limit)
+
+    async def list_summaries(
+        self, browser_id: str, skip: int = 0, limit: int = 100
+    ) -> list[Session]:
+        await self._flush_sessions(None)
+        return await self._inner.list_summaries(browser_id, skip, limit)
+
+    async def iter_by_browser_id(
+        self, browser_id: str, batch_size: int = 100
+    ) -> AsyncIterator[Session]:
+        await self._flush_sessions(None)
+        async for session in self._inner.iter_by_browser_id(browser_id, batch_size):
+            yield session
+
+    async def iter_all(self, batch_size: int = 100) -> AsyncIterator[Session]:
+        await self._flush_sessions(None)
+        async for session in self._inner.iter_all(batch_size):
+            yield session
+
+    async def find_versions_by_browser_id(
+        self, browser_id: str, skip: int = 0, limit: int = 100
+    ) -> list[SessionVersion]:
+        await self._flush_sessions(None)
+        return await self._inner.find_versions_by_browser_id(browser_id, skip, limit)
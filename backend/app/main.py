@@ -5,9 +5,17 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.routers import chat_router, health_router, sessions_router
+from app.api.compression import CompressionMiddleware
+from app.api.dependencies import get_container
+from app.api.routers import (
+    chat_router,
+    health_router,
+    search_router,
+    sessions_router,
+    websocket_router,
+)
 from app.config import settings
-from app.infrastructure.database import init_db
+from app.infrastructure.database import init_db, prewarm_pool
 
 
 @asynccontextmanager
@@ -15,13 +23,21 @@ async def lifespan(app: FastAPI):
     """
     Lifespan context manager for startup and shutdown events
     """
-    # Startup: Initialize database connection
-    await init_db()
-    print("Database initialized")
+    # Startup: Initialize database connection and open the pool up front
+    container = get_container()
+    client = container.mongo_client()
+    if client is None:
+        print("WARNING: MONGODB_URI not set, skipping database initialization")
+    else:
+        await init_db(client)
+        await prewarm_pool(client, container.config.mongodb_min_pool_size)
+        print("Database initialized")
+    await container.start()
 
     yield
 
-    # Shutdown: Cleanup (if needed)
+    # Shutdown: flush buffered writes, then close the MongoDB pool
+    await container.close()
     print("Shutting down")
 
 
@@ -47,10 +63,22 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Negotiated response compression (SSE excluded)
+    if settings.compression_enabled:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.compression_minimum_size,
+            gzip_level=settings.compression_gzip_level,
+            brotli_quality=settings.compression_brotli_quality,
+            zstd_level=settings.compression_zstd_level,
+        )
+
     # Include routers
     app.include_router(health_router)
     app.include_router(chat_router)
     app.include_router(sessions_router)
+    app.include_router(search_router)
+    app.include_router(websocket_router)
 
     return app
 
@@ -0,0 +1 @@
+"""Microbenchmarks (run from backend/: python -m benchmarks.<name>)"""
@@ -0,0 +1,122 @@
+"""Content compression benchmark: ratio and CPU cost per codec
+
+The corpus is built from this repository's own Markdown, Python and
+TypeScript sources, cut into answer-sized chunks and wrapped in short
+Korean prose, alternating with short user questions. That mirrors the
+assistant answers (code + markdown) that dominate stored volume.
+
+Reports, for the whole corpus as the adapter would store it (content below
+the threshold stays raw): stored/raw size ratio and CPU time per message to
+encode and to decode. The dictionary is trained on a disjoint half of the
+corpus.
+
+Usage:
+    python -m benchmarks.bench_content_compression
+"""
+
+import random
+import time
+from pathlib import Path
+
+from app.infrastructure.session import content_codec
+from app.infrastructure.session.content_codec import ContentCodec, train_dictionary
+
+from .common import measure
+
+_ROOT = Path(__file__).resolve().parents[2]
+_PATTERNS = ("*.md", "*.py", "*.ts", "*.tsx")
+_SKIP = ("node_modules", ".next", ".venv", "__pycache__", ".pytest_cache")
+_QUESTIONS = (
+    "이 함수가 왜 None을 반환하나요?",
+    "세션 목록을 페이지네이션하려면 어떻게 해야 하나요?",
+    "Can you refactor this into smaller functions?",
+    "테스트 코드도 같이 작성해 주세요.",
+)
+
+
+def _sources() -> list[str]:
+    texts = []
+    for pattern in _PATTERNS:
+        for path in sorted(_ROOT.rglob(pattern)):
+            if any(part in _SKIP for part in path.parts):
+                continue
+            texts.append(path.read_text(errors="ignore"))
+    return texts
+
+
+def make_corpus(seed: int = 0) -> list[str]:
+    """Alternating questions and code/markdown answers (500 B - 8 KB)"""
+    rng = random.Random(seed)
+    corpus = []
+    for text in _sources():
+        lines = text.splitlines()
+        i = 0
+        while i < len(lines):
+            take = rng.randint(15, 200)
+            chunk = "\n".join(lines[i : i + take])
+            i += take
+            if len(chunk) < 200:
+                continue
+            corpus.append(rng.choice(_QUESTIONS))
+            corpus.append(
+                "아래처럼 수정하면 됩니다. "
+                "핵심은 한 번의 왕복으로 처리하는 것입니다.\n\n"
+                f"```\n{chunk}\n```\n\n변경 후 테스트를 다시 실행해 보세요."
+            )
+    return corpus
+
+
+def _zlib_codec() -> ContentCodec:
+    """The fallback codec used when zstandard is not installed"""
+    zstandard, content_codec.zstandard = content_codec.zstandard, None
+    try:
+        return ContentCodec(zlib_level=6)
+    finally:
+        content_codec.zstandard = zstandard
+
+
+def main() -> None:
+    corpus = make_corpus()
+    # Question/answer pairs at even positions train, odd ones are measured
+    training = [m for i, m in enumerate(corpus) if i // 2 % 2 == 0]
+    sample = [m for i, m in enumerate(corpus) if i // 2 % 2 == 1]
+    dictionary = train_dictionary(training)
+    raw_bytes = sum(len(c.encode()) for c in sample)
+    print(f"{len(sample)} messages, {raw_bytes / 1024:.0f} KiB of content\n")
+
+    codecs = (
+        ("zlib-6", _zlib_codec()),
+        ("zstd-3", ContentCodec(zstd_level=3)),
+        ("zstd-3 + dict", ContentCodec(zstd_level=3, dictionaries=[dictionary])),
+    )
+    print(
+        f"{'codec':<14} | {'stored':>9} | {'ratio':>6} | "
+        f"{'encode/msg':>11} | {'decode/msg':>11}"
+    )
+    for name, codec in codecs:
+        messages = [{"id": str(i), "content": c} for i, c in enumerate(sample)]
+        stored, _, inline_bytes = codec.encode_messages("bench", "bench", messages)
+        packed = [(m["codec"], m["content_z"]) for m in stored if "codec" in m]
+
+        encode = measure(
+            lambda: codec.encode_messages("bench", "bench", messages),
+            repeat=3,
+            number=3,
+            clock=time.process_time,
+        )
+        decode = measure(
+            lambda: [codec.decompress(c, data) for c, data in packed],
+            repeat=3,
+            number=3,
+            clock=time.process_time,
+        )
+        print(
+            f"{name:<14} | {inline_bytes / 1024:>5.0f} KiB | "
+            f"{inline_bytes / raw_bytes:>6.3f} | "
+            f"{encode * 1000 / len(sample):>8.1f} us | "
+            f"{decode * 1000 / len(sample):>8.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
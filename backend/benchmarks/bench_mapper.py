@@ -0,0 +1,51 @@
+"""Mapper benchmark: building Session entities from raw MongoDB documents
+
+Reports CPU time (process time) per mapped session at 10, 100 and 1,000
+messages for the mapper's read path (pydantic-core validation) and the
+"trusted" alternative (model_construct for the session and every message).
+
+Usage:
+    python -m benchmarks.bench_mapper
+"""
+
+import time
+
+from app.domain.chat.entities import MessageEmbed
+from app.domain.session.entities import Session
+from app.infrastructure.session.mapper import (
+    session_entity_to_raw,
+    session_raw_to_entity,
+)
+
+from .common import make_session, measure
+
+
+def _constructed(raw: dict) -> Session:
+    messages = [MessageEmbed.model_construct(**m) for m in raw["messages"]]
+    return Session.model_construct(**{**raw, "messages": messages})
+
+
+def main() -> None:
+    print(
+        f"{'messages':>8} | {'validate':>12} | {'construct':>12} | "
+        f"{'entity -> raw':>13}"
+    )
+    for count in (10, 100, 1000):
+        raw = session_entity_to_raw(make_session(count))
+        number = max(5, 20000 // count)
+
+        def run(fn) -> float:
+            return measure(fn, number=number, clock=time.process_time) * 1000
+
+        validated = run(lambda: session_raw_to_entity(raw))
+        constructed = run(lambda: _constructed(raw))
+        session = session_raw_to_entity(raw)
+        dumped = run(lambda: session_entity_to_raw(session))
+        print(
+            f"{count:>8} | {validated:>9.1f} us | {constructed:>9.1f} us | "
+            f"{dumped:>10.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
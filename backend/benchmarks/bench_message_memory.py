@@ -0,0 +1,122 @@
+"""Memory benchmark: in-memory repository history, MessageEmbed vs. CompactMessage
+
+Reports retained memory per 1,000 messages held by InMemorySessionRepository:
+before (the history kept as MessageEmbed objects, as the repository used to)
+and after (CompactMessage, as it does now), with fresh id, role and
+timestamp objects per message as a request produces them. Message text is
+shared between both runs and reported separately, since it is the same in
+either representation. Also times a read, which expands the history again.
+
+Usage:
+    python -m benchmarks.bench_message_memory
+"""
+
+import asyncio
+import gc
+import sys
+import time
+import tracemalloc
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from app.domain.chat.entities import MessageEmbed
+from app.domain.session.entities import Session
+from app.infrastructure.session.memory_adapter import InMemorySessionRepository
+
+from .common import make_messages
+
+_ROLES = (b"user", b"assistant")
+_MODEL = b"us.anthropic.claude-3-5-sonnet-20241022-v2:0"
+
+
+def _raw_documents(contents: list[str]) -> list[dict]:
+    """Fresh per-message objects, like a decoded Mongo document"""
+    start = datetime(2025, 1, 1)
+    documents = []
+    parent_id = None
+    for i, content in enumerate(contents):
+        message_id = str(uuid.uuid4())
+        documents.append(
+            {
+                "id": message_id,
+                "role": _ROLES[i % 2].decode(),
+                "content": content,
+                "timestamp": start + timedelta(seconds=i),
+                "model": _MODEL.decode() if i % 2 else None,
+                "parent_id": parent_id,
+            }
+        )
+        parent_id = message_id
+    return documents
+
+
+def _retained(build: Callable[[], list]) -> tuple[int, list]:
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    return used, result
+
+
+def _stored(contents: list[str]) -> InMemorySessionRepository:
+    repository = InMemorySessionRepository()
+    session = Session(session_id="bench", browser_id="bench")
+    session.messages = [
+        MessageEmbed.model_validate(d) for d in _raw_documents(contents)
+    ]
+    asyncio.run(repository.save(session))
+    return repository
+
+
+def _best_ms(run: Callable[[], object], rounds: int = 20) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    count = 1000
+    contents = [m.content for m in make_messages(count)]
+    content_bytes = sum(sys.getsizeof(c) for c in contents)
+
+    embed_bytes, embeds = _retained(
+        lambda: [MessageEmbed.model_validate(d) for d in _raw_documents(contents)]
+    )
+    del embeds
+    compact_bytes, repository = _retained(lambda: _stored(contents))
+    loop = asyncio.new_event_loop()
+    read_ms = _best_ms(
+        lambda: loop.run_until_complete(repository.find_by_session_id("bench"))
+    )
+    loop.close()
+
+    scale = 1000 / count
+    print(f"per 1,000 messages ({count} measured)")
+    print(f"{'':<16} | {'overhead':>10} | {'with text':>10}")
+    for label, used in (
+        ("before (embed)", embed_bytes),
+        ("after (compact)", compact_bytes),
+    ):
+        print(
+            f"{label:<16} | {used * scale / 1024:>7.1f} KiB | "
+            f"{(used + content_bytes) * scale / 1024:>7.1f} KiB"
+        )
+    print(
+        f"overhead reduction: {embed_bytes / compact_bytes:.1f}x "
+        f"(text: {content_bytes * scale / 1024:.1f} KiB)"
+    )
+    print(
+        f"read (find_by_session_id, expands the history): "
+        f"{read_ms * scale:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Serialization benchmark: SSE frames and a 1,000-message session
+
+Compares the previous encoding paths with app.api.serialization:
+- SSE: json.dumps + f-string per token vs. pre-encoded bytes
+- Session: SessionResponseDTO through FastAPI's response_model round trip
+  (dump -> validate -> dump -> json.dumps) vs. one pydantic-core pass
+
+Usage:
+    python -m benchmarks.bench_serialization
+"""
+
+import json
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.api.serialization import encode_sse_token, session_to_json
+from app.application.session.dto import SessionResponseDTO
+
+from .common import make_session, measure
+
+
+def _baseline_session(session, adapter: TypeAdapter) -> bytes:
+    dto = SessionResponseDTO(
+        session_id=session.session_id,
+        browser_id=session.browser_id,
+        title=session.title,
+        pinned=session.pinned,
+        created_at=session.created_at,
+        updated_at=session.updated_at,
+        messages=session.messages,
+        active_leaf_id=session.active_leaf_id,
+        message_count=session.message_count,
+        total_tokens=session.total_tokens,
+        last_message_preview=session.last_message_preview,
+    )
+    # What FastAPI does with a response_model: dump, validate, dump again
+    validated = adapter.validate_python(dto.model_dump(by_alias=True))
+    content = jsonable_encoder(adapter.dump_python(validated, mode="json"))
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def main() -> None:
+    tokens = ["안녕", "하세요", " world", "\n", "```", '"quoted"'] * 500
+
+    def baseline_sse():
+        for token in tokens:
+            data = json.dumps({"content": token}, ensure_ascii=False)
+            f"data: {data}\n\n".encode()
+
+    def fast_sse():
+        for token in tokens:
+            encode_sse_token(token)
+
+    sse_old = measure(baseline_sse)
+    sse_new = measure(fast_sse)
+    print(f"SSE, {len(tokens)} tokens")
+    print(f"  json.dumps + f-string : {sse_old:8.3f} ms")
+    print(f"  encode_sse_token      : {sse_new:8.3f} ms  ({sse_old / sse_new:.1f}x)")
+
+    session = make_session(1000)
+    adapter = TypeAdapter(SessionResponseDTO)
+    assert json.loads(_baseline_session(session, adapter)) == json.loads(
+        session_to_json(session)
+    )
+
+    old = measure(lambda: _baseline_session(session, adapter), number=5)
+    new = measure(lambda: session_to_json(session), number=5)
+    print("GET /api/sessions/{id}, 1,000 messages")
+    print(f"  response_model path   : {old:8.3f} ms")
+    print(f"  session_to_json       : {new:8.3f} ms  ({old / new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Session repository backends: latency of the chat hot path
+
+Runs one workload against each backend and reports the mean time per
+operation:
+
+- create: new session with 20 messages
+- append: one message to an existing session, 50 concurrent writers
+- get: load a whole session by ID
+- page: latest 50 messages of a 200-message session
+- list: session summaries of a browser (first 100)
+
+Backends: the in-memory reference, SQLite (temporary WAL database file) and
+MongoDB when MONGODB_URI is set (the bench browser's sessions are deleted
+afterwards).
+
+Usage:
+    python -m benchmarks.bench_session_backends
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+
+from app.domain.chat.entities import MessageEmbed
+from app.domain.session.entities import Session
+from app.domain.session.ports import SessionRepository
+from app.harness.testing import InMemorySessionRepository
+from app.infrastructure.session.sqlite_adapter import SqliteSessionRepository
+
+from .common import make_messages
+
+_SESSIONS = 200
+_CONCURRENCY = 50
+_BROWSER = "bench-browser"
+_COLUMNS = ("create", "append", "get", "page", "list")
+
+
+def _session(i: int, messages: int) -> Session:
+    session = Session(session_id=f"bench-{i}", browser_id=_BROWSER)
+    for message in make_messages(messages, seed=i):
+        session.add_message(message)
+    return session
+
+
+async def _timed(ops: list[Callable[[], Awaitable]], concurrency: int = 1) -> float:
+    """Mean milliseconds per operation, `concurrency` operations at a time"""
+    started = time.perf_counter()
+    for i in range(0, len(ops), concurrency):
+        await asyncio.gather(*(op() for op in ops[i : i + concurrency]))
+    return (time.perf_counter() - started) * 1000 / len(ops)
+
+
+async def run(repo: SessionRepository) -> dict[str, float]:
+    sessions = [_session(i, 20) for i in range(_SESSIONS)]
+    results = {"create": await _timed([lambda s=s: repo.create(s) for s in sessions])}
+
+    async def append(session: Session) -> None:
+        message = MessageEmbed(role="user", content="다음 질문입니다")
+        session.add_message(message)
+        await repo.append_messages(session, [message])
+
+    results["append"] = await _timed(
+        [lambda s=s: append(s) for s in sessions], _CONCURRENCY
+    )
+    results["get"] = await _timed(
+        [lambda s=s: repo.find_by_session_id(s.session_id) for s in sessions]
+    )
+
+    long_session = _session(_SESSIONS, 200)
+    await repo.create(long_session)
+    results["page"] = await _timed(
+        [lambda: repo.find_messages(long_session.session_id, limit=50)] * 100
+    )
+    results["list"] = await _timed([lambda: repo.list_summaries(_BROWSER)] * 50)
+    return results
+
+
+async def _mongo() -> None:
+    from app.infrastructure.database import close_client, init_db
+    from app.infrastructure.session.mongo_adapter import MongoSessionRepository
+
+    client = await init_db()
+    if client is None:
+        return
+    repo = MongoSessionRepository()
+    try:
+        await repo.delete_many(_BROWSER)
+        _report("mongo", await run(repo))
+    finally:
+        await repo.delete_many(_BROWSER)
+        await close_client(client)
+
+
+def _report(name: str, results: dict[str, float]) -> None:
+    cells = " | ".join(f"{results[k]:>7.3f} ms" for k in _COLUMNS)
+    print(f"{name:<8} | {cells}")
+
+
+async def main() -> None:
+    print(f"{'backend':<8} | " + " | ".join(f"{c:>10}" for c in _COLUMNS))
+    _report("memory", await run(InMemorySessionRepository()))
+
+    with tempfile.TemporaryDirectory() as directory:
+        repo = SqliteSessionRepository(os.path.join(directory, "bench.db"))
+        try:
+            _report("sqlite", await run(repo))
+        finally:
+            await repo.close()
+
+    if os.environ.get("MONGODB_URI"):
+        await _mongo()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
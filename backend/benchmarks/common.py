@@ -0,0 +1,66 @@
+"""Shared helpers for microbenchmarks"""
+
+import random
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from app.domain.chat.entities import MessageEmbed
+from app.domain.session.entities import Session
+
+_WORDS = (
+    "세션 메시지 응답 코드 함수 데이터 서버 클라이언트 스트림 모델 "
+    "the quick brown fox returns a value from the async handler while "
+    "def class import await yield return list dict json mongo index"
+).split()
+
+
+def make_content(rng: random.Random, words: int) -> str:
+    """Pseudo-realistic mixed Korean/English/code text"""
+    text = " ".join(rng.choice(_WORDS) for _ in range(words))
+    if words > 60:
+        text += "\n```python\ndef handler(x):\n    return x * 2\n```\n"
+    return text
+
+
+def make_messages(count: int, seed: int = 0) -> list[MessageEmbed]:
+    """Alternating user/assistant messages with typical lengths"""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    messages = []
+    for i in range(count):
+        role = "user" if i % 2 == 0 else "assistant"
+        words = rng.randint(5, 30) if role == "user" else rng.randint(40, 250)
+        messages.append(
+            MessageEmbed(
+                role=role,
+                content=make_content(rng, words),
+                timestamp=start + timedelta(seconds=i),
+                model=None if role == "user" else "bench-model",
+            )
+        )
+    return messages
+
+
+def make_session(count: int, seed: int = 0) -> Session:
+    """Session with `count` linear messages"""
+    session = Session(session_id=f"bench-{count}", browser_id="bench-browser")
+    for message in make_messages(count, seed):
+        session.add_message(message)
+    return session
+
+
+def measure(
+    fn: Callable[[], object],
+    repeat: int = 5,
+    number: int = 20,
+    clock: Callable[[], float] = time.perf_counter,
+) -> float:
+    """Best-of-`repeat` mean time per call in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = clock()
+        for _ in range(number):
+            fn()
+        best = min(best, (clock() - started) / number)
+    return best * 1000
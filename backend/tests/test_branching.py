@@ -0,0 +1,177 @@
+"""Tests for copy-on-write conversation branching"""
+
+import pytest
+
+from app.domain.chat.entities import MessageEmbed
+from app.domain.chat.service import ChatOrchestrator
+from app.domain.session.entities import Session
+from app.harness.testing import InMemorySessionRepository, ScriptedChatService
+
+
+class RecordingRepository(InMemorySessionRepository):
+    """Records whether writes were full saves or appends"""
+
+    def __init__(self):
+        super().__init__()
+        self.writes: list[tuple[str, int]] = []
+
+    async def save(self, session, expected_revision=None):
+        self.writes.append(("save", len(session.messages)))
+        return await super().save(session, expected_revision)
+
+    async def create(self, session):
+        self.writes.append(("create", len(session.messages)))
+        return await super().create(session)
+
+    async def append_messages(self, session, messages, expected_revision=None):
+        self.writes.append(("append", len(messages)))
+        await super().append_messages(session, messages, expected_revision)
+
+
+async def _turn(orchestrator: ChatOrchestrator, message: str = "", **kwargs) -> str:
+    tokens = [
+        t async for t in orchestrator.process_message("s1", "b1", message, **kwargs)
+    ]
+    return "".join(tokens)
+
+
+# --- Entity Tests ---
+
+
+def test_active_path_follows_parent_pointers():
+    session = Session(session_id="s", browser_id="b")
+    q1 = MessageEmbed(role="user", content="q1")
+    a1 = MessageEmbed(role="assistant", content="a1")
+    session.add_message(q1)
+    session.add_message(a1)
+
+    a1_retry = MessageEmbed(role="assistant", content="a1 again")
+    session.add_branch(q1.id, a1_retry)
+
+    assert [m.content for m in session.active_path()] == ["q1", "a1 again"]
+    assert len(session.messages) == 3
+
+    session.select_branch(a1.id)
+    assert [m.content for m in session.active_path()] == ["q1", "a1"]
+
+
+def test_select_branch_follows_latest_descendant():
+    session = Session(session_id="s", browser_id="b")
+    q1 = MessageEmbed(role="user", content="q1")
+    session.add_message(q1)
+    session.add_message(MessageEmbed(role="assistant", content="a1"))
+    q2 = MessageEmbed(role="user", content="q2")
+    session.add_message(q2)
+
+    edited = MessageEmbed(role="user", content="q1 edited")
+    session.add_branch(None, edited)
+    assert [m.content for m in session.active_path()] == ["q1 edited"]
+
+    session.select_branch(q1.id)
+    assert session.active_leaf_id == q2.id
+
+
+def test_legacy_linear_session_is_upgraded():
+    messages = [
+        MessageEmbed(role="user", content="q"),
+        MessageEmbed(role="assistant", content="a"),
+    ]
+    session = Session(session_id="s", browser_id="b", messages=messages)
+
+    assert [m.content for m in session.active_path()] == ["q", "a"]
+    assert session.ensure_tree() is True
+    assert messages[1].parent_id == messages[0].id
+    assert session.active_leaf_id == messages[1].id
+    assert session.ensure_tree() is False
+
+
+def test_add_branch_rejects_unknown_parent():
+    session = Session(session_id="s", browser_id="b")
+    with pytest.raises(ValueError):
+        session.add_branch("missing", MessageEmbed(role="user", content="x"))
+
+
+# --- Orchestrator Tests ---
+
+
+@pytest.mark.asyncio
+async def test_regenerate_and_edit_append_only_new_messages():
+    repo = RecordingRepository()
+    chat = ScriptedChatService(response_fn=lambda text: f"echo {text}")
+    orchestrator = ChatOrchestrator(repo, chat)
+
+    await _turn(orchestrator, "hello")
+    assert repo.writes == [("create", 1), ("append", 1)]
+
+    repo.writes.clear()
+    await _turn(orchestrator, regenerate=True)
+    assert repo.writes == [("append", 1)]
+
+    session = await repo.find_by_session_id("s1")
+    first_user = session.messages[0]
+    repo.writes.clear()
+    await _turn(orchestrator, "hello again", edit_message_id=first_user.id)
+    assert repo.writes == [("append", 1), ("append", 1)]
+
+    session = await repo.find_by_session_id("s1")
+    assert len(session.messages) == 5
+    assert [m.content for m in session.active_path()] == [
+        "hello again",
+        "echo hello again ",
+    ]
+    # The prompt only contained the active branch
+    assert chat.call_log[-1]["input"] == "hello again"
+
+
+@pytest.mark.asyncio
+async def test_regenerate_uses_prefix_only():
+    repo = InMemorySessionRepository()
+    seen: list[int] = []
+
+    class CountingChat(ScriptedChatService):
+        async def stream_response(self, messages, **kwargs):
+            seen.append(len(messages))
+            async for token in super().stream_response(messages, **kwargs):
+                yield token
+
+    orchestrator = ChatOrchestrator(repo, CountingChat(default_response="ok"))
+    await _turn(orchestrator, "q1")
+    await _turn(orchestrator, regenerate=True)
+
+    # Both generations saw only the user message, never the previous answer
+    assert seen == [1, 1]
+
+
+def test_branch_endpoint_switches_active_leaf():
+    from fastapi.testclient import TestClient
+
+    from app.api.dependencies import set_container
+    from app.harness.testing import TestContainer
+    from app.main import create_app
+
+    container = TestContainer(fake_response="reply")
+    set_container(container)
+    client = TestClient(create_app())
+
+    body = {"session_id": "s-api", "browser_id": "b", "message": "hi"}
+    client.post("/api/chat", json=body)
+    client.post("/api/chat", json={**body, "regenerate": True})
+
+    # The conversation view gets the active branch, the tree view everything
+    active = client.get("/api/sessions/s-api").json()
+    assert [m["id"] for m in active["messages"]][-1] == active["active_leaf_id"]
+    assert len(active["messages"]) == 2
+    session = client.get("/api/sessions/s-api", params={"tree": 1}).json()
+    assert len(session["messages"]) == 3
+    first_reply = session["messages"][1]["id"]
+    assert session["active_leaf_id"] == session["messages"][2]["id"]
+
+    response = client.put(
+        "/api/sessions/s-api/branch", json={"message_id": first_reply}
+    )
+    assert response.status_code == 200
+    assert response.json()["active_leaf_id"] == first_reply
+    assert [m["id"] for m in response.json()["messages"]][-1] == first_reply
+
+    missing = client.put("/api/sessions/s-api/branch", json={"message_id": "nope"})
+    assert missing.status_code == 400
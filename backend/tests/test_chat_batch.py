@@ -0,0 +1,361 @@
+"""Tests for batch chat and admission control"""
+
+import asyncio
+import json
+
+import pytest
+
+from app.application.chat.batch import BatchChatUseCase
+from app.application.chat.dto import BatchChatItem, BatchChatRequest
+from app.domain.chat.entities import MessageEmbed
+from app.domain.chat.service import ChatOrchestrator
+from app.domain.session.entities import Session
+from app.domain.session.locks import KeyedLock
+from app.harness.testing import (
+    InMemorySessionRepository,
+    ScriptedChatService,
+    TestContainer,
+)
+from app.infrastructure.admission import (
+    AdmissionController,
+    AdmissionTimeoutError,
+    Priority,
+)
+from app.infrastructure.metrics import MetricsRegistry
+
+
+class RecordingRepository(InMemorySessionRepository):
+    """In-memory repository that records session writes"""
+
+    def __init__(self):
+        super().__init__()
+        self.writes: list[tuple] = []
+
+    async def create(self, session):
+        self.writes.append(("create", session.session_id, len(session.messages)))
+        return await super().create(session)
+
+    async def insert_many(self, sessions):
+        self.writes.append(("insert_many", [s.session_id for s in sessions]))
+        return await super().insert_many(sessions)
+
+    async def write_batch(self, saves, appends, expected_revisions=None):
+        self.writes.append(("write_batch", [s.session_id for s, _ in appends]))
+        return await super().write_batch(saves, appends, expected_revisions)
+
+    async def append_messages(self, session, messages, expected_revision=None):
+        self.writes.append(("append", session.session_id, len(messages)))
+        await super().append_messages(session, messages, expected_revision)
+
+
+class GatedChat(ScriptedChatService):
+    """Echoes the prompt; each stream waits until the test opens the gate"""
+
+    def __init__(self):
+        super().__init__(response_fn=lambda text: f"re: {text}")
+        self.gate = asyncio.Event()
+
+    async def stream_response(self, messages, **kwargs):
+        await self.gate.wait()
+        async for token in super().stream_response(messages, **kwargs):
+            yield token
+
+
+async def _collect(use_case: BatchChatUseCase, request: BatchChatRequest) -> list:
+    return [r async for r in use_case.execute(request)]
+
+
+# --- Admission Tests ---
+
+
+@pytest.mark.asyncio
+async def test_admission_serves_interactive_before_batch():
+    controller = AdmissionController(max_concurrent=1, registry=MetricsRegistry())
+    order: list[str] = []
+
+    await controller.acquire(Priority.INTERACTIVE)
+
+    async def waiter(priority: Priority, name: str):
+        async with controller.slot(priority):
+            order.append(name)
+
+    batch = asyncio.create_task(waiter(Priority.BATCH, "batch"))
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(waiter(Priority.INTERACTIVE, "interactive"))
+    await asyncio.sleep(0)
+
+    controller.release(Priority.INTERACTIVE)
+    await asyncio.gather(batch, interactive)
+    assert order == ["interactive", "batch"]
+    assert controller.active == 0
+
+
+@pytest.mark.asyncio
+async def test_admission_caps_batch_share():
+    controller = AdmissionController(
+        max_concurrent=4, batch_max_share=0.5, registry=MetricsRegistry()
+    )
+    await controller.acquire(Priority.BATCH)
+    await controller.acquire(Priority.BATCH)
+
+    with pytest.raises(AdmissionTimeoutError):
+        await controller.acquire(Priority.BATCH, timeout=0.01)
+
+    # Interactive traffic still has headroom
+    await controller.acquire(Priority.INTERACTIVE, timeout=0.01)
+    assert controller.active == 3
+
+
+@pytest.mark.asyncio
+async def test_admission_admits_batch_with_a_small_burst():
+    controller = AdmissionController(
+        rate_per_second=100.0, burst=1, batch_max_share=0.5, registry=MetricsRegistry()
+    )
+    # The interactive reserve never exceeds what a full bucket holds
+    await controller.acquire(Priority.BATCH, timeout=0.1)
+    controller.release(Priority.BATCH)
+    await controller.acquire(Priority.BATCH, timeout=0.1)
+    assert controller.active == 1
+
+
+# --- Batch Use Case Tests ---
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_items_and_writes_each_session_once():
+    repo = RecordingRepository()
+    chat = ScriptedChatService({"a": "answer a", "b": "answer b"})
+    use_case = BatchChatUseCase(
+        repo, chat, AdmissionController(registry=MetricsRegistry()), concurrency=4
+    )
+    request = BatchChatRequest(
+        browser_id="batch-browser",
+        items=[
+            BatchChatItem(id="1", session_id="s1", message="a"),
+            BatchChatItem(id="2", session_id="s1", message="b"),
+            BatchChatItem(id="3", message="a"),
+        ],
+    )
+
+    results = [r async for r in use_case.execute(request)]
+
+    assert sorted(r.index for r in results) == [0, 1, 2]
+    assert all(r.status == "ok" for r in results)
+    by_id = {r.id: r for r in results}
+    assert by_id["3"].content == "answer a "
+    assert by_id["3"].session_id is None
+
+    session = await repo.find_by_session_id("s1")
+    assert [m.content for m in session.messages] == [
+        "a",
+        "answer a ",
+        "b",
+        "answer b ",
+    ]
+    assert session.browser_id == "batch-browser"
+    assert repo.writes == [("insert_many", ["s1"])]
+
+
+@pytest.mark.asyncio
+async def test_batch_writes_sessions_together_and_reports_after_the_write():
+    repo = RecordingRepository()
+    await repo.save(Session(session_id="old", browser_id="b1"))
+    chat = GatedChat()
+    use_case = BatchChatUseCase(repo, chat, concurrency=4)
+    request = BatchChatRequest(
+        browser_id="b1",
+        items=[
+            BatchChatItem(session_id="new", message="x"),
+            BatchChatItem(session_id="old", message="y"),
+        ],
+    )
+    reported: list[int] = []
+
+    async def consume() -> None:
+        async for result in use_case.execute(request):
+            assert result.status == "ok"
+            # Only reported once the turn is stored
+            stored = await repo.find_by_session_id(result.session_id)
+            assert stored is not None and len(stored.messages) == 2
+            reported.append(result.index)
+
+    task = asyncio.create_task(consume())
+    await asyncio.sleep(0.01)
+    chat.gate.set()
+    await task
+
+    assert sorted(reported) == [0, 1]
+    # One insert for the new session, one guarded write_batch for the other
+    assert repo.writes == [
+        ("insert_many", ["new"]),
+        ("write_batch", ["old"]),
+        ("append", "old", 2),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batch_retries_only_conflicting_sessions():
+    class OneConflict(RecordingRepository):
+        async def write_batch(self, saves, appends, expected_revisions=None):
+            if len(self.writes) == 0:
+                # Another container writes to s2 first
+                stored = await self.find_by_session_id("s2")
+                stored.add_message(MessageEmbed(role="user", content="elsewhere"))
+                await InMemorySessionRepository.save(self, stored)
+            return await super().write_batch(saves, appends, expected_revisions)
+
+    repo = OneConflict()
+    for session_id in ("s1", "s2"):
+        await repo.save(Session(session_id=session_id, browser_id="b1"))
+    chat = GatedChat()
+    use_case = BatchChatUseCase(repo, chat)
+    request = BatchChatRequest(
+        browser_id="b1",
+        items=[
+            BatchChatItem(session_id="s1", message="one"),
+            BatchChatItem(session_id="s2", message="two"),
+        ],
+    )
+
+    task = asyncio.create_task(_collect(use_case, request))
+    await asyncio.sleep(0.01)
+    chat.gate.set()
+    results = await task
+
+    assert all(r.status == "ok" for r in results)
+    batches = [w[1] for w in repo.writes if w[0] == "write_batch"]
+    assert [sorted(b) for b in batches] == [["s1", "s2"], ["s2"]]
+    s2 = await repo.find_by_session_id("s2")
+    assert [m.content.strip() for m in s2.active_path()] == [
+        "elsewhere",
+        "two",
+        "re: two",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batch_reports_unsaved_answers_as_errors():
+    class Broken(InMemorySessionRepository):
+        async def write_batch(self, saves, appends, expected_revisions=None):
+            raise RuntimeError("database down")
+
+    repo = Broken()
+    await repo.save(Session(session_id="s1", browser_id="b1"))
+    use_case = BatchChatUseCase(repo, ScriptedChatService(default_response="ok"))
+    request = BatchChatRequest(
+        browser_id="b1",
+        items=[BatchChatItem(session_id="s1", message="q"), BatchChatItem(message="q")],
+    )
+
+    results = sorted(await _collect(use_case, request), key=lambda r: r.index)
+
+    assert results[0].status == "error" and "database down" in results[0].error
+    # The answer is still returned; the stateless item is unaffected
+    assert results[0].content == "ok "
+    assert results[1].status == "ok"
+
+
+@pytest.mark.asyncio
+async def test_batch_and_interactive_turns_on_one_session_both_survive():
+    repo = RecordingRepository()
+    session = Session(session_id="s1", browser_id="b1")
+    session.add_message(MessageEmbed(role="user", content="earlier"))
+    await repo.save(session)
+
+    chat = GatedChat()
+    locks = KeyedLock()
+    orchestrator = ChatOrchestrator(repo, chat, session_locks=locks)
+    use_case = BatchChatUseCase(repo, chat, session_locks=locks)
+    request = BatchChatRequest(
+        browser_id="b1", items=[BatchChatItem(session_id="s1", message="batch")]
+    )
+
+    async def interactive() -> None:
+        async for _ in orchestrator.process_message("s1", "b1", "interactive"):
+            pass
+
+    async def batch() -> None:
+        async for _ in use_case.execute(request):
+            pass
+
+    tasks = [asyncio.create_task(interactive()), asyncio.create_task(batch())]
+    await asyncio.sleep(0.01)
+    chat.gate.set()
+    await asyncio.gather(*tasks)
+
+    stored = await repo.find_by_session_id("s1")
+    contents = [m.content.strip() for m in stored.active_path()]
+    assert contents[0] == "earlier"
+    assert sorted(contents[1:]) == sorted(
+        ["interactive", "re: interactive", "batch", "re: batch"]
+    )
+    # The batch appended only its own turn
+    assert ("append", "s1", 2) in repo.writes
+    assert len(locks) == 0
+
+
+@pytest.mark.asyncio
+async def test_batch_append_conflict_reloads_and_keeps_both_writers():
+    class OtherWriterRepository(InMemorySessionRepository):
+        async def append_messages(self, session, messages, expected_revision=None):
+            if messages[0].content == "batch":
+                # Another container appends first, once
+                stored = await self.find_by_session_id(session.session_id)
+                if not stored.messages:
+                    other = MessageEmbed(role="user", content="elsewhere")
+                    stored.add_message(other)
+                    await super().append_messages(stored, [other])
+            await super().append_messages(session, messages, expected_revision)
+
+    repo = OtherWriterRepository()
+    await repo.save(Session(session_id="s1", browser_id="b1"))
+    use_case = BatchChatUseCase(repo, ScriptedChatService(default_response="ok"))
+    request = BatchChatRequest(
+        browser_id="b1", items=[BatchChatItem(session_id="s1", message="batch")]
+    )
+    results = [r async for r in use_case.execute(request)]
+
+    assert results[0].status == "ok"
+    stored = await repo.find_by_session_id("s1")
+    assert [m.content.strip() for m in stored.active_path()] == [
+        "elsewhere",
+        "batch",
+        "ok",
+    ]
+    assert stored.message_count == 3
+
+
+@pytest.mark.asyncio
+async def test_batch_rejects_oversized_request():
+    use_case = BatchChatUseCase(
+        InMemorySessionRepository(), ScriptedChatService(), max_items=1
+    )
+    request = BatchChatRequest(
+        browser_id="b", items=[BatchChatItem(message="x"), BatchChatItem(message="y")]
+    )
+    with pytest.raises(ValueError):
+        use_case.validate(request)
+
+
+def test_batch_endpoint_streams_ndjson():
+    from fastapi.testclient import TestClient
+
+    from app.api.dependencies import set_container
+    from app.main import create_app
+
+    set_container(TestContainer(fake_response="batch reply"))
+    client = TestClient(create_app())
+
+    response = client.post(
+        "/api/chat/batch",
+        json={
+            "browser_id": "b",
+            "items": [{"message": "one"}, {"message": "two", "session_id": "s"}],
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["index"] for line in lines) == [0, 1]
+    assert all(line["content"] == "batch reply " for line in lines)
@@ -0,0 +1,343 @@
+"""Tests for ChatService decorators"""
+
+import asyncio
+import random
+
+import pytest
+from pydantic import ValidationError
+
+from app.application.chat.dto import ChatRequest
+from app.config import Settings
+from app.domain.chat.entities import InferenceParams, MessageEmbed
+from app.domain.chat.errors import ChatServiceError, TransientChatServiceError
+from app.domain.chat.ports import ChatService
+from app.domain.chat.service import ChatOrchestrator
+from app.harness.testing import (
+    FakeChatService,
+    InMemorySessionRepository,
+    ScriptedChatService,
+)
+from app.infrastructure.chat.bedrock_adapter import resolve_inference_params
+from app.infrastructure.chat.retry import RetryingChatService
+from app.infrastructure.chat.router import RoutingChatService, RoutingRules
+from app.infrastructure.metrics import MetricsRegistry
+
+
+class FailingChatService(ChatService):
+    """Raises a scripted error per call, then streams tokens"""
+
+    def __init__(self, failures: list[Exception], tokens: list[str], fail_after=0):
+        self._failures = list(failures)
+        self._tokens = tokens
+        self._fail_after = fail_after
+        self.calls = 0
+
+    async def stream_response(
+        self, messages, model=None, system_prompt=None, params=None
+    ):
+        self.calls += 1
+        failure = self._failures.pop(0) if self._failures else None
+        for i, token in enumerate(self._tokens):
+            if failure and i == self._fail_after:
+                raise failure
+            yield token
+        if failure and self._fail_after >= len(self._tokens):
+            raise failure
+
+    def get_model_id(self) -> str:
+        return "flaky-model"
+
+
+async def _collect(service: ChatService) -> str:
+    messages = [MessageEmbed(role="user", content="hi")]
+    return "".join([t async for t in service.stream_response(messages)])
+
+
+def _retrying(inner: ChatService, registry: MetricsRegistry, **kwargs):
+    sleeps: list[float] = []
+
+    async def fake_sleep(delay: float) -> None:
+        sleeps.append(delay)
+
+    service = RetryingChatService(
+        inner, registry=registry, sleep=fake_sleep, rng=random.Random(0), **kwargs
+    )
+    return service, sleeps
+
+
+# --- Retry Tests ---
+
+
+@pytest.mark.asyncio
+async def test_retry_recovers_before_first_token():
+    registry = MetricsRegistry()
+    inner = FailingChatService(
+        failures=[TransientChatServiceError("throttled")] * 2, tokens=["a", "b"]
+    )
+    service, sleeps = _retrying(inner, registry, max_attempts=3)
+
+    assert await _collect(service) == "ab"
+    assert inner.calls == 3
+    assert len(sleeps) == 2
+    assert all(0 <= s <= 2.0 for s in sleeps)
+    assert registry.get("chat.retry.attempts", model="flaky-model") == 2
+    assert registry.get("chat.retry.recovered", model="flaky-model") == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_never_after_output():
+    registry = MetricsRegistry()
+    inner = FailingChatService(
+        failures=[TransientChatServiceError("throttled")],
+        tokens=["a", "b"],
+        fail_after=1,
+    )
+    service, sleeps = _retrying(inner, registry)
+
+    received = []
+    with pytest.raises(TransientChatServiceError):
+        async for token in service.stream_response([]):
+            received.append(token)
+
+    assert received == ["a"]
+    assert inner.calls == 1
+    assert sleeps == []
+    assert registry.get("chat.retry.skipped_after_output", model="flaky-model") == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_gives_up_after_max_attempts():
+    registry = MetricsRegistry()
+    inner = FailingChatService(
+        failures=[TransientChatServiceError("503")] * 5, tokens=["a"]
+    )
+    service, _ = _retrying(inner, registry, max_attempts=2)
+
+    with pytest.raises(TransientChatServiceError):
+        await _collect(service)
+    assert inner.calls == 2
+    assert registry.get("chat.retry.exhausted", model="flaky-model") == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_respects_deadline():
+    registry = MetricsRegistry()
+    inner = FailingChatService(
+        failures=[TransientChatServiceError("503")] * 5, tokens=["a"]
+    )
+    service, sleeps = _retrying(
+        inner, registry, max_attempts=5, base_delay=10.0, max_delay=10.0, deadline=0.0
+    )
+
+    with pytest.raises(TransientChatServiceError):
+        await _collect(service)
+    assert inner.calls == 1
+    assert sleeps == []
+
+
+@pytest.mark.asyncio
+async def test_stalled_attempt_is_bounded_by_the_deadline():
+    class StallingChatService(FailingChatService):
+        async def stream_response(self, messages, **kwargs):
+            self.calls += 1
+            await asyncio.Event().wait()  # no token, no error
+            yield "never"
+
+    registry = MetricsRegistry()
+    inner = StallingChatService(failures=[], tokens=[])
+    service, sleeps = _retrying(inner, registry, deadline=0.05)
+
+    with pytest.raises(TransientChatServiceError):
+        await asyncio.wait_for(_collect(service), timeout=1.0)
+    assert inner.calls == 1
+    assert sleeps == []
+    assert registry.get("chat.retry.stalled", model="flaky-model") == 1
+    assert registry.get("chat.retry.deadline_exceeded", model="flaky-model") == 1
+
+
+@pytest.mark.asyncio
+async def test_non_transient_errors_are_not_retried():
+    registry = MetricsRegistry()
+    inner = FailingChatService(failures=[ChatServiceError("bad request")], tokens=["a"])
+    service, _ = _retrying(inner, registry)
+
+    with pytest.raises(ChatServiceError):
+        await _collect(service)
+    assert inner.calls == 1
+
+
+# --- Router Tests ---
+
+
+def _router(inner: ChatService = None, **overrides) -> RoutingChatService:
+    rules = RoutingRules(
+        default_model_id="big",
+        fast_model_id="small",
+        max_prompt_chars=20,
+        max_history_messages=4,
+        escalation_keywords=["코드"],
+        escalation_tags=["analysis"],
+        min_samples=2,
+        **overrides,
+    )
+    return RoutingChatService(inner or FakeChatService(), rules, MetricsRegistry())
+
+
+def _user(content: str) -> MessageEmbed:
+    return MessageEmbed(role="user", content=content)
+
+
+def test_router_sends_cheap_turn_to_fast_model():
+    assert _router().resolve_model([_user("안녕하세요")]) == "small"
+
+
+def test_router_explicit_model_wins():
+    router = _router()
+    assert router.resolve_model([_user("안녕하세요")], model="pinned") == "pinned"
+    assert router.resolve_model([_user("안녕하세요")], model="auto") == "small"
+
+
+def test_router_escalates_on_rules():
+    router = _router()
+    assert router.resolve_model([_user("이 코드 봐줘")]) == "big"
+    assert router.resolve_model([_user("hi")], tags=["Analysis"]) == "big"
+    assert router.resolve_model([_user("x" * 21)]) == "big"
+    assert router.resolve_model([_user("hi")] * 5) == "big"
+
+
+@pytest.mark.asyncio
+async def test_router_demotes_fast_model_on_errors():
+    inner = FailingChatService(failures=[ChatServiceError("boom")] * 2, tokens=["a"])
+    router = _router(inner)
+    for _ in range(2):
+        with pytest.raises(ChatServiceError):
+            await _collect(router)
+
+    assert router.stats_for("small").error_rate == 1.0
+    assert router.resolve_model([_user("hi")]) == "big"
+
+
+@pytest.mark.asyncio
+async def test_router_retries_fast_model_once_errors_age_out():
+    now = [0.0]
+    inner = FailingChatService(failures=[ChatServiceError("boom")] * 2, tokens=["a"])
+    router = RoutingChatService(
+        inner,
+        RoutingRules(
+            default_model_id="big",
+            fast_model_id="small",
+            min_samples=2,
+            stats_max_age_seconds=60.0,
+        ),
+        MetricsRegistry(),
+        clock=lambda: now[0],
+    )
+    for _ in range(2):
+        with pytest.raises(ChatServiceError):
+            await _collect(router)
+    assert router.resolve_model([_user("hi")]) == "big"
+
+    # The bad samples expire; the recovered fast model serves again
+    now[0] = 61.0
+    assert router.resolve_model([_user("hi")]) == "small"
+    assert await _collect(router) == "a"
+    assert router.stats_for("small").error_rate == 0.0
+    assert router.resolve_model([_user("hi")]) == "small"
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_records_routed_model():
+    repo = InMemorySessionRepository()
+    orchestrator = ChatOrchestrator(repo, _router())
+
+    async for _ in orchestrator.process_message("s1", "b1", "안녕하세요"):
+        pass
+
+    session = await repo.find_by_session_id("s1")
+    assert session.messages[-1].role == "assistant"
+    assert session.messages[-1].model == "small"
+
+
+# --- Inference Parameter Tests ---
+
+
+def _params_config() -> Settings:
+    return Settings(
+        bedrock_max_tokens=1024,
+        bedrock_temperature=0.7,
+        bedrock_model_params={"small": {"max_tokens": 256, "temperature": 0.2}},
+        bedrock_max_tokens_ceiling=2048,
+        bedrock_temperature_ceiling=0.9,
+        bedrock_max_stop_sequences=2,
+    )
+
+
+def test_inference_params_use_per_model_defaults():
+    config = _params_config()
+    assert resolve_inference_params("big", None, config).max_tokens == 1024
+    small = resolve_inference_params("small", None, config)
+    assert (small.max_tokens, small.temperature) == (256, 0.2)
+
+
+def test_inference_params_ignore_unset_per_model_defaults():
+    config = _params_config()
+    config.bedrock_model_params = {
+        "unset": {"max_tokens": None, "temperature": None, "top_p": None}
+    }
+    resolved = resolve_inference_params("unset", None, config)
+    assert (resolved.max_tokens, resolved.temperature) == (1024, 0.7)
+    assert resolved.top_p is None
+
+
+def test_inference_params_overrides_are_clamped():
+    config = _params_config()
+    overrides = InferenceParams(
+        max_tokens=4096, temperature=1.0, stop_sequences=["a", "b", "c"]
+    )
+    resolved = resolve_inference_params("big", overrides, config)
+    assert resolved.max_tokens == 2048
+    assert resolved.temperature == 0.9
+    assert resolved.stop_sequences == ["a", "b"]
+
+
+def test_chat_request_inference_params():
+    request = ChatRequest(session_id="s", browser_id="b", message="hi")
+    assert request.inference_params() is None
+
+    request = ChatRequest(session_id="s", browser_id="b", message="hi", max_tokens=100)
+    assert request.inference_params() == InferenceParams(max_tokens=100)
+
+
+def test_chat_request_requires_message_unless_regenerating():
+    with pytest.raises(ValidationError):
+        ChatRequest(session_id="s", browser_id="b")
+    with pytest.raises(ValidationError):
+        ChatRequest(session_id="s", browser_id="b", message="", edit_message_id="m")
+
+    request = ChatRequest(session_id="s", browser_id="b", regenerate=True)
+    assert request.message == ""
+
+
+@pytest.mark.asyncio
+async def test_inference_params_reach_chat_service():
+    repo = InMemorySessionRepository()
+    chat = ScriptedChatService(default_response="ok")
+    orchestrator = ChatOrchestrator(repo, chat)
+    params = InferenceParams(max_tokens=64)
+
+    async for _ in orchestrator.process_message("s1", "b1", "hi", params=params):
+        pass
+
+    assert chat.call_log[0]["params"] == params
+
+
+def test_bedrock_client_pool_is_keyed_by_params():
+    from app.infrastructure.chat.bedrock_adapter import BedrockChatService
+
+    service = BedrockChatService()
+    default = service._get_llm("model-a")
+    assert service._get_llm("model-a") is default
+
+    short = service._get_llm("model-a", InferenceParams(max_tokens=10))
+    assert short is not default
+    assert short.max_tokens == 10
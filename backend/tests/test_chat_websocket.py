@@ -0,0 +1,147 @@
+"""Tests for the multiplexed WebSocket chat transport"""
+
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import set_container
+from app.harness.testing import TestContainer
+from app.main import create_app
+
+
+class BlockingChatService:
+    """Chat service that yields one token and then waits forever"""
+
+    def __init__(self, inner):
+        self._inner = inner
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+    async def stream_response(
+        self, messages, model=None, system_prompt=None, params=None
+    ):
+        yield "first "
+        await asyncio.Event().wait()
+
+
+def _client(container: TestContainer) -> TestClient:
+    set_container(container)
+    return TestClient(create_app())
+
+
+def _start(stream_id: str, session_id: str) -> dict:
+    return {
+        "type": "start",
+        "stream_id": stream_id,
+        "session_id": session_id,
+        "browser_id": "ws-browser",
+        "message": "hello",
+    }
+
+
+def _collect_until_done(ws, stream_ids: set[str]) -> list[dict]:
+    frames = []
+    remaining = set(stream_ids)
+    while remaining:
+        frame = ws.receive_json()
+        frames.append(frame)
+        if frame["type"] in ("done", "error", "cancelled"):
+            remaining.discard(frame.get("stream_id"))
+    return frames
+
+
+def test_websocket_multiplexes_streams():
+    container = TestContainer(fake_response="multiplexed reply")
+    client = _client(container)
+
+    with client.websocket_connect("/ws/chat") as ws:
+        ws.send_json(_start("a", "session-a"))
+        ws.send_json(_start("b", "session-b"))
+        frames = _collect_until_done(ws, {"a", "b"})
+
+    for stream_id, session_id in (("a", "session-a"), ("b", "session-b")):
+        text = "".join(
+            f["content"]
+            for f in frames
+            if f["type"] == "token" and f["stream_id"] == stream_id
+        )
+        assert text == "multiplexed reply "
+        assert {
+            "type": "done",
+            "stream_id": stream_id,
+            "session_id": session_id,
+        } in frames
+
+
+def test_websocket_cancel_and_errors():
+    container = TestContainer()
+    container._fake_chat = BlockingChatService(container._fake_chat)
+    client = _client(container)
+
+    with client.websocket_connect("/ws/chat") as ws:
+        ws.send_json({"type": "ping"})
+        assert ws.receive_json() == {"type": "pong"}
+
+        ws.send_json({"type": "start", "stream_id": "bad"})
+        assert ws.receive_json()["type"] == "error"
+
+        ws.send_json(_start("slow", "session-slow"))
+        assert ws.receive_json()["content"] == "first "
+        ws.send_json({"type": "cancel", "stream_id": "slow"})
+        frame = ws.receive_json()
+        assert frame == {
+            "type": "cancelled",
+            "stream_id": "slow",
+            "session_id": "session-slow",
+        }
+
+
+def test_buffered_tokens_are_merged_per_stream():
+    from app.api.routers.websocket import ChatConnection
+
+    async def scenario():
+        connection = ChatConnection(None, None, None, buffer_frames=2)
+        await connection._emit_token(
+            {"type": "token", "stream_id": "a", "content": "x"}
+        )
+        await connection._emit_token(
+            {"type": "token", "stream_id": "b", "content": "y"}
+        )
+
+        # Buffer is full: the next token waits until the sender drains
+        blocked = asyncio.create_task(
+            connection._emit_token({"type": "token", "stream_id": "a", "content": "z"})
+        )
+        await asyncio.sleep(0)
+        assert not blocked.done()
+
+        first = connection._drain()
+        await blocked
+        connection._emit({"type": "done", "stream_id": "a"})
+        return first, connection._drain()
+
+    first, second = asyncio.run(scenario())
+    assert [f["content"] for f in first] == ["x", "y"]
+    assert second == [
+        {"type": "token", "stream_id": "a", "content": "z"},
+        {"type": "done", "stream_id": "a"},
+    ]
+
+
+def test_consecutive_tokens_of_a_stream_share_one_frame():
+    from app.api.routers.websocket import ChatConnection
+
+    async def scenario():
+        connection = ChatConnection(None, None, None)
+        for stream_id, content in (("a", "he"), ("b", "hi"), ("a", "llo")):
+            await connection._emit_token(
+                {"type": "token", "stream_id": stream_id, "content": content}
+            )
+        return connection._drain()
+
+    frames = asyncio.run(scenario())
+    assert [(f["stream_id"], f["content"]) for f in frames] == [
+        ("a", "hello"),
+        ("b", "hi"),
+    ]
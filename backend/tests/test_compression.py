@@ -0,0 +1,94 @@
+"""Tests for negotiated response compression"""
+
+import gzip
+
+import zstandard
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.api.compression import CompressionMiddleware, gzip_encoder, negotiate
+
+BIG = "assistant answer with ```code``` and markdown\n" * 200
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/big")
+    def big():
+        return PlainTextResponse(BIG, headers={"ETag": '"1-abc"'})
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("tiny")
+
+    @app.get("/sse")
+    def sse():
+        return StreamingResponse(
+            iter([b"data: 1\n\n", BIG.encode()]), media_type="text/event-stream"
+        )
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(
+            (f"{i} {BIG}\n".encode() for i in range(3)),
+            media_type="application/x-ndjson",
+        )
+
+    @app.get("/encoded")
+    def encoded():
+        body = gzip.compress(BIG.encode())
+        return Response(body, headers={"Content-Encoding": "gzip"})
+
+    return TestClient(app)
+
+
+def test_negotiation_prefers_client_quality_then_server_order():
+    encoders = [gzip_encoder()]
+    assert negotiate("gzip, br", encoders).name == "gzip"
+    assert negotiate("gzip;q=0", encoders) is None
+    assert negotiate("*", encoders).name == "gzip"
+    assert negotiate("", encoders) is None
+
+
+def test_large_body_is_compressed_with_weak_etag():
+    response = _client().get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == 'W/"1-abc"'
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) < len(BIG) // 5
+    assert response.text == BIG
+
+
+def test_zstd_preferred_when_accepted():
+    headers = {"Accept-Encoding": "gzip, zstd"}
+    with _client().stream("GET", "/big", headers=headers) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "zstd"
+    assert zstandard.ZstdDecompressor().decompress(raw) == BIG.encode()
+
+
+def test_small_body_and_sse_are_not_compressed():
+    client = _client()
+    assert (
+        "content-encoding"
+        not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    )
+    sse = client.get("/sse", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in sse.headers
+    assert sse.text.startswith("data: 1")
+
+
+def test_streaming_body_is_compressed_incrementally():
+    response = _client().get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text == "".join(f"{i} {BIG}\n" for i in range(3))
+
+
+def test_existing_content_encoding_is_untouched():
+    response = _client().get("/encoded", headers={"Accept-Encoding": "zstd, gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == BIG
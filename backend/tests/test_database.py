@@ -0,0 +1,69 @@
+"""Tests for MongoDB client setup and pool statistics"""
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import set_container
+from app.config import Settings
+from app.harness.testing import TestContainer
+from app.infrastructure.database import (
+    PoolStatsListener,
+    close_client,
+    create_mongo_client,
+)
+from app.infrastructure.metrics import MetricsRegistry
+from app.main import create_app
+
+
+def test_pool_stats_follow_pool_events():
+    listener = PoolStatsListener(max_pool_size=4, registry=MetricsRegistry())
+    event = SimpleNamespace(address=("db", 27017), reason="timeout")
+
+    listener.pool_created(event)
+    for _ in range(3):
+        listener.connection_created(event)
+        listener.connection_check_out_started(event)
+    listener.connection_checked_out(event)
+    listener.connection_checked_out(event)
+    listener.connection_check_out_failed(event)
+    listener.connection_checked_in(event)
+
+    assert listener.snapshot() == {
+        "pools": 1,
+        "max_pool_size": 4,
+        "open": 3,
+        "in_use": 1,
+        "available": 2,
+        "waiting": 0,
+        "utilization": 0.25,
+        "checkout_failures": 1,
+        "clears": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_client_uses_pool_settings():
+    config = Settings(
+        mongodb_max_pool_size=7,
+        mongodb_min_pool_size=2,
+        mongodb_max_idle_time_ms=1000,
+        mongodb_server_selection_timeout_ms=50,
+        mongodb_compressors=["zlib"],
+    )
+    client = create_mongo_client("mongodb://db.invalid:27017", config)
+    try:
+        options = client.options
+        assert options.pool_options.max_pool_size == 7
+        assert options.pool_options.min_pool_size == 2
+        assert options.pool_options.max_idle_time_seconds == 1
+        assert options.server_selection_timeout == 0.05
+    finally:
+        await close_client(client)
+
+
+def test_pool_endpoint_without_database():
+    set_container(TestContainer())
+    response = TestClient(create_app()).get("/health/pool")
+    assert response.json() == {"status": "disconnected"}
@@ -0,0 +1,136 @@
+"""Tests for the indexed in-memory session repository"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.domain.chat.entities import MessageEmbed
+from app.domain.session.entities import Session
+from app.infrastructure.session.compact import (
+    CompactMessage,
+    compact_messages,
+    expand_messages,
+    pack_id,
+    unpack_id,
+)
+from app.infrastructure.session.memory_adapter import InMemorySessionRepository
+
+START = datetime(2026, 1, 1)
+
+
+def _session(session_id: str, hours: int, browser_id: str = "b1") -> Session:
+    session = Session(session_id=session_id, browser_id=browser_id)
+    session.updated_at = START + timedelta(hours=hours)
+    return session
+
+
+async def _ids(repo: InMemorySessionRepository, skip: int = 0, limit: int = 100):
+    return [s.session_id for s in await repo.find_by_browser_id("b1", skip, limit)]
+
+
+@pytest.mark.asyncio
+async def test_browser_index_follows_writes():
+    repo = InMemorySessionRepository()
+    await repo.save_many([_session(f"s{i}", i) for i in range(5)])
+    await repo.save(_session("other", 99, browser_id="b2"))
+
+    assert await _ids(repo) == ["s4", "s3", "s2", "s1", "s0"]
+    assert await _ids(repo, skip=1, limit=2) == ["s3", "s2"]
+    assert await _ids(repo, skip=10) == []
+
+    # Every kind of write moves the session to its new position
+    session = await repo.find_by_session_id("s0")
+    message = MessageEmbed(role="user", content="q")
+    session.add_message(message)
+    await repo.append_messages(session, [message])
+    await repo.update("s1", title="renamed")
+    await repo.save(_session("s2", -1))
+    await repo.delete("s3")
+
+    assert await _ids(repo) == ["s1", "s0", "s4", "s2"]
+    versions = await repo.find_versions_by_browser_id("b1", limit=2)
+    assert [v.session_id for v in versions] == ["s1", "s0"]
+    summaries = await repo.list_summaries("b1", limit=2)
+    assert [s.messages for s in summaries] == [[], []]
+    assert await repo.delete_many("b1") == 4
+    assert await _ids(repo) == []
+
+
+@pytest.mark.asyncio
+async def test_update_in_place_ignores_bookkeeping_fields():
+    repo = InMemorySessionRepository()
+    await repo.save(_session("s1", 0))
+
+    updated = await repo.update("s1", title="t", pinned=True, revision=50)
+
+    assert (updated.title, updated.pinned, updated.revision) == ("t", True, 1)
+    # The returned entity is a copy
+    updated.title = "changed"
+    assert (await repo.find_by_session_id("s1")).title == "t"
+    assert await repo.update("missing", title="t") is None
+
+
+@pytest.mark.asyncio
+async def test_memory_stats_track_messages_and_content():
+    repo = InMemorySessionRepository()
+    session = _session("s1", 0)
+    session.add_message(MessageEmbed(role="user", content="질문"))
+    await repo.save(session)
+    await repo.save(_session("s2", 1, browser_id="b2"))
+
+    reply = MessageEmbed(role="assistant", content="답변입니다")
+    session.add_message(reply)
+    await repo.append_messages(session, [reply])
+    stats = repo.memory_stats()
+
+    assert stats["sessions"] == 2 and stats["browsers"] == 2
+    assert stats["messages"] == 2 and stats["content_bytes"] > 0
+
+    await repo.delete("s1")
+    assert repo.memory_stats()["messages"] == 0
+    assert repo.memory_stats()["content_bytes"] == 0
+
+
+# --- Compact Message Tests ---
+
+
+def test_compact_round_trip_preserves_messages():
+    parent = MessageEmbed(role="user", content="hi", timestamp=START)
+    reply = MessageEmbed(
+        role="assistant",
+        content="hello",
+        timestamp=datetime(2026, 1, 2, 3, 4, 5, 678901),
+        model="claude",
+        parent_id=parent.id,
+    )
+    legacy = MessageEmbed(id="m1", role="user", content="x", timestamp=START)
+
+    compact = compact_messages([parent, reply, legacy])
+    restored = expand_messages(compact)
+
+    assert restored == [parent, reply, legacy]
+    assert [m.model_dump() for m in restored] == [
+        m.model_dump() for m in (parent, reply, legacy)
+    ]
+    assert isinstance(compact[0].packed_id, int) and compact[2].packed_id == "m1"
+    # Interned: one role string per process
+    assert compact[0].role is compact[2].role
+    # Non-canonical UUID spellings survive unchanged
+    upper = parent.id.upper()
+    assert unpack_id(pack_id(upper)) == upper
+
+
+@pytest.mark.asyncio
+async def test_repository_holds_compact_messages_and_returns_copies():
+    repo = InMemorySessionRepository()
+    session = _session("s1", 0)
+    aware = datetime(2026, 1, 1, 9, tzinfo=timezone(timedelta(hours=9)))
+    session.add_message(MessageEmbed(role="user", content="q", timestamp=aware))
+    await repo.save(session)
+
+    assert all(isinstance(m, CompactMessage) for m in repo._histories["s1"])
+    found = await repo.find_by_session_id("s1")
+    # Timestamps come back as naive UTC, like from the database
+    assert found.messages[0].timestamp == datetime(2026, 1, 1)
+    found.messages[0].content = "changed"
+    assert (await repo.find_by_session_id("s1")).messages[0].content == "q"
@@ -0,0 +1,131 @@
+"""Tests for message search"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import set_container
+from app.config import Settings
+from app.domain.chat.entities import MessageEmbed
+from app.domain.search.snippet import make_snippet
+from app.domain.session.entities import Session
+from app.harness.container import Container
+from app.harness.testing import InMemorySessionRepository, TestContainer
+from app.infrastructure.search.ngram_index import NGramSearchIndex
+from app.infrastructure.search.rebuild import rebuild_search_index
+from app.infrastructure.session.sqlite_adapter import SqliteSessionRepository
+from app.main import create_app
+
+
+def _session(session_id: str, browser_id: str = "b1") -> Session:
+    return Session(session_id=session_id, browser_id=browser_id)
+
+
+@pytest.mark.asyncio
+async def test_ngram_index_matches_korean_fragments():
+    index = NGramSearchIndex()
+    await index.index_messages(
+        _session("s1"),
+        [
+            MessageEmbed(role="user", content="세션에서 메시지를 검색하는 방법"),
+            MessageEmbed(role="assistant", content="Python 코드 예제입니다"),
+        ],
+    )
+
+    hits = await index.search("b1", "메시지")
+    assert [h.snippet for h in hits] == ["세션에서 메시지를 검색하는 방법"]
+    assert await index.search("b1", "검")  # single syllable
+    assert await index.search("b1", "PYTHON")  # case-insensitive
+    assert await index.search("b1", "메시지 검색") == []  # phrase, not bag of grams
+    assert await index.search("b2", "메시지") == []  # other browser
+
+
+@pytest.mark.asyncio
+async def test_ngram_index_ranks_and_removes_sessions():
+    index = NGramSearchIndex()
+    await index.index_messages(
+        _session("s1"), [MessageEmbed(role="user", content="mongo " * 5)]
+    )
+    await index.index_messages(
+        _session("s2"),
+        [MessageEmbed(role="user", content="mongo and a lot of other words " * 5)],
+    )
+
+    hits = await index.search("b1", "mongo")
+    assert [h.session_id for h in hits] == ["s1", "s2"]
+
+    await index.remove_session("s1")
+    assert [h.session_id for h in await index.search("b1", "mongo")] == ["s2"]
+    await index.remove_session("s2")
+    assert index.stats() == {"browsers": 0, "messages": 0, "grams": 0, "postings": 0}
+
+
+def test_snippet_window():
+    content = "a" * 100 + "needle" + "b" * 100
+    snippet = make_snippet(content, "NEEDLE", context=10)
+    assert snippet == "..." + "a" * 10 + "needle" + "b" * 10 + "..."
+    assert make_snippet("short", "missing") == "short"
+
+
+def test_search_endpoint_indexes_on_append_and_delete():
+    container = TestContainer(fake_response="답변입니다")
+    set_container(container)
+    client = TestClient(create_app())
+    client.post(
+        "/api/chat",
+        json={"session_id": "s1", "browser_id": "b1", "message": "검색 기능 테스트"},
+    )
+
+    response = client.get("/api/search", params={"browser_id": "b1", "q": "기능"})
+    assert response.status_code == 200
+    hits = response.json()["hits"]
+    assert [(h["session_id"], h["role"]) for h in hits] == [("s1", "user")]
+
+    answer = client.get("/api/search", params={"browser_id": "b1", "q": "답변"})
+    assert answer.json()["hits"][0]["role"] == "assistant"
+
+    client.delete("/api/sessions/s1")
+    empty = client.get("/api/search", params={"browser_id": "b1", "q": "기능"})
+    assert empty.json()["hits"] == []
+
+
+@pytest.mark.asyncio
+async def test_rebuild_replaces_each_sessions_entries():
+    repo = InMemorySessionRepository()
+    session = _session("s1")
+    session.add_message(MessageEmbed(role="user", content="저장된 메시지"))
+    await repo.save(session)
+    await repo.save(_session("empty"))
+
+    index = NGramSearchIndex()
+    totals = await rebuild_search_index(index, repo, batch_size=1)
+    assert totals == {"sessions": 2, "messages": 1}
+    # Re-running does not duplicate hits
+    await rebuild_search_index(index, repo)
+    assert len(await index.search("b1", "메시지")) == 1
+    assert index.stats()["messages"] == 1
+
+
+def test_search_backend_follows_session_backend():
+    assert Settings(session_backend="mongo").search_backend == "mongo"
+    assert Settings(session_backend="sqlite").search_backend == "memory"
+    assert Settings(session_backend="memory").search_backend == "memory"
+    explicit = Settings(session_backend="sqlite", search_backend="mongo")
+    assert explicit.search_backend == "mongo"
+
+
+@pytest.mark.asyncio
+async def test_container_start_rebuilds_memory_index(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    repo = SqliteSessionRepository(path)
+    session = _session("s1")
+    session.add_message(MessageEmbed(role="user", content="재시작 전에 저장"))
+    await repo.save(session)
+    await repo.close()
+
+    container = Container(Settings(session_backend="sqlite", session_sqlite_path=path))
+    try:
+        await container.start()
+        hits = await container.search_index().search("b1", "재시작")
+        assert [h.session_id for h in hits] == ["s1"]
+    finally:
+        await container.close()
@@ -0,0 +1,279 @@
+"""Tests for cold-session tiering (archive collection)"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo import DeleteOne, ReplaceOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.domain.chat.entities import MessageEmbed
+from app.domain.session.entities import Session
+from app.domain.session.errors import SessionAlreadyExistsError
+from app.infrastructure.search.ngram_index import NGramSearchIndex
+from app.infrastructure.session import mongo_adapter
+from app.infrastructure.session.archive import (
+    SessionArchive,
+    TieringSessionRepository,
+)
+from app.infrastructure.session.content_codec import ContentCodec
+
+NOW = datetime(2026, 3, 1)
+
+
+class _Result:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+def _matches(doc: dict, query: dict) -> bool:
+    for field, condition in query.items():
+        value = doc.get(field)
+        if not isinstance(condition, dict):
+            if value != condition:
+                return False
+        elif "$ne" in condition:
+            if value == condition["$ne"]:
+                return False
+        elif "$in" in condition:
+            if value not in condition["$in"]:
+                return False
+        elif "$lt" in condition:
+            if value is None or not value < condition["$lt"]:
+                return False
+        elif "$not" in condition:
+            bound = condition["$not"]["$gte"]
+            if value is not None and value >= bound:
+                return False
+    return True
+
+
+class _Cursor:
+    def __init__(self, docs: list[dict]):
+        self._docs = docs
+
+    def sort(self, field, direction):
+        return _Cursor(
+            sorted(self._docs, key=lambda d: d[field], reverse=direction < 0)
+        )
+
+    def skip(self, n):
+        return _Cursor(self._docs[n:])
+
+    def limit(self, n):
+        return _Cursor(self._docs[:n])
+
+    def batch_size(self, n):
+        return self
+
+    async def __aiter__(self):
+        for doc in self._docs:
+            yield doc
+
+
+class _MemoryCollection:
+    """Just enough of a Mongo collection; `key` is the unique field"""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.docs: dict[str, dict] = {}
+
+    def find(self, query, projection=None):
+        return _Cursor([dict(d) for d in self.docs.values() if _matches(d, query)])
+
+    async def find_one(self, query, projection=None):
+        return next((dict(d) for d in self.docs.values() if _matches(d, query)), None)
+
+    async def insert_one(self, doc):
+        if doc[self.key] in self.docs:
+            raise DuplicateKeyError("E11000 duplicate key")
+        self.docs[doc[self.key]] = dict(doc)
+
+    async def insert_many(self, docs, ordered=False):
+        errors = []
+        for i, doc in enumerate(docs):
+            try:
+                await self.insert_one(doc)
+            except DuplicateKeyError:
+                errors.append({"index": i, "code": 11000})
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+    async def update_many(self, query, update):
+        matched = [d for d in self.docs.values() if _matches(d, query)]
+        for doc in matched:
+            doc.update(update["$set"])
+        return _Result(matched_count=len(matched))
+
+    async def delete_one(self, query):
+        for key, doc in list(self.docs.items()):
+            if _matches(doc, query):
+                del self.docs[key]
+                return _Result(deleted_count=1)
+        return _Result(deleted_count=0)
+
+    async def delete_many(self, query):
+        keys = [k for k, d in self.docs.items() if _matches(d, query)]
+        for key in keys:
+            del self.docs[key]
+        return _Result(deleted_count=len(keys))
+
+    async def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            if isinstance(op, ReplaceOne):
+                self.docs[op._filter[self.key]] = dict(op._doc)
+            elif isinstance(op, DeleteOne):
+                await self.delete_one(op._filter)
+
+
+@pytest.fixture
+def hot(monkeypatch):
+    collection = _MemoryCollection("session_id")
+    blobs = _MemoryCollection("_id")
+    monkeypatch.setattr(mongo_adapter, "sessions_collection", lambda: collection)
+    monkeypatch.setattr(mongo_adapter, "blobs_collection", lambda: blobs)
+    collection.blobs = blobs
+    return collection
+
+
+@pytest.fixture
+def archive():
+    return SessionArchive(
+        mongo_adapter.MongoSessionRepository(ContentCodec(min_bytes=64)),
+        idle_after=timedelta(days=7),
+        collection=_MemoryCollection("_id"),
+    )
+
+
+def _session(session_id: str, age_days: int, browser_id: str = "b1") -> Session:
+    session = Session(session_id=session_id, browser_id=browser_id, title="t")
+    session.add_message(MessageEmbed(role="user", content="질문 " * 100))
+    session.add_message(MessageEmbed(role="assistant", content="a", model="m"))
+    session.updated_at = NOW - timedelta(days=age_days)
+    return session
+
+
+async def _seed(*sessions: Session) -> None:
+    await mongo_adapter.MongoSessionRepository().save_many(list(sessions))
+
+
+@pytest.mark.asyncio
+async def test_archive_idle_moves_only_idle_sessions(hot, archive):
+    await _seed(_session("old", 30), _session("recent", 1))
+
+    assert await archive.archive_idle(now=NOW) == 1
+
+    assert set(hot.docs) == {"recent"}
+    stored = archive._archive().docs["old"]
+    assert stored["browser_id"] == "b1"
+    assert stored["archived_at"] == NOW
+    # One compressed frame, no message list
+    assert isinstance(stored["data"], bytes) and "messages" not in stored
+
+
+@pytest.mark.asyncio
+async def test_pinned_idle_sessions_stay_hot(hot, archive):
+    pinned = _session("pinned", 30)
+    pinned.pinned = True
+    await _seed(pinned, _session("old", 30))
+
+    assert await archive.archive_idle(now=NOW) == 1
+
+    assert set(hot.docs) == {"pinned"}
+    assert set(archive._archive().docs) == {"old"}
+
+
+@pytest.mark.asyncio
+async def test_archive_keeps_sessions_written_meanwhile(hot, archive, monkeypatch):
+    await _seed(_session("old", 30))
+    original_bulk_write = hot.bulk_write
+
+    async def touch_then_delete(operations, ordered=True):
+        hot.docs["old"]["updated_at"] = NOW
+        await original_bulk_write(operations, ordered)
+
+    monkeypatch.setattr(hot, "bulk_write", touch_then_delete)
+
+    assert await archive.archive_idle(now=NOW) == 0
+    assert "old" in hot.docs
+    assert archive._archive().docs == {}
+
+
+@pytest.mark.asyncio
+async def test_lookup_restores_archived_session(hot, archive):
+    session = _session("old", 30)
+    await _seed(session)
+    await archive.archive_idle(now=NOW)
+    repo = TieringSessionRepository(archive._repository, archive)
+
+    version = await repo.find_version("old")
+    assert version.revision == session.revision
+    assert "old" not in hot.docs
+
+    restored = await repo.find_by_session_id("old")
+
+    # BSON keeps milliseconds, like the hot collection does
+    assert restored.model_dump(exclude={"created_at", "messages"}) == (
+        session.model_dump(exclude={"created_at", "messages"})
+    )
+    assert [m.content for m in restored.messages] == [
+        m.content for m in session.messages
+    ]
+    assert "old" in hot.docs and "restored_at" in hot.docs["old"]
+    assert archive._archive().docs == {}
+    # Opened again: the next pass leaves it hot
+    assert await archive.archive_idle(now=datetime.utcnow()) == 0
+
+
+@pytest.mark.asyncio
+async def test_tiering_covers_both_tiers_for_export_and_delete(hot, archive):
+    await _seed(_session("old", 30), _session("recent", 1), _session("x", 30, "b2"))
+    await archive.archive_idle(now=NOW)
+    repo = TieringSessionRepository(archive._repository, archive)
+
+    # Archived sessions stay listed (without messages) and are not restored
+    summaries = await repo.list_summaries("b1")
+    assert [s.session_id for s in summaries] == ["recent", "old"]
+    assert summaries[1].title == "t" and summaries[1].messages == []
+    assert summaries[1].message_count == 2
+    assert [s.session_id for s in await repo.list_summaries("b1", 1, 1)] == ["old"]
+    # Archived before summaries were stored: decoded whole
+    del archive._archive().docs["old"]["summary"]
+    assert (await repo.list_summaries("b1"))[1].title == "t"
+    versions = await repo.find_versions_by_browser_id("b1")
+    assert [v.session_id for v in versions] == ["recent", "old"]
+    assert "old" not in hot.docs
+    exported = [s.session_id async for s in repo.iter_by_browser_id("b1")]
+    assert exported == ["recent", "old"]
+
+    with pytest.raises(SessionAlreadyExistsError):
+        await repo.create(_session("old", 0))
+    assert await repo.insert_many([_session("old", 0), _session("new", 0)]) == [
+        False,
+        True,
+    ]
+
+    assert await repo.delete_many("b1") == 3
+    assert set(archive._archive().docs) == {"x"}
+
+
+@pytest.mark.asyncio
+async def test_archived_sessions_leave_search_until_restored(hot):
+    index = NGramSearchIndex()
+    archive = SessionArchive(
+        mongo_adapter.MongoSessionRepository(),
+        collection=_MemoryCollection("_id"),
+        search_index=index,
+    )
+    old, recent = _session("old", 30), _session("recent", 1)
+    await _seed(old, recent)
+    for session in (old, recent):
+        await index.index_messages(session, session.messages)
+
+    await archive.archive_idle(now=NOW)
+    hits = await index.search("b1", "질문")
+    assert [h.session_id for h in hits] == ["recent"]
+
+    repo = TieringSessionRepository(archive._repository, archive)
+    await repo.find_by_session_id("old")
+    hits = await index.search("b1", "질문")
+    assert sorted(h.session_id for h in hits) == ["old", "recent"]
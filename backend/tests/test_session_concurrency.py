@@ -0,0 +1,354 @@
+"""Tests for concurrent chat turns on one session
+
+Turns in one process are serialized per session by a KeyedLock; writers in
+other processes are detected by the revision guard on appends and saves.
+"""
+
+import asyncio
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from app.application.session.select_branch import SelectBranchUseCase
+from app.domain.chat.entities import MessageEmbed
+from app.domain.chat.service import ChatOrchestrator
+from app.domain.session.entities import Session
+from app.domain.session.errors import SessionConflictError
+from app.domain.session.locks import KeyedLock
+from app.harness.testing import InMemorySessionRepository, ScriptedChatService
+from app.infrastructure.session import mongo_adapter
+from app.infrastructure.session.mongo_adapter import MongoSessionRepository
+from app.infrastructure.session.sqlite_adapter import SqliteSessionRepository
+from app.infrastructure.session.write_behind import WriteBehindSessionRepository
+
+
+class GatedChat(ScriptedChatService):
+    """Echoes the prompt; each stream waits until the test opens the gate"""
+
+    def __init__(self):
+        super().__init__(response_fn=lambda text: f"re: {text}")
+        self.gate = asyncio.Event()
+        self.streaming = 0
+
+    async def stream_response(self, messages, **kwargs):
+        self.streaming += 1
+        await self.gate.wait()
+        async for token in super().stream_response(messages, **kwargs):
+            yield token
+
+
+class OtherWriterRepository(InMemorySessionRepository):
+    """Simulates another container writing just before a reply is appended"""
+
+    def __init__(self):
+        super().__init__()
+        self.interleave: list[MessageEmbed] = []
+        self.conflicts = 0
+
+    async def append_messages(self, session, messages, expected_revision=None):
+        if self.interleave and messages[0].role == "assistant":
+            stored = await self.find_by_session_id(session.session_id)
+            other = self.interleave.pop()
+            stored.add_message(other)
+            await super().append_messages(stored, [other])
+        try:
+            await super().append_messages(session, messages, expected_revision)
+        except SessionConflictError:
+            self.conflicts += 1
+            raise
+
+
+def _contents(messages: list[MessageEmbed]) -> list[str]:
+    # Scripted replies are streamed word by word ("word ")
+    return [m.content.strip() for m in messages]
+
+
+async def _turn(orchestrator: ChatOrchestrator, session_id: str, text: str) -> str:
+    tokens = [t async for t in orchestrator.process_message(session_id, "b1", text)]
+    return "".join(tokens)
+
+
+# --- KeyedLock Tests ---
+
+
+@pytest.mark.asyncio
+async def test_keyed_lock_serializes_one_key_only():
+    locks = KeyedLock()
+    events: list[str] = []
+
+    async def worker(key: str, name: str) -> None:
+        async with locks.hold(key):
+            events.append(f"{name} in")
+            await asyncio.sleep(0.01)
+            events.append(f"{name} out")
+
+    await asyncio.gather(worker("a", "a1"), worker("a", "a2"), worker("b", "b1"))
+
+    # Same key: one after the other; the other key did not wait
+    assert events.index("a1 out") < events.index("a2 in")
+    assert events.index("b1 in") < events.index("a1 out")
+    assert len(locks) == 0
+
+
+# --- Orchestrator Tests ---
+
+
+@pytest.mark.asyncio
+async def test_turns_on_one_session_are_serialized():
+    repo = InMemorySessionRepository()
+    chat = GatedChat()
+    orchestrator = ChatOrchestrator(repo, chat)
+
+    first = asyncio.create_task(_turn(orchestrator, "s1", "one"))
+    second = asyncio.create_task(_turn(orchestrator, "s1", "two"))
+    other = asyncio.create_task(_turn(orchestrator, "s2", "other"))
+    await asyncio.sleep(0.01)
+
+    # s1's second turn waits for the first; s2 streams in parallel
+    assert chat.streaming == 2
+    assert orchestrator.session_locks.locked("s1")
+    chat.gate.set()
+    await asyncio.gather(first, second, other)
+
+    session = await repo.find_by_session_id("s1")
+    assert _contents(session.active_path()) == [
+        "one",
+        "re: one",
+        "two",
+        "re: two",
+    ]
+    # The second prompt included the first exchange
+    assert chat.call_log[-1]["input"] == "two"
+    assert len(orchestrator.session_locks) == 0
+
+
+@pytest.mark.asyncio
+async def test_conflicting_append_is_retried_without_calling_the_model():
+    repo = OtherWriterRepository()
+    chat = ScriptedChatService(default_response="answer")
+    orchestrator = ChatOrchestrator(repo, chat)
+    await _turn(orchestrator, "s1", "first")
+
+    # Another container adds a message while our reply is being generated
+    repo.interleave.append(MessageEmbed(role="user", content="from elsewhere"))
+    await _turn(orchestrator, "s1", "second")
+
+    assert repo.conflicts == 1
+    assert len(chat.call_log) == 2
+    session = await repo.find_by_session_id("s1")
+    assert _contents(session.messages) == [
+        "first",
+        "answer",
+        "second",
+        "from elsewhere",
+        "answer",
+    ]
+    second, reply = session.messages[2], session.messages[4]
+    assert reply.parent_id == second.id
+    assert session.active_leaf_id == reply.id
+    assert session.message_count == 5
+
+
+@pytest.mark.asyncio
+async def test_new_session_created_elsewhere_is_appended_to():
+    class LateCreateRepository(InMemorySessionRepository):
+        async def create(self, session):
+            # Another container created the session after our lookup
+            if session.session_id not in self._sessions:
+                other = Session(session_id=session.session_id, browser_id="b1")
+                other.add_message(MessageEmbed(role="user", content="elsewhere"))
+                await self.save(other)
+            return await super().create(session)
+
+    repo = LateCreateRepository()
+    orchestrator = ChatOrchestrator(repo, ScriptedChatService(default_response="ok"))
+    await _turn(orchestrator, "s1", "mine")
+
+    session = await repo.find_by_session_id("s1")
+    assert _contents(session.active_path()) == ["elsewhere", "mine", "ok"]
+
+
+@pytest.mark.asyncio
+async def test_persistent_conflicts_give_up():
+    class AlwaysConflicting(InMemorySessionRepository):
+        async def append_messages(self, session, messages, expected_revision=None):
+            raise SessionConflictError(session.session_id, expected_revision)
+
+    repo = AlwaysConflicting()
+    await repo.save(Session(session_id="s1", browser_id="b1"))
+    chat = ScriptedChatService(default_response="ok")
+    orchestrator = ChatOrchestrator(repo, chat, append_attempts=3)
+
+    with pytest.raises(SessionConflictError):
+        await _turn(orchestrator, "s1", "hi")
+    assert chat.call_log == []
+    assert len(orchestrator.session_locks) == 0
+
+
+@pytest.mark.asyncio
+async def test_legacy_regenerate_answers_a_session_written_meanwhile():
+    class OtherWriterSaves(InMemorySessionRepository):
+        async def save(self, session, expected_revision=None):
+            if expected_revision is not None:
+                raise SessionConflictError(session.session_id, expected_revision)
+            return await super().save(session)
+
+    repo = OtherWriterSaves()
+    # Linear session from before branching (no parent pointers)
+    await repo.save(
+        Session(
+            session_id="s1",
+            browser_id="b1",
+            messages=[MessageEmbed(role="user", content="q")],
+        )
+    )
+    chat = ScriptedChatService(default_response="ok")
+    orchestrator = ChatOrchestrator(repo, chat)
+
+    tokens = [
+        t async for t in orchestrator.process_message("s1", "b1", "", regenerate=True)
+    ]
+
+    assert "".join(tokens).strip() == "ok"
+    stored = await repo.find_by_session_id("s1")
+    assert _contents(stored.messages) == ["q", "ok"]
+
+
+@pytest.mark.asyncio
+async def test_branch_switch_waits_for_a_running_turn():
+    repo = InMemorySessionRepository()
+    session = Session(session_id="s1", browser_id="b1")
+    question = MessageEmbed(role="user", content="q")
+    session.add_message(question)
+    answer = MessageEmbed(role="assistant", content="a")
+    session.add_message(answer)
+    await repo.save(session)
+    locks = KeyedLock()
+    use_case = SelectBranchUseCase(repo, session_locks=locks)
+    # An unused KeyedLock is empty (falsy) but must still be shared
+    orchestrator = ChatOrchestrator(repo, ScriptedChatService(), session_locks=locks)
+    assert orchestrator.session_locks is use_case.session_locks is locks
+
+    async with locks.hold("s1"):
+        switch = asyncio.create_task(use_case.execute("s1", question.id))
+        await asyncio.sleep(0.01)
+        assert not switch.done()
+    # The branch through the question ends at its latest answer
+    assert (await switch).active_leaf_id == answer.id
+
+
+# --- Repository Guard Tests ---
+
+
+async def _assert_guarded(repo) -> None:
+    session = Session(session_id="s1", browser_id="b1")
+    session.add_message(MessageEmbed(role="user", content="q"))
+    await repo.save(session)
+    stale = await repo.find_by_session_id("s1")
+    await repo.update("s1", title="renamed")
+
+    reply = MessageEmbed(role="assistant", content="a")
+    expected = stale.revision
+    stale.add_message(reply)
+    with pytest.raises(SessionConflictError):
+        await repo.append_messages(stale, [reply], expected_revision=expected)
+    assert len((await repo.find_by_session_id("s1")).messages) == 1
+
+    fresh = await repo.find_by_session_id("s1")
+    expected = fresh.revision
+    fresh.add_message(reply)
+    await repo.append_messages(fresh, [reply], expected_revision=expected)
+    stored = await repo.find_by_session_id("s1")
+    assert [m.content for m in stored.messages] == ["q", "a"]
+    assert stored.title == "renamed" and stored.revision == fresh.revision
+
+
+async def _assert_guarded_saves(repo) -> None:
+    session = Session(session_id="s1", browser_id="b1")
+    session.add_message(MessageEmbed(role="user", content="q"))
+    # A missing session is created
+    await repo.save(session, expected_revision=0)
+    stale = await repo.find_by_session_id("s1")
+    await repo.update("s1", title="renamed")
+
+    expected = stale.revision
+    stale.add_message(MessageEmbed(role="assistant", content="a"))
+    with pytest.raises(SessionConflictError):
+        await repo.save(stale, expected_revision=expected)
+    stored = await repo.find_by_session_id("s1")
+    assert stored.title == "renamed" and len(stored.messages) == 1
+
+    expected = stored.revision
+    stored.add_message(MessageEmbed(role="assistant", content="a"))
+    await repo.save(stored, expected_revision=expected)
+    assert len((await repo.find_by_session_id("s1")).messages) == 2
+
+
+@pytest.mark.asyncio
+async def test_memory_repository_guards_appends():
+    await _assert_guarded(InMemorySessionRepository())
+    await _assert_guarded_saves(InMemorySessionRepository())
+
+
+@pytest.mark.asyncio
+async def test_sqlite_repository_guards_appends(tmp_path):
+    repo = SqliteSessionRepository(str(tmp_path / "sessions.db"))
+    try:
+        await _assert_guarded(repo)
+    finally:
+        await repo.close()
+    repo = SqliteSessionRepository(str(tmp_path / "saves.db"))
+    try:
+        await _assert_guarded_saves(repo)
+    finally:
+        await repo.close()
+
+
+@pytest.mark.asyncio
+async def test_write_behind_repository_guards_saves():
+    repo = WriteBehindSessionRepository(InMemorySessionRepository(), interval=60)
+    try:
+        await _assert_guarded_saves(repo)
+    finally:
+        await repo.drain()
+
+
+@pytest.mark.asyncio
+async def test_mongo_save_filters_on_revision(monkeypatch):
+    class Collection:
+        def __init__(self):
+            self.filters = []
+
+        async def replace_one(self, query, raw, upsert=False):
+            self.filters.append(query)
+
+            class Result:
+                matched_count = 0
+
+            return Result()
+
+        async def insert_one(self, raw):
+            raise DuplicateKeyError("E11000 duplicate key")
+
+    collection = Collection()
+    monkeypatch.setattr(mongo_adapter, "sessions_collection", lambda: collection)
+    session = Session(session_id="s1", browser_id="b1")
+
+    with pytest.raises(SessionConflictError):
+        await MongoSessionRepository().save(session, expected_revision=2)
+    assert collection.filters == [{"session_id": "s1", "revision": 2}]
+
+
+def test_mongo_append_filters_on_revision():
+    repo = MongoSessionRepository()
+    session = Session(session_id="s1", browser_id="b1")
+    message = MessageEmbed(role="user", content="q")
+    session.add_message(message)
+
+    query, _, _ = repo._encode_append(session, [message], expected_revision=3)
+    assert query["revision"] == 3
+    # Documents without the field count as revision 0
+    query, _, _ = repo._encode_append(session, [message], expected_revision=0)
+    assert query["revision"] == {"$in": [0, None]}
+    query, _, _ = repo._encode_append(session, [message])
+    assert "revision" not in query
@@ -0,0 +1,89 @@
+"""Tests for the request-coalescing session loader"""
+
+import asyncio
+
+import pytest
+
+from app.domain.session.entities import Session
+from app.harness.testing import InMemorySessionRepository
+from app.infrastructure.metrics import MetricsRegistry
+from app.infrastructure.session.loader import BatchingSessionRepository, SessionLoader
+
+
+class _CountingRepository(InMemorySessionRepository):
+    def __init__(self):
+        super().__init__()
+        self.batches: list[list[str]] = []
+
+    async def find_many(self, session_ids: list[str]) -> dict[str, Session]:
+        self.batches.append(list(session_ids))
+        await asyncio.sleep(0)
+        return await super().find_many(session_ids)
+
+
+async def _repository(*session_ids: str) -> _CountingRepository:
+    repo = _CountingRepository()
+    for session_id in session_ids:
+        await repo.save(Session(session_id=session_id, browser_id="b1"))
+    return repo
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_share_one_query():
+    repo = await _repository("a", "b", "c")
+    batching = BatchingSessionRepository(repo, registry=MetricsRegistry())
+
+    found = await asyncio.gather(
+        *(batching.find_by_session_id(i) for i in ("a", "b", "missing", "a", "c"))
+    )
+
+    assert repo.batches == [["a", "b", "missing", "c"]]
+    assert [s.session_id if s else None for s in found] == [
+        "a",
+        "b",
+        None,
+        "a",
+        "c",
+    ]
+    # Deduplicated waiters still get independent copies
+    assert found[0] is not found[3]
+
+
+@pytest.mark.asyncio
+async def test_full_batch_dispatches_without_waiting():
+    repo = await _repository()
+    loader = SessionLoader(
+        repo.find_many, window=60, max_batch=2, registry=MetricsRegistry()
+    )
+
+    await asyncio.wait_for(
+        asyncio.gather(loader.load("a"), loader.load("b")), timeout=1
+    )
+    assert repo.batches == [["a", "b"]]
+
+
+@pytest.mark.asyncio
+async def test_lookup_after_write_starts_a_fresh_query():
+    repo = await _repository("a")
+    batching = BatchingSessionRepository(repo, registry=MetricsRegistry())
+
+    first = asyncio.ensure_future(batching.find_by_session_id("a"))
+    await asyncio.sleep(0.005)  # the first query is now in flight
+    await batching.update("a", title="renamed")
+    second = await batching.find_by_session_id("a")
+
+    await first
+    assert second.title == "renamed"
+    assert len(repo.batches) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_query_reaches_every_waiter():
+    async def failing(session_ids):
+        raise RuntimeError("boom")
+
+    loader = SessionLoader(failing, registry=MetricsRegistry())
+    results = await asyncio.gather(
+        loader.load("a"), loader.load("b"), return_exceptions=True
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
@@ -0,0 +1,430 @@
+"""Tests for session persistence mapping and repositories"""
+
+import pytest
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.domain.chat.entities import MessageEmbed
+from app.domain.chat.tokens import estimate_tokens
+from app.domain.session.entities import Session
+from app.domain.session.errors import SessionAlreadyExistsError
+from app.infrastructure.metrics import MetricsRegistry
+from app.infrastructure.session import content_codec, mongo_adapter
+from app.infrastructure.session.backfill import backfill_session_stats
+from app.infrastructure.session.mapper import (
+    session_entity_to_raw,
+    session_raw_to_entity,
+)
+from app.infrastructure.session.write_behind import WriteBehindSessionRepository
+
+
+def _session() -> Session:
+    session = Session(session_id="s1", browser_id="b1", title="t", pinned=True)
+    session.add_message(MessageEmbed(role="user", content="q"))
+    session.add_message(MessageEmbed(role="assistant", content="a", model="m"))
+    return session
+
+
+# --- Mapper Tests ---
+
+
+def test_raw_mapping_round_trip():
+    session = _session()
+    raw = {"_id": "oid", "content_bytes": 2, **session_entity_to_raw(session)}
+    assert session_raw_to_entity(raw) == session
+
+    # Documents written before counters and branching existed
+    legacy = {"session_id": "s", "browser_id": "b", "messages": [raw["messages"][0]]}
+    restored = session_raw_to_entity(legacy)
+    assert (restored.revision, restored.message_count) == (0, 0)
+    assert isinstance(restored.messages[0], MessageEmbed)
+    assert restored.messages[0].content == session.messages[0].content
+    assert restored.messages[0].id == session.messages[0].id
+
+
+# --- Mongo Round Trip Tests ---
+
+
+class _Result:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+class _FakeCollection:
+    """Records calls; emulates the unique session_id index"""
+
+    def __init__(self):
+        self.docs: dict[str, dict] = {}
+        self.calls: list[str] = []
+
+    async def insert_one(self, doc):
+        self.calls.append("insert_one")
+        if doc["session_id"] in self.docs:
+            raise DuplicateKeyError("E11000 duplicate key")
+        self.docs[doc["session_id"]] = dict(doc)
+
+    async def replace_one(self, query, doc, upsert=False):
+        self.calls.append("replace_one")
+        self.docs[query["session_id"]] = dict(doc)
+
+    async def find_one_and_update(self, query, update, projection, return_document):
+        self.calls.append("find_one_and_update")
+        doc = self.docs.get(query["session_id"])
+        if doc is None:
+            return None
+        doc.update(update["$set"])
+        doc["revision"] += update["$inc"]["revision"]
+        return {k: v for k, v in doc.items() if projection.get(k, 1)}
+
+    def _append(self, query, update) -> bool:
+        doc = self.docs.get(query["session_id"])
+        if doc is None:
+            return False
+        limit = query.get("content_bytes", {}).get("$not", {}).get("$gt")
+        if limit is not None and doc.get("content_bytes", 0) > limit:
+            return False
+        if "revision" in query and doc.get("revision", 0) != query["revision"]:
+            return False
+        excluded = query.get("messages.id", {}).get("$nin", [])
+        if any(m["id"] in excluded for m in doc["messages"]):
+            return False
+        doc["messages"] = doc["messages"] + update["$push"]["messages"]["$each"]
+        doc.update(update["$set"])
+        for field, value in update["$inc"].items():
+            doc[field] = doc.get(field, 0) + value
+        return True
+
+    async def update_one(self, query, update):
+        self.calls.append("update_one")
+        return _Result(matched_count=int(self._append(query, update)))
+
+    async def bulk_write(self, operations, ordered=True):
+        self.calls.append(f"bulk_write:{len(operations)}")
+        matched = upserted = 0
+        for op in operations:
+            session_id = op._filter["session_id"]
+            if isinstance(op, ReplaceOne):
+                matched += session_id in self.docs
+                upserted += session_id not in self.docs
+                self.docs[session_id] = dict(op._doc)
+            else:
+                matched += self._append(op._filter, op._doc)
+        return _Result(matched_count=matched, upserted_count=upserted)
+
+    def find(self, query, projection=None):
+        self.calls.append("find")
+        wanted = query["session_id"]["$in"]
+        docs = [self.docs[i] for i in wanted if i in self.docs]
+        return _Cursor([dict(doc) for doc in docs])
+
+    async def find_one(self, query, projection=None):
+        self.calls.append("find_one")
+        doc = self.docs.get(query["session_id"])
+        return dict(doc, messages=[dict(m) for m in doc["messages"]]) if doc else None
+
+    async def delete_one(self, query):
+        self.calls.append("delete_one")
+        deleted = self.docs.pop(query["session_id"], None) is not None
+        return _Result(deleted_count=int(deleted))
+
+
+class _FakeBlobCollection:
+    def __init__(self):
+        self.docs: dict[str, dict] = {}
+
+    async def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            self.docs[op._filter["_id"]] = dict(op._doc)
+
+    def find(self, query):
+        return _Cursor([self.docs[i] for i in query["_id"]["$in"] if i in self.docs])
+
+    async def delete_many(self, query):
+        wanted = query.get("session_id")
+        ids = wanted["$in"] if isinstance(wanted, dict) else [wanted]
+        self.docs = {
+            key: blob
+            for key, blob in self.docs.items()
+            if not (
+                blob["session_id"] in ids
+                or (wanted is None and blob["browser_id"] == query["browser_id"])
+            )
+        }
+
+
+@pytest.fixture
+def blobs(monkeypatch):
+    fake = _FakeBlobCollection()
+    monkeypatch.setattr(mongo_adapter, "blobs_collection", lambda: fake)
+    return fake
+
+
+@pytest.fixture
+def collection(monkeypatch, blobs):
+    fake = _FakeCollection()
+    monkeypatch.setattr(mongo_adapter, "sessions_collection", lambda: fake)
+    return fake
+
+
+@pytest.mark.asyncio
+async def test_mongo_writes_take_one_round_trip(collection):
+    repository = mongo_adapter.MongoSessionRepository()
+    session = _session()
+
+    await repository.create(session)
+    with pytest.raises(SessionAlreadyExistsError):
+        await repository.create(session)
+    await repository.save(session)
+
+    updated = await repository.update("s1", title="새 제목", revision=99)
+    assert updated.title == "새 제목"
+    assert updated.messages == []  # metadata-only projection
+    assert updated.revision == session.revision + 1
+
+    assert await repository.delete("s1") is True
+    assert await repository.delete("s1") is False
+    assert await repository.update("s1", title="x") is None
+    assert collection.calls == [
+        "insert_one",
+        "insert_one",
+        "replace_one",
+        "find_one_and_update",
+        "delete_one",
+        "delete_one",
+        "find_one_and_update",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_mongo_find_many_is_one_query(collection):
+    repository = mongo_adapter.MongoSessionRepository()
+    await repository.save(_session())
+
+    found = await repository.find_many(["s1", "missing", "s1"])
+    assert list(found) == ["s1"]
+    assert len(found["s1"].messages) == 2
+    assert await repository.find_many([]) == {}
+    assert collection.calls == ["replace_one", "find"]
+
+
+@pytest.mark.asyncio
+async def test_mongo_write_batch_is_one_bulk_write(collection):
+    repository = mongo_adapter.MongoSessionRepository()
+    stored = _session()
+    await repository.save(stored)
+    collection.calls.clear()
+
+    new = Session(session_id="s2", browser_id="b1")
+    reply = MessageEmbed(role="user", content="more")
+    stored.add_message(reply)
+    await repository.write_batch([new], [(stored, [reply])])
+    assert collection.calls == ["bulk_write:2"]
+    assert len(collection.docs["s1"]["messages"]) == 3
+
+    # An append to a session that vanished is redone as a full save
+    gone = _session()
+    gone.session_id = "gone"
+    await repository.write_batch([], [(gone, gone.messages[-1:])])
+    assert collection.calls[1:] == [
+        "bulk_write:1",
+        "find",
+        "update_one",
+        "update_one",
+        "replace_one",
+    ]
+    assert len(collection.docs["gone"]["messages"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_mongo_write_batch_reports_revision_conflicts(collection):
+    repository = mongo_adapter.MongoSessionRepository()
+    first, second = _session(), _session()
+    second.session_id = "s2"
+    await repository.save_many([first, second])
+    expected = {"s1": first.revision, "s2": second.revision - 1}
+    collection.calls.clear()
+
+    appends = []
+    for session in (first, second):
+        reply = MessageEmbed(role="user", content="more")
+        session.add_message(reply)
+        appends.append((session, [reply]))
+    assert await repository.write_batch([], appends, expected) == {"s2"}
+
+    assert collection.calls[0] == "bulk_write:2"
+    assert len(collection.docs["s1"]["messages"]) == 3
+    assert len(collection.docs["s2"]["messages"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_write_behind_retry_after_partial_failure_appends_once(collection):
+    mongo = mongo_adapter.MongoSessionRepository()
+    first, second = _session(), _session()
+    second.session_id = "s2"
+    await mongo.save_many([first, second])
+    repo = WriteBehindSessionRepository(mongo, interval=60, registry=MetricsRegistry())
+
+    async def append(session: Session, content: str) -> None:
+        message = MessageEmbed(role="user", content=content)
+        session.add_message(message)
+        await repo.append_messages(session, [message])
+
+    await append(first, "one")
+    await append(second, "two")
+
+    # The unordered bulk_write applies the first append, then fails
+    bulk_write = collection.bulk_write
+
+    async def partial(operations, ordered=True):
+        collection.bulk_write = bulk_write
+        await bulk_write(operations[:1], ordered)
+        raise BulkWriteError({"writeErrors": [{"index": 1, "code": 91}]})
+
+    collection.bulk_write = partial
+    with pytest.raises(BulkWriteError):
+        await repo.flush()
+
+    # Requeued with a newer append to the same session, then retried whole
+    await append(first, "three")
+    await repo.drain()
+
+    stored = await mongo.find_many(["s1", "s2"])
+    assert [m.content for m in stored["s1"].messages[2:]] == ["one", "three"]
+    assert [m.content for m in stored["s2"].messages[2:]] == ["two"]
+    assert collection.docs["s1"]["message_count"] == 4
+    assert collection.docs["s2"]["message_count"] == 3
+
+
+# --- Content Compression Tests ---
+
+
+_ANSWER = "설명과 코드:\n```python\ndef handler(x):\n    return x * 2\n```\n" * 40
+
+
+@pytest.mark.parametrize("zstd", [True, False])
+def test_codec_round_trip(monkeypatch, zstd):
+    if not zstd:
+        monkeypatch.setattr(content_codec, "zstandard", None)
+    codec = content_codec.ContentCodec(min_bytes=100)
+    message = MessageEmbed(role="assistant", content=_ANSWER).model_dump()
+
+    stored, blobs, inline_bytes = codec.encode_messages("s1", "b1", [message])
+    assert blobs == []
+    assert stored[0]["codec"] == ("zstd" if zstd else "zlib")
+    assert stored[0]["content"] == ""
+    assert inline_bytes == len(stored[0]["content_z"]) < len(_ANSWER.encode()) / 5
+    assert codec.decompress(stored[0]["codec"], stored[0]["content_z"]) == _ANSWER
+
+
+def test_codec_dictionary_round_trip():
+    samples = [f"{i}: {_ANSWER[i % 50:]}" for i in range(200)]
+    dictionary = content_codec.train_dictionary(samples, size=4096)
+    codec = content_codec.ContentCodec(min_bytes=10, dictionaries=[dictionary])
+    assert codec.codec.startswith("zstd:")
+
+    stored, _, _ = codec.encode_messages(
+        "s1", "b1", [{"id": "m", "content": samples[7]}]
+    )
+    reader = content_codec.ContentCodec(dictionaries=[dictionary])
+    assert reader.decompress(stored[0]["codec"], stored[0]["content_z"]) == samples[7]
+
+
+@pytest.mark.asyncio
+async def test_large_content_is_compressed_and_spills_to_blobs(collection, blobs):
+    codec = content_codec.ContentCodec(min_bytes=100)
+    # Room for the two short messages and one compressed answer
+    codec.inline_budget = 2 + len(codec.compress(_ANSWER.encode())) * 3 // 2
+    repository = mongo_adapter.MongoSessionRepository(codec)
+    session = _session()
+    for _ in range(2):
+        session.add_message(MessageEmbed(role="assistant", content=_ANSWER))
+    await repository.save(session)
+
+    stored = collection.docs["s1"]["messages"]
+    assert [m.get("codec") for m in stored] == [None, None, "zstd", "zstd"]
+    # The second answer no longer fits the inline budget
+    assert "content_z" in stored[2] and "blob_id" in stored[3]
+    assert list(blobs.docs) == [f"s1:{session.messages[3].id}"]
+
+    reply = MessageEmbed(role="assistant", content=_ANSWER)
+    session.add_message(reply)
+    await repository.append_messages(session, [reply])
+    assert collection.docs["s1"]["messages"][-1]["blob_id"] == f"s1:{reply.id}"
+
+    loaded = await repository.find_by_session_id("s1")
+    assert [m.content for m in loaded.messages] == [m.content for m in session.messages]
+
+    await repository.delete("s1")
+    assert blobs.docs == {}
+
+
+# --- Denormalized Counter Tests ---
+
+
+def test_counters_follow_appends_and_refresh():
+    session = _session()
+    assert session.message_count == 2
+    assert session.total_tokens == estimate_tokens("q") + estimate_tokens("a")
+    assert session.last_message_preview == "a"
+
+    session.add_message(MessageEmbed(role="user", content="  여러   줄\n메시지 " * 30))
+    assert session.last_message_preview.startswith("여러 줄 메시지 여러")
+    assert len(session.last_message_preview) == 100
+
+    expected = (session.message_count, session.total_tokens)
+    session.message_count = session.total_tokens = 0
+    session.refresh_stats()
+    assert (session.message_count, session.total_tokens) == expected
+
+
+def test_estimate_tokens_counts_hangul_per_character():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcdefgh") == 2
+    assert estimate_tokens("안녕하세요") == 5
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    def batch_size(self, size):
+        return self
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for doc in self._docs:
+            yield doc
+
+
+class _BackfillCollection:
+    def __init__(self, docs, changed_ids=()):
+        self.docs = docs
+        self.changed_ids = set(changed_ids)
+        self.batches: list[list] = []
+
+    def find(self, query, projection):
+        return _Cursor(self.docs)
+
+    async def bulk_write(self, operations, ordered=True):
+        self.batches.append(operations)
+        matched = sum(
+            1 for op in operations if op._filter["_id"] not in self.changed_ids
+        )
+        return _Result(matched_count=matched)
+
+
+@pytest.mark.asyncio
+async def test_backfill_writes_in_batches_and_skips_changed_sessions():
+    docs = [{"_id": i, "messages": [{"content": "hello"}] * i} for i in range(5)]
+    collection = _BackfillCollection(docs, changed_ids={3})
+
+    totals = await backfill_session_stats(collection, batch_size=2)
+
+    assert totals == {"scanned": 5, "updated": 4, "skipped": 1}
+    assert [len(b) for b in collection.batches] == [2, 2, 1]
+    first = collection.batches[0][1]
+    assert first._filter == {"_id": 1, "messages": {"$size": 1}}
+    assert first._doc["$set"]["message_count"] == 1
+    assert first._doc["$set"]["last_message_preview"] == "hello"
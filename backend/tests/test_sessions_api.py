@@ -0,0 +1,453 @@
+"""Tests for session endpoints and their serialization"""
+
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import serialization
+from app.api.dependencies import set_container
+from app.application.session.dto import SessionResponseDTO
+from app.config import Settings
+from app.domain.chat.entities import MessageEmbed
+from app.domain.session.entities import Session
+from app.harness.testing import InMemorySessionRepository, TestContainer
+from app.main import create_app
+
+
+def _client(container: TestContainer = None) -> TestClient:
+    set_container(container or TestContainer())
+    return TestClient(create_app())
+
+
+def _session(count: int = 3) -> Session:
+    session = Session(session_id="s1", browser_id="b1", title="제목")
+    for i in range(count):
+        role = "user" if i % 2 == 0 else "assistant"
+        session.add_message(MessageEmbed(role=role, content=f'메시지 {i} "q"'))
+    return session
+
+
+# --- Serialization Tests ---
+
+
+def test_session_json_matches_response_dto():
+    session = _session()
+    expected = SessionResponseDTO(
+        **session.model_dump(include=set(serialization.SESSION_FIELDS))
+    ).model_dump(mode="json")
+
+    assert json.loads(serialization.session_to_json(session)) == expected
+
+
+def test_session_summary_json_has_no_messages():
+    payload = json.loads(serialization.sessions_to_json([_session()]))
+    assert payload[0]["messages"] is None
+    assert payload[0]["title"] == "제목"
+
+
+def test_sse_token_frame_is_valid_json():
+    frame = serialization.encode_sse_token('줄\n"바꿈"')
+    assert frame.startswith(b"data: ") and frame.endswith(b"\n\n")
+    assert json.loads(frame[6:-2]) == {"content": '줄\n"바꿈"'}
+
+
+def test_stdlib_fallback_matches_orjson(monkeypatch):
+    session = _session()
+    fast = serialization.sessions_to_json([session])
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert json.loads(serialization.sessions_to_json([session])) == json.loads(fast)
+
+
+# --- Endpoint Tests ---
+
+
+def test_get_session_returns_messages():
+    container = TestContainer()
+    client = _client(container)
+    client.post(
+        "/api/chat", json={"session_id": "s1", "browser_id": "b1", "message": "hi"}
+    )
+
+    response = client.get("/api/sessions/s1")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert [m["role"] for m in response.json()["messages"]] == ["user", "assistant"]
+
+    listing = client.get("/api/sessions", params={"browser_id": "b1"}).json()
+    assert [s["session_id"] for s in listing] == ["s1"]
+
+
+# --- Conditional GET Tests ---
+
+
+def _chat(client: TestClient, message: str = "hi") -> None:
+    client.post(
+        "/api/chat", json={"session_id": "s1", "browser_id": "b1", "message": message}
+    )
+
+
+def test_get_session_returns_304_without_loading_messages():
+    container = TestContainer()
+    client = _client(container)
+    _chat(client)
+
+    first = client.get("/api/sessions/s1")
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    repository = container.session_repository()
+    loads = []
+    original = repository.find_by_session_id
+
+    async def counting_find(session_id):
+        loads.append(session_id)
+        return await original(session_id)
+
+    repository.find_by_session_id = counting_find
+
+    response = client.get("/api/sessions/s1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert loads == []
+
+
+def test_session_etag_changes_with_new_messages_and_updates():
+    client = _client()
+    _chat(client)
+    etag = client.get("/api/sessions/s1").headers["etag"]
+
+    _chat(client, "again")
+    after_chat = client.get("/api/sessions/s1", headers={"If-None-Match": etag})
+    assert after_chat.status_code == 200
+    assert after_chat.headers["etag"] != etag
+
+    client.patch("/api/sessions/s1", json={"pinned": True})
+    after_pin = client.get(
+        "/api/sessions/s1", headers={"If-None-Match": after_chat.headers["etag"]}
+    )
+    assert after_pin.status_code == 200
+
+
+def test_session_list_conditional_get():
+    client = _client()
+    _chat(client)
+    params = {"browser_id": "b1"}
+
+    first = client.get("/api/sessions", params=params)
+    etag = first.headers["etag"]
+    cached = client.get("/api/sessions", params=params, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    client.patch("/api/sessions/s1", json={"title": "새 제목"})
+    changed = client.get(
+        "/api/sessions", params=params, headers={"If-None-Match": etag}
+    )
+    assert changed.status_code == 200
+    assert changed.json()[0]["title"] == "새 제목"
+
+
+def test_session_list_ignores_if_modified_since():
+    client = _client()
+    _chat(client)
+    client.post(
+        "/api/chat", json={"session_id": "s2", "browser_id": "b1", "message": "hi"}
+    )
+    params = {"browser_id": "b1"}
+    first = client.get("/api/sessions", params=params)
+
+    # Deleting the older session leaves the latest updated_at unchanged
+    client.delete("/api/sessions/s1")
+    response = client.get(
+        "/api/sessions",
+        params=params,
+        headers={"If-Modified-Since": first.headers["last-modified"]},
+    )
+    assert response.status_code == 200
+    assert [s["session_id"] for s in response.json()] == ["s2"]
+
+
+def test_if_modified_since():
+    client = _client()
+    _chat(client)
+
+    last_modified = client.get("/api/sessions/s1").headers["last-modified"]
+    response = client.get(
+        "/api/sessions/s1", headers={"If-Modified-Since": last_modified}
+    )
+    assert response.status_code == 304
+
+    stale = client.get(
+        "/api/sessions/s1",
+        headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"},
+    )
+    assert stale.status_code == 200
+
+
+def test_missing_session_is_404():
+    client = _client()
+    assert client.get("/api/sessions/missing").status_code == 404
+
+
+# --- Message Paging Tests ---
+
+
+def test_message_page_cursors():
+    session = _session(10)
+    for i, message in enumerate(session.messages):
+        message.timestamp = datetime(2025, 1, 1) + timedelta(seconds=i)
+    ids = [m.id for m in session.messages]
+
+    latest = session.message_page(limit=4)
+    assert [m.id for m in latest.messages] == ids[6:]
+    assert latest.has_more
+
+    newer = session.message_page(after=ids[6], limit=2)
+    assert [m.id for m in newer.messages] == ids[7:9]
+    assert newer.has_more
+    assert not session.message_page(after=ids[6], limit=3).has_more
+
+    older = session.message_page(before=ids[3], limit=5)
+    assert [m.id for m in older.messages] == ids[:3]
+    assert not older.has_more
+
+    since = session.message_page(after=session.messages[7].timestamp)
+    assert [m.id for m in since.messages] == ids[8:]
+
+
+def test_get_messages_endpoint():
+    container = TestContainer()
+    client = _client(container)
+    for text in ("one", "two", "three"):
+        _chat(client, text)
+    all_ids = [m["id"] for m in client.get("/api/sessions/s1").json()["messages"]]
+
+    latest = client.get("/api/sessions/s1/messages", params={"limit": 2}).json()
+    assert [m["id"] for m in latest["messages"]] == all_ids[-2:]
+    assert latest["has_more"] is True
+    assert latest["active_leaf_id"] == all_ids[-1]
+
+    delta = client.get("/api/sessions/s1/messages", params={"after": all_ids[3]}).json()
+    assert [m["id"] for m in delta["messages"]] == all_ids[4:]
+    assert delta["has_more"] is False
+
+    timestamp = client.get("/api/sessions/s1").json()["messages"][3]["timestamp"]
+    by_time = client.get("/api/sessions/s1/messages", params={"after": timestamp})
+    assert [m["id"] for m in by_time.json()["messages"]] == all_ids[4:]
+
+
+def test_get_messages_errors():
+    client = _client()
+    _chat(client)
+
+    unknown = client.get("/api/sessions/s1/messages", params={"after": "nope"})
+    assert unknown.status_code == 400
+    both = client.get("/api/sessions/s1/messages", params={"after": "a", "before": "b"})
+    assert both.status_code == 400
+    assert client.get("/api/sessions/missing/messages").status_code == 404
+
+
+# --- Export Tests ---
+
+
+def _client_with_sessions(count: int) -> TestClient:
+    container = TestContainer()
+    client = _client(container)
+    for i in range(count):
+        client.post(
+            "/api/chat",
+            json={"session_id": f"s{i}", "browser_id": "b1", "message": f"질문 {i}"},
+        )
+    return client
+
+
+def test_export_ndjson_streams_one_session_per_line():
+    client = _client_with_sessions(3)
+    response = client.get(
+        "/api/sessions/export", params={"browser_id": "b1", "format": "ndjson"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "attachment" in response.headers["content-disposition"]
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(s["session_id"] for s in lines) == ["s0", "s1", "s2"]
+    assert all(len(s["messages"]) == 2 for s in lines)
+    assert "revision" not in lines[0]
+
+
+def test_export_json_and_markdown():
+    client = _client_with_sessions(2)
+    params = {"browser_id": "b1"}
+
+    exported = client.get("/api/sessions/export", params={**params, "format": "json"})
+    assert len(exported.json()) == 2
+
+    markdown = client.get(
+        "/api/sessions/export", params={**params, "format": "markdown"}
+    ).text
+    assert markdown.count("# 새 채팅") == 2
+    assert "**You**:\n\n질문 0" in markdown
+
+    empty = client.get(
+        "/api/sessions/export", params={"browser_id": "nobody", "format": "json"}
+    )
+    assert empty.json() == []
+
+
+def test_export_compressed_download():
+    client = _client_with_sessions(2)
+    response = client.get(
+        "/api/sessions/export", params={"browser_id": "b1", "compress": True}
+    )
+
+    assert response.headers["content-type"] == "application/gzip"
+    assert response.headers["content-disposition"].endswith('.ndjson.gz"')
+    assert "content-encoding" not in response.headers
+    lines = gzip.decompress(response.content).decode().splitlines()
+    assert len(lines) == 2
+
+
+@pytest.mark.asyncio
+async def test_default_iter_by_browser_id_pages_through_sessions():
+    repository = InMemorySessionRepository()
+    for i in range(5):
+        await repository.save(Session(session_id=f"s{i}", browser_id="b1"))
+
+    seen = [s.session_id async for s in repository.iter_by_browser_id("b1", 2)]
+    assert sorted(seen) == [f"s{i}" for i in range(5)]
+
+
+# --- Bulk Tests ---
+
+
+def test_bulk_import_reports_per_item_results():
+    container = TestContainer()
+    client = _client(container)
+    client.post("/api/sessions", json={"session_id": "old", "browser_id": "b1"})
+
+    response = client.post(
+        "/api/sessions/bulk",
+        json={
+            "browser_id": "b1",
+            "sessions": [
+                {
+                    "id": "local-1",
+                    "title": "로컬 대화",
+                    "createdAt": 1735689600000,
+                    "updatedAt": 1735689660000,
+                    "messages": [
+                        {
+                            "id": "m1",
+                            "role": "user",
+                            "content": "이전 질문",
+                            "timestamp": 1735689600000,
+                        }
+                    ],
+                },
+                {"session_id": "old"},
+                {"session_id": "local-1"},
+                {"id": "broken", "messages": [{"role": "user"}]},
+            ],
+        },
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["created"] == 1
+    assert [r["status"] for r in body["results"]] == [
+        "created",
+        "exists",
+        "error",
+        "error",
+    ]
+    # A malformed message fails only its own session
+    broken = body["results"][3]
+    assert broken["session_id"] == "broken" and "content" in broken["error"]
+
+    imported = client.get("/api/sessions/local-1").json()
+    assert imported["messages"][0]["content"] == "이전 질문"
+    assert imported["created_at"].startswith("2025-01-01")
+    hits = client.get("/api/search", params={"browser_id": "b1", "q": "이전"})
+    assert hits.json()["hits"][0]["session_id"] == "local-1"
+
+
+def test_bulk_actions_are_scoped_to_browser():
+    client = _client()
+    for session_id, browser_id in (("a", "b1"), ("b", "b1"), ("c", "b2")):
+        client.post(
+            "/api/sessions", json={"session_id": session_id, "browser_id": browser_id}
+        )
+
+    pinned = client.post(
+        "/api/sessions/bulk/actions",
+        json={"browser_id": "b1", "action": "pin", "session_ids": ["a", "c"]},
+    )
+    assert pinned.json() == {"action": "pin", "matched": 1}
+    assert client.get("/api/sessions/a").json()["pinned"] is True
+    assert client.get("/api/sessions/c").json()["pinned"] is False
+
+    cleared = client.post(
+        "/api/sessions/bulk/actions",
+        json={"browser_id": "b1", "action": "delete", "all": True},
+    )
+    assert cleared.json()["matched"] == 2
+    assert client.get("/api/sessions", params={"browser_id": "b1"}).json() == []
+    assert client.get("/api/sessions/c").status_code == 200
+
+
+def test_bulk_action_requires_exactly_one_target():
+    client = _client()
+    for payload in (
+        {"browser_id": "b1", "action": "delete"},
+        {"browser_id": "b1", "action": "delete", "all": True, "session_ids": []},
+    ):
+        assert (
+            client.post("/api/sessions/bulk/actions", json=payload).status_code == 422
+        )
+
+
+def test_session_list_includes_counters():
+    client = _client()
+    _chat(client, "첫 질문")
+
+    listing = client.get("/api/sessions", params={"browser_id": "b1"}).json()
+    assert listing[0]["message_count"] == 2
+    assert listing[0]["total_tokens"] > 0
+    assert listing[0]["last_message_preview"] == "Test response."
+    assert listing[0]["messages"] is None
+
+
+def test_batch_get_returns_sessions_in_request_order():
+    client = _client_with_sessions(3)
+    client.post("/api/sessions", json={"session_id": "other", "browser_id": "b2"})
+
+    response = client.post(
+        "/api/sessions/batch-get",
+        json={"browser_id": "b1", "session_ids": ["s2", "nope", "s0", "other", "s2"]},
+    )
+    assert response.status_code == 200
+    payload = response.json()
+    assert [s["session_id"] for s in payload["sessions"]] == ["s2", "s0"]
+    assert payload["missing"] == ["nope", "other"]
+    assert len(payload["sessions"][0]["messages"]) == 2
+
+    summaries = client.post(
+        "/api/sessions/batch-get",
+        json={"browser_id": "b1", "session_ids": ["s1"], "include_messages": False},
+    ).json()
+    assert summaries["sessions"][0]["messages"] is None
+
+
+def test_batch_get_limit():
+    config = Settings(mongodb_uri="mongodb://localhost:27017")
+    config.session_batch_get_max_items = 2
+    client = _client(TestContainer(config))
+    response = client.post(
+        "/api/sessions/batch-get",
+        json={"browser_id": "b1", "session_ids": ["a", "b", "c"]},
+    )
+    assert response.status_code == 400
@@ -0,0 +1,181 @@
+"""Tests for the SQLite session repository
+
+Parity tests run the same operations against SqliteSessionRepository and
+the in-memory reference implementation and compare the results.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.domain.chat.entities import MessageEmbed
+from app.domain.session.entities import Session
+from app.domain.session.errors import SessionAlreadyExistsError
+from app.harness.testing import InMemorySessionRepository
+from app.infrastructure.metrics import MetricsRegistry
+from app.infrastructure.session.sqlite_adapter import SqliteSessionRepository
+
+START = datetime(2026, 1, 1)
+
+
+@pytest.fixture
+def sqlite_factory(tmp_path):
+    opened: list[SqliteSessionRepository] = []
+
+    def open_repository(**kwargs) -> SqliteSessionRepository:
+        repository = SqliteSessionRepository(str(tmp_path / "sessions.db"), **kwargs)
+        opened.append(repository)
+        return repository
+
+    yield open_repository
+    for repository in opened:
+        asyncio.run(repository.close())
+
+
+def _session(session_id: str, browser_id: str = "b1", turns: int = 3) -> Session:
+    session = Session(session_id=session_id, browser_id=browser_id, title=session_id)
+    for i in range(turns):
+        session.add_message(
+            MessageEmbed(
+                role="user", content=f"질문 {i}", timestamp=START + timedelta(i)
+            )
+        )
+    session.updated_at = START + timedelta(hours=int(session_id[1:]))
+    return session
+
+
+SESSIONS = {
+    session.session_id: session
+    for session in [_session(f"s{i}") for i in range(6)] + [_session("s9", "b2")]
+}
+REPLY = MessageEmbed(role="assistant", content="답변", model="m")
+
+
+def _copy(*session_ids: str) -> list[Session]:
+    return [SESSIONS[i].model_copy(deep=True) for i in session_ids]
+
+
+async def _scenario(repo) -> dict:
+    """Exercise the port; return everything observable"""
+    await repo.save_many(_copy("s0", "s1", "s2", "s3", "s4"))
+    await repo.create(*_copy("s9"))
+
+    session = await repo.find_by_session_id("s1")
+    reply = REPLY.model_copy()
+    session.add_message(reply)
+    await repo.append_messages(session, [reply])
+
+    first = session.messages[0].id
+    await repo.update("s2", title="renamed", pinned=True)
+    await repo.set_pinned_many("b1", ["s3", "s9"], True)
+    inserted = await repo.insert_many(_copy("s4", "s5"))
+    deleted = await repo.delete_many("b1", ["s0", "s9"])
+
+    def dump(s: Session, **exclude) -> dict:
+        return s.model_dump(exclude={"updated_at", "revision", *exclude})
+
+    return {
+        "inserted": inserted,
+        "deleted": deleted,
+        "s1": dump(await repo.find_by_session_id("s1")),
+        "many": sorted((await repo.find_many(["s1", "s3", "nope"])).keys()),
+        "list": [dump(s) for s in await repo.find_by_browser_id("b1", 1, 2)],
+        "summaries": [s.session_id for s in await repo.list_summaries("b1")],
+        "versions": [
+            v.session_id for v in await repo.find_versions_by_browser_id("b1")
+        ],
+        "iter": [s.session_id async for s in repo.iter_by_browser_id("b1", 2)],
+        "all": sorted([len(s.messages) async for s in repo.iter_all(2)]),
+        "page": (await repo.find_messages("s1", limit=2)).model_dump(),
+        "after": (await repo.find_messages("s1", after=first, limit=2)).model_dump(),
+        "before": (
+            await repo.find_messages("s1", before=START + timedelta(2))
+        ).model_dump(),
+        "missing": await repo.find_messages("nope"),
+        "deleted_one": [await repo.delete("s4"), await repo.delete("s4")],
+    }
+
+
+@pytest.mark.asyncio
+async def test_sqlite_matches_reference_implementation(sqlite_factory):
+    expected = await _scenario(InMemorySessionRepository())
+    actual = await _scenario(sqlite_factory())
+
+    for key in expected:
+        assert actual[key] == expected[key], key
+
+
+@pytest.mark.asyncio
+async def test_update_returns_metadata_and_bumps_revision(sqlite_factory):
+    repo = sqlite_factory()
+    session = await repo.create(_session("s1"))
+
+    updated = await repo.update("s1", title="새 제목", revision=99)
+
+    assert updated.title == "새 제목" and updated.messages == []
+    assert updated.revision == session.revision + 1
+    assert (await repo.find_version("s1")).revision == updated.revision
+    assert await repo.update("nope", title="x") is None
+    with pytest.raises(SessionAlreadyExistsError):
+        await repo.create(_session("s1"))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_share_commits(sqlite_factory):
+    registry = MetricsRegistry()
+    repo = sqlite_factory(registry=registry)
+    await repo.save(_session("s1", turns=0))
+    session = await repo.find_by_session_id("s1")
+
+    replies = [MessageEmbed(role="user", content=f"m{i}") for i in range(20)]
+    for reply in replies:
+        session.add_message(reply)
+    await asyncio.gather(*(repo.append_messages(session, [r]) for r in replies))
+
+    stored = await repo.find_by_session_id("s1")
+    assert [m.content for m in stored.messages] == [r.content for r in replies]
+    assert stored.message_count == 20
+    counters = registry.snapshot()["counters"]
+    assert counters["session.sqlite.writes"] == 21
+    assert counters["session.sqlite.commits"] < 21
+
+
+@pytest.mark.asyncio
+async def test_guarded_write_batch_skips_only_conflicting_sessions(sqlite_factory):
+    for repo in (sqlite_factory(), InMemorySessionRepository()):
+        await repo.save_many([_session("s1", turns=1), _session("s2", turns=1)])
+        s1 = await repo.find_by_session_id("s1")
+        s2 = await repo.find_by_session_id("s2")
+        expected = {"s1": s1.revision, "s2": s2.revision}
+        await repo.update("s2", title="renamed")
+
+        appends = []
+        for session in (s1, s2):
+            reply = MessageEmbed(role="user", content="more")
+            session.add_message(reply)
+            appends.append((session, [reply]))
+        assert await repo.write_batch([], appends, expected) == {"s2"}
+
+        assert len((await repo.find_by_session_id("s1")).messages) == 2
+        assert len((await repo.find_by_session_id("s2")).messages) == 1
+
+
+@pytest.mark.asyncio
+async def test_save_rewrites_changed_messages_and_survives_reopen(sqlite_factory):
+    repo = sqlite_factory()
+    legacy = Session(session_id="s1", browser_id="b1")
+    legacy.messages = [
+        MessageEmbed(role="user", content="q"),
+        MessageEmbed(role="assistant", content="a"),
+    ]
+    await repo.save(legacy)
+
+    loaded = await repo.find_by_session_id("s1")
+    assert loaded.ensure_tree()
+    await repo.save(loaded)
+    await repo.close()
+
+    reopened = await sqlite_factory().find_by_session_id("s1")
+    assert reopened.messages[1].parent_id == reopened.messages[0].id
+    assert reopened.active_leaf_id == reopened.messages[1].id
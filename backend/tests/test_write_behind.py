@@ -0,0 +1,137 @@
+"""Tests for the write-behind session repository"""
+
+import asyncio
+
+import pytest
+
+from app.domain.chat.entities import MessageEmbed
+from app.domain.session.entities import Session
+from app.domain.session.errors import SessionConflictError
+from app.harness.testing import InMemorySessionRepository
+from app.infrastructure.metrics import MetricsRegistry
+from app.infrastructure.session.write_behind import WriteBehindSessionRepository
+
+
+class _RecordingRepository(InMemorySessionRepository):
+    def __init__(self, fail: int = 0):
+        super().__init__()
+        self.batches: list[tuple[list[str], list[tuple[str, int]]]] = []
+        self._fail = fail
+
+    async def write_batch(self, saves, appends):
+        if self._fail:
+            self._fail -= 1
+            raise RuntimeError("write failed")
+        self.batches.append(
+            (
+                [s.session_id for s in saves],
+                [(s.session_id, len(m)) for s, m in appends],
+            )
+        )
+        await super().write_batch(saves, appends)
+
+
+def _repository(inner, **kwargs) -> WriteBehindSessionRepository:
+    kwargs.setdefault("interval", 60)
+    return WriteBehindSessionRepository(inner, registry=MetricsRegistry(), **kwargs)
+
+
+async def _append(repo, session: Session, content: str) -> None:
+    message = MessageEmbed(role="user", content=content)
+    session.add_message(message)
+    await repo.append_messages(session, [message])
+
+
+@pytest.mark.asyncio
+async def test_appends_are_coalesced_into_one_batch():
+    inner = _RecordingRepository()
+    await inner.save(Session(session_id="a", browser_id="b1"))
+    await inner.save(Session(session_id="b", browser_id="b1"))
+    repo = _repository(inner)
+
+    a = await repo.find_by_session_id("a")
+    b = await repo.find_by_session_id("b")
+    for i in range(3):
+        await _append(repo, a, f"a{i}")
+    await _append(repo, b, "b0")
+    await repo.save(Session(session_id="c", browser_id="b1"))
+
+    # Buffered writes are visible to lookups before the flush
+    assert len((await repo.find_by_session_id("a")).messages) == 3
+    assert (await repo.find_version("c")) is not None
+    assert inner.batches == []
+
+    await repo.drain()
+    assert inner.batches == [(["c"], [("a", 3), ("b", 1)])]
+    assert [m.content for m in (await inner.find_by_session_id("a")).messages] == [
+        "a0",
+        "a1",
+        "a2",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_save_supersedes_earlier_appends():
+    inner = _RecordingRepository()
+    repo = _repository(inner)
+    session = Session(session_id="a", browser_id="b1")
+    await repo.save(session)
+    await _append(repo, session, "hi")
+
+    await repo.flush()
+    assert inner.batches == [(["a"], [])]
+    assert (await inner.find_by_session_id("a")).message_count == 1
+
+
+@pytest.mark.asyncio
+async def test_flush_after_max_ops_and_browser_reads_flush_first():
+    inner = _RecordingRepository()
+    repo = _repository(inner, max_ops=2)
+    await repo.save(Session(session_id="a", browser_id="b1"))
+    await repo.save(Session(session_id="b", browser_id="b1"))
+    await asyncio.sleep(0.01)
+    assert inner.batches == [(["a", "b"], [])]
+
+    await repo.save(Session(session_id="c", browser_id="b1"))
+    listed = await repo.list_summaries("b1")
+    assert {s.session_id for s in listed} == {"a", "b", "c"}
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_writes_for_retry():
+    inner = _RecordingRepository(fail=1)
+    await inner.save(Session(session_id="a", browser_id="b1"))
+    repo = _repository(inner)
+    session = await repo.find_by_session_id("a")
+    await _append(repo, session, "first")
+
+    with pytest.raises(RuntimeError):
+        await repo.flush()
+    await _append(repo, session, "second")
+
+    await repo.drain()
+    assert inner.batches == [([], [("a", 2)])]
+
+
+@pytest.mark.asyncio
+async def test_guarded_append_checks_the_buffered_revision():
+    inner = _RecordingRepository()
+    await inner.save(Session(session_id="a", browser_id="b1"))
+    repo = _repository(inner)
+
+    stale = await repo.find_by_session_id("a")
+    await _append(repo, await repo.find_by_session_id("a"), "buffered")
+
+    message = MessageEmbed(role="assistant", content="late")
+    expected = stale.revision
+    stale.add_message(message)
+    with pytest.raises(SessionConflictError):
+        await repo.append_messages(stale, [message], expected_revision=expected)
+
+    fresh = await repo.find_by_session_id("a")
+    expected = fresh.revision
+    fresh.add_message(message)
+    await repo.append_messages(fresh, [message], expected_revision=expected)
+    await repo.drain()
+    stored = await inner.find_by_session_id("a")
+    assert [m.content for m in stored.messages] == ["buffered", "late"]
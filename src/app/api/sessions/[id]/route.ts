@@ -2,18 +2,40 @@ export const runtime = 'edge'
 
 const backendUrl = process.env.MODAL_BACKEND_URL || 'http://localhost:8000'
 
+// Conditional GET: validators go upstream, ETag / Last-Modified come back
+const REQUEST_VALIDATORS = ['if-none-match', 'if-modified-since']
+const RESPONSE_VALIDATORS = ['etag', 'last-modified', 'cache-control']
+
+function pickHeaders(source: Headers, names: string[]): Record<string, string> {
+  const picked: Record<string, string> = {}
+  for (const name of names) {
+    const value = source.get(name)
+    if (value !== null) picked[name] = value
+  }
+  return picked
+}
+
 export async function GET(
   request: Request,
   { params }: { params: Promise<{ id: string }> }
 ) {
   const { id } = await params
   try {
-    const response = await fetch(`${backendUrl}/api/sessions/${id}`)
+    const response = await fetch(`${backendUrl}/api/sessions/${id}`, {
+      headers: pickHeaders(request.headers, REQUEST_VALIDATORS),
+    })
+    const validators = pickHeaders(response.headers, RESPONSE_VALIDATORS)
+
+    // Relay 304 as-is so the browser reuses its cached body
+    if (response.status === 304) {
+      return new Response(null, { status: 304, headers: validators })
+    }
+
     const data = await response.json()
 
     return new Response(JSON.stringify(data), {
       status: response.status,
-      headers: { 'Content-Type': 'application/json' },
+      headers: { ...validators, 'Content-Type': 'application/json' },
     })
   } catch (error) {
     console.error('Session GET error:', error)
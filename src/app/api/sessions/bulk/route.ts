@@ -0,0 +1,28 @@
+export const runtime = 'edge'
+
+const backendUrl = process.env.MODAL_BACKEND_URL || 'http://localhost:8000'
+
+export async function POST(request: Request) {
+  try {
+    const body = await request.json()
+
+    const response = await fetch(`${backendUrl}/api/sessions/bulk`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(body),
+    })
+
+    const data = await response.json()
+
+    return new Response(JSON.stringify(data), {
+      status: response.status,
+      headers: { 'Content-Type': 'application/json' },
+    })
+  } catch (error) {
+    console.error('Sessions bulk POST error:', error)
+    return new Response(JSON.stringify({ error: 'Internal server error' }), {
+      status: 500,
+      headers: { 'Content-Type': 'application/json' },
+    })
+  }
+}
@@ -2,6 +2,19 @@ export const runtime = 'edge'
 
 const backendUrl = process.env.MODAL_BACKEND_URL || 'http://localhost:8000'
 
+// Conditional GET: validators go upstream, ETag / Last-Modified come back
+const REQUEST_VALIDATORS = ['if-none-match', 'if-modified-since']
+const RESPONSE_VALIDATORS = ['etag', 'last-modified', 'cache-control']
+
+function pickHeaders(source: Headers, names: string[]): Record<string, string> {
+  const picked: Record<string, string> = {}
+  for (const name of names) {
+    const value = source.get(name)
+    if (value !== null) picked[name] = value
+  }
+  return picked
+}
+
 export async function GET(request: Request) {
   const { searchParams } = new URL(request.url)
   const browserId = searchParams.get('browser_id')
@@ -14,12 +27,21 @@ export async function GET(request: Request) {
   }
 
   try {
-    const response = await fetch(`${backendUrl}/api/sessions?browser_id=${browserId}`)
+    const response = await fetch(`${backendUrl}/api/sessions?browser_id=${browserId}`, {
+      headers: pickHeaders(request.headers, REQUEST_VALIDATORS),
+    })
+    const validators = pickHeaders(response.headers, RESPONSE_VALIDATORS)
+
+    // Relay 304 as-is so the browser reuses its cached body
+    if (response.status === 304) {
+      return new Response(null, { status: 304, headers: validators })
+    }
+
     const data = await response.json()
 
     return new Response(JSON.stringify(data), {
       status: response.status,
-      headers: { 'Content-Type': 'application/json' },
+      headers: { ...validators, 'Content-Type': 'application/json' },
     })
   } catch (error) {
     console.error('Sessions GET error:', error)
@@ -1,30 +1,56 @@
 import { ChatSession } from '@/entities/message'
 
+const STORAGE_KEY = 'ai-chat-sessions'
+
+interface SessionImportResult {
+  session_id: string
+  status: 'created' | 'exists' | 'error'
+  error?: string
+}
+
 export async function migrateLocalStorage(browserId: string): Promise<void> {
-  const raw = localStorage.getItem('ai-chat-sessions')
+  const raw = localStorage.getItem(STORAGE_KEY)
   if (!raw) return
 
   try {
     const data = JSON.parse(raw)
-    const sessions = data.state?.sessions || {}
+    const entries = Object.entries(data.state?.sessions || {}) as [string, ChatSession][]
+    let failed: [string, ChatSession][] = []
 
-    for (const session of Object.values(sessions) as ChatSession[]) {
-      await fetch('/api/sessions', {
+    if (entries.length > 0) {
+      // One request for all sessions; existing ones are reported, not replaced
+      const response = await fetch('/api/sessions/bulk', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
         },
         body: JSON.stringify({
-          ...session,
           browser_id: browserId,
+          sessions: entries.map(([, session]) => session),
         }),
       })
+
+      if (!response.ok) {
+        throw new Error(`Bulk import failed: ${response.status}`)
+      }
+
+      // Results are in request order; "exists" was migrated before
+      const { results } = (await response.json()) as { results: SessionImportResult[] }
+      failed = entries.filter((_, i) => !results[i] || results[i].status === 'error')
+    }
+
+    if (failed.length > 0) {
+      // Keep only the sessions that did not make it, for the next attempt
+      data.state.sessions = Object.fromEntries(failed)
+      localStorage.setItem(STORAGE_KEY, JSON.stringify(data))
+      console.error(`Failed to migrate ${failed.length} localStorage sessions`)
+      return
     }
 
     // Remove old localStorage data after successful migration
-    localStorage.removeItem('ai-chat-sessions')
+    localStorage.removeItem(STORAGE_KEY)
     console.log('Successfully migrated localStorage data to backend')
   } catch (error) {
     console.error('Failed to migrate localStorage:', error)
   }
-}
\ No newline at end of file
+}